@@ -0,0 +1,304 @@
+import numpy as np
+import pandas as pd
+from calendario import CLASIFICACIONES, DIAS_SEMANA, ESTACIONES, build_calendar_context
+
+# Variables de la matriz de correlación (mismos nombres que la gráfica original)
+VARIABLES_CORRELACION = ['precio_mwh', 'hora', 'mes', 'dia_semana_num',
+                         'es_fin_de_semana_num', 'es_feriado_num', 'ciclo_escolar_num']
+
+# Agrupaciones que usan las gráficas: nombre -> (claves, tamaño de cada clave)
+AGRUPACIONES = {
+    'dia_semana': (('dia_semana',), (7,)),
+    'estacion': (('estacion',), (len(ESTACIONES),)),
+    'clasificacion': (('clasificacion',), (len(CLASIFICACIONES),)),
+    'mes': (('mes',), (12,)),
+    'hora': (('hora',), (24,)),
+    'hora_dia_semana': (('hora', 'dia_semana'), (24, 7)),
+    'hora_estacion': (('hora', 'estacion'), (24, len(ESTACIONES))),
+    'mes_ciclo': (('mes', 'ciclo_escolar'), (12, 2)),
+    'hora_feriado': (('hora', 'feriado'), (24, 2)),
+    'hora_fin_de_semana': (('hora', 'fin_de_semana'), (24, 2))
+}
+
+def _merge_moments(n_a, mean_a, m2_a, n_b, mean_b, m2_b):
+    """
+    Combina conteo, media y suma de cuadrados centrados de dos bloques (Chan et al.)
+
+    Funciona elemento a elemento para vectores y, con m2 matricial, para covarianzas.
+    """
+    n = n_a + n_b
+    with np.errstate(invalid='ignore', divide='ignore'):
+        w_b = np.where(n > 0, n_b / n, 0.0)
+    delta = mean_b - mean_a
+    mean = mean_a + delta * w_b
+    if np.ndim(m2_a) == 2 and np.ndim(delta) == 1:
+        m2 = m2_a + m2_b + np.outer(delta, delta) * (n_a * n_b / n if n > 0 else 0.0)
+    else:
+        m2 = m2_a + m2_b + delta ** 2 * n_a * w_b
+    return n, mean, m2
+
+class ChartAggregates:
+    """
+    Estado de tamaño fijo con todo lo que necesitan las 12 gráficas de pregunta5
+
+    Se alimenta por bloques de registros hora-día (update) y dos estados se
+    pueden combinar (merge), así que preparar las gráficas de varios años cuesta
+    lo mismo en memoria que un mes. Guarda:
+      - conteo, media y M2 por cada agrupación (promedios, desviaciones, heatmaps)
+      - histogramas de ancho fijo por estación (cuantiles para los boxplots)
+      - media y matriz de co-momentos de las variables de correlación
+    """
+
+    def __init__(self, rango=(0.0, 2000.0), ancho_bin=0.5):
+        self.edges = np.arange(rango[0], rango[1] + ancho_bin, ancho_bin)
+        self.n_bins = len(self.edges) - 1
+        self.grupos = {name: {'n': np.zeros(int(np.prod(shape))), 'media': np.zeros(int(np.prod(shape))),
+                              'm2': np.zeros(int(np.prod(shape)))}
+                       for name, (_, shape) in AGRUPACIONES.items()}
+        self.histogramas = np.zeros((len(ESTACIONES), self.n_bins), dtype=np.int64)
+        self.minimo = np.full(len(ESTACIONES), np.inf)
+        self.maximo = np.full(len(ESTACIONES), -np.inf)
+        k = len(VARIABLES_CORRELACION)
+        self.n = 0
+        self.media = np.zeros(k)
+        self.comomentos = np.zeros((k, k))
+
+    def update(self, registros):
+        """
+        Agrega un bloque de registros (diccionario de arreglos del mismo largo)
+
+        Llaves: precio, hora, mes, dia_semana (0=lunes), estacion y clasificacion
+        (códigos de calendario.py), fin_de_semana, feriado y ciclo_escolar (bool).
+        """
+        precio = np.asarray(registros['precio'], dtype=float)
+        valid = ~np.isnan(precio)
+        r = {key: np.asarray(value)[valid] for key, value in registros.items()}
+        precio = precio[valid]
+        if len(precio) == 0:
+            return self
+        r['mes'] = r['mes'] - 1  # código 0-11
+
+        for name, (keys, shape) in AGRUPACIONES.items():
+            code = np.ravel_multi_index(tuple(r[key].astype(np.int64) for key in keys), shape)
+            size = int(np.prod(shape))
+            n_b = np.bincount(code, minlength=size).astype(float)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean_b = np.where(n_b > 0, np.bincount(code, weights=precio, minlength=size) / n_b, 0.0)
+            m2_b = np.bincount(code, weights=(precio - mean_b[code]) ** 2, minlength=size)
+            g = self.grupos[name]
+            g['n'], g['media'], g['m2'] = _merge_moments(g['n'], g['media'], g['m2'], n_b, mean_b, m2_b)
+
+        # Histogramas por estación; fuera de rango se acumula en los extremos
+        season = r['estacion'].astype(np.int64)
+        bins = np.clip(np.searchsorted(self.edges, precio, side='right') - 1, 0, self.n_bins - 1)
+        self.histogramas += np.bincount(season * self.n_bins + bins,
+                                        minlength=self.histogramas.size).reshape(self.histogramas.shape)
+        np.minimum.at(self.minimo, season, precio)
+        np.maximum.at(self.maximo, season, precio)
+
+        # Co-momentos para la matriz de correlación
+        X = np.column_stack([precio, r['hora'], r['mes'] + 1, r['dia_semana'],
+                             r['fin_de_semana'], r['feriado'], r['ciclo_escolar']]).astype(float)
+        mean_b = X.mean(axis=0)
+        centered = X - mean_b
+        self.n, self.media, self.comomentos = _merge_moments(
+            self.n, self.media, self.comomentos, len(X), mean_b, centered.T @ centered)
+        return self
+
+    def merge(self, other):
+        """
+        Combina otro estado (ej. de otro año o de otro proceso) en este
+        """
+        for name, g in self.grupos.items():
+            o = other.grupos[name]
+            g['n'], g['media'], g['m2'] = _merge_moments(g['n'], g['media'], g['m2'], o['n'], o['media'], o['m2'])
+        self.histogramas += other.histogramas
+        self.minimo = np.minimum(self.minimo, other.minimo)
+        self.maximo = np.maximum(self.maximo, other.maximo)
+        self.n, self.media, self.comomentos = _merge_moments(
+            self.n, self.media, self.comomentos, other.n, other.media, other.comomentos)
+        return self
+
+    # -------------------------------------------------------------------------
+    # Lecturas para las gráficas
+    # -------------------------------------------------------------------------
+
+    def mean(self, name):
+        """
+        Promedio por grupo con la forma de la agrupación (NaN si el grupo no tiene datos)
+        """
+        g = self.grupos[name]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            values = np.where(g['n'] > 0, g['media'], np.nan)
+        return values.reshape(AGRUPACIONES[name][1])
+
+    def std(self, name):
+        """
+        Desviación estándar muestral por grupo (ddof=1, igual que pandas)
+        """
+        g = self.grupos[name]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            values = np.where(g['n'] > 1, np.sqrt(g['m2'] / (g['n'] - 1)), np.nan)
+        return values.reshape(AGRUPACIONES[name][1])
+
+    def count(self, name):
+        return self.grupos[name]['n'].reshape(AGRUPACIONES[name][1]).astype(np.int64)
+
+    def correlation(self):
+        """
+        Matriz de correlación de Pearson de VARIABLES_CORRELACION
+        """
+        std = np.sqrt(np.diag(self.comomentos))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = self.comomentos / np.outer(std, std)
+        return pd.DataFrame(corr, index=VARIABLES_CORRELACION, columns=VARIABLES_CORRELACION)
+
+    def _quantile(self, season, q):
+        counts = self.histogramas[season]
+        cumulative = np.cumsum(counts)
+        n = cumulative[-1]
+        # Misma convención que numpy/pandas: posición q × (n - 1) entre los valores ordenados
+        position = q * (n - 1)
+        b = int(np.searchsorted(cumulative, position, side='right'))
+        before = cumulative[b - 1] if b > 0 else 0
+        fraction = (position - before + 0.5) / counts[b]
+        value = self.edges[b] + fraction * (self.edges[b + 1] - self.edges[b])
+        return float(np.clip(value, self.minimo[season], self.maximo[season]))
+
+    def boxplot_stats(self, max_fliers=200):
+        """
+        Estadísticas de boxplot por estación para Axes.bxp, desde los histogramas
+
+        Cuartiles y bigotes (1.5 × IQR) tienen error de a lo sumo un ancho de bin;
+        los valores atípicos se representan por el centro de sus bins.
+        """
+        centers = (self.edges[:-1] + self.edges[1:]) / 2
+        stats = []
+        for season, name in enumerate(ESTACIONES):
+            counts = self.histogramas[season]
+            if counts.sum() == 0:
+                stats.append({'label': name[:3], 'med': np.nan, 'q1': np.nan, 'q3': np.nan,
+                              'whislo': np.nan, 'whishi': np.nan, 'fliers': []})
+                continue
+            q1, med, q3 = (self._quantile(season, q) for q in (0.25, 0.5, 0.75))
+            iqr = q3 - q1
+            occupied = counts > 0
+            inside = occupied & (centers >= q1 - 1.5 * iqr) & (centers <= q3 + 1.5 * iqr)
+            whislo = max(self.minimo[season], self.edges[:-1][inside].min()) if inside.any() else q1
+            whishi = min(self.maximo[season], self.edges[1:][inside].max()) if inside.any() else q3
+
+            fliers = centers[occupied & ~inside]
+            fliers = np.clip(fliers, self.minimo[season], self.maximo[season])
+            if len(fliers) > max_fliers:
+                fliers = fliers[np.linspace(0, len(fliers) - 1, max_fliers).astype(int)]
+            stats.append({'label': name[:3], 'med': med, 'q1': q1, 'q3': q3,
+                          'whislo': whislo, 'whishi': whishi, 'fliers': fliers})
+        return stats
+
+    def chart_data(self):
+        """
+        Series y tablas listas para graficar, con las etiquetas de la versión original
+        """
+        def series(name, labels):
+            values = pd.Series(self.mean(name), index=labels)
+            return values[self.count(name) > 0]
+
+        hour_weekday = pd.DataFrame(self.mean('hora_dia_semana'), index=pd.Index(range(24), name='hora'),
+                                    columns=pd.Index(DIAS_SEMANA, name='dia_semana_nombre'))
+        hour_season = pd.DataFrame(self.mean('hora_estacion'), index=pd.Index(range(24), name='hora'),
+                                   columns=pd.Index(ESTACIONES, name='estacion'))
+        hour_season = hour_season.loc[:, self.count('hora_estacion').sum(axis=0) > 0]
+
+        month_count = self.count('mes') > 0
+        meses = np.arange(1, 13)
+
+        def by_flag(name, index):
+            table = pd.DataFrame(self.mean(name), index=index, columns=[False, True])
+            return table.loc[:, self.count(name).sum(axis=0) > 0]
+
+        hora_mean = series('hora', range(24))
+        return {
+            'por_dia_semana': series('dia_semana', DIAS_SEMANA).sort_values(),
+            'por_estacion': series('estacion', ESTACIONES).sort_values(),
+            'hora_dia_semana': hour_weekday,
+            'por_clasificacion': series('clasificacion', CLASIFICACIONES).sort_values(),
+            'por_mes': pd.Series(self.mean('mes')[month_count], index=meses[month_count]),
+            'mes_ciclo': by_flag('mes_ciclo', meses).loc[month_count],
+            'hora_feriado': by_flag('hora_feriado', range(24)),
+            'hora_fin_de_semana': by_flag('hora_fin_de_semana', range(24)),
+            # pivot_table ordena las columnas alfabéticamente
+            'hora_estacion': hour_season[sorted(hour_season.columns)],
+            'std_mes': pd.Series(self.std('mes')[month_count], index=meses[month_count]),
+            'correlacion': self.correlation(),
+            'boxplot_estacion': self.boxplot_stats(),
+            'dia_mas_barato': series('dia_semana', DIAS_SEMANA).idxmin(),
+            'estacion_mas_barata': series('estacion', ESTACIONES).idxmin(),
+            'hora_mas_barata': int(hora_mean.idxmin()),
+            'registros': int(self.n)
+        }
+
+def records_from_context_table(energy_context_df):
+    """
+    Convierte (un bloque de) la tabla hora-día de pregunta5 a los arreglos de update
+    """
+    def codes(column, categories):
+        return pd.Categorical(energy_context_df[column], categories=categories).codes
+
+    registros = {
+        'precio': energy_context_df['precio_mwh'].to_numpy(dtype=float),
+        'hora': energy_context_df['hora'].to_numpy(),
+        'mes': energy_context_df['mes'].to_numpy(),
+        'dia_semana': energy_context_df['dia_semana_num'].to_numpy(),
+        'estacion': codes('estacion', ESTACIONES),
+        'clasificacion': codes('clasificacion', CLASIFICACIONES),
+        'fin_de_semana': energy_context_df['es_fin_de_semana'].to_numpy(dtype=bool),
+        'feriado': energy_context_df['es_feriado'].to_numpy(dtype=bool),
+        'ciclo_escolar': energy_context_df['ciclo_escolar_activo'].to_numpy(dtype=bool)
+    }
+    # Filas con categorías desconocidas quedan fuera (sin precio)
+    unknown = (registros['estacion'] < 0) | (registros['clasificacion'] < 0)
+    registros['precio'] = np.where(unknown, np.nan, registros['precio'])
+    registros['estacion'] = np.maximum(registros['estacion'], 0)
+    registros['clasificacion'] = np.maximum(registros['clasificacion'], 0)
+    return registros
+
+def records_from_price_grid(price_grid, context=None):
+    """
+    Arreglos de update directamente desde la grilla (sin armar la tabla hora-día)
+    """
+    if context is None:
+        context = build_calendar_context(price_grid)
+    shape = price_grid['precios'].shape
+
+    def by_day(values):
+        return np.broadcast_to(np.asarray(values)[:, None], shape).ravel()
+
+    return {
+        'precio': price_grid['precios'].ravel(),
+        'hora': np.broadcast_to(np.arange(24), shape).ravel(),
+        'mes': by_day(price_grid['mes']),
+        'dia_semana': by_day(context['dia_semana']),
+        'estacion': by_day(context['estacion']),
+        'clasificacion': by_day(context['clasificacion']),
+        'fin_de_semana': by_day(context['es_fin_de_semana']),
+        'feriado': by_day(context['es_feriado']),
+        'ciclo_escolar': by_day(context['ciclo_escolar_activo'])
+    }
+
+def aggregate_context_table(energy_context_df, chunksize=100_000, **kwargs):
+    """
+    Estado de gráficas a partir de la tabla hora-día, procesada por bloques
+    """
+    aggregates = ChartAggregates(**kwargs)
+    for start in range(0, len(energy_context_df), chunksize):
+        aggregates.update(records_from_context_table(energy_context_df.iloc[start:start + chunksize]))
+    return aggregates
+
+def aggregate_price_grids(price_grids, **kwargs):
+    """
+    Estado de gráficas para varios años (una grilla por año) sin concatenar tablas
+    """
+    aggregates = ChartAggregates(**kwargs)
+    for price_grid in price_grids:
+        aggregates.update(records_from_price_grid(price_grid))
+    return aggregates
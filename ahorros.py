@@ -0,0 +1,218 @@
+from itertools import product
+import numpy as np
+import pandas as pd
+from calendario import DIAS_SEMANA, ESTACIONES, build_calendar_context
+from perfiles import expected_price_grid
+from datos import MONTHS
+
+def baseline_mask(price_grid, hora_inicio=8, hora_fin=20):
+    """
+    Máscara (días, 24) del horario actual: hora_inicio a hora_fin todos los días
+    """
+    mask = np.zeros(price_grid['precios'].shape)
+    mask[:, hora_inicio:hora_fin] = 1.0
+    return mask
+
+def _daily_average_by(values, codes, n_codes):
+    sums = np.bincount(codes, weights=np.nansum(values, axis=1), minlength=n_codes)
+    counts = np.bincount(codes, weights=np.sum(~np.isnan(values), axis=1), minlength=n_codes)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return sums / counts
+
+def valley_hours_mask(price_grid, base):
+    """
+    Mismas horas diarias que la base, pero en las horas más baratas de cada mes
+
+    Las horas se eligen con el precio promedio (mes, hora) para que sea un
+    horario fijo por mes, aplicable en la práctica.
+    """
+    precios = price_grid['precios']
+    month_idx = price_grid['mes'] - 1
+    sums = np.zeros((12, 24))
+    counts = np.zeros((12, 24))
+    np.add.at(sums, month_idx, np.nan_to_num(precios))
+    np.add.at(counts, month_idx, ~np.isnan(precios))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        month_avg = np.where(counts > 0, sums / counts, np.inf)
+
+    # Rango de cada hora dentro de su mes; se trabajan las n más baratas del día
+    ranks = np.argsort(np.argsort(month_avg, axis=1, kind='stable'), axis=1)[month_idx]
+    hours_per_day = base.sum(axis=1, keepdims=True)
+    return (ranks < hours_per_day).astype(float)
+
+def _hour_ranges(hours):
+    # [0, 1, 2, 22, 23] -> "00:00-03:00, 22:00-24:00"
+    breaks = np.flatnonzero(np.diff(hours) != 1) + 1
+    return ', '.join(f"{run[0]:02d}:00-{run[-1] + 1:02d}:00" for run in np.split(hours, breaks) if len(run))
+
+def valley_hours_by_month(price_grid, mask, base=None):
+    """
+    Horas que la máscara de horas valle trabaja en cada mes y su precio promedio
+
+    Lee las horas directamente de la máscara (valley_hours_mask o la de
+    evaluate_savings_policies), así el reporte muestra las mismas horas que
+    se re-preciaron. Con base, agrega el precio promedio del horario actual.
+
+    Returns:
+        pd.DataFrame: Mes, Horas, Horario, Precio_Valle (y Precio_Actual)
+    """
+    precios = price_grid['precios']
+    month_idx = price_grid['mes'] - 1
+    first_day = np.flatnonzero(np.diff(month_idx, prepend=-1))
+
+    def month_mean(weights):
+        sums = np.bincount(month_idx, weights=np.nansum(precios * weights, axis=1), minlength=12)
+        counts = np.bincount(month_idx, weights=np.sum(~np.isnan(precios) * weights, axis=1), minlength=12)
+        return np.divide(sums, counts, out=np.full(12, np.nan), where=counts > 0)
+
+    hours = [np.flatnonzero(mask[day]) for day in first_day]
+    tabla = pd.DataFrame({
+        'Mes': [MONTHS[m] for m in month_idx[first_day]],
+        'Horas': [len(h) for h in hours],
+        'Horario': [_hour_ranges(h) for h in hours],
+        'Precio_Valle': month_mean(mask)[month_idx[first_day]]
+    })
+    if base is not None:
+        tabla['Precio_Actual'] = month_mean(base)[month_idx[first_day]]
+    return tabla
+
+def weekday_shift_mask(price_grid, base, context):
+    """
+    Traslada el trabajo del día de semana más caro al más barato de la misma semana
+
+    El día caro no se opera y el día barato trabaja las 24 horas. Con jornadas
+    de hasta 12 horas la producción semanal no cambia (Horas_Robot lo muestra).
+    Solo se aplica en semanas donde existen ambos días.
+
+    Returns:
+        tuple: (máscara, día más barato, día más caro)
+    """
+    weekday_avg = _daily_average_by(price_grid['precios'], context['dia_semana'], 7)
+    mejor, peor = int(np.nanargmin(weekday_avg)), int(np.nanargmax(weekday_avg))
+
+    # Semana calendario (lunes a domingo) a partir de los días desde la época
+    week = (price_grid['fechas'].astype('datetime64[D]').astype(np.int64) + 3) // 7
+    paired = np.isin(week, week[context['dia_semana'] == mejor]) & np.isin(week, week[context['dia_semana'] == peor])
+
+    mask = base.copy()
+    mask[paired & (context['dia_semana'] == peor)] = 0.0
+    mask[paired & (context['dia_semana'] == mejor)] = 1.0
+    return mask, DIAS_SEMANA[mejor], DIAS_SEMANA[peor]
+
+def seasonal_maintenance_mask(price_grid, base, context, dias_mantenimiento=14):
+    """
+    Concentra los días de mantenimiento en los días más caros de la estación más cara
+
+    Returns:
+        tuple: (máscara, estación más cara)
+    """
+    precios = price_grid['precios']
+    season_avg = _daily_average_by(precios, context['estacion'], len(ESTACIONES))
+    peor = int(np.nanargmax(season_avg))
+
+    day_cost = np.nansum(np.nan_to_num(precios) * base, axis=1)
+    candidates = np.flatnonzero(context['estacion'] == peor)
+    stop = candidates[np.argsort(-day_cost[candidates], kind='stable')[:dias_mantenimiento]]
+
+    mask = base.copy()
+    mask[stop] = 0.0
+    return mask, ESTACIONES[peor]
+
+def evaluate_savings_policies(price_grid, context=None, hora_inicio=8, hora_fin=20,
+                              num_robots=25, consumption_per_robot=0.2, dias_mantenimiento=14,
+                              perfil=None):
+    """
+    Re-precia el año completo bajo cada política sobre la grilla horaria
+
+    Cada política es una máscara (días, 24) de horas operadas; todas se apilan
+    y se evalúan en una sola pasada (einsum contra la matriz de precios). La
+    política combinada es la mejor combinación de las tres políticas a precios
+    observados: una política que con esos precios encarece la operación (ej. un
+    traslado decidido con precios esperados) queda fuera, así que la combinada
+    nunca ahorra menos que la mejor política sola. Su ahorro no suma dos veces
+    las horas que dos políticas moverían.
+
+    El mantenimiento se compara contra parar los mismos días en fechas
+    promedio (costo diario medio de la base), ya que en ambos casos la planta
+    deja de producir esos días.
+
+    Con perfil (perfiles.load_or_build_profiles) las políticas se deciden con
+    el precio esperado del contexto de cada día, y las horas sin precio
+    observado (ej. una grilla futura de perfiles.calendar_grid) se valoran a
+    ese precio esperado.
+
+    La diferencia entre la suma de ahorros individuales y la combinada se
+    separa en 'traslape' (ahorros positivos que no se suman al combinarse) y
+    'perdida' (lo que pierden por sí solas las políticas con ahorro negativo).
+
+    Returns:
+        dict: 'tabla' (DataFrame por política), 'mascaras', políticas de la
+              combinada, traslape, pérdida y días/estación elegidos
+    """
+    if context is None:
+        context = build_calendar_context(price_grid)
+
+    observados = price_grid['precios']
+    if perfil is not None:
+        price_grid = expected_price_grid(perfil, price_grid, context)
+        observados = np.where(np.isnan(observados), price_grid['precios'], observados)
+    precios = np.nan_to_num(observados)
+    total_consumption_per_hour = num_robots * consumption_per_robot
+
+    base = baseline_mask(price_grid, hora_inicio, hora_fin)
+    valle = valley_hours_mask(price_grid, base)
+    semana, mejor_dia, peor_dia = weekday_shift_mask(price_grid, base, context)
+    mantenimiento, peor_estacion = seasonal_maintenance_mask(price_grid, base, context, dias_mantenimiento)
+
+    componentes = ['Horas valle', 'Traslado semanal', 'Mantenimiento estacional']
+    paro = mantenimiento.sum(axis=1) == 0
+
+    # Candidatas a combinada: cada subconjunto no vacío de las tres políticas,
+    # en orden horas valle -> traslado semanal -> mantenimiento
+    combos, candidatas = [], []
+    for usa_valle, usa_semana, usa_mantenimiento in product((False, True), repeat=3):
+        if not (usa_valle or usa_semana or usa_mantenimiento):
+            continue
+        mask = valle if usa_valle else base
+        mask = weekday_shift_mask(price_grid, mask, context)[0] if usa_semana else mask.copy()
+        if usa_mantenimiento:
+            mask[paro] = 0.0
+        combos.append((usa_valle, usa_semana, usa_mantenimiento))
+        candidatas.append(mask)
+
+    masks = np.stack([base, valle, semana, mantenimiento] + candidatas)
+    costs = np.einsum('pdh,dh->p', masks, precios) * total_consumption_per_hour
+    robot_hours = masks.sum(axis=(1, 2)) * num_robots
+
+    # Referencia del mantenimiento: los mismos días parados a costo diario promedio
+    con_mantenimiento = np.array([False, False, False, True] + [combo[2] for combo in combos])
+    mean_day_cost = costs[0] / len(precios)
+    reference = np.where(con_mantenimiento, costs[0] - dias_mantenimiento * mean_day_cost, costs[0])
+    savings = reference - costs
+
+    # Combinada = la candidata con mayor ahorro realizado
+    best = 4 + int(np.argmax(savings[4:]))
+    politicas_combinada = [name for name, usa in zip(componentes, combos[best - 4]) if usa]
+    keep = [0, 1, 2, 3, best]
+    names = ['Actual'] + componentes + ['Combinada']
+    masks, costs, robot_hours = masks[keep], costs[keep], robot_hours[keep]
+    reference, savings = reference[keep], savings[keep]
+
+    tabla = pd.DataFrame({
+        'Politica': names,
+        'Costo_Anual': costs,
+        'Ahorro_Anual': savings,
+        'Ahorro_Pct': savings / reference * 100,
+        'Horas_Robot': robot_hours
+    })
+
+    return {
+        'tabla': tabla,
+        'mascaras': dict(zip(names, masks)),
+        'mejor_dia': mejor_dia,
+        'peor_dia': peor_dia,
+        'peor_estacion': peor_estacion,
+        'politicas_combinada': politicas_combinada,
+        'traslape': np.maximum(savings[1:4], 0).sum() - savings[4],
+        'perdida': -np.minimum(savings[1:4], 0).sum()
+    }
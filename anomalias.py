@@ -0,0 +1,176 @@
+import warnings
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from datos import MONTHS
+from ingresos import calculate_hourly_profit_grid, summarize_by_month
+
+def _trailing_windows(series, window):
+    """
+    Ventanas (n, window) con las window horas anteriores a cada hora (sin incluirla)
+    """
+    padded = np.concatenate([np.full(window, np.nan), series])
+    return sliding_window_view(padded, window)[:len(series)]
+
+def rolling_robust_zscore(series, window=168, mad_floor=0.1):
+    """
+    z robusto de cada hora contra la mediana/MAD de las window horas previas
+
+    El MAD se limita por abajo a mad_floor × mediana para que en semanas muy
+    estables una variación pequeña no se marque como pico.
+    """
+    windows = _trailing_windows(series, window)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # ventanas iniciales todo NaN
+        median = np.nanmedian(windows, axis=1)
+        mad = np.nanmedian(np.abs(windows - median[:, None]), axis=1)
+    scale = np.maximum(1.4826 * mad, mad_floor * np.abs(median))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (series - median) / scale, median
+
+def ewma_zscore(series, alpha=0.05):
+    """
+    z de cada hora contra la media/varianza exponencial previa (vectorizado)
+
+    Misma recursión que OnlineSpikeDetector: se evalúa la hora contra el
+    estado anterior y luego se actualiza.
+    """
+    s = pd.Series(series)
+    ewm = s.ewm(alpha=alpha, adjust=False, ignore_na=True)
+    mean = ewm.mean().shift(1).to_numpy()
+    std = np.sqrt(ewm.var(bias=True).shift(1).to_numpy())
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (series - mean) / std
+
+class OnlineSpikeDetector:
+    """
+    Detector de picos en una sola pasada para precios que llegan hora por hora
+
+    Mantiene media y varianza exponenciales (O(1) en memoria); update devuelve
+    si la hora es pico y su z antes de incorporarla al estado.
+    """
+
+    def __init__(self, alpha=0.05, threshold=4.0, warmup=24):
+        self.alpha = alpha
+        self.threshold = threshold
+        self.warmup = warmup
+        self.mean = None
+        self.var = 0.0
+        self.n = 0
+
+    def update(self, price):
+        if price is None or np.isnan(price):
+            return False, np.nan
+        if self.mean is None:
+            self.mean = float(price)
+            self.n = 1
+            return False, np.nan
+
+        diff = price - self.mean
+        z = diff / np.sqrt(self.var) if self.var > 0 else np.nan
+        es_pico = self.n >= self.warmup and z > self.threshold
+
+        increment = self.alpha * diff
+        self.mean += increment
+        self.var = (1 - self.alpha) * (self.var + diff * increment)
+        self.n += 1
+        return bool(es_pico), z
+
+def detect_spikes(price_grid, window=168, umbral_robusto=5.0, alpha=0.05, umbral_ewma=4.0,
+                  mad_floor=0.1, metodo='ambos', warmup=24):
+    """
+    Marca horas y días con picos de precio sobre la serie horaria completa
+
+    La grilla se recorre en orden cronológico (día por día, hora por hora).
+    Solo cuentan desviaciones hacia arriba.
+
+    Args:
+        price_grid: Diccionario de datos.build_price_grid
+        window: Horas de la ventana móvil de mediana/MAD (168 = una semana)
+        umbral_robusto: z robusto mínimo para marcar pico
+        alpha / umbral_ewma: Suavizado y umbral del criterio exponencial
+        metodo: 'mediana', 'ewma' o 'ambos' (pico si ambos criterios coinciden)
+        warmup: Horas iniciales sin marcar mientras se estabiliza la estadística
+
+    Returns:
+        dict: Matrices (días, 24) de z y picos, picos por día y precio de referencia
+    """
+    shape = price_grid['precios'].shape
+    series = price_grid['precios'].ravel()
+
+    z_robusto, mediana = rolling_robust_zscore(series, window, mad_floor)
+    z_ewma = ewma_zscore(series, alpha)
+
+    criterios = {
+        'mediana': z_robusto > umbral_robusto,
+        'ewma': z_ewma > umbral_ewma
+    }
+    criterios['ambos'] = criterios['mediana'] & criterios['ewma']
+    if metodo not in criterios:
+        raise ValueError(f"Método no soportado: {metodo}. Opciones: {list(criterios)}")
+
+    picos = criterios[metodo].copy()
+    picos[:warmup] = False
+    picos = picos.reshape(shape)
+
+    return {
+        'picos': picos,
+        'dias_con_pico': picos.any(axis=1),
+        'z_robusto': z_robusto.reshape(shape),
+        'z_ewma': z_ewma.reshape(shape),
+        'precio_referencia': mediana.reshape(shape)
+    }
+
+def spike_cost_breakdown(price_grid, spikes, schedule_mask=None, num_robots=25, consumption_per_robot=0.2):
+    """
+    Costo mensual total, costo en horas pico y costo excluyendo picos
+
+    schedule_mask: Horas operadas (24,) o (días, 24); por defecto 08:00-20:00.
+
+    'costo_picos_a_referencia' valora las horas pico a su mediana móvil: la
+    diferencia con 'costo_picos' es el sobrecosto atribuible a los picos.
+
+    Returns:
+        pd.DataFrame: Una fila por mes
+    """
+    if schedule_mask is None:
+        # Horario actual 08:00-20:00, como en pregunta1
+        schedule_mask = np.zeros(24, dtype=bool)
+        schedule_mask[8:20] = True
+
+    costos = np.nan_to_num(calculate_hourly_profit_grid(
+        price_grid, schedule_mask, num_robots=num_robots, consumption_per_robot=consumption_per_robot
+    )['costos_usd'])
+    picos = spikes['picos']
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratio = np.where(picos, spikes['precio_referencia'] / price_grid['precios'], 0.0)
+    costo_referencia = costos * np.nan_to_num(ratio)
+
+    total = summarize_by_month(price_grid, costos)
+    en_picos = summarize_by_month(price_grid, costos * picos)
+    a_referencia = summarize_by_month(price_grid, costo_referencia)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return pd.DataFrame({
+            'Mes': MONTHS,
+            'Costo_Total': total,
+            'Costo_Excluyendo_Picos': total - en_picos,
+            'Costo_Picos': en_picos,
+            'Costo_Picos_a_Referencia': a_referencia,
+            'Sobrecosto_Picos': en_picos - a_referencia,
+            'Contribucion_Picos_Pct': np.where(total > 0, en_picos / total * 100, 0.0),
+            'Horas_Pico': np.bincount(price_grid['mes'] - 1, weights=picos.sum(axis=1), minlength=12).astype(int)
+        })
+
+def add_spike_flags(energy_context_df, price_grid, spikes):
+    """
+    Agrega la columna 'es_pico' a la tabla hora-día de pregunta5
+
+    Permite filtrar los análisis de contexto, ej. df[~df['es_pico']].groupby('estacion').
+    """
+    fechas = pd.to_datetime(energy_context_df['fecha']).to_numpy().astype('datetime64[D]')
+    day_pos = (fechas - price_grid['fechas'][0]).astype(np.int64)
+    flagged = energy_context_df.copy()
+    flagged['es_pico'] = spikes['picos'][day_pos, energy_context_df['hora'].to_numpy(dtype=int)]
+    return flagged
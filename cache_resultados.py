@@ -0,0 +1,216 @@
+import os
+import sys
+import types
+import pickle
+import hashlib
+import tempfile
+import inspect
+import functools
+import numpy as np
+import pandas as pd
+
+# Junto a los módulos del proyecto (no relativo al directorio de trabajo), así
+# todas las ejecuciones comparten la caché; CACHE_RESULTADOS_DIR la reubica
+CACHE_DIR = os.environ.get('CACHE_RESULTADOS_DIR',
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache_resultados'))
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024  # 200 MB
+
+def _update_hash(hasher, value):
+    """
+    Agrega un valor al hash según su contenido (DataFrames y arreglos por sus datos)
+    """
+    if isinstance(value, pd.DataFrame):
+        hasher.update(b'df')
+        hasher.update(repr((value.shape, list(value.columns))).encode())
+        if not value.empty:
+            hasher.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, pd.Series):
+        hasher.update(b'series')
+        hasher.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        hasher.update(repr((value.dtype.str, value.shape)).encode())
+        hasher.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        hasher.update(b'dict')
+        for key in sorted(value, key=repr):
+            _update_hash(hasher, key)
+            _update_hash(hasher, value[key])
+    elif isinstance(value, (list, tuple)):
+        hasher.update(type(value).__name__.encode())
+        for item in value:
+            _update_hash(hasher, item)
+    else:
+        hasher.update(repr(value).encode())
+
+def hash_inputs(*args, **kwargs):
+    """
+    Hash de contenido (sha256) de los datos de entrada y parámetros
+    """
+    hasher = hashlib.sha256()
+    _update_hash(hasher, args)
+    _update_hash(hasher, kwargs)
+    return hasher.hexdigest()
+
+def _code_fingerprint(code):
+    # Constantes anidadas (lambdas, comprensiones) se representan por su propio bytecode
+    consts = tuple(_code_fingerprint(c) if hasattr(c, 'co_code') else c for c in code.co_consts)
+    return (code.co_code, consts)
+
+def _referenced_names(code):
+    # Nombres globales y atributos usados por la función y sus funciones anidadas
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if hasattr(const, 'co_code'):
+            names |= _referenced_names(const)
+    return names
+
+@functools.lru_cache(maxsize=None)
+def _file_digest(path, mtime, size):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def _is_project_file(path, project_dir):
+    return bool(path) and os.path.dirname(os.path.abspath(path)) == project_dir
+
+def _function_key(func):
+    """
+    Huella de la función y de todo el código del proyecto del que depende
+
+    Incluye el bytecode y los valores por defecto de la función y, recorriendo
+    sus nombres globales, el de cada función del proyecto que llama (con sus
+    valores por defecto), las constantes de módulo que usa y el contenido de
+    los módulos del proyecto que referencia (ej. flota.optimize_fleet_levels).
+    Así editar una función auxiliar o cambiar un valor por defecto invalida los
+    resultados guardados de quienes la usan.
+    """
+    project_dir = os.path.dirname(os.path.abspath(func.__code__.co_filename))
+    parts = []
+    seen = set()
+
+    def visit(target):
+        target = inspect.unwrap(target)
+        if id(target) in seen:
+            return
+        seen.add(id(target))
+        code = target.__code__
+        parts.append((os.path.basename(code.co_filename), target.__qualname__, _code_fingerprint(code),
+                      target.__defaults__, tuple(sorted((target.__kwdefaults__ or {}).items()))))
+
+        for name in sorted(_referenced_names(code)):
+            value = target.__globals__.get(name)
+            if isinstance(value, types.FunctionType):
+                if _is_project_file(inspect.unwrap(value).__code__.co_filename, project_dir):
+                    visit(value)
+            elif isinstance(value, (types.ModuleType, type)):
+                # Módulos y clases del proyecto: se usa el contenido de su archivo
+                module = value if isinstance(value, types.ModuleType) else sys.modules.get(value.__module__)
+                path = getattr(module, '__file__', None)
+                if _is_project_file(path, project_dir):
+                    stat = os.stat(path)
+                    parts.append((name, _file_digest(path, stat.st_mtime_ns, stat.st_size)))
+            elif isinstance(value, (int, float, str, bytes, tuple, list, dict, frozenset)):
+                parts.append((name, hash_inputs(value)))
+
+    visit(func)
+    return tuple(parts)
+
+def _normalized_arguments(signature, args, kwargs):
+    # f(df, 25) y f(df, num_robots=25) producen la misma clave
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return dict(bound.arguments)
+
+def _evict(cache_dir, max_bytes):
+    """
+    Elimina los resultados usados hace más tiempo hasta quedar bajo max_bytes
+    """
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith('.pkl'):
+            path = os.path.join(cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:  # otro proceso o hilo ya lo eliminó
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+def _module_digest(module):
+    path = module.__file__
+    stat = os.stat(path)
+    return (module.__name__, _file_digest(path, stat.st_mtime_ns, stat.st_size))
+
+def cached_result(max_bytes=DEFAULT_MAX_BYTES, cache_dir=CACHE_DIR, modulos=()):
+    """
+    Decorador: guarda el resultado en disco con clave = hash(código, datos, parámetros)
+
+    El código incluye la función, sus valores por defecto y las funciones y
+    módulos del proyecto que usa (ver _function_key); los parámetros se
+    normalizan con la firma, así que pasarlos por posición o por nombre da la
+    misma clave. modulos agrega a la clave el contenido completo de esos
+    módulos, para dependencias que no aparecen como nombres de la función
+    (ej. métodos de objetos que devuelve).
+
+    Una ejecución repetida con el mismo libro de precios y los mismos parámetros
+    se sirve desde disco sin recalcular (ni imprimir). La carpeta se limita a
+    max_bytes eliminando primero los resultados menos usados.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.lru_cache(maxsize=1)
+        def function_key():
+            # Se calcula en la primera llamada, cuando ya existen todas las funciones llamadas
+            return _function_key(func) + tuple(_module_digest(module) for module in modulos)
+
+        def cache_key(*args, **kwargs):
+            return hash_inputs(function_key(), _normalized_arguments(signature, args, kwargs))
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = cache_key(*args, **kwargs)
+            path = os.path.join(cache_dir, f"{key}.pkl")
+
+            if os.path.exists(path):
+                try:
+                    with open(path, 'rb') as f:
+                        result = pickle.load(f)
+                    os.utime(path)  # marca de uso reciente para la expulsión LRU
+                    return result
+                except (OSError, pickle.UnpicklingError, EOFError):
+                    pass
+
+            result = func(*args, **kwargs)
+
+            # Archivo temporal propio de cada escritor: dos hilos o procesos con la misma
+            # clave nunca mezclan sus bytes y os.replace publica siempre un pickle completo
+            os.makedirs(cache_dir, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=cache_dir, prefix=f"{key}.", suffix='.tmp', delete=False) as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(f.name, path)
+            _evict(cache_dir, max_bytes)
+
+            return result
+
+        wrapper.cache_key = cache_key
+        return wrapper
+
+    return decorator
+
+def clear_cache(cache_dir=CACHE_DIR):
+    """
+    Borra todos los resultados guardados
+    """
+    if os.path.isdir(cache_dir):
+        for name in os.listdir(cache_dir):
+            if name.endswith('.pkl'):
+                os.remove(os.path.join(cache_dir, name))
@@ -0,0 +1,73 @@
+import numpy as np
+
+# Días feriados oficiales de Guatemala 2023
+FERIADOS_GUATEMALA_2023 = [
+    (1, 1),   # Año Nuevo
+    (4, 6),   # Jueves Santo (abril 6, 2023)
+    (4, 7),   # Viernes Santo
+    (5, 1),   # Día del Trabajo
+    (6, 30),  # Día del Ejército
+    (9, 15),  # Día de la Independencia
+    (10, 20), # Día de la Revolución
+    (11, 1),  # Día de Todos los Santos
+    (12, 24), # Nochebuena
+    (12, 25), # Navidad
+    (12, 31), # Fin de Año
+]
+
+# Ciclo escolar: Enero-Junio y Agosto-Octubre (vacaciones en julio)
+PERIODOS_ESCOLARES = [
+    (1, 1, 6, 30),
+    (8, 1, 10, 31),
+]
+
+# Códigos usados en los arreglos de contexto
+CLASIFICACIONES = ['Semana Laboral', 'Viernes', 'Fin de Semana', 'Feriado']
+ESTACIONES = ['Invierno', 'Primavera', 'Verano', 'Otoño']
+DIAS_SEMANA = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+def build_calendar_context(price_grid, feriados=None, periodos_escolares=None):
+    """
+    Variables contextuales por día de la grilla como arreglos enteros/booleanos
+
+    Usa las mismas reglas que create_guatemala_calendar_2023 de pregunta5, pero
+    calculadas de forma vectorizada sobre el vector de fechas de la grilla.
+
+    Returns:
+        dict: Arreglos de largo días con códigos de contexto
+    """
+    feriados = FERIADOS_GUATEMALA_2023 if feriados is None else feriados
+    periodos_escolares = PERIODOS_ESCOLARES if periodos_escolares is None else periodos_escolares
+
+    mes = price_grid['mes']
+    dia = price_grid['dia']
+
+    # 1970-01-01 fue jueves: (días + 3) % 7 da 0=lunes
+    dia_semana = (price_grid['fechas'].astype('datetime64[D]').astype(np.int64) + 3) % 7
+
+    month_day = mes * 100 + dia
+    es_feriado = np.isin(month_day, [m * 100 + d for m, d in feriados])
+
+    ciclo_escolar_activo = np.zeros(len(mes), dtype=bool)
+    for inicio_mes, inicio_dia, fin_mes, fin_dia in periodos_escolares:
+        ciclo_escolar_activo |= (month_day >= inicio_mes * 100 + inicio_dia) & (month_day <= fin_mes * 100 + fin_dia)
+
+    # Estación (Hemisferio Norte): Dic-Feb, Mar-May, Jun-Ago, Sep-Nov
+    estacion = (mes % 12) // 3
+
+    es_fin_de_semana = dia_semana >= 5
+    clasificacion = np.select(
+        [es_feriado, es_fin_de_semana, dia_semana == 4],
+        [CLASIFICACIONES.index('Feriado'), CLASIFICACIONES.index('Fin de Semana'),
+         CLASIFICACIONES.index('Viernes')],
+        default=CLASIFICACIONES.index('Semana Laboral')
+    )
+
+    return {
+        'dia_semana': dia_semana,
+        'es_fin_de_semana': es_fin_de_semana,
+        'es_feriado': es_feriado,
+        'estacion': estacion,
+        'ciclo_escolar_activo': ciclo_escolar_activo,
+        'clasificacion': clasificacion
+    }
@@ -0,0 +1,189 @@
+import numpy as np
+import pandas as pd
+from sensibilidad import BASE_PARAMETERS, evaluate_profit_model, _hourly_price_prefix
+
+# Productos por hora que la estación de empaque puede despachar (cuello de botella).
+# 120 productos/hora = 30 robots a 15 minutos por producto.
+CAPACIDAD_ESTACION = 120
+
+def capacity_model(price_grid, num_robots, consumo_por_robot=0.2, escala_precio=1.0,
+                   capacidad_estacion=CAPACIDAD_ESTACION, params=None, prefix=None):
+    """
+    Modelo anual de flota con cuello de botella en la estación de empaque
+
+    Todos los argumentos numéricos admiten arreglos y se combinan con broadcasting.
+    Los robots por encima de la capacidad de la estación siguen consumiendo
+    energía pero no agregan productos despachados.
+
+    Args:
+        price_grid: Diccionario de datos.build_price_grid
+        num_robots: Tamaño de flota (escalar o arreglo)
+        consumo_por_robot: MWh por robot por hora
+        escala_precio: Factor sobre todos los precios de energía (1.0 = 2023)
+        capacidad_estacion: Productos por hora que acepta la estación (None = sin límite)
+        params: Resto de parámetros sobre BASE_PARAMETERS (horario, minutos, tasa)
+
+    Returns:
+        dict: Arreglos de productos, ingresos, costo, utilidad y utilización de la estación
+    """
+    params = dict(BASE_PARAMETERS, **(params or {}))
+    num_robots = np.asarray(num_robots, dtype=float)
+    escala_precio = np.asarray(escala_precio, dtype=float)
+    params['num_robots'] = num_robots
+    # Escalar el precio equivale a escalar el consumo en el modelo de costo
+    params['consumo_por_robot'] = np.asarray(consumo_por_robot, dtype=float) * escala_precio
+
+    if prefix is None:
+        prefix = _hourly_price_prefix(price_grid)
+    model = evaluate_profit_model(price_grid, params, prefix=prefix)
+
+    productos = model['productos']
+    if capacidad_estacion is not None:
+        hours = params['hora_fin'] - params['hora_inicio']
+        max_products = capacidad_estacion * hours * len(price_grid['fechas'])
+        despachados = np.minimum(productos, max_products)
+    else:
+        max_products = np.inf
+        despachados = productos
+
+    # Ingreso proporcional a los productos despachados
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ingresos = np.where(productos > 0, model['ingresos'] * despachados / productos, 0.0)
+
+    return {
+        'productos': despachados,
+        'ingresos': ingresos,
+        'costo_energia': model['costo_energia'],
+        'utilidad': ingresos - model['costo_energia'],
+        'utilizacion_estacion': despachados / max_products
+    }
+
+def bisect_vectorized(func, lo, hi, iteraciones=60):
+    """
+    Bisección simultánea sobre arreglos: raíz de func en [lo, hi] por elemento
+
+    func recibe un arreglo de puntos y devuelve valores con su misma forma.
+    Donde func(lo) y func(hi) tienen el mismo signo el resultado es NaN.
+    """
+    lo, hi = np.broadcast_arrays(np.asarray(lo, dtype=float), np.asarray(hi, dtype=float))
+    lo, hi = lo.copy(), hi.copy()
+    f_lo = func(lo)
+    valid = np.sign(f_lo) != np.sign(func(hi))
+
+    for _ in range(iteraciones):
+        mid = (lo + hi) / 2
+        f_mid = func(mid)
+        same = np.sign(f_mid) == np.sign(f_lo)
+        lo = np.where(same, mid, lo)
+        f_lo = np.where(same, f_mid, f_lo)
+        hi = np.where(same, hi, mid)
+
+    return np.where(valid, (lo + hi) / 2, np.nan)
+
+def break_even_price_scale(price_grid, num_robots=25, consumo_por_robot=0.2, escala_max=1000.0, **model_kwargs):
+    """
+    Factor de precio de energía en el que la utilidad anual llega a cero
+    """
+    prefix = _hourly_price_prefix(price_grid)
+    num_robots, consumo_por_robot = np.broadcast_arrays(np.asarray(num_robots, dtype=float),
+                                                        np.asarray(consumo_por_robot, dtype=float))
+
+    def profit(escala):
+        return capacity_model(price_grid, num_robots, consumo_por_robot, escala,
+                              prefix=prefix, **model_kwargs)['utilidad']
+
+    return bisect_vectorized(profit, np.zeros(num_robots.shape), np.full(num_robots.shape, escala_max))
+
+def break_even_fleet(price_grid, consumo_por_robot=0.2, escala_precio=1.0, max_robots=10000.0, **model_kwargs):
+    """
+    Flota máxima (continua) con utilidad no negativa
+
+    Más allá de la capacidad de la estación cada robot adicional solo suma costo,
+    así que la utilidad termina cruzando cero; se busca ese cruce desde el punto
+    de saturación de la estación.
+    """
+    prefix = _hourly_price_prefix(price_grid)
+    consumo_por_robot, escala_precio = np.broadcast_arrays(np.asarray(consumo_por_robot, dtype=float),
+                                                           np.asarray(escala_precio, dtype=float))
+    lo = np.full(consumo_por_robot.shape, _saturation_fleet(model_kwargs))
+
+    def profit(robots):
+        return capacity_model(price_grid, robots, consumo_por_robot, escala_precio,
+                              prefix=prefix, **model_kwargs)['utilidad']
+
+    return bisect_vectorized(profit, lo, np.full(lo.shape, max_robots))
+
+def _saturation_fleet(model_kwargs):
+    params = dict(BASE_PARAMETERS, **(model_kwargs.get('params') or {}))
+    capacidad = model_kwargs.get('capacidad_estacion', CAPACIDAD_ESTACION)
+    if capacidad is None:
+        return 1.0
+    return capacidad * params['minutos_por_producto'] / 60
+
+def optimal_fleet(price_grid, consumo_por_robot=0.2, escala_precio=1.0, max_robots=500, **model_kwargs):
+    """
+    Flota entera que maximiza la utilidad, por bisección sobre la utilidad marginal
+
+    La utilidad es cóncava en el número de robots (lineal hasta saturar la
+    estación, decreciente después): el óptimo es el primer R con
+    utilidad(R + 1) - utilidad(R) <= 0.
+    """
+    prefix = _hourly_price_prefix(price_grid)
+    consumo_por_robot, escala_precio = np.broadcast_arrays(np.asarray(consumo_por_robot, dtype=float),
+                                                           np.asarray(escala_precio, dtype=float))
+
+    def marginal(robots):
+        model = lambda r: capacity_model(price_grid, r, consumo_por_robot, escala_precio,
+                                         prefix=prefix, **model_kwargs)['utilidad']
+        return model(robots + 1) - model(robots)
+
+    lo = np.zeros(consumo_por_robot.shape, dtype=np.int64)
+    hi = np.full(consumo_por_robot.shape, max_robots, dtype=np.int64)
+    while np.any(lo < hi):
+        mid = (lo + hi) // 2
+        improving = marginal(mid) > 0
+        lo = np.where(improving, mid + 1, lo)
+        hi = np.where(improving, hi, mid)
+
+    best = capacity_model(price_grid, lo, consumo_por_robot, escala_precio, prefix=prefix, **model_kwargs)
+    return {'num_robots': lo, 'utilidad': best['utilidad'], 'utilizacion_estacion': best['utilizacion_estacion']}
+
+def capacity_sweep(price_grid, robots=None, consumos=None, escalas=None, **model_kwargs):
+    """
+    Barrido (flota × consumo × escala de precio) en una sola evaluación con broadcasting
+
+    Returns:
+        dict: Cubo de utilidad con sus ejes, flota óptima de la malla y tabla resumen
+    """
+    robots = np.arange(1, 61) if robots is None else np.asarray(robots)
+    consumos = np.array([0.15, 0.2, 0.25]) if consumos is None else np.asarray(consumos, dtype=float)
+    escalas = np.array([0.5, 1.0, 1.5, 2.0, 3.0]) if escalas is None else np.asarray(escalas, dtype=float)
+
+    cube = capacity_model(price_grid, robots[:, None, None], consumos[None, :, None], escalas[None, None, :],
+                          **model_kwargs)
+    utilidad = np.broadcast_to(cube['utilidad'], (len(robots), len(consumos), len(escalas)))
+    best = utilidad.argmax(axis=0)
+
+    # Puntos de equilibrio en la misma malla (consumo × escala)
+    c_mesh, s_mesh = np.meshgrid(consumos, escalas, indexing='ij')
+    fleet_be = break_even_fleet(price_grid, c_mesh, s_mesh, **model_kwargs)
+    optimum = optimal_fleet(price_grid, c_mesh, s_mesh, max_robots=int(robots.max()) * 10, **model_kwargs)
+
+    resumen = pd.DataFrame({
+        'consumo_por_robot': c_mesh.ravel(),
+        'escala_precio': s_mesh.ravel(),
+        'robots_optimos': optimum['num_robots'].ravel(),
+        'utilidad_optima': optimum['utilidad'].ravel(),
+        'robots_optimos_malla': robots[best].ravel(),
+        'flota_equilibrio': fleet_be.ravel(),
+        'escala_equilibrio_25_robots': break_even_price_scale(price_grid, 25, c_mesh, **model_kwargs).ravel()
+    })
+
+    return {
+        'robots': robots,
+        'consumos': consumos,
+        'escalas': escalas,
+        'utilidad': utilidad,
+        'robots_optimos_malla': robots[best],
+        'resumen': resumen
+    }
@@ -0,0 +1,293 @@
+import os
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from datos import MONTHS, build_price_grid
+
+# Precios implícitos del carbono (USD/tCO2) que recorre la frontera costo-emisiones
+PRECIOS_CARBONO = np.concatenate([[0.0], np.geomspace(1, 5000, 60)])
+
+@lru_cache(maxsize=8)
+def _read_intensity_table(file_path, mtime, size, factor):
+    """
+    Lee la serie de intensidad y la promedia por hora; la clave incluye mtime/tamaño
+    """
+    if file_path.lower().endswith(('.xlsx', '.xls')):
+        df = pd.read_excel(file_path)
+    else:
+        df = pd.read_csv(file_path)
+
+    df.columns = [str(col).strip().lower() for col in df.columns]
+    if 'fecha' not in df.columns or 'intensidad' not in df.columns:
+        raise ValueError(f"El archivo {file_path} debe tener columnas 'fecha' e 'intensidad' (tCO2/MWh)")
+
+    times = pd.to_datetime(df['fecha'])
+    if 'hora' in df.columns:
+        times = times + pd.to_timedelta(df['hora'].astype(int), unit='h')
+    values = df['intensidad'].to_numpy(dtype=float) * factor
+    valid = ~np.isnan(values) & times.notna().to_numpy()
+
+    # Series sub-horarias (5, 15 o 30 min) se promedian dentro de cada hora
+    hours = times.to_numpy()[valid].astype('datetime64[h]')
+    hour_times, inverse = np.unique(hours, return_inverse=True)
+    sums = np.bincount(inverse, weights=values[valid], minlength=len(hour_times))
+    intensities = sums / np.bincount(inverse, minlength=len(hour_times))
+
+    hour_times.setflags(write=False)
+    intensities.setflags(write=False)
+    return hour_times, intensities
+
+def load_carbon_intensity(file_path, toneladas_por_unidad=1.0):
+    """
+    Carga una serie horaria (o más fina) de intensidad de carbono de la red
+
+    El archivo (CSV o Excel) debe tener columnas 'fecha' e 'intensidad' y
+    opcionalmente 'hora'. La intensidad se expresa en tCO2/MWh; para series en
+    kgCO2/MWh usar toneladas_por_unidad=0.001.
+
+    Returns:
+        tuple: (horas datetime64[h] ordenadas, intensidad tCO2/MWh por hora)
+    """
+    stat = os.stat(file_path)
+    return _read_intensity_table(os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size,
+                                 float(toneladas_por_unidad))
+
+def align_intensity_to_grid(price_grid, serie):
+    """
+    Alinea la intensidad a la grilla día × hora del tensor de precios
+
+    Igual que tipo_cambio.align_fx_to_grid: cada celda toma el valor de su hora
+    o, si falta, el último publicado antes; las celdas anteriores al inicio de
+    la serie usan el primer valor.
+
+    Returns:
+        np.ndarray: Intensidad tCO2/MWh con forma (días, 24)
+    """
+    hour_times, intensities = serie
+    if len(intensities) == 0:
+        raise ValueError("La serie de intensidad de carbono está vacía")
+
+    cell_times = price_grid['fechas'].astype('datetime64[h]')[:, None] + np.arange(24).astype('timedelta64[h]')
+    idx = np.searchsorted(hour_times, cell_times, side='right') - 1
+    return intensities[np.clip(idx, 0, len(intensities) - 1)]
+
+def _daily_masks(price_grid, masks):
+    """
+    Lleva máscaras (24,), (K, 24), (K, 12, 24) mensuales o (K, días, 24) a (K, días, 24)
+    """
+    masks = np.asarray(masks, dtype=float)
+    n_days = len(price_grid['fechas'])
+    if masks.ndim == 1:
+        masks = masks[None, :]
+    if masks.ndim == 2:
+        return np.broadcast_to(masks[:, None, :], (len(masks), n_days, 24))
+    if masks.shape[1] == 12 and n_days != 12:
+        return masks[:, price_grid['mes'] - 1, :]
+    return masks
+
+def cost_and_emissions(price_grid, intensidad, masks, num_robots=25, consumption_per_robot=0.2):
+    """
+    Costo (USD) y emisiones (tCO2) diarias de K horarios en una sola pasada
+
+    Precio e intensidad se apilan en un tensor (2, días, 24) y se contraen
+    contra todas las máscaras a la vez, de modo que las emisiones salen del
+    mismo producto que el costo. Igual que en los cálculos de costo, las horas
+    sin precio no consumen. Sin intensidad (None) las emisiones son cero.
+
+    Returns:
+        dict: 'costo_usd', 'emisiones_tco2' y 'energia_mwh', cada uno (K, días)
+    """
+    precios = price_grid['precios']
+    has_price = ~np.isnan(precios)
+    intensidad = np.zeros(precios.shape) if intensidad is None else np.where(has_price, np.nan_to_num(intensidad), 0.0)
+    valores = np.stack([np.nan_to_num(precios), intensidad, has_price.astype(float)])
+    valores *= num_robots * consumption_per_robot
+
+    totals = np.einsum('vdh,kdh->vkd', valores, _daily_masks(price_grid, masks), optimize=True)
+    return {'costo_usd': totals[0], 'emisiones_tco2': totals[1], 'energia_mwh': totals[2]}
+
+def monthly_cost_emissions(price_grid, intensidad, mask, **consumption_kwargs):
+    """
+    Reporte mensual de costo energético y emisiones de un horario
+
+    Args:
+        mask: Máscara (24,), (12, 24) mensual o (días, 24) de horas trabajadas
+
+    Returns:
+        pd.DataFrame: Mes, Costo_USD, Emisiones_tCO2, Energia_MWh e Intensidad_Media
+    """
+    totals = cost_and_emissions(price_grid, intensidad, np.asarray(mask)[None], **consumption_kwargs)
+    month_idx = price_grid['mes'] - 1
+    by_month = {key: np.bincount(month_idx, weights=value[0], minlength=12) for key, value in totals.items()}
+
+    report = pd.DataFrame({
+        'Mes': MONTHS,
+        'Costo_USD': by_month['costo_usd'],
+        'Emisiones_tCO2': by_month['emisiones_tco2'],
+        'Energia_MWh': by_month['energia_mwh']
+    })
+    report['Intensidad_Media'] = np.divide(by_month['emisiones_tco2'], by_month['energia_mwh'],
+                                           out=np.zeros(12), where=by_month['energia_mwh'] > 0)
+    return report
+
+def sheet_cost_and_emissions(df_list, schedule_mask, intensidad=None, num_robots=25, consumption_per_robot=0.2):
+    """
+    Costo (USD) y emisiones (tCO2) mensuales de un horario sobre las hojas mensuales de precios
+
+    Para los reportes de pregunta1-4, que trabajan con df_list: la grilla día ×
+    hora se arma una sola vez y cost_and_emissions da costo y emisiones en la
+    misma contracción. Igual que los cálculos por hoja, las horas sin precio no
+    consumen y ambos totales se llevan a cobertura completa del horario en cada
+    mes (validacion.coverage_adjusted), así un mes con huecos no parece más
+    barato ni más limpio.
+
+    Args:
+        schedule_mask: Máscara (24,) de horas trabajadas, o carga (días, 24) por hora
+                       (p. ej. robots activos de flota.optimize_fleet_levels con num_robots=1)
+        intensidad: Intensidad tCO2/MWh (días, 24) de align_intensity_to_grid; None = sin emisiones
+
+    Returns:
+        dict: 'costos', 'emisiones' (None sin intensidad) y 'cobertura', arreglos (12,)
+    """
+    price_grid = build_price_grid(df_list)
+    carga = np.broadcast_to(np.asarray(schedule_mask, dtype=float), price_grid['precios'].shape)
+    totals = cost_and_emissions(price_grid, intensidad, carga[None], num_robots, consumption_per_robot)
+
+    # Cobertura: horas trabajadas con precio sobre horas trabajadas, por mes
+    month_idx = price_grid['mes'] - 1
+    worked = carga > 0
+    observed = (worked & ~np.isnan(price_grid['precios'])).sum(axis=1)
+    expected = np.bincount(month_idx, weights=worked.sum(axis=1), minlength=12)
+    cobertura = np.divide(np.bincount(month_idx, weights=observed, minlength=12), expected,
+                          out=np.zeros(12), where=expected > 0)
+
+    def by_month(values):
+        total = np.bincount(month_idx, weights=values[0], minlength=12)
+        return np.divide(total, cobertura, out=total, where=(cobertura > 0) & (cobertura < 1))
+
+    return {
+        'costos': by_month(totals['costo_usd']),
+        'emisiones': None if intensidad is None else by_month(totals['emisiones_tco2']),
+        'cobertura': cobertura
+    }
+
+def select_hours_weighted(price_grid, intensidad, n_horas=12, precios_carbono=PRECIOS_CARBONO):
+    """
+    Horas de cada mes que minimizan precio + precio_carbono × intensidad
+
+    Se evalúan todos los precios del carbono juntos: promedios (12, 24) de
+    precio e intensidad, objetivo (L, 12, 24) y un solo argsort. Los promedios
+    son sobre las celdas con precio; una hora sin ningún precio en el mes no se
+    elige.
+
+    Returns:
+        np.ndarray: Máscaras booleanas (L, 12, 24)
+    """
+    month_idx = price_grid['mes'] - 1
+    has_price = ~np.isnan(price_grid['precios'])
+    counts = np.zeros((12, 24))
+    np.add.at(counts, month_idx, has_price)
+
+    def monthly_mean(values):
+        sums = np.zeros((12, 24))
+        np.add.at(sums, month_idx, np.where(has_price, values, 0.0))
+        return np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+
+    precio = np.where(counts > 0, monthly_mean(price_grid['precios']), np.inf)
+    intensidad_media = monthly_mean(np.nan_to_num(intensidad))
+
+    lambdas = np.atleast_1d(np.asarray(precios_carbono, dtype=float))
+    objetivo = precio + lambdas[:, None, None] * intensidad_media
+    ranking = np.argsort(objetivo, axis=2, kind='stable')[..., :n_horas]
+    masks = np.zeros(objetivo.shape, dtype=bool)
+    np.put_along_axis(masks, ranking, True, axis=2)
+    return masks
+
+def carbon_pareto_sweep(price_grid, intensidad, n_horas=12, precios_carbono=PRECIOS_CARBONO,
+                        **consumption_kwargs):
+    """
+    Frontera costo (USD) vs emisiones (tCO2) del horario mensual de n_horas
+
+    Cada precio del carbono λ define el objetivo ponderado costo + λ × emisiones;
+    recorrer λ traza la frontera de Pareto. Los horarios repetidos se descartan
+    y se marcan los puntos no dominados.
+
+    Returns:
+        dict: 'frontera' (DataFrame por horario distinto) y 'mascaras' (N, 12, 24)
+    """
+    lambdas = np.atleast_1d(np.asarray(precios_carbono, dtype=float))
+    masks = select_hours_weighted(price_grid, intensidad, n_horas, lambdas)
+
+    # Horarios distintos (varios λ suelen elegir las mismas horas); se conserva el menor λ
+    _, first = np.unique(masks.reshape(len(lambdas), -1), axis=0, return_index=True)
+    first = np.sort(first)
+    masks, lambdas = masks[first], lambdas[first]
+
+    totals = cost_and_emissions(price_grid, intensidad, masks, **consumption_kwargs)
+    costo = totals['costo_usd'].sum(axis=1)
+    emisiones = totals['emisiones_tco2'].sum(axis=1)
+
+    # Un punto es dominado si otro cuesta y emite lo mismo o menos (y mejora en algo)
+    no_peor = (costo[None, :] <= costo[:, None]) & (emisiones[None, :] <= emisiones[:, None])
+    mejor = (costo[None, :] < costo[:, None]) | (emisiones[None, :] < emisiones[:, None])
+    pareto = ~(no_peor & mejor).any(axis=1)
+
+    # Referencia: el horario de menor costo (λ = menor precio evaluado)
+    costo_extra = costo - costo[0]
+    reduccion = emisiones[0] - emisiones
+    frontera = pd.DataFrame({
+        'Precio_Carbono': lambdas,
+        'Costo_USD': costo,
+        'Emisiones_tCO2': emisiones,
+        'Costo_Extra': costo_extra,
+        'Reduccion_tCO2': reduccion,
+        'Costo_Abatimiento': np.divide(costo_extra, reduccion, out=np.full(len(costo), np.nan),
+                                       where=reduccion > 1e-9),
+        'Pareto': pareto
+    })
+    return {'frontera': frontera, 'mascaras': masks}
+
+def print_carbon_report(report, frontera=None):
+    """
+    Muestra costo y emisiones por mes y, si se pasa, la frontera costo-emisiones
+    """
+    print("\nCOSTO Y EMISIONES POR MES")
+    print("=" * 75)
+    print(f"{'Mes':<12} {'Costo ($)':>16} {'Emisiones (tCO2)':>18} {'Energía (MWh)':>14} {'tCO2/MWh':>10}")
+    print("-" * 75)
+    for _, row in report.iterrows():
+        print(f"{row['Mes']:<12} {row['Costo_USD']:>16,.2f} {row['Emisiones_tCO2']:>18,.1f} "
+              f"{row['Energia_MWh']:>14,.0f} {row['Intensidad_Media']:>10.3f}")
+    print("-" * 75)
+    print(f"{'TOTAL':<12} {report['Costo_USD'].sum():>16,.2f} {report['Emisiones_tCO2'].sum():>18,.1f} "
+          f"{report['Energia_MWh'].sum():>14,.0f}")
+
+    if frontera is not None:
+        puntos = frontera[frontera['Pareto']]
+        print("\nFRONTERA COSTO-EMISIONES (horarios no dominados)")
+        print("=" * 75)
+        print(f"{'$/tCO2':>10} {'Costo ($)':>16} {'Emisiones (tCO2)':>18} {'Reducción':>12} {'$/tCO2 evit.':>14}")
+        print("-" * 75)
+        for _, row in puntos.iterrows():
+            abatimiento = '-' if np.isnan(row['Costo_Abatimiento']) else f"{row['Costo_Abatimiento']:,.2f}"
+            print(f"{row['Precio_Carbono']:>10,.1f} {row['Costo_USD']:>16,.2f} {row['Emisiones_tCO2']:>18,.1f} "
+                  f"{row['Reduccion_tCO2']:>12,.1f} {abatimiento:>14}")
+
+if __name__ == "__main__":
+    import argparse
+    from validacion import load_price_data
+
+    parser = argparse.ArgumentParser(description="Costo y emisiones de CO2 del horario de trabajo")
+    parser.add_argument('intensidad', help="CSV o Excel con columnas fecha, [hora], intensidad")
+    parser.add_argument('archivo', nargs='?', default=r"Modela1Fixeddata.xlsx")
+    parser.add_argument('--kg', action='store_true', help="La intensidad viene en kgCO2/MWh")
+    parser.add_argument('--horas', type=int, default=12, help="Horas diarias a trabajar")
+    args = parser.parse_args()
+
+    _, price_grid = load_price_data(args.archivo, fill_gaps=True, verbose=False)
+    serie = load_carbon_intensity(args.intensidad, 0.001 if args.kg else 1.0)
+    intensidad = align_intensity_to_grid(price_grid, serie)
+
+    horario_actual = (np.arange(24) >= 8) & (np.arange(24) < 20)
+    sweep = carbon_pareto_sweep(price_grid, intensidad, n_horas=args.horas)
+    print_carbon_report(monthly_cost_emissions(price_grid, intensidad, horario_actual), sweep['frontera'])
@@ -0,0 +1,77 @@
+import pandas as pd
+import numpy as np
+import calendar
+from typing import List
+
+MONTHS = ['Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio',
+          'Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre']
+
+def read_excel_sheets_to_dataframes(file_path):
+    """
+    Read Excel file with sheets named 1-12 and return list of DataFrames
+    """
+    dataframes = []
+
+    for sheet_num in range(1, 13):
+        try:
+            df = pd.read_excel(file_path, sheet_name=str(sheet_num))
+            dataframes.append(df)
+        except Exception as e:
+            print(f"Error reading sheet '{sheet_num}': {e}")
+            dataframes.append(pd.DataFrame())
+
+    return dataframes
+
+def build_price_grid(df_list: List[pd.DataFrame], year=2023):
+    """
+    Convierte las hojas mensuales (24 horas × días) en una matriz día × hora
+
+    Cada fila corresponde a un día real del calendario y cada columna a una
+    hora (0-23). Los días u horas sin dato quedan como NaN.
+
+    Args:
+        df_list: Lista de DataFrames con precios de energía por mes
+        year: Año de los datos
+
+    Returns:
+        dict: Matriz de precios y vectores de fecha/mes/día por fila
+    """
+    month_blocks = []
+    month_numbers = []
+    day_numbers = []
+
+    for month_idx in range(12):
+        month_num = month_idx + 1
+        days_in_month = calendar.monthrange(year, month_num)[1]
+        block = np.full((days_in_month, 24), np.nan)
+
+        if month_idx < len(df_list) and not df_list[month_idx].empty:
+            # Hoja: filas = horas, columnas = días
+            values = df_list[month_idx].iloc[:24, :days_in_month].to_numpy(dtype=float)
+            block[:values.shape[1], :values.shape[0]] = values.T
+
+        month_blocks.append(block)
+        month_numbers.append(np.full(days_in_month, month_num))
+        day_numbers.append(np.arange(1, days_in_month + 1))
+
+    mes = np.concatenate(month_numbers)
+    dia = np.concatenate(day_numbers)
+    fechas = pd.to_datetime({'year': year, 'month': mes, 'day': dia}).to_numpy().astype('datetime64[D]')
+
+    return {
+        'precios': np.vstack(month_blocks),
+        'fechas': fechas,
+        'mes': mes,
+        'dia': dia,
+        'año': year
+    }
+
+def price_grid_from_records(fechas, horas, precios, year=2023):
+    """
+    Grilla día × hora a partir de registros (fecha, hora, precio), ej. la tabla de contexto de pregunta5
+    """
+    grid = build_price_grid([], year=year)
+    fechas = pd.to_datetime(pd.Series(fechas)).to_numpy().astype('datetime64[D]')
+    day_pos = (fechas - grid['fechas'][0]).astype(np.int64)
+    grid['precios'][day_pos, np.asarray(horas, dtype=int)] = np.asarray(precios, dtype=float)
+    return grid
@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+from datos import MONTHS
+
+def _cumulative_bounds(llegadas, latencia_max, backlog_max):
+    """
+    Cotas de producción acumulada por hora: LB(t) <= X(t) <= UB(t)
+
+    UB(t) = A(t): no se produce antes de que llegue la demanda.
+    LB(t) = max(A(t - L), A(t) - B): plazo de L horas y backlog máximo B.
+    Al cierre del día todo debe estar producido (LB = A en la hora 23).
+    """
+    A = np.cumsum(llegadas, axis=1)
+    shifted = np.zeros_like(A)
+    if latencia_max < 24:
+        shifted[:, latencia_max:] = A[:, :24 - latencia_max]
+    lower = shifted if backlog_max is None else np.maximum(shifted, A - backlog_max)
+    lower[:, -1] = A[:, -1]
+    return lower, A
+
+def _asap_schedule(llegadas, capacidad):
+    """
+    Producción inmediata: cada hora produce todo lo pendiente hasta la capacidad
+    """
+    produccion = np.zeros_like(llegadas)
+    pendiente = np.zeros(len(llegadas))
+    for hour in range(24):
+        pendiente = pendiente + llegadas[:, hour]
+        produccion[:, hour] = np.minimum(pendiente, capacidad)
+        pendiente = pendiente - produccion[:, hour]
+    return produccion
+
+def _greedy_cheapest_first(precios, lower, upper, capacidad):
+    """
+    Asigna producción a las horas más baratas primero, en todos los días a la vez
+
+    En cada paso k se toma la k-ésima hora más barata de cada día y se le asigna
+    el máximo valor con el que aún existe una solución factible para las horas
+    que faltan (X = producción acumulada de las horas ya asignadas):
+        δ <= C - x_t
+        δ <= min_{s>=t} (UB(s) - X(s)) - max(0, max_{s<t} (LB(s) - X(s)))
+    Lo que ya falta antes de t (déficit) se debe cubrir con horas libres previas
+    y resta espacio a t. Las cotas acumuladas sobre una cadena de horas forman un
+    g-polimatroide, por lo que la asignación voraz en orden de precio es óptima.
+    """
+    days = len(precios)
+    x = np.zeros(precios.shape)
+    order = np.argsort(np.where(np.isnan(precios), np.inf, precios), axis=1, kind='stable')
+    rows = np.arange(days)
+    hours = np.arange(24)
+
+    for k in range(24):
+        t = order[:, k]
+        X = np.cumsum(x, axis=1)
+        later = hours[None, :] >= t[:, None]
+
+        room = np.where(later, upper - X, np.inf).min(axis=1)
+        deficit = np.where(later, 0.0, lower - X).max(axis=1)
+
+        delta = np.minimum(capacidad, room - np.maximum(deficit, 0.0))
+        x[rows, t] = np.maximum(delta, 0.0)
+
+    return x
+
+def optimize_load_shifting(price_grid, llegadas, latencia_max=4, backlog_max=None, num_robots=25,
+                           minutes_per_product=15, consumption_per_robot=0.2):
+    """
+    Activación horaria de robots que minimiza el costo energético con demanda diferible
+
+    La demanda llega por hora (productos) y puede esperar hasta latencia_max
+    horas, con a lo sumo backlog_max productos pendientes. Cada día se resuelve
+    con asignación voraz a las horas más baratas bajo cotas de producción
+    acumulada, vectorizada sobre todos los días del año (24 pasos en total).
+    Los días sin solución factible (capacidad insuficiente para el plazo) usan
+    la producción inmediata y quedan marcados.
+
+    Args:
+        price_grid: Diccionario de datos.build_price_grid
+        llegadas: Productos que llegan por hora, forma (24,) o (días, 24)
+        latencia_max: Horas máximas entre llegada y producción (0 = inmediato)
+        backlog_max: Productos pendientes máximos al cierre de cada hora (None = sin límite)
+        num_robots: Robots disponibles (capacidad por hora)
+        minutes_per_product: Minutos de robot por producto
+        consumption_per_robot: MWh por robot por hora activa
+
+    Returns:
+        dict: Producción, robots activos y backlog (días, 24), costo diario y resumen mensual
+    """
+    precios = price_grid['precios']
+    llegadas = np.broadcast_to(np.asarray(llegadas, dtype=float), precios.shape).copy()
+    llegadas[np.isnan(precios)] = 0.0  # horas sin precio: sin datos de operación
+
+    capacidad = num_robots * 60 / minutes_per_product
+    lower, upper = _cumulative_bounds(llegadas, latencia_max, backlog_max)
+
+    inmediata = _asap_schedule(llegadas, capacidad)
+    X_inmediata = np.cumsum(inmediata, axis=1)
+    factible = np.all(X_inmediata >= lower - 1e-9, axis=1)
+
+    optima = _greedy_cheapest_first(precios, lower, upper, capacidad)
+    produccion = np.where(factible[:, None], optima, inmediata)
+
+    # Energía: cada producto ocupa minutes_per_product minutos de un robot
+    robots_activos = produccion * minutes_per_product / 60
+    precios_validos = np.nan_to_num(precios)
+    costo = (robots_activos * consumption_per_robot * precios_validos).sum(axis=1)
+    costo_inmediato = (inmediata * minutes_per_product / 60 * consumption_per_robot * precios_validos).sum(axis=1)
+
+    month_idx = price_grid['mes'] - 1
+    resumen = pd.DataFrame({
+        'Mes': MONTHS,
+        'Costo_Inmediato': np.bincount(month_idx, weights=costo_inmediato, minlength=12),
+        'Costo_Optimizado': np.bincount(month_idx, weights=costo, minlength=12),
+        'Dias_Infactibles': np.bincount(month_idx, weights=~factible, minlength=12).astype(int)
+    })
+    resumen['Ahorro'] = resumen['Costo_Inmediato'] - resumen['Costo_Optimizado']
+
+    return {
+        'produccion': produccion,
+        'robots_activos': robots_activos,
+        'robots_encendidos': np.ceil(robots_activos - 1e-9).astype(int),
+        'backlog': np.cumsum(llegadas - produccion, axis=1),
+        'costo_diario': costo,
+        'costo_inmediato_diario': costo_inmediato,
+        'dias_infactibles': ~factible,
+        'resumen': resumen
+    }
+
+def print_load_shifting_report(result, latencia_max=None, backlog_max=None):
+    """
+    Muestra el costo mensual de producir de inmediato frente a diferir la demanda
+    """
+    resumen = result['resumen']
+    titulo = "DESPLAZAMIENTO DE CARGA"
+    if latencia_max is not None:
+        titulo += f" (plazo {latencia_max} h"
+        titulo += f", backlog máx. {backlog_max:,.0f})" if backlog_max is not None else ")"
+    print(f"\n{titulo}")
+    print("=" * 100)
+    print(f"{'Mes':<12} {'Inmediato ($)':>16} {'Optimizado ($)':>16} {'Ahorro ($)':>14} {'Días infactibles':>18}")
+    print("-" * 80)
+    for _, fila in resumen.iterrows():
+        print(f"{fila['Mes']:<12} {fila['Costo_Inmediato']:>16,.2f} {fila['Costo_Optimizado']:>16,.2f} "
+              f"{fila['Ahorro']:>14,.2f} {fila['Dias_Infactibles']:>18}")
+    inmediato = resumen['Costo_Inmediato'].sum()
+    ahorro = resumen['Ahorro'].sum()
+    print("-" * 80)
+    print(f"{'Total':<12} {inmediato:>16,.2f} {resumen['Costo_Optimizado'].sum():>16,.2f} {ahorro:>14,.2f}")
+    if inmediato > 0:
+        print(f"\nAhorro anual por diferir la demanda: ${ahorro:,.2f} USD ({ahorro / inmediato * 100:.1f}%)")
+    print(f"Pico de robots encendidos: {result['robots_encendidos'].max()}")
+    dias = int(result['dias_infactibles'].sum())
+    if dias:
+        print(f"⚠️  {dias} días sin capacidad para cumplir el plazo (se producen de inmediato)")
@@ -0,0 +1,224 @@
+import os
+import itertools
+import tomllib
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from cache_resultados import hash_inputs
+from ingresos import calculate_hourly_profit_grid, summarize_by_month
+from sensibilidad import BASE_PARAMETERS
+
+try:
+    import pyarrow  # noqa: F401  (motor de pandas para Parquet)
+    PARQUET_DISPONIBLE = True
+except ImportError:
+    PARQUET_DISPONIBLE = False
+
+# Columnas de resultado; el resto de columnas del almacén son parámetros
+COLUMNAS_RESULTADO = ['ingresos', 'costo_energia', 'utilidad', 'productos', 'horas_robot_dia']
+COLUMNAS_CLAVE = ['escenario_hash', 'datos_hash']
+
+def load_scenario_file(file_path):
+    """
+    Lee una definición de escenarios en TOML o YAML
+
+    Formato (TOML):
+        [base]                      # sobrescribe BASE_PARAMETERS
+        consumo_por_robot = 0.2
+
+        [grid]                      # producto cartesiano de las listas
+        num_robots = [20, 25, 30]
+        hora_inicio = [6, 8, 10]
+
+        [[escenarios]]              # escenarios explícitos adicionales
+        nombre = "Modificado"
+        consumo_por_robot = 0.15
+        hora_inicio = 10
+        hora_fin = 16
+
+    Un escenario puede usar 'periodos' = [[inicio, fin], ...] en lugar de
+    hora_inicio/hora_fin para turnos partidos como los de pregunta4.
+    """
+    if file_path.lower().endswith(('.yaml', '.yml')):
+        import yaml  # opcional: solo para definiciones en YAML
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return yaml.safe_load(f) or {}
+    with open(file_path, 'rb') as f:
+        return tomllib.load(f)
+
+def expand_scenarios(definition):
+    """
+    Lista de escenarios (diccionarios de parámetros completos) de una definición
+
+    Cada escenario de la lista explícita y de la grilla parte de BASE_PARAMETERS
+    y de la sección [base]. Los escenarios repetidos se eliminan por su hash
+    (gana el explícito, que conserva su nombre) y las combinaciones de la grilla
+    con hora_fin <= hora_inicio se descartan.
+    """
+    base = {**BASE_PARAMETERS, **definition.get('base', {})}
+    grid = definition.get('grid', {})
+
+    scenarios = [{**base, **explicit} for explicit in definition.get('escenarios', [])]
+    if grid:
+        keys = list(grid)
+        for values in itertools.product(*(grid[key] for key in keys)):
+            scenario = {**base, **dict(zip(keys, values))}
+            if scenario.get('periodos') or scenario['hora_fin'] > scenario['hora_inicio']:
+                scenarios.append(scenario)
+    if not scenarios:
+        scenarios.append(dict(base))
+
+    unique = {}
+    for scenario in scenarios:
+        unique.setdefault(scenario_hash(scenario), scenario)
+    return list(unique.values())
+
+def scenario_hash(scenario):
+    """
+    Hash de los parámetros que afectan el resultado (el nombre no cuenta)
+    """
+    params = {key: value for key, value in scenario.items() if key != 'nombre'}
+    return hash_inputs(params)[:16]
+
+def _scenario_mask(scenario):
+    periods = scenario.get('periodos') or [(scenario['hora_inicio'], scenario['hora_fin'])]
+    mask = np.zeros(24, dtype=bool)
+    for start_hour, end_hour in periods:
+        mask[int(start_hour):int(end_hour)] = True
+    return mask
+
+def evaluate_scenario(price_grid, scenario):
+    """
+    Ingresos, costo y utilidad anual de un escenario con los motores de ingresos.py
+    """
+    mask = _scenario_mask(scenario)
+    grid = calculate_hourly_profit_grid(
+        price_grid, mask,
+        num_robots=scenario['num_robots'],
+        consumption_per_robot=scenario['consumo_por_robot'],
+        minutes_per_product=scenario['minutos_por_producto'],
+        gtq_to_usd_rate=scenario['tasa_cambio']
+    )
+    ingresos = summarize_by_month(price_grid, grid['ingresos_usd']).sum()
+    costo = summarize_by_month(price_grid, grid['costos_usd']).sum()
+    return {
+        'ingresos': ingresos,
+        'costo_energia': costo,
+        'utilidad': ingresos - costo,
+        'productos': summarize_by_month(price_grid, grid['productos']).sum(),
+        'horas_robot_dia': int(mask.sum()) * scenario['num_robots']
+    }
+
+# Grilla de precios por proceso: se envía una sola vez en el inicializador
+_worker_grid = None
+
+def _init_worker(price_grid):
+    global _worker_grid
+    _worker_grid = price_grid
+
+def _evaluate_batch(scenarios):
+    return [evaluate_scenario(_worker_grid, scenario) for scenario in scenarios]
+
+def _scenario_row(scenario, result, data_hash):
+    row = {'escenario_hash': scenario_hash(scenario), 'datos_hash': data_hash}
+    for key, value in scenario.items():
+        # Listas (ej. periodos) se guardan como texto para que la columna sea escalar
+        row[key] = repr(value) if isinstance(value, (list, tuple, dict)) else value
+    row.update(result)
+    return row
+
+def store_path(path):
+    """
+    Ruta efectiva del almacén: Parquet si pyarrow está disponible, si no CSV
+    """
+    root, ext = os.path.splitext(path)
+    if ext.lower() == '.parquet' and not PARQUET_DISPONIBLE:
+        return f"{root}.csv"
+    return path
+
+def load_store(path):
+    """
+    Resultados guardados (DataFrame vacío si el almacén no existe)
+    """
+    path = store_path(path)
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=COLUMNAS_CLAVE)
+    if path.lower().endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+def save_store(df, path):
+    path = store_path(path)
+    tmp_path = f"{path}.tmp"
+    if path.lower().endswith('.parquet'):
+        df.to_parquet(tmp_path, index=False)
+    else:
+        df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return path
+
+def run_experiments(price_grid, scenarios, store='resultados_experimentos.parquet', max_workers=None,
+                    batch_size=64, verbose=True):
+    """
+    Evalúa los escenarios en paralelo y agrega los resultados al almacén columnar
+
+    Los pares (escenario_hash, datos_hash) ya presentes en el almacén no se
+    recalculan, así que un estudio se puede interrumpir, reanudar o ampliar con
+    más escenarios pagando solo por los nuevos.
+
+    Args:
+        price_grid: Diccionario de datos.build_price_grid
+        scenarios: Lista de expand_scenarios
+        store: Archivo .parquet (o .csv) de resultados
+        max_workers: Procesos; None = número de CPUs, 1 = sin procesos
+        batch_size: Escenarios por tarea enviada a cada proceso
+
+    Returns:
+        pd.DataFrame: Filas del almacén correspondientes a los escenarios pedidos
+    """
+    data_hash = hash_inputs(price_grid['precios'])[:16]
+    existing = load_store(store)
+    done = set(zip(existing['escenario_hash'], existing['datos_hash'])) if len(existing) else set()
+
+    pending = [s for s in scenarios if (scenario_hash(s), data_hash) not in done]
+    if verbose:
+        print(f"Escenarios: {len(scenarios)} | ya calculados: {len(scenarios) - len(pending)} | "
+              f"por calcular: {len(pending)}")
+
+    if pending:
+        batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+        if max_workers == 1:
+            _init_worker(price_grid)
+            results = [r for batch in batches for r in _evaluate_batch(batch)]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                     initargs=(price_grid,)) as executor:
+                results = [r for batch_results in executor.map(_evaluate_batch, batches) for r in batch_results]
+
+        new_rows = pd.DataFrame([_scenario_row(s, r, data_hash) for s, r in zip(pending, results)])
+        existing = new_rows if existing.empty else pd.concat([existing, new_rows], ignore_index=True)
+        path = save_store(existing, store)
+        if verbose:
+            print(f"Resultados guardados en {path}")
+
+    requested = {scenario_hash(s) for s in scenarios}
+    mask = existing['escenario_hash'].isin(requested) & (existing['datos_hash'] == data_hash)
+    return existing[mask].reset_index(drop=True)
+
+if __name__ == "__main__":
+    import argparse
+    from validacion import load_price_data
+
+    parser = argparse.ArgumentParser(description="Ejecuta una grilla de escenarios de costo y utilidad")
+    parser.add_argument('escenarios', help="Archivo TOML o YAML de escenarios")
+    parser.add_argument('archivo', nargs='?', default=r"Modela1Fixeddata.xlsx")
+    parser.add_argument('--salida', default='resultados_experimentos.parquet')
+    parser.add_argument('--procesos', type=int, default=None)
+    args = parser.parse_args()
+
+    _, price_grid = load_price_data(args.archivo, verbose=False)
+    scenarios = expand_scenarios(load_scenario_file(args.escenarios))
+    results = run_experiments(price_grid, scenarios, store=args.salida, max_workers=args.procesos)
+
+    columns = [c for c in results.columns if c not in COLUMNAS_CLAVE]
+    print(results.sort_values('utilidad', ascending=False)[columns].head(20).to_string(index=False))
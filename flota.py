@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+from datos import MONTHS
+
+def _fill_cheapest(precios, robot_hours, num_robots, min_robots):
+    """
+    Reparte las horas-robot del día empezando por las horas más baratas
+
+    Returns:
+        np.ndarray: Robots por hora (días, 24), enteros
+    """
+    days = len(precios)
+    order = np.argsort(np.where(np.isnan(precios), np.inf, precios), axis=1, kind='stable')
+
+    # Capacidad libre por hora sobre el mínimo, en orden de precio
+    free = np.full((days, 24), num_robots - min_robots)
+    remaining = np.maximum(robot_hours - min_robots * 24, 0)[:, None]
+    before = np.cumsum(free, axis=1) - free
+    extra_sorted = np.clip(remaining - before, 0, free)
+
+    robots = np.full((days, 24), min_robots)
+    np.put_along_axis(robots, order, min_robots + extra_sorted, axis=1)
+    return robots.astype(int)
+
+def _fill_with_ramps(precios, robot_hours, num_robots, min_robots, rampa):
+    """
+    Agrega un robot-hora a la vez en la hora más barata donde no rompe la rampa
+
+    Una hora admite un robot más si queda bajo num_robots y a lo sumo rampa
+    robots sobre sus vecinas. Cada iteración avanza todos los días a la vez;
+    la hora con menos robots siempre es admisible, así que no hay bloqueos.
+    """
+    days = len(precios)
+    rows = np.arange(days)
+    price_key = np.where(np.isnan(precios), np.inf, precios)
+    robots = np.full((days, 24), min_robots, dtype=int)
+    remaining = np.maximum(robot_hours - min_robots * 24, 0)
+    unlimited = np.full((days, 1), np.iinfo(np.int32).max)
+
+    while np.any(remaining > 0):
+        left = np.hstack([unlimited, robots[:, :-1]])
+        right = np.hstack([robots[:, 1:], unlimited])
+        addable = (robots < num_robots) & (robots + 1 - left <= rampa) & (robots + 1 - right <= rampa)
+
+        key = np.where(addable, price_key, np.inf)
+        t = key.argmin(axis=1)
+        step = (remaining > 0) & np.isfinite(key[rows, t])
+        if not step.any():
+            break
+        robots[rows[step], t[step]] += 1
+        remaining -= step
+    return robots
+
+def optimize_fleet_levels(price_grid, meta_diaria=1200, num_robots=25, min_robots=0, rampa=None,
+                          minutes_per_product=15, consumption_per_robot=0.2, intensidad_carbono=None,
+                          precio_carbono=0.0):
+    """
+    Número de robots activos por hora y día que cumple la meta diaria al menor costo
+
+    Sin rampa es una mochila fraccionaria por día: las horas-robot necesarias se
+    asignan a las horas más baratas hasta num_robots por hora (un solo paso
+    vectorizado). Con rampa, la asignación voraz agrega robots-hora uno a uno en
+    la hora más barata que respeta el límite de cambio con sus vecinas, para
+    las 24 × 365 celdas a la vez. Con intensidad_carbono las horas se ordenan
+    por precio + precio_carbono × intensidad, igual que carbono.select_hours_weighted.
+
+    Args:
+        price_grid: Diccionario de datos.build_price_grid
+        meta_diaria: Productos por día, escalar o arreglo por día (1200 = horario actual)
+        num_robots: Robots disponibles por hora
+        min_robots: Robots mínimos encendidos en cualquier hora
+        rampa: Cambio máximo de robots entre horas consecutivas (None = sin límite)
+        intensidad_carbono: Intensidad tCO2/MWh (días, 24) de carbono.align_intensity_to_grid
+        precio_carbono: Precio del carbono en USD/tCO2
+
+    Returns:
+        dict: Matriz de activación (días, 24), costo diario, déficit diario de
+        productos (meta sobre la capacidad de la flota) y resumen mensual
+    """
+    precios = price_grid['precios']
+    days = len(precios)
+    products_per_robot_hour = 60 / minutes_per_product
+    meta = np.broadcast_to(np.asarray(meta_diaria, dtype=float), (days,))
+    robot_hours = np.ceil(meta / products_per_robot_hour).astype(int)
+    # Una meta sobre la capacidad de la flota no se recorta en silencio: se reporta el déficit
+    robot_hours = np.minimum(robot_hours, num_robots * 24)
+
+    # Las horas sin precio siguen en NaN y quedan al final del orden
+    clave = precios if intensidad_carbono is None else precios + precio_carbono * np.nan_to_num(intensidad_carbono)
+    if rampa is None:
+        robots = _fill_cheapest(clave, robot_hours, num_robots, min_robots)
+    else:
+        robots = _fill_with_ramps(clave, robot_hours, num_robots, min_robots, rampa)
+
+    precios_validos = np.nan_to_num(precios)
+    costo = (robots * precios_validos).sum(axis=1) * consumption_per_robot
+    productos = robots.sum(axis=1) * products_per_robot_hour
+    deficit = np.maximum(meta - productos, 0.0)
+
+    month_idx = price_grid['mes'] - 1
+    resumen = pd.DataFrame({
+        'Mes': MONTHS,
+        'Costo_Energia': np.bincount(month_idx, weights=costo, minlength=12),
+        'Productos': np.bincount(month_idx, weights=productos, minlength=12),
+        'Horas_Robot': np.bincount(month_idx, weights=robots.sum(axis=1), minlength=12).astype(int),
+        'Pico_Robots': np.maximum.reduceat(robots.max(axis=1), np.flatnonzero(np.diff(month_idx, prepend=-1))),
+        'Deficit': np.bincount(month_idx, weights=deficit, minlength=12)
+    })
+
+    result = {
+        'robots_por_hora': robots,
+        'costo_diario': costo,
+        'productos_diarios': productos,
+        'deficit_diario': deficit,
+        'resumen': resumen
+    }
+    if intensidad_carbono is not None:
+        # Igual que el costo, las horas sin precio no consumen
+        operado = np.where(np.isnan(precios), 0.0, np.nan_to_num(intensidad_carbono))
+        emisiones = (robots * operado).sum(axis=1) * consumption_per_robot
+        result['emisiones_diarias'] = emisiones
+        resumen['Emisiones_tCO2'] = np.bincount(month_idx, weights=emisiones, minlength=12)
+    return result
+
+def activation_matrix(result, price_grid, month):
+    """
+    Matriz de activación de un mes como tabla (filas = día, columnas = hora)
+    """
+    rows = price_grid['mes'] == month
+    return pd.DataFrame(result['robots_por_hora'][rows],
+                        index=pd.Index(price_grid['dia'][rows], name='Dia'),
+                        columns=[f"{h:02d}:00" for h in range(24)])
+
+def print_activation_report(result, price_grid, month):
+    """
+    Muestra la matriz de activación del mes y su costo frente a la flota completa
+    """
+    matrix = activation_matrix(result, price_grid, month)
+    costo = result['resumen'].loc[month - 1, 'Costo_Energia']
+    print(f"\nROBOTS ACTIVOS POR HORA - {MONTHS[month - 1].upper()}")
+    print("=" * 100)
+    print(matrix.to_string())
+    print(f"\nCosto energético del mes: ${costo:,.2f} USD")
+    print(f"Horas-robot: {matrix.to_numpy().sum():,} | Pico de robots: {matrix.to_numpy().max()}")
+
+    deficit = result['deficit_diario'][price_grid['mes'] == month]
+    dias_deficit = int((deficit > 1e-9).sum())
+    if dias_deficit:
+        print(f"⚠️  {dias_deficit} días sin capacidad suficiente para la meta (déficit total "
+              f"{deficit.sum():,.0f} productos)")
@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+from datos import MONTHS
+from calendario import CLASIFICACIONES, build_calendar_context
+from ingresos import calculate_hourly_profit_grid, schedule_to_hour_mask
+from pareto import mask_to_periods
+
+def contiguous_schedules(n_horas=12):
+    """
+    Las 24 jornadas continuas de n_horas (incluye las que cruzan la medianoche)
+
+    Returns:
+        tuple: (máscaras (24, 24) bool, nombres 'HH:00-HH:00')
+    """
+    offsets = (np.arange(24)[:, None] + np.arange(n_horas)[None, :]) % 24
+    masks = np.zeros((24, 24), dtype=bool)
+    np.put_along_axis(masks, offsets, True, axis=1)
+    names = [f"{start:02d}:00-{(start + n_horas) % 24:02d}:00" for start in range(24)]
+    return masks, names
+
+def _describe(mask):
+    bits = int(np.dot(mask.astype(np.int64), 1 << np.arange(24)))
+    return ', '.join(f"{start:02d}:00-{end:02d}:00" for start, end in mask_to_periods(bits))
+
+def optimize_weekly_schedules(price_grid, context=None, horarios=None, n_horas=12, intensidad_carbono=None,
+                              precio_carbono=0.0, **profit_kwargs):
+    """
+    Horario óptimo por mes y tipo de día (semana laboral, viernes, fin de semana, feriado)
+
+    La utilidad por hora se acumula por (mes, tipo de día, hora) y todos los
+    horarios candidatos se evalúan con un solo producto matricial (12, 4, 24) ×
+    (24, K). El horario uniforme del mes es el mejor candidato aplicado a todos
+    sus días; la ganancia es lo que se obtiene al permitir un horario por tipo.
+    Con precio_carbono la utilidad descuenta las emisiones de cada hora y el
+    resultado agrega las emisiones de cada horario elegido.
+
+    Args:
+        price_grid: Diccionario de datos.build_price_grid
+        context: Resultado de calendario.build_calendar_context (se calcula si es None)
+        horarios: Candidatos con el formato de define_work_schedules de pregunta4;
+                  None = todas las jornadas continuas de n_horas
+        intensidad_carbono: Intensidad tCO2/MWh (días, 24) de carbono.align_intensity_to_grid
+        precio_carbono: Precio del carbono en USD/tCO2
+        **profit_kwargs: Parámetros para calculate_hourly_profit_grid (num_robots, consumo, ...)
+
+    Returns:
+        dict: 'horarios' (fila por mes y tipo de día), 'resumen' mensual y máscaras (12, 4, 24)
+    """
+    if context is None:
+        context = build_calendar_context(price_grid)
+
+    if horarios is None:
+        candidates, names = contiguous_schedules(n_horas)
+    else:
+        names = [info['nombre'] for info in horarios.values()]
+        candidates = np.array([schedule_to_hour_mask(info) for info in horarios.values()])
+
+    grid = calculate_hourly_profit_grid(price_grid, None, intensidad_carbono=intensidad_carbono,
+                                        precio_carbono=precio_carbono, **profit_kwargs)
+    n_types = len(CLASIFICACIONES)
+    group = (price_grid['mes'] - 1) * n_types + context['clasificacion']
+
+    # Utilidad, costo y emisiones sumados por (mes, tipo, hora) y días por (mes, tipo)
+    utilidad = np.zeros((12 * n_types, 24))
+    costo = np.zeros((12 * n_types, 24))
+    emisiones = np.zeros((12 * n_types, 24))
+    np.add.at(utilidad, group, grid['utilidad_usd'])
+    np.add.at(costo, group, grid['costos_usd'])
+    if intensidad_carbono is not None:
+        np.add.at(emisiones, group, grid['emisiones_tco2'])
+    dias = np.bincount(group, minlength=12 * n_types).reshape(12, n_types)
+
+    candidate_matrix = candidates.T.astype(float)
+    valor = (utilidad @ candidate_matrix).reshape(12, n_types, -1)
+    costo_candidato = (costo @ candidate_matrix).reshape(12, n_types, -1)
+    emisiones_candidato = (emisiones @ candidate_matrix).reshape(12, n_types, -1)
+
+    # Mejor horario por tipo de día y mejor horario único por mes
+    best = valor.argmax(axis=2)
+    best_value = np.take_along_axis(valor, best[..., None], axis=2)[..., 0]
+    best_cost = np.take_along_axis(costo_candidato, best[..., None], axis=2)[..., 0]
+    best_emissions = np.take_along_axis(emisiones_candidato, best[..., None], axis=2)[..., 0]
+    uniforme = valor.sum(axis=1).argmax(axis=1)
+    uniforme_value = valor.sum(axis=1)[np.arange(12), uniforme]
+    uniforme_cost = costo_candidato.sum(axis=1)[np.arange(12), uniforme]
+
+    months, types = np.nonzero(dias)
+    horarios_df = pd.DataFrame({
+        'Mes': [MONTHS[m] for m in months],
+        'Clasificacion': [CLASIFICACIONES[t] for t in types],
+        'Dias': dias[months, types],
+        'Horario': [names[k] for k in best[months, types]],
+        'Horas_Trabajo': [_describe(candidates[k]) for k in best[months, types]],
+        'Utilidad': best_value[months, types],
+        'Costo_Energia': best_cost[months, types],
+        'Horario_Uniforme': [names[k] for k in uniforme[months]]
+    })
+    if intensidad_carbono is not None:
+        horarios_df['Emisiones_tCO2'] = best_emissions[months, types]
+
+    por_tipo = np.where(dias > 0, best_value, 0.0).sum(axis=1)
+    resumen = pd.DataFrame({
+        'Mes': MONTHS,
+        'Horario_Uniforme': [names[k] for k in uniforme],
+        'Utilidad_Uniforme': uniforme_value,
+        'Utilidad_Por_Tipo': por_tipo,
+        'Ganancia': por_tipo - uniforme_value,
+        'Costo_Uniforme': uniforme_cost,
+        'Costo_Por_Tipo': np.where(dias > 0, best_cost, 0.0).sum(axis=1)
+    })
+    resumen['Ganancia_Pct'] = resumen['Ganancia'] / resumen['Utilidad_Uniforme'].abs() * 100
+    if intensidad_carbono is not None:
+        resumen['Emisiones_Por_Tipo'] = np.where(dias > 0, best_emissions, 0.0).sum(axis=1)
+
+    masks = candidates[best]
+    masks[dias == 0] = False
+
+    return {
+        'horarios': horarios_df,
+        'resumen': resumen,
+        'mascaras': masks,
+        'ganancia_anual': resumen['Ganancia'].sum()
+    }
+
+def weekly_schedule_mask(price_grid, result, context=None):
+    """
+    Máscara (días, 24) que aplica a cada día el horario de su mes y tipo de día
+
+    Se puede pasar a calculate_hourly_profit_grid o a ahorros para re-preciar el año.
+    """
+    if context is None:
+        context = build_calendar_context(price_grid)
+    return result['mascaras'][price_grid['mes'] - 1, context['clasificacion']]
+
+def print_weekly_schedules(result):
+    """
+    Muestra el horario por tipo de día de cada mes y la ganancia sobre el horario uniforme
+    """
+    tabla = result['horarios'].pivot(index='Mes', columns='Clasificacion', values='Horario')
+    tabla = tabla.reindex(index=MONTHS, columns=[c for c in CLASIFICACIONES if c in tabla.columns])
+
+    print("\nHORARIO ÓPTIMO POR TIPO DE DÍA")
+    print("=" * 100)
+    print(tabla.fillna('-').to_string())
+
+    print("\nGANANCIA SOBRE UN HORARIO ÚNICO POR MES")
+    print("-" * 100)
+    for _, row in result['resumen'].iterrows():
+        print(f"{row['Mes']:<12} uniforme {row['Horario_Uniforme']:<14} "
+              f"${row['Utilidad_Uniforme']:>14,.2f} | por tipo ${row['Utilidad_Por_Tipo']:>14,.2f} | "
+              f"ganancia ${row['Ganancia']:>10,.2f} ({row['Ganancia_Pct']:.2f}%)")
+    print(f"\nGanancia anual: ${result['ganancia_anual']:,.2f} USD")
@@ -0,0 +1,139 @@
+import numpy as np
+from calendario import CLASIFICACIONES, build_calendar_context
+
+def build_price_rank_index(price_grid, context=None, n_cuantiles=101):
+    """
+    Precalcula órdenes y cuantiles de la matriz de precios para consultas rápidas
+
+    Incluye argsort por día, por mes y por (mes, clasificación de día), el orden
+    global de todas las celdas y un resumen de cuantiles. Los NaN quedan al final
+    de cada orden.
+
+    Args:
+        price_grid: Diccionario de datos.build_price_grid
+        context: Resultado de calendario.build_calendar_context (se calcula si es None)
+        n_cuantiles: Puntos del resumen de cuantiles (101 = percentiles 0..100)
+
+    Returns:
+        dict: Índice de rangos reutilizable por cheapest_hours / hours_below_quantile
+    """
+    if context is None:
+        context = build_calendar_context(price_grid)
+
+    precios = price_grid['precios']
+    valid = ~np.isnan(precios)
+    valores = np.where(valid, precios, 0.0)
+    month_idx = price_grid['mes'] - 1
+    clasif_idx = context['clasificacion']
+
+    # Sumas y conteos por (mes, clasificación, hora): base de todas las consultas por contexto
+    sums = np.zeros((12, len(CLASIFICACIONES), 24))
+    counts = np.zeros((12, len(CLASIFICACIONES), 24))
+    np.add.at(sums, (month_idx, clasif_idx), valores)
+    np.add.at(counts, (month_idx, clasif_idx), valid)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        context_avg = sums / counts
+        month_avg = sums.sum(axis=1) / counts.sum(axis=1)
+
+    flat = precios.ravel()
+    global_order = np.argsort(flat, kind='stable')
+    n_valid = int(valid.sum())
+    sorted_values = flat[global_order[:n_valid]]
+
+    return {
+        'orden_dia': np.argsort(precios, axis=1),
+        'orden_mes': np.argsort(month_avg, axis=1),
+        'orden_contexto': np.argsort(context_avg, axis=2),
+        'promedio_mes_hora': month_avg,
+        'promedio_contexto_hora': context_avg,
+        'sumas_contexto': sums,
+        'conteos_contexto': counts,
+        'orden_global': global_order[:n_valid],
+        'valores_ordenados': sorted_values,
+        'niveles_cuantiles': np.linspace(0, 1, n_cuantiles),
+        'cuantiles': np.quantile(sorted_values, np.linspace(0, 1, n_cuantiles)),
+        'precios': precios
+    }
+
+def cheapest_hours(index, n=5, meses=None, clasificaciones=None, mas_caras=False):
+    """
+    Devuelve las n horas más baratas (o caras) en promedio para un contexto
+
+    Ejemplo: cheapest_hours(idx, 6, meses=[3], clasificaciones=['Semana Laboral', 'Viernes'])
+    responde "6 horas más baratas en días laborales no feriados de marzo".
+
+    Returns:
+        list: Tuplas (hora, precio promedio)
+    """
+    single_month = meses is not None and len(meses) == 1
+
+    if single_month and clasificaciones is not None and len(clasificaciones) == 1:
+        # Orden precalculado de la celda (mes, clasificación)
+        m = meses[0] - 1
+        c = CLASIFICACIONES.index(clasificaciones[0])
+        averages = index['promedio_contexto_hora'][m, c]
+        order = index['orden_contexto'][m, c]
+    elif single_month and clasificaciones is None:
+        averages = index['promedio_mes_hora'][meses[0] - 1]
+        order = index['orden_mes'][meses[0] - 1]
+    else:
+        # Combinaciones: se agregan las sumas precalculadas (24 valores, sin recorrer datos)
+        averages = _combined_average(index, meses, clasificaciones)
+        order = np.argsort(averages)
+
+    # Horas sin datos en el contexto (NaN) quedan al final del orden y se descartan
+    order = order[:int(np.count_nonzero(~np.isnan(averages)))]
+
+    if mas_caras:
+        order = order[::-1]
+
+    return [(int(hour), float(averages[hour])) for hour in order[:n]]
+
+def _combined_average(index, meses, clasificaciones):
+    month_sel = slice(None) if meses is None else np.asarray(meses) - 1
+    clasif_sel = slice(None) if clasificaciones is None else [CLASIFICACIONES.index(c) for c in clasificaciones]
+
+    sums = index['sumas_contexto'][month_sel][:, clasif_sel].sum(axis=(0, 1))
+    counts = index['conteos_contexto'][month_sel][:, clasif_sel].sum(axis=(0, 1))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return sums / counts
+
+def cheapest_hours_of_day(index, day_position, n=5):
+    """
+    Las n horas más baratas de un día específico (posición de fila en la grilla)
+    """
+    order = index['orden_dia'][day_position][:n]
+    return [(int(hour), float(index['precios'][day_position, hour])) for hour in order]
+
+def quantile_threshold(index, q):
+    """
+    Precio del cuantil q (0-1) interpolado desde el resumen de cuantiles
+    """
+    return float(np.interp(q, index['niveles_cuantiles'], index['cuantiles']))
+
+def hours_below_quantile(index, q):
+    """
+    Todas las celdas con precio en o bajo el cuantil q, sin recorrer la matriz
+
+    Las celdas salen del prefijo del orden global, ordenadas de menor a mayor precio.
+
+    Returns:
+        tuple: (posiciones de día, horas, precios)
+    """
+    threshold = quantile_threshold(index, q)
+    k = np.searchsorted(index['valores_ordenados'], threshold, side='right')
+    day_pos, hours = np.unravel_index(index['orden_global'][:k], index['precios'].shape)
+    return day_pos, hours, index['valores_ordenados'][:k]
+
+def hours_above_quantile(index, q):
+    """
+    Todas las celdas con precio en o sobre el cuantil q (sufijo del orden global)
+
+    Returns:
+        tuple: (posiciones de día, horas, precios), de mayor a menor precio
+    """
+    threshold = quantile_threshold(index, q)
+    k = np.searchsorted(index['valores_ordenados'], threshold, side='left')
+    day_pos, hours = np.unravel_index(index['orden_global'][k:][::-1], index['precios'].shape)
+    return day_pos, hours, index['valores_ordenados'][k:][::-1]
@@ -0,0 +1,182 @@
+import numpy as np
+from perfiles import expected_price_grid
+
+# Ganancias por producto (Grupo Impar) en quetzales
+PRODUCT_PROFITS_GTQ = {
+    'Equipos de Sonido y Video': 600,
+    'Electrodomésticos': 450,
+    'Adornos': 75,
+    'Muebles': 900,
+    'Productos para el hogar': 75
+}
+
+# Probabilidades (Grupo Impar)
+PRODUCT_PROBABILITIES = {
+    'Equipos de Sonido y Video': 0.10,
+    'Electrodomésticos': 0.30,
+    'Adornos': 0.20,
+    'Muebles': 0.20,
+    'Productos para el hogar': 0.20
+}
+
+GTQ_TO_USD_RATE = 7.8
+
+def average_profit_per_product(product_profits=None, product_probabilities=None):
+    """
+    Ganancia esperada por producto en GTQ según la mezcla de productos
+    """
+    product_profits = product_profits or PRODUCT_PROFITS_GTQ
+    product_probabilities = product_probabilities or PRODUCT_PROBABILITIES
+
+    return sum(product_profits[name] * product_probabilities[name] for name in product_profits)
+
+def schedule_to_hour_mask(schedule_info):
+    """
+    Convierte un horario con formato de define_work_schedules en una máscara de 24 horas
+    """
+    mask = np.zeros(24, dtype=bool)
+    for start_hour, end_hour in schedule_info['horas_trabajo']:
+        mask[start_hour:end_hour] = True
+    return mask
+
+def calculate_hourly_revenue_grid(price_grid, schedule_mask=None, num_robots=25,
+                                  minutes_per_product=15,
+                                  productividad_horaria=None,
+                                  multiplicador_valor=None,
+                                  avg_profit_per_product_gtq=None,
+                                  gtq_to_usd_rate=GTQ_TO_USD_RATE):
+    """
+    Calcula productos e ingresos por cada celda día × hora de la matriz de precios
+
+    Args:
+        price_grid: Diccionario de datos.build_price_grid
+        schedule_mask: Horas trabajadas, forma (24,) o (días, 24). None = todas
+        num_robots: Número de robots activos
+        minutes_per_product: Minutos promedio por producto por robot
+        productividad_horaria: Factor sobre productos/robot/hora, forma (24,) o (días, 24)
+        multiplicador_valor: Factor sobre la ganancia por producto (ej. cortes de envío)
+        avg_profit_per_product_gtq: Ganancia por producto; por defecto la mezcla del Grupo Impar
+        gtq_to_usd_rate: Tasa GTQ por USD, escalar o matriz alineada a la grilla
+
+    Returns:
+        dict: Matrices (días, 24) de productos e ingresos en USD
+    """
+    shape = price_grid['precios'].shape
+
+    if avg_profit_per_product_gtq is None:
+        avg_profit_per_product_gtq = average_profit_per_product()
+
+    products_per_robot_per_hour = 60 / minutes_per_product
+
+    worked = np.ones(shape) if schedule_mask is None else np.broadcast_to(schedule_mask, shape)
+    productividad = 1.0 if productividad_horaria is None else np.asarray(productividad_horaria, dtype=float)
+    valor = 1.0 if multiplicador_valor is None else np.asarray(multiplicador_valor, dtype=float)
+
+    productos = worked * (num_robots * products_per_robot_per_hour) * productividad
+    ingresos_usd = productos * avg_profit_per_product_gtq * valor / gtq_to_usd_rate
+
+    return {
+        'productos': np.broadcast_to(productos, shape),
+        'ingresos_usd': np.broadcast_to(ingresos_usd, shape)
+    }
+
+def calculate_hourly_profit_grid(price_grid, schedule_mask=None, num_robots=25,
+                                 consumption_per_robot=0.2, intensidad_carbono=None,
+                                 precio_carbono=0.0, **revenue_kwargs):
+    """
+    Utilidad por hora (ingresos - costo energético) como una sola matriz vectorizada
+
+    Las horas sin precio se consideran sin costo, igual que el dropna() de los
+    cálculos mensuales.
+
+    Con intensidad_carbono (tCO2/MWh, (días, 24) de carbono.align_intensity_to_grid)
+    también devuelve 'emisiones_tco2'; precio_carbono (USD/tCO2) las descuenta
+    de la utilidad, de modo que los optimizadores basados en utilidad pasan a
+    ponderar dólares y emisiones.
+    """
+    revenue = calculate_hourly_revenue_grid(price_grid, schedule_mask, num_robots=num_robots,
+                                            **revenue_kwargs)
+
+    shape = price_grid['precios'].shape
+    worked = np.ones(shape) if schedule_mask is None else np.broadcast_to(schedule_mask, shape)
+    total_consumption_per_hour = num_robots * consumption_per_robot
+
+    precios = np.nan_to_num(price_grid['precios'], nan=0.0)
+    costos = precios * total_consumption_per_hour * worked
+
+    result = {
+        'productos': revenue['productos'],
+        'ingresos_usd': revenue['ingresos_usd'],
+        'costos_usd': costos,
+        'utilidad_usd': revenue['ingresos_usd'] - costos
+    }
+    if intensidad_carbono is not None:
+        # Mismas horas con consumo que el costo (las horas sin precio no operan)
+        operated = worked * ~np.isnan(price_grid['precios'])
+        emisiones = np.nan_to_num(intensidad_carbono) * total_consumption_per_hour * operated
+        result['emisiones_tco2'] = emisiones
+        result['utilidad_usd'] = result['utilidad_usd'] - precio_carbono * emisiones
+    return result
+
+def summarize_by_month(price_grid, values):
+    """
+    Suma una matriz (días, 24) por mes usando el vector de meses de la grilla
+    """
+    daily_totals = np.asarray(values).sum(axis=1)
+    return np.bincount(price_grid['mes'] - 1, weights=daily_totals, minlength=12)
+
+def optimize_hours_by_profit(price_grid, n_horas=None, perfil=None, intensidad_carbono=None,
+                             precio_carbono=0.0, **profit_kwargs):
+    """
+    Selecciona las horas de cada mes comparando utilidad hora por hora
+
+    Con intensidad_carbono y precio_carbono (USD/tCO2) la utilidad de cada hora
+    descuenta sus emisiones, así que se eligen horas más limpias cuando el
+    carbono tiene precio; el resultado agrega las emisiones mensuales.
+
+    Args:
+        price_grid: Diccionario de datos.build_price_grid
+        n_horas: Horas diarias a trabajar; None = todas las horas con utilidad positiva
+        perfil: Tabla de perfiles.build_profile_table / load_or_build_profiles; si se
+                indica, se optimiza con el precio esperado del contexto de cada día
+                (sirve también para grillas futuras de perfiles.calendar_grid)
+        intensidad_carbono: Intensidad tCO2/MWh (días, 24) de carbono.align_intensity_to_grid
+        precio_carbono: Precio del carbono en USD/tCO2
+        **profit_kwargs: Parámetros para calculate_hourly_profit_grid
+
+    Returns:
+        dict: Máscara (12, 24) de horas elegidas y utilidad promedio por hora
+    """
+    if perfil is not None:
+        price_grid = expected_price_grid(perfil, price_grid)
+
+    grid = calculate_hourly_profit_grid(price_grid, intensidad_carbono=intensidad_carbono,
+                                        precio_carbono=precio_carbono, **profit_kwargs)
+    profit = grid['utilidad_usd']
+
+    # Utilidad promedio por (mes, hora)
+    month_idx = price_grid['mes'] - 1
+    sums = np.zeros((12, 24))
+    np.add.at(sums, month_idx, profit)
+    counts = np.bincount(month_idx, minlength=12)[:, None]
+    avg_profit = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+
+    if n_horas is None:
+        mask = avg_profit > 0
+    else:
+        ranking = np.argsort(-avg_profit, axis=1)[:, :n_horas]
+        mask = np.zeros((12, 24), dtype=bool)
+        np.put_along_axis(mask, ranking, True, axis=1)
+
+    monthly_profit = (avg_profit * mask).sum(axis=1) * counts[:, 0]
+
+    result = {
+        'mascara_horas': mask,
+        'utilidad_promedio_hora': avg_profit,
+        'utilidad_mensual': monthly_profit
+    }
+    if intensidad_carbono is not None:
+        emisiones = np.zeros((12, 24))
+        np.add.at(emisiones, month_idx, grid['emisiones_tco2'])
+        result['emisiones_mensuales'] = (emisiones * mask).sum(axis=1)
+    return result
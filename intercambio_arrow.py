@@ -0,0 +1,197 @@
+import os
+import numpy as np
+import pandas as pd
+from datos import MONTHS
+from calendario import CLASIFICACIONES, DIAS_SEMANA, ESTACIONES, build_calendar_context
+from cache_resultados import hash_inputs
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow es opcional; solo lo requieren la exportación y la lectura
+    pa = None
+
+TABLA_CONTEXTO = 'contexto_horario'
+EXTENSION = '.arrow'
+
+# Columnas categóricas: se guardan como diccionario (índice entero + valores únicos)
+CATEGORIAS = {
+    'mes_nombre': MONTHS,
+    'dia_semana_nombre': DIAS_SEMANA,
+    'estacion': ESTACIONES,
+    'clasificacion': CLASIFICACIONES
+}
+
+# Agregados exportados junto a la tabla: nombre -> columnas de agrupación
+AGREGADOS = {
+    'por_mes_hora': ['mes', 'hora'],
+    'por_clasificacion_hora': ['clasificacion', 'hora'],
+    'por_dia_semana': ['dia_semana_num', 'dia_semana_nombre'],
+    'por_estacion': ['estacion'],
+    'por_mes': ['mes', 'mes_nombre']
+}
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("El intercambio Arrow requiere pyarrow (pip install pyarrow)")
+
+def build_context_table(price_grid, context=None):
+    """
+    Tabla hora-día con contexto, equivalente a map_energy_data_with_context de pregunta5
+
+    Se arma con arreglos sobre la grilla (sin recorrer días ni horas) y con tipos
+    compactos: enteros de 8 bits y categorías con orden fijo. Igual que en
+    pregunta5, las horas sin precio no generan fila.
+
+    Returns:
+        pd.DataFrame: Una fila por hora con precio, ordenada por fecha y hora
+    """
+    if context is None:
+        context = build_calendar_context(price_grid)
+
+    precios = price_grid['precios']
+    days, hours = np.nonzero(~np.isnan(precios))
+    dia_semana = context['dia_semana'][days]
+
+    def categorical(codes, name):
+        return pd.Categorical.from_codes(codes, categories=CATEGORIAS[name])
+
+    return pd.DataFrame({
+        'fecha': pd.to_datetime(price_grid['fechas'][days]),
+        'mes': price_grid['mes'][days].astype(np.int8),
+        'mes_nombre': categorical(price_grid['mes'][days] - 1, 'mes_nombre'),
+        'dia': price_grid['dia'][days].astype(np.int8),
+        'hora': hours.astype(np.int8),
+        'precio_mwh': precios[days, hours],
+        'dia_semana_num': dia_semana.astype(np.int8),
+        'dia_semana_nombre': categorical(dia_semana, 'dia_semana_nombre'),
+        'es_fin_de_semana': context['es_fin_de_semana'][days],
+        'es_semana_laboral': dia_semana < 4,
+        'es_viernes': dia_semana == 4,
+        'es_feriado': context['es_feriado'][days],
+        'estacion': categorical(context['estacion'][days], 'estacion'),
+        'ciclo_escolar_activo': context['ciclo_escolar_activo'][days],
+        'clasificacion': categorical(context['clasificacion'][days], 'clasificacion')
+    })
+
+def context_aggregates(table):
+    """
+    Agregados de precio que usan los tableros (promedio, desviación y registros)
+
+    Returns:
+        dict: nombre -> DataFrame en formato largo
+    """
+    def summarize(keys):
+        grouped = table.groupby(keys, observed=True)['precio_mwh']
+        return grouped.agg(precio_promedio='mean', desviacion_std='std', registros='count').reset_index()
+
+    return {name: summarize(keys) for name, keys in AGREGADOS.items()}
+
+def _to_arrow(df, metadata):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if 'fecha' in table.column_names:
+        position = table.column_names.index('fecha')
+        table = table.set_column(position, 'fecha', table.column('fecha').cast(pa.date32()))
+    return table.replace_schema_metadata({**(table.schema.metadata or {}), **metadata})
+
+def _stored_hash(path):
+    if not os.path.exists(path):
+        return None
+    with pa.memory_map(path, 'r') as source:
+        metadata = pa.ipc.open_file(source).schema.metadata or {}
+    return metadata.get(b'datos_hash', b'').decode() or None
+
+def export_context_arrow(price_grid, directory, context=None, incluir_agregados=True, verbose=True):
+    """
+    Escribe la tabla hora-día y sus agregados como archivos Arrow IPC (Feather v2)
+
+    Los archivos van sin compresión para que los lectores puedan mapearlos en
+    memoria y trabajar sobre ellos sin copiar. Cada archivo guarda en sus
+    metadatos el hash de lo que lo produjo (precios, fechas, contexto de
+    calendario y si incluye agregados): si todos los archivos esperados existen
+    con ese hash no se vuelven a escribir.
+
+    Returns:
+        dict: nombre de tabla -> ruta del archivo
+    """
+    _require_pyarrow()
+    os.makedirs(directory, exist_ok=True)
+
+    if context is None:
+        context = build_calendar_context(price_grid)
+
+    # Feriados y ciclo escolar cambian la tabla aunque los precios sean los mismos
+    data_hash = hash_inputs(price_grid['precios'], price_grid['fechas'], context, incluir_agregados)[:16]
+    metadata = {'datos_hash': data_hash, 'año': str(price_grid['año'])}
+    names = [TABLA_CONTEXTO] + (list(AGREGADOS) if incluir_agregados else [])
+    expected = {name: os.path.join(directory, f"{name}{EXTENSION}") for name in names}
+
+    if all(_stored_hash(path) == data_hash for path in expected.values()):
+        if verbose:
+            print(f"Tablas de contexto vigentes en {directory} (datos sin cambios)")
+        return expected
+
+    table = build_context_table(price_grid, context)
+    frames = {TABLA_CONTEXTO: table}
+    if incluir_agregados:
+        frames.update(context_aggregates(table))
+
+    for name, df in frames.items():
+        tmp_path = f"{expected[name]}.tmp"
+        feather.write_feather(_to_arrow(df, metadata), tmp_path, compression='uncompressed')
+        os.replace(tmp_path, expected[name])
+
+    if verbose:
+        print(f"Exportadas {len(expected)} tablas Arrow en {directory} ({len(table):,} registros hora-día)")
+    return expected
+
+def list_context_tables(directory):
+    """
+    Tablas Arrow disponibles en el directorio de exportación
+    """
+    return {name[:-len(EXTENSION)]: os.path.join(directory, name)
+            for name in sorted(os.listdir(directory)) if name.endswith(EXTENSION)}
+
+def open_context_arrow(directory, name=TABLA_CONTEXTO):
+    """
+    Abre una tabla exportada mapeada en memoria (sin copiar ni re-interpretar)
+
+    Las columnas de la tabla devuelta apuntan directamente al archivo; filtrar
+    o seleccionar columnas con pyarrow.compute no carga el resto del archivo.
+
+    Returns:
+        pyarrow.Table
+    """
+    _require_pyarrow()
+    source = pa.memory_map(os.path.join(directory, f"{name}{EXTENSION}"), 'r')
+    return pa.ipc.open_file(source).read_all()
+
+def load_context_dataframe(directory, name=TABLA_CONTEXTO, columns=None):
+    """
+    Tabla exportada como DataFrame con las categorías restauradas
+
+    A diferencia de open_context_arrow, convertir a pandas sí copia los datos.
+    """
+    table = open_context_arrow(directory, name)
+    if columns is not None:
+        table = table.select(columns)
+    df = table.to_pandas()
+    if 'fecha' in df.columns:
+        df['fecha'] = pd.to_datetime(df['fecha'])
+    for column, categories in CATEGORIAS.items():
+        if column in df.columns:
+            df[column] = pd.Categorical(df[column], categories=categories)
+    return df
+
+if __name__ == "__main__":
+    import argparse
+    from validacion import load_price_data
+
+    parser = argparse.ArgumentParser(description="Exporta la tabla hora-día con contexto como Arrow IPC")
+    parser.add_argument('archivo', nargs='?', default=r"Modela1Fixeddata.xlsx")
+    parser.add_argument('--salida', default='contexto_arrow')
+    args = parser.parse_args()
+
+    _, price_grid = load_price_data(args.archivo, verbose=False)
+    for name, path in export_context_arrow(price_grid, args.salida).items():
+        print(f"  {name:<25} {path}")
@@ -0,0 +1,174 @@
+import numpy as np
+import pandas as pd
+from datos import MONTHS
+
+HALF_BITS = 12
+HALF_SIZE = 1 << HALF_BITS
+
+def _subset_sums(values):
+    """
+    Suma de values sobre los bits de cada máscara de 12 bits (4096 valores)
+
+    Se construye duplicando la tabla por cada bit: tabla_nueva = [tabla, tabla + v[bit]].
+    """
+    table = np.zeros(1, dtype=float)
+    for value in values:
+        table = np.concatenate([table, table + value])
+    return table
+
+def _popcount_table():
+    return _subset_sums(np.ones(HALF_BITS)).astype(np.int8)
+
+def mask_to_periods(mask):
+    """
+    Convierte una máscara de 24 bits (bit h = hora h) en períodos [(inicio, fin), ...]
+    """
+    periods = []
+    start = None
+    for hour in range(25):
+        active = hour < 24 and (mask >> hour) & 1
+        if active and start is None:
+            start = hour
+        elif not active and start is not None:
+            periods.append((start, hour))
+            start = None
+    return periods
+
+def _frontier_by_hours(cost, products, hours):
+    """
+    Para cada cantidad de horas, conserva los puntos no dominados (menor costo, más productos)
+    """
+    order = np.lexsort((-products, cost, hours))
+    big = products.max() + 1.0
+    key = products[order] + hours[order] * big
+
+    # Máximo acumulado del grupo: las horas ascendentes separan los grupos por el desplazamiento
+    running = np.maximum.accumulate(key)
+    previous = np.concatenate([[-np.inf], running[:-1]])
+    group_start = np.concatenate([[True], hours[order][1:] != hours[order][:-1]])
+    keep = group_start | (key > previous)
+    return order[keep]
+
+def pareto_schedule_frontier(price_grid, month=1, num_robots=25, consumption_per_robot=0.2,
+                             minutes_per_product=15, productividad_horaria=None,
+                             min_horas=1, max_horas=24, max_bloques=3, chunk_bits=20,
+                             intensidad_carbono=None, precio_carbono=0.0):
+    """
+    Frontera de Pareto de horarios diarios (costo energético, productos, horas trabajadas)
+
+    Enumera las 2^24 máscaras horarias por bloques con sumas precalculadas de
+    12 bits (costo = tabla_alta + tabla_baja). En cada bloque poda por cantidad de
+    horas antes del filtro final de dominancia en las tres dimensiones.
+
+    Con intensidad_carbono la dimensión de costo pasa a ser el costo ponderado
+    costo + precio_carbono × emisiones, como en carbono.select_hours_weighted;
+    la frontera reporta además el costo real y las emisiones de cada horario.
+
+    Args:
+        price_grid: Diccionario de datos.build_price_grid
+        month: Mes a evaluar (1-12)
+        productividad_horaria: Factores de productividad por hora (24,), opcional
+        min_horas / max_horas: Rango de horas diarias admitidas
+        max_bloques: Máximo de bloques continuos de trabajo por día (None = sin límite)
+        chunk_bits: Tamaño del bloque de enumeración (2^chunk_bits máscaras)
+        intensidad_carbono: Intensidad tCO2/MWh (días, 24) de carbono.align_intensity_to_grid
+        precio_carbono: Precio del carbono en USD/tCO2
+
+    Returns:
+        pd.DataFrame: Horarios no dominados ordenados por costo (ponderado, si hay intensidad)
+    """
+    rows = price_grid['mes'] == month
+    days = int(rows.sum())
+    total_consumption_per_hour = num_robots * consumption_per_robot
+
+    # Costo y productos mensuales por hora del día
+    hourly_cost = np.nansum(price_grid['precios'][rows], axis=0) * total_consumption_per_hour
+    hourly_objective = hourly_cost
+    if intensidad_carbono is not None:
+        # Emisiones de las horas con precio, las mismas que pagan energía
+        has_price = ~np.isnan(price_grid['precios'][rows])
+        hourly_emissions = (np.where(has_price, np.nan_to_num(intensidad_carbono[rows]), 0.0).sum(axis=0)
+                            * total_consumption_per_hour)
+        hourly_objective = hourly_cost + precio_carbono * hourly_emissions
+    productividad = np.ones(24) if productividad_horaria is None else np.asarray(productividad_horaria, dtype=float)
+    hourly_products = num_robots * (60 / minutes_per_product) * days * productividad
+
+    cost_lo, cost_hi = _subset_sums(hourly_objective[:HALF_BITS]), _subset_sums(hourly_objective[HALF_BITS:])
+    prod_lo, prod_hi = _subset_sums(hourly_products[:HALF_BITS]), _subset_sums(hourly_products[HALF_BITS:])
+    popcount = _popcount_table()
+
+    hi_per_chunk = 1 << (chunk_bits - HALF_BITS)
+    low_masks = np.arange(HALF_SIZE, dtype=np.int64)
+
+    candidates = []
+    for hi_start in range(0, HALF_SIZE, hi_per_chunk):
+        hi = np.arange(hi_start, hi_start + hi_per_chunk, dtype=np.int64)
+        masks = ((hi[:, None] << HALF_BITS) | low_masks[None, :]).ravel()
+        hours = (popcount[hi][:, None] + popcount[None, :]).ravel().astype(np.int16)
+
+        keep = (hours >= min_horas) & (hours <= max_horas)
+        if max_bloques is not None:
+            starts = masks & ~(masks << 1) & 0xFFFFFF
+            blocks = popcount[starts & 0xFFF] + popcount[starts >> HALF_BITS]
+            keep &= blocks <= max_bloques
+        if not keep.any():
+            continue
+
+        masks, hours = masks[keep], hours[keep]
+        cost = (cost_hi[hi][:, None] + cost_lo[None, :]).ravel()[keep]
+        products = (prod_hi[hi][:, None] + prod_lo[None, :]).ravel()[keep]
+
+        selected = _frontier_by_hours(cost, products, hours)
+        candidates.append((masks[selected], cost[selected], products[selected], hours[selected]))
+
+    masks = np.concatenate([c[0] for c in candidates])
+    cost = np.concatenate([c[1] for c in candidates])
+    products = np.concatenate([c[2] for c in candidates])
+    hours = np.concatenate([c[3] for c in candidates])
+
+    selected = _frontier_by_hours(cost, products, hours)
+    masks, cost, products, hours = masks[selected], cost[selected], products[selected], hours[selected]
+
+    # Dominancia 3D final: menor costo, más productos, menos horas
+    c_le = cost[:, None] <= cost[None, :]
+    p_ge = products[:, None] >= products[None, :]
+    h_le = hours[:, None] <= hours[None, :]
+    strict = (cost[:, None] < cost[None, :]) | (products[:, None] > products[None, :]) | (hours[:, None] < hours[None, :])
+    dominated = (c_le & p_ge & h_le & strict).any(axis=0)
+
+    frontier = pd.DataFrame({
+        'mascara': masks[~dominated],
+        'horas_dia': hours[~dominated].astype(int),
+        'costo_energia': cost[~dominated],
+        'productos_mes': products[~dominated],
+        'horas_robot_mes': hours[~dominated].astype(int) * num_robots * days
+    })
+    sort_key = 'costo_energia'
+    if intensidad_carbono is not None:
+        # La enumeración usó el costo ponderado; el costo real y las emisiones salen de los bits
+        bits = (masks[~dominated][:, None] >> np.arange(24)) & 1
+        frontier['costo_ponderado'] = frontier['costo_energia']
+        frontier['costo_energia'] = bits @ hourly_cost
+        frontier['emisiones_tco2'] = bits @ hourly_emissions
+        sort_key = 'costo_ponderado'
+    frontier['periodos'] = frontier['mascara'].apply(mask_to_periods)
+    frontier['mes'] = MONTHS[month - 1]
+
+    return frontier.sort_values(sort_key).reset_index(drop=True)
+
+def generate_schedule_catalog(frontier):
+    """
+    Convierte la frontera en un catálogo con el formato de define_work_schedules
+    """
+    schedules = {}
+    for _, row in frontier.iterrows():
+        key = f"Pareto_{row['horas_dia']:02d}h_{row['mascara']:06x}"
+        periods = row['periodos']
+        descripcion = ', '.join(f"{start:02d}:00-{end:02d}:00" for start, end in periods)
+        schedules[key] = {
+            'nombre': f"Pareto {row['horas_dia']}h",
+            'horas_trabajo': periods,
+            'total_horas': int(row['horas_dia']),
+            'descripcion': f"Trabajo: {descripcion}"
+        }
+    return schedules
@@ -0,0 +1,194 @@
+import os
+import numpy as np
+import pandas as pd
+from calendario import CLASIFICACIONES, build_calendar_context
+from cache_resultados import hash_inputs
+
+# Ejes de la tabla: (hora, día de semana 0=lunes, mes, feriado, ciclo escolar)
+FORMA_PERFIL = (24, 7, 12, 2, 2)
+
+# Niveles de respaldo cuando una celda no tiene observaciones
+NIVELES = ['contexto_completo', 'hora_dia_mes', 'hora_mes', 'hora']
+
+def _context_indices(price_grid, context):
+    """
+    Índices (días, 24) de cada celda de la grilla sobre los ejes de FORMA_PERFIL
+    """
+    days = len(price_grid['fechas'])
+    hora = np.broadcast_to(np.arange(24), (days, 24))
+    dia_semana = np.broadcast_to(context['dia_semana'][:, None], (days, 24))
+    mes = np.broadcast_to(price_grid['mes'][:, None] - 1, (days, 24))
+    feriado = np.broadcast_to(context['es_feriado'][:, None].astype(int), (days, 24))
+    escolar = np.broadcast_to(context['ciclo_escolar_activo'][:, None].astype(int), (days, 24))
+    return hora, dia_semana, mes, feriado, escolar
+
+def build_profile_table(price_grid, context=None):
+    """
+    Precio esperado por (hora, día de semana, mes, feriado, ciclo escolar)
+
+    Sumas y conteos salen de un solo np.bincount sobre el índice plano de cada
+    celda. Las combinaciones sin datos (ej. feriado en un día de semana que no
+    cayó feriado ese mes) toman el promedio del nivel más fino disponible:
+    (hora, día, mes) → (hora, mes) → (hora).
+
+    Returns:
+        dict: 'precio_esperado' (float32, FORMA_PERFIL), 'conteos', 'nivel' y 'hash_datos'
+    """
+    if context is None:
+        context = build_calendar_context(price_grid)
+
+    precios = price_grid['precios']
+    valid = ~np.isnan(precios)
+    flat = np.ravel_multi_index(_context_indices(price_grid, context), FORMA_PERFIL)
+
+    size = int(np.prod(FORMA_PERFIL))
+    sums = np.bincount(flat[valid], weights=precios[valid], minlength=size).reshape(FORMA_PERFIL)
+    counts = np.bincount(flat[valid], minlength=size).reshape(FORMA_PERFIL)
+
+    expected = np.full(FORMA_PERFIL, np.nan)
+    level = np.full(FORMA_PERFIL, -1, dtype=np.int8)
+
+    # Del nivel más fino al más grueso: cada nivel solo llena las celdas vacías
+    for nivel, axes in enumerate([(), (3, 4), (1, 3, 4), (1, 2, 3, 4)]):
+        level_sums = sums.sum(axis=axes, keepdims=True)
+        level_counts = counts.sum(axis=axes, keepdims=True)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            level_avg = np.broadcast_to(level_sums / level_counts, FORMA_PERFIL)
+        fill = np.isnan(expected) & ~np.isnan(level_avg)
+        expected[fill] = level_avg[fill]
+        level[fill] = nivel
+
+    return {
+        'precio_esperado': expected.astype(np.float32),
+        'conteos': counts.astype(np.uint16),
+        'nivel': level,
+        'hash_datos': hash_inputs(precios)
+    }
+
+def profile_path(data_path):
+    """
+    Archivo .npz del perfil junto al libro de datos
+    """
+    return f"{os.path.splitext(data_path)[0]}.perfiles.npz"
+
+def save_profile_table(table, data_path):
+    path = profile_path(data_path)
+    np.savez_compressed(path, **table)
+    return path
+
+def load_or_build_profiles(price_grid, data_path, context=None):
+    """
+    Carga el perfil guardado si corresponde a los mismos precios; si no, lo reconstruye y guarda
+    """
+    path = profile_path(data_path)
+    if os.path.exists(path):
+        with np.load(path) as stored:
+            if str(stored['hash_datos']) == hash_inputs(price_grid['precios']):
+                return {key: stored[key] for key in stored.files}
+
+    table = build_profile_table(price_grid, context)
+    save_profile_table(table, data_path)
+    return table
+
+def expected_price(table, hora, dia_semana, mes, feriado=False, escolar=False):
+    """
+    Consulta O(1) del precio esperado; acepta escalares o arreglos (mes 1-12)
+    """
+    return table['precio_esperado'][np.asarray(hora), np.asarray(dia_semana), np.asarray(mes) - 1,
+                                    np.asarray(feriado, dtype=int), np.asarray(escolar, dtype=int)]
+
+def expected_price_grid(table, price_grid, context=None):
+    """
+    Copia de la grilla con 'precios' reemplazados por el precio esperado de su contexto
+
+    El resultado sirve directamente a ingresos.optimize_hours_by_profit,
+    pareto.pareto_schedule_frontier u otras funciones sobre la grilla, que así
+    trabajan con precios esperados por contexto en vez de los observados.
+    También funciona con grillas de fechas futuras sin precios.
+    """
+    if context is None:
+        context = build_calendar_context(price_grid)
+    indices = _context_indices(price_grid, context)
+    return dict(price_grid, precios=table['precio_esperado'][indices].astype(float))
+
+def calendar_grid(fechas):
+    """
+    Grilla sin precios para un vector de fechas (ej. planificar un mes futuro)
+    """
+    fechas = np.asarray(fechas, dtype='datetime64[D]')
+    index = pd.DatetimeIndex(fechas)
+    return {
+        'precios': np.full((len(fechas), 24), np.nan),
+        'fechas': fechas,
+        'mes': index.month.to_numpy(),
+        'dia': index.day.to_numpy(),
+        'año': index.year.to_numpy()
+    }
+
+def best_worst_hours(table, dia_semana, mes, feriado=False, escolar=False):
+    """
+    Hora más barata y más cara esperadas para un contexto de día
+
+    Returns:
+        dict: mejor_hora, mejor_precio, peor_hora, peor_precio
+    """
+    profile = expected_price(table, np.arange(24), dia_semana, mes, feriado, escolar)
+    best, worst = int(np.nanargmin(profile)), int(np.nanargmax(profile))
+    return {
+        'mejor_hora': best,
+        'mejor_precio': float(profile[best]),
+        'peor_hora': worst,
+        'peor_precio': float(profile[worst])
+    }
+
+def hourly_profile_by_classification(table):
+    """
+    Precio promedio (4, 24) por clasificación de día y hora, solo desde la tabla
+
+    La clasificación depende del día de semana y del feriado (ver calendario),
+    así que cada celda observada del perfil se asigna a su tipo y se promedia
+    ponderando por su conteo. Sin recorrer la tabla horaria.
+    """
+    counts = table['conteos'].astype(float)
+    sums = np.nan_to_num(table['precio_esperado'].astype(float)) * counts
+
+    # Eje (día de semana, feriado) -> código de clasificación
+    dia_semana = np.arange(7)[:, None]
+    feriado = np.arange(2)[None, :]
+    codes = np.select(
+        [feriado == 1, dia_semana >= 5, dia_semana == 4],
+        [CLASIFICACIONES.index('Feriado'), CLASIFICACIONES.index('Fin de Semana'),
+         CLASIFICACIONES.index('Viernes')],
+        default=CLASIFICACIONES.index('Semana Laboral')
+    )
+    codes = np.broadcast_to(codes, (7, 2))
+
+    # Sumas por (hora, día, feriado) y luego por clasificación
+    by_day = sums.sum(axis=(2, 4)), counts.sum(axis=(2, 4))
+    class_sums = np.zeros((len(CLASIFICACIONES), 24))
+    class_counts = np.zeros((len(CLASIFICACIONES), 24))
+    for target, values in zip((class_sums, class_counts), by_day):
+        np.add.at(target, codes.ravel(), values.reshape(24, -1).T)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return class_sums / class_counts
+
+def best_worst_hours_by_classification(table):
+    """
+    Mejor y peor hora esperadas por tipo de día (Semana Laboral, Viernes, ...)
+
+    Returns:
+        dict: clasificación -> mejor_hora, mejor_precio, peor_hora, peor_precio
+    """
+    profile = hourly_profile_by_classification(table)
+    result = {}
+    for code, name in enumerate(CLASIFICACIONES):
+        if np.isnan(profile[code]).all():
+            continue
+        best, worst = int(np.nanargmin(profile[code])), int(np.nanargmax(profile[code]))
+        result[name] = {
+            'mejor_hora': best,
+            'mejor_precio': float(profile[code, best]),
+            'peor_hora': worst,
+            'peor_precio': float(profile[code, worst])
+        }
+    return result
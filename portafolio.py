@@ -0,0 +1,217 @@
+import os
+import numpy as np
+import pandas as pd
+from datos import MONTHS
+from experimentos import load_scenario_file
+
+# Valores por defecto de cada sitio (la planta actual)
+SITIO_BASE = {
+    'num_robots': 25,
+    'consumo_por_robot': 0.2,
+    'minutos_por_producto': 15,
+    'hora_inicio': 0,
+    'hora_fin': 24,
+    'produccion_minima': 0.0,
+    'factor_precio': 1.0
+}
+
+def load_portfolio(file_path, fill_gaps=True):
+    """
+    Lee la definición del portafolio (TOML o YAML) y carga la grilla de precios de cada sitio
+
+    Formato:
+        meta_diaria = 2400          # productos por día entre todos los sitios
+
+        [[sitios]]
+        nombre = "Central"
+        archivo = "Modela1Fixeddata.xlsx"
+        num_robots = 25
+        produccion_minima = 600     # productos/día que el sitio debe cubrir
+        factor_precio = 1.0         # ajuste del nodo (pérdidas, peajes)
+
+    Sitios que comparten archivo de precios lo leen una sola vez.
+
+    Returns:
+        tuple: (lista de sitios con su 'price_grid', meta diaria)
+    """
+    from validacion import load_price_data
+
+    definition = load_scenario_file(file_path)
+    base_dir = os.path.dirname(os.path.abspath(file_path))
+    grids = {}
+    sites = []
+    for entry in definition.get('sitios', []):
+        site = {**SITIO_BASE, **entry}
+        path = os.path.join(base_dir, site['archivo'])
+        if path not in grids:
+            _, grids[path] = load_price_data(path, fill_gaps=fill_gaps, verbose=False)
+        site['price_grid'] = grids[path]
+        sites.append(site)
+
+    if not sites:
+        raise ValueError(f"El archivo {file_path} no define sitios ([[sitios]])")
+    return sites, definition.get('meta_diaria')
+
+def stack_sites(sites):
+    """
+    Apila los sitios en tensores (S, días, 24) de costo y capacidad por producto
+
+    Costo por producto de una celda = precio × factor × consumo × minutos / 60.
+    Capacidad = num_robots × 60 / minutos en las horas permitidas y con precio.
+    Todos los sitios deben cubrir las mismas fechas: los días se comparan fila a
+    fila y los meses se toman del primer sitio.
+    """
+    fechas = sites[0]['price_grid']['fechas']
+    for site in sites[1:]:
+        otras = site['price_grid']['fechas']
+        if len(otras) != len(fechas) or not np.array_equal(otras, fechas):
+            raise ValueError(f"Todos los sitios deben cubrir las mismas fechas ({site.get('nombre', 'sitio')}: "
+                             f"{len(otras)} días desde {otras[0]}; primer sitio: {len(fechas)} días desde {fechas[0]})")
+
+    def column(key):
+        return np.array([site[key] for site in sites], dtype=float)[:, None, None]
+
+    precios = np.stack([site['price_grid']['precios'] for site in sites]) * column('factor_precio')
+    hours = np.arange(24)
+    allowed = np.stack([(hours >= site['hora_inicio']) & (hours < site['hora_fin']) for site in sites])
+    allowed = allowed[:, None, :] & ~np.isnan(precios)
+
+    productos_por_robot_hora = 60 / column('minutos_por_producto')
+    return {
+        'precios': precios,
+        'costo_por_producto': np.nan_to_num(precios) * column('consumo_por_robot') / productos_por_robot_hora,
+        'capacidad': np.where(allowed, column('num_robots') * productos_por_robot_hora, 0.0),
+        'productos_por_robot_hora': productos_por_robot_hora,
+        'nombres': [site.get('nombre', f"Sitio {i + 1}") for i, site in enumerate(sites)],
+        'minimos': np.array([site['produccion_minima'] for site in sites], dtype=float)
+    }
+
+def _fill_cheapest(costo, capacidad, objetivo):
+    """
+    Asigna objetivo (por fila) a las celdas más baratas del último eje hasta su capacidad
+
+    Es la solución exacta de la mochila fraccionaria por fila: costo lineal y
+    capacidades por celda. Sin bucles: argsort, suma acumulada y recorte.
+    """
+    order = np.argsort(np.where(capacidad > 0, costo, np.inf), axis=-1, kind='stable')
+    cap_sorted = np.take_along_axis(capacidad, order, axis=-1)
+    before = np.cumsum(cap_sorted, axis=-1) - cap_sorted
+    take = np.clip(np.asarray(objetivo)[..., None] - before, 0, cap_sorted)
+    asignado = np.zeros_like(capacidad)
+    np.put_along_axis(asignado, order, take, axis=-1)
+    return asignado
+
+def optimize_portfolio(sites, meta_diaria):
+    """
+    Reparte la producción diaria entre sitios y horas al menor costo energético total
+
+    Primero cada sitio cubre su produccion_minima en sus horas más baratas; el
+    resto de la meta se asigna a las celdas (sitio, hora) más baratas de todo el
+    portafolio. Como el costo de cada sitio es convexo en su producción, esta
+    asignación es óptima. Todos los sitios y días se resuelven a la vez sobre el
+    tensor (S, días, 24), por lo que decenas de sitios cuestan lo mismo que uno.
+
+    Args:
+        sites: Lista de sitios (load_portfolio o diccionarios con 'price_grid' y SITIO_BASE)
+        meta_diaria: Productos por día del portafolio, escalar o arreglo por día
+
+    Returns:
+        dict: Producción y robots (S, días, 24), costos, déficit (meta y mínimos
+        sobre la capacidad de cada sitio) y resúmenes por sitio y mes
+    """
+    sites = [{**SITIO_BASE, **site} for site in sites]
+    stacked = stack_sites(sites)
+    costo, capacidad = stacked['costo_por_producto'], stacked['capacidad']
+    n_sites, n_days, _ = costo.shape
+    meta = np.broadcast_to(np.asarray(meta_diaria, dtype=float), (n_days,))
+
+    # 1) Mínimos por sitio (cada sitio en sus horas más baratas), validados contra su capacidad diaria
+    capacidad_diaria = capacidad.sum(axis=2)
+    minimos = np.broadcast_to(stacked['minimos'][:, None], (n_sites, n_days))
+    deficit_minimos = np.maximum(minimos - capacidad_diaria, 0.0)
+    minimos = minimos - deficit_minimos
+    produccion = _fill_cheapest(costo, capacidad, minimos)
+
+    # 2) Resto de la meta en las celdas más baratas del portafolio (días, S × 24)
+    restante = np.maximum(meta - produccion.sum(axis=(0, 2)), 0.0)
+    flat = lambda x: x.transpose(1, 0, 2).reshape(n_days, n_sites * 24)
+    extra = _fill_cheapest(flat(costo), flat(capacidad - produccion), restante)
+    produccion = produccion + extra.reshape(n_days, n_sites, 24).transpose(1, 0, 2)
+
+    # Referencia: cada sitio cubre su mínimo y el resto de la meta se reparte en proporción
+    # a la capacidad libre, así el total producido es el mismo que el del portafolio
+    libre = capacidad_diaria - minimos
+    share = libre / np.maximum(libre.sum(axis=0), 1e-12)
+    independiente = _fill_cheapest(costo, capacidad, minimos + share * restante)
+
+    costo_diario = (produccion * costo).sum(axis=2)
+    costo_independiente = (independiente * costo).sum(axis=2)
+    robots = produccion / stacked['productos_por_robot_hora']
+
+    total = produccion.sum(axis=(1, 2))
+    resumen_sitios = pd.DataFrame({
+        'Sitio': stacked['nombres'],
+        'Productos': total,
+        'Participacion_Pct': total / max(total.sum(), 1e-12) * 100,
+        'Costo_Energia': costo_diario.sum(axis=1),
+        'Costo_por_Producto': costo_diario.sum(axis=1) / np.maximum(total, 1e-12),
+        'Horas_Robot': robots.sum(axis=(1, 2)),
+        'Deficit_Minimo': deficit_minimos.sum(axis=1),
+        'Costo_Independiente': costo_independiente.sum(axis=1)
+    })
+
+    month_idx = sites[0]['price_grid']['mes'] - 1
+    resumen_mensual = pd.DataFrame({
+        'Mes': MONTHS,
+        'Costo_Portafolio': np.bincount(month_idx, weights=costo_diario.sum(axis=0), minlength=12),
+        'Costo_Independiente': np.bincount(month_idx, weights=costo_independiente.sum(axis=0), minlength=12),
+        'Productos': np.bincount(month_idx, weights=produccion.sum(axis=(0, 2)), minlength=12)
+    })
+    resumen_mensual['Ahorro'] = resumen_mensual['Costo_Independiente'] - resumen_mensual['Costo_Portafolio']
+
+    return {
+        'produccion': produccion,
+        'robots_activos': robots,
+        'robots_encendidos': np.ceil(robots - 1e-9).astype(int),
+        'costo_diario': costo_diario,
+        # Productos sin cubrir: faltante de la meta o de los mínimos que exceden la capacidad del sitio
+        'deficit_diario': np.maximum(meta - produccion.sum(axis=(0, 2)), deficit_minimos.sum(axis=0)),
+        'deficit_minimos': deficit_minimos,
+        'resumen_sitios': resumen_sitios,
+        'resumen_mensual': resumen_mensual,
+        'ahorro_anual': resumen_mensual['Ahorro'].sum()
+    }
+
+def print_portfolio_report(result):
+    """
+    Muestra el reparto por sitio y el ahorro frente a operar cada sitio por separado
+    """
+    print("\nPORTAFOLIO MULTI-SITIO")
+    print("=" * 110)
+    print(f"{'Sitio':<20} {'Productos':>14} {'Part. (%)':>10} {'Costo ($)':>16} {'$/producto':>12} "
+          f"{'Horas-robot':>13} {'Independiente ($)':>18}")
+    print("-" * 110)
+    for _, row in result['resumen_sitios'].iterrows():
+        print(f"{row['Sitio']:<20} {row['Productos']:>14,.0f} {row['Participacion_Pct']:>10.1f} "
+              f"{row['Costo_Energia']:>16,.2f} {row['Costo_por_Producto']:>12.2f} {row['Horas_Robot']:>13,.0f} "
+              f"{row['Costo_Independiente']:>18,.2f}")
+
+    dias_deficit = int((result['deficit_diario'] > 1e-9).sum())
+    print(f"\nAhorro anual vs sitios independientes: ${result['ahorro_anual']:,.2f} USD")
+    if dias_deficit:
+        print(f"⚠️  {dias_deficit} días sin capacidad suficiente (déficit total "
+              f"{result['deficit_diario'].sum():,.0f} productos)")
+    for _, row in result['resumen_sitios'][result['resumen_sitios']['Deficit_Minimo'] > 1e-9].iterrows():
+        print(f"⚠️  {row['Sitio']}: la producción mínima excede su capacidad "
+              f"({row['Deficit_Minimo']:,.0f} productos sin cubrir en el año)")
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Optimiza la producción de varios sitios con distintos precios")
+    parser.add_argument('definicion', help="Archivo TOML o YAML con [[sitios]] y meta_diaria")
+    parser.add_argument('--meta', type=float, default=None, help="Productos por día (sobrescribe meta_diaria)")
+    args = parser.parse_args()
+
+    sites, meta = load_portfolio(args.definicion)
+    print_portfolio_report(optimize_portfolio(sites, args.meta if args.meta is not None else meta))
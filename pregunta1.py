@@ -1,6 +1,9 @@
 import pandas as pd
 from typing import List
 import numpy as np
+from validacion import load_price_data, warn_incomplete_months
+from carbono import sheet_cost_and_emissions, load_carbon_intensity, align_intensity_to_grid
+from tarifas import define_tariffs, scenario_consumption_profile, evaluate_tariffs, tariff_summary_table
 
 def read_excel_sheets_to_dataframes(file_path):
     """
@@ -27,12 +30,15 @@ def read_excel_sheets_to_dataframes(file_path):
     
     return dataframes
 
-def calculate_energy_cost(df_list: List[pd.DataFrame]):
+def calculate_energy_cost(df_list: List[pd.DataFrame], verbose=True, intensidad=None):
     """
     Calcula el costo total del consumo energético para el año 2023
     
     Args:
         df_list: Lista de DataFrames con precios de energía por mes
+        verbose: Si False no imprime nada (ver resultados.py para mostrar el resultado)
+        intensidad: Intensidad de carbono tCO2/MWh (días, 24) de
+            carbono.align_intensity_to_grid; si se indica, agrega las emisiones
     
     Returns:
         dict: Diccionario con costos detallados
@@ -46,48 +52,46 @@ def calculate_energy_cost(df_list: List[pd.DataFrame]):
     working_hours_start = 8  # 8:00 AM
     working_hours_end = 20   # 8:00 PM (fila 19 = 19:00-19:59)
     
-    print(f"Parámetros del sistema:")
-    print(f"- Número de robots: {num_robots}")
-    print(f"- Consumo por robot: {consumption_per_robot} MWh/hora")
-    print(f"- Consumo total por hora: {total_consumption_per_hour} MWh/hora")
-    print(f"- Horario de operación: {working_hours_start}:00 - {working_hours_end}:00")
-    print(f"- Horas de trabajo por día: {working_hours_end - working_hours_start}")
-    print()
+    if verbose:
+        print(f"Parámetros del sistema:")
+        print(f"- Número de robots: {num_robots}")
+        print(f"- Consumo por robot: {consumption_per_robot} MWh/hora")
+        print(f"- Consumo total por hora: {total_consumption_per_hour} MWh/hora")
+        print(f"- Horario de operación: {working_hours_start}:00 - {working_hours_end}:00")
+        print(f"- Horas de trabajo por día: {working_hours_end - working_hours_start}")
+        print()
     
     monthly_costs = []
     monthly_details = []
     
+    # Costo y emisiones (tCO2, si hay serie de intensidad) del horario laboral por mes en
+    # una sola pasada; con huecos sin rellenar ambos se llevan a cobertura completa
+    schedule_mask = (np.arange(24) >= working_hours_start) & (np.arange(24) < working_hours_end)
+    totals = sheet_cost_and_emissions(df_list, schedule_mask, intensidad, num_robots, consumption_per_robot)
+    monthly_emissions = totals['emisiones']
+    
     months = ['Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio',
               'Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre']
     
     for month_idx, df in enumerate(df_list):
         if df.empty:
-            print(f"Mes {month_idx + 1} ({months[month_idx]}): Sin datos")
+            if verbose:
+                print(f"Mes {month_idx + 1} ({months[month_idx]}): Sin datos")
             monthly_costs.append(0)
             continue
             
         month_name = months[month_idx]
-        print(f"Procesando {month_name} (Mes {month_idx + 1})")
+        if verbose:
+            print(f"Procesando {month_name} (Mes {month_idx + 1})")
         
         # Extraer precios del horario laboral (filas 8-19)
         working_hours_prices = df.iloc[working_hours_start:working_hours_end]
+        valid_hours = working_hours_prices.notna()
+        total_hours_worked = int(valid_hours.to_numpy().sum())
+        days_with_data = int(valid_hours.any().sum())
         
-        # Calcular costo por cada hora de cada día
-        daily_costs = []
-        total_hours_worked = 0
-        
-        for day in working_hours_prices.columns:
-            day_prices = working_hours_prices[day]
-            # Filtrar valores NaN
-            valid_prices = day_prices.dropna()
-            
-            if len(valid_prices) > 0:
-                # Costo por día = suma de (precio_hora * consumo_por_hora) para todas las horas laborales
-                daily_cost = sum(price * total_consumption_per_hour for price in valid_prices)
-                daily_costs.append(daily_cost)
-                total_hours_worked += len(valid_prices)
-        
-        month_cost = sum(daily_costs)
+        coverage = float(totals['cobertura'][month_idx])
+        month_cost = float(totals['costos'][month_idx])
         monthly_costs.append(month_cost)
         
         # Estadísticas del mes
@@ -108,43 +112,55 @@ def calculate_energy_cost(df_list: List[pd.DataFrame]):
                 'precio_promedio': avg_price,
                 'precio_minimo': min_price,
                 'precio_maximo': max_price,
-                'dias_con_datos': len(daily_costs)
+                'dias_con_datos': days_with_data,
+                'cobertura': coverage
             })
+            if monthly_emissions is not None:
+                monthly_details[-1]['emisiones_tco2'] = float(monthly_emissions[month_idx])
             
-            print(f"  - Costo total: ${month_cost:,.2f} USD")
-            print(f"  - Horas trabajadas: {total_hours_worked}")
-            print(f"  - Precio promedio: ${avg_price:.2f} USD/MWh")
-            print(f"  - Días con datos: {len(daily_costs)}")
-        else:
+            if verbose:
+                print(f"  - Costo total: ${month_cost:,.2f} USD")
+                print(f"  - Horas trabajadas: {total_hours_worked}")
+                print(f"  - Precio promedio: ${avg_price:.2f} USD/MWh")
+                print(f"  - Días con datos: {days_with_data}")
+                if monthly_emissions is not None:
+                    print(f"  - Emisiones: {monthly_emissions[month_idx]:,.1f} tCO2")
+                if coverage < 1:
+                    print(f"  ⚠️  Cobertura de precios: {coverage * 100:.1f}% (costo ajustado a cobertura completa)")
+        elif verbose:
             print(f"  - Sin datos válidos para {month_name}")
         
-        print()
+        if verbose:
+            print()
     
     # Costo total anual
     total_annual_cost = sum(monthly_costs)
     
     # Resumen
-    print("="*60)
-    print("RESUMEN ANUAL - COSTO CONSUMO ENERGÉTICO 2023")
-    print("="*60)
-    print(f"Costo total anual: ${total_annual_cost:,.2f} USD")
-    print(f"Costo promedio mensual: ${total_annual_cost/12:,.2f} USD")
-    
-    # Mes más caro y más barato
-    if monthly_costs:
-        max_month_idx = monthly_costs.index(max(monthly_costs))
-        min_month_idx = monthly_costs.index(min(monthly_costs))
+    if verbose:
+        print("="*60)
+        print("RESUMEN ANUAL - COSTO CONSUMO ENERGÉTICO 2023")
+        print("="*60)
+        print(f"Costo total anual: ${total_annual_cost:,.2f} USD")
+        print(f"Costo promedio mensual: ${total_annual_cost/12:,.2f} USD")
+        if monthly_emissions is not None:
+            print(f"Emisiones anuales: {monthly_emissions.sum():,.1f} tCO2")
+    
+        # Mes más caro y más barato
+        if monthly_costs:
+            max_month_idx = monthly_costs.index(max(monthly_costs))
+            min_month_idx = monthly_costs.index(min(monthly_costs))
         
-        print(f"Mes más caro: {months[max_month_idx]} (${monthly_costs[max_month_idx]:,.2f} USD)")
-        print(f"Mes más barato: {months[min_month_idx]} (${monthly_costs[min_month_idx]:,.2f} USD)")
+            print(f"Mes más caro: {months[max_month_idx]} (${monthly_costs[max_month_idx]:,.2f} USD)")
+            print(f"Mes más barato: {months[min_month_idx]} (${monthly_costs[min_month_idx]:,.2f} USD)")
     
-    print()
-    print("Desglose mensual:")
-    for i, (month, cost) in enumerate(zip(months, monthly_costs)):
-        percentage = (cost / total_annual_cost * 100) if total_annual_cost > 0 else 0
-        print(f"{month:>12}: ${cost:>10,.2f} USD ({percentage:>5.1f}%)")
+        print()
+        print("Desglose mensual:")
+        for i, (month, cost) in enumerate(zip(months, monthly_costs)):
+            percentage = (cost / total_annual_cost * 100) if total_annual_cost > 0 else 0
+            print(f"{month:>12}: ${cost:>10,.2f} USD ({percentage:>5.1f}%)")
     
-    return {
+    resultado = {
         'costo_total_anual': total_annual_cost,
         'costos_mensuales': monthly_costs,
         'detalles_mensuales': monthly_details,
@@ -155,19 +171,81 @@ def calculate_energy_cost(df_list: List[pd.DataFrame]):
             'horas_operacion_diaria': working_hours_end - working_hours_start
         }
     }
+    if monthly_emissions is not None:
+        resultado['emisiones_mensuales'] = monthly_emissions.tolist()
+        resultado['emisiones_total_anual'] = float(monthly_emissions.sum())
+    return resultado
+
+def calculate_tariff_costs(price_grid, nombres_tarifas=None, verbose=True):
+    """
+    Factura anual del horario actual (8:00-20:00) bajo cada tarifa de tarifas.define_tariffs
+
+    Args:
+        price_grid: Diccionario de datos.build_price_grid
+        nombres_tarifas: Claves de define_tariffs() a evaluar; None = todas
+        verbose: Si False no imprime nada
 
-# Uso del código
-file_path = r"Modela1Fixeddata.xlsx"
-df_list: List[pd.DataFrame] = read_excel_sheets_to_dataframes(file_path)
+    Returns:
+        pd.DataFrame: Desglose anual por tarifa (energía, recargos, demanda, cargo fijo)
+    """
+    tariffs = define_tariffs()
+    names = list(nombres_tarifas or tariffs)
+    unknown = [name for name in names if name not in tariffs]
+    if unknown:
+        raise ValueError(f"Tarifas desconocidas: {', '.join(unknown)} (disponibles: {', '.join(tariffs)})")
+
+    profile = scenario_consumption_profile(num_robots=25, consumption_per_robot=0.2,
+                                           working_hours_start=8, working_hours_end=20)
+    result = evaluate_tariffs(price_grid, profile, [tariffs[name] for name in names])
+    table = tariff_summary_table(result, names, ['Actual'])
+
+    if verbose:
+        print("="*60)
+        print("COSTO ANUAL POR TARIFA - HORARIO ACTUAL")
+        print("="*60)
+        print(f"{'Tarifa':<20} {'Energía':>14} {'Recargos':>12} {'Demanda':>12} {'Fijo':>10} {'Total':>14}")
+        print("-" * 87)
+        for _, row in table.iterrows():
+            print(f"{row['Tarifa']:<20} ${row['Energia_USD']:>13,.2f} ${row['Recargos_USD']:>11,.2f} "
+                  f"${row['Demanda_USD']:>11,.2f} ${row['Fijo_USD']:>9,.2f} ${row['Total_USD']:>13,.2f}")
+        print()
+
+    return table
 
-# Calcular el costo del consumo energético
-resultado = calculate_energy_cost(df_list)
+if __name__ == "__main__":
+    import argparse
 
-# Mostrar resultado principal
-print("\n" + "="*80)
-print("RESPUESTA A LA PREGUNTA:")
-print("="*80)
-print(f"El costo actual del consumo energético para los 25 robots que consumen")
-print(f"0.2 MWh cada uno durante el horario laboral (8:00-20:00) es:")
-print(f"\n${resultado['costo_total_anual']:,.2f} USD anuales")
-print("="*80)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Costo anual del consumo energético (pregunta 1)")
+    parser.add_argument('--intensidad', help="CSV o Excel con fecha, [hora], intensidad (tCO2/MWh) para reportar emisiones")
+    parser.add_argument('--tarifa', nargs='*', choices=list(define_tariffs()), metavar='NOMBRE',
+                        help="Costo con cargos de demanda y bandas horarias (tarifas.define_tariffs); sin nombres evalúa todas")
+    args = parser.parse_args()
+
+    # Uso del código
+    file_path = r"Modela1Fixeddata.xlsx"
+    # Validación única al cargar (huecos cortos interpolados, máscara de calidad aplicada)
+    df_list, price_grid = load_price_data(file_path, fill_gaps=True)
+    warn_incomplete_months(price_grid, 8, 20)
+
+    # Serie opcional de intensidad de carbono alineada a la grilla de precios
+    intensidad = None
+    if args.intensidad:
+        intensidad = align_intensity_to_grid(price_grid, load_carbon_intensity(args.intensidad))
+
+    # Calcular el costo del consumo energético
+    resultado = calculate_energy_cost(df_list, intensidad=intensidad)
+
+    # Mostrar resultado principal
+    print("\n" + "="*80)
+    print("RESPUESTA A LA PREGUNTA:")
+    print("="*80)
+    print(f"El costo actual del consumo energético para los 25 robots que consumen")
+    print(f"0.2 MWh cada uno durante el horario laboral (8:00-20:00) es:")
+    print(f"\n${resultado['costo_total_anual']:,.2f} USD anuales")
+    if intensidad is not None:
+        print(f"con emisiones de {resultado['emisiones_total_anual']:,.1f} tCO2")
+    print("="*80)
+
+    if args.tarifa is not None:
+        print()
+        calculate_tariff_costs(price_grid, args.tarifa or None)
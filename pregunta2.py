@@ -1,6 +1,11 @@
 import pandas as pd
 from typing import List
 import numpy as np
+from cache_resultados import cached_result
+from datos import build_price_grid
+from validacion import load_price_data, warn_incomplete_months
+from carbono import sheet_cost_and_emissions, load_carbon_intensity, align_intensity_to_grid
+from tipo_cambio import load_fx_rates, align_fx_to_grid, effective_rate
 
 def read_excel_sheets_to_dataframes(file_path):
     """
@@ -19,53 +24,82 @@ def read_excel_sheets_to_dataframes(file_path):
     
     return dataframes
 
+@cached_result()
+def compute_energy_cost_scenario(df_list: List[pd.DataFrame],
+                                 num_robots=25,
+                                 consumption_per_robot=0.2,
+                                 working_hours_start=8,
+                                 working_hours_end=20,
+                                 consumo_horario=None,
+                                 intensidad=None):
+    """
+    Costo energético anual y mensual de un escenario (sin salida en consola)
+
+    Costo y emisiones (si se indica intensidad, tCO2/MWh (días, 24)) salen de
+    la misma pasada vectorizada (carbono.sheet_cost_and_emissions).
+
+    Returns:
+        tuple: (costo anual, costos mensuales, emisiones mensuales o None)
+    """
+    schedule_mask = (np.arange(24) >= working_hours_start) & (np.arange(24) < working_hours_end)
+    if consumo_horario is not None:
+        # Consumo medido (MWh por hora, mismas hojas que df_list) en lugar de la carga constante
+        carga = np.nan_to_num(build_price_grid(consumo_horario)['precios']) * schedule_mask
+        totals = sheet_cost_and_emissions(df_list, carga, intensidad, num_robots=1, consumption_per_robot=1)
+    else:
+        totals = sheet_cost_and_emissions(df_list, schedule_mask, intensidad, num_robots, consumption_per_robot)
+
+    monthly_costs = totals['costos'].tolist()
+    monthly_emissions = None if totals['emisiones'] is None else totals['emisiones'].tolist()
+    return sum(monthly_costs), monthly_costs, monthly_emissions
+
 def calculate_energy_cost_scenario(df_list: List[pd.DataFrame], 
                                  num_robots=25, 
                                  consumption_per_robot=0.2, 
                                  working_hours_start=8, 
                                  working_hours_end=20,
-                                 scenario_name="Actual"):
+                                 scenario_name="Actual",
+                                 verbose=True,
+                                 consumo_horario=None,
+                                 intensidad=None):
     """
     Calcula el costo energético para un escenario específico
+
+    consumo_horario: Consumo medido de la flota en MWh por hora, en hojas
+    mensuales con el mismo formato que df_list (ver telemetria.consumption_sheets).
+    Si se indica, reemplaza el consumo constante num_robots × consumption_per_robot.
+
+    intensidad (tCO2/MWh, (días, 24)) agrega las emisiones mensuales al resultado.
+
+    El cálculo se guarda en caché (compute_energy_cost_scenario); el encabezado
+    del escenario se imprime siempre.
     """
     total_consumption_per_hour = num_robots * consumption_per_robot
     working_hours_per_day = working_hours_end - working_hours_start
     
-    print(f"\n{'='*60}")
-    print(f"ESCENARIO: {scenario_name}")
-    print(f"{'='*60}")
-    print(f"- Número de robots: {num_robots}")
-    print(f"- Consumo por robot: {consumption_per_robot} MWh/hora")
-    print(f"- Consumo total por hora: {total_consumption_per_hour} MWh/hora")
-    print(f"- Horario de operación: {working_hours_start}:00 - {working_hours_end}:00")
-    print(f"- Horas de trabajo por día: {working_hours_per_day}")
-    
-    monthly_costs = []
-    
-    for month_idx, df in enumerate(df_list):
-        if df.empty:
-            monthly_costs.append(0)
-            continue
-        
-        # Extraer precios del horario laboral
-        working_hours_prices = df.iloc[working_hours_start:working_hours_end]
-        
-        daily_costs = []
-        for day in working_hours_prices.columns:
-            day_prices = working_hours_prices[day].dropna()
-            if len(day_prices) > 0:
-                daily_cost = sum(price * total_consumption_per_hour for price in day_prices)
-                daily_costs.append(daily_cost)
-        
-        month_cost = sum(daily_costs)
-        monthly_costs.append(month_cost)
-    
-    total_annual_cost = sum(monthly_costs)
-    return total_annual_cost, monthly_costs
-
-def calculate_revenue_scenario(working_hours_per_day, scenario_name="Actual"):
+    if verbose:
+        print(f"\n{'='*60}")
+        print(f"ESCENARIO: {scenario_name}")
+        print(f"{'='*60}")
+        print(f"- Número de robots: {num_robots}")
+        print(f"- Consumo por robot: {consumption_per_robot} MWh/hora")
+        if consumo_horario is None:
+            print(f"- Consumo total por hora: {total_consumption_per_hour} MWh/hora")
+        else:
+            print("- Consumo total por hora: medido (telemetría)")
+        print(f"- Horario de operación: {working_hours_start}:00 - {working_hours_end}:00")
+        print(f"- Horas de trabajo por día: {working_hours_per_day}")
+    
+    return compute_energy_cost_scenario(df_list, num_robots, consumption_per_robot, working_hours_start,
+                                        working_hours_end, consumo_horario, intensidad)
+
+def calculate_revenue_scenario(working_hours_per_day, scenario_name="Actual", gtq_to_usd_rate=7.8,
+                               verbose=True):
     """
     Calcula los ingresos basados en el tiempo de trabajo y productos procesados
+
+    gtq_to_usd_rate puede reemplazarse por la tasa equivalente del período
+    (ver tipo_cambio.effective_rate).
     """
     # Parámetros de producción
     num_robots = 25
@@ -104,97 +138,124 @@ def calculate_revenue_scenario(working_hours_per_day, scenario_name="Actual"):
     # Ingresos totales anuales
     total_annual_revenue_gtq = products_per_year * avg_profit_per_product
     
-    # Conversión a USD (aproximada: 1 USD = 7.8 GTQ)
-    gtq_to_usd_rate = 7.8
+    # Conversión a USD (por defecto aproximada: 1 USD = 7.8 GTQ)
     total_annual_revenue_usd = total_annual_revenue_gtq / gtq_to_usd_rate
     
-    print(f"\nCálculo de Ingresos - {scenario_name}:")
-    print(f"- Productos por robot por hora: {products_per_robot_per_hour:.1f}")
-    print(f"- Productos procesados por día: {products_per_day:.0f}")
-    print(f"- Productos procesados por año: {products_per_year:.0f}")
-    print(f"- Ganancia promedio por producto: {avg_profit_per_product:.0f} GTQ")
-    print(f"- Ingresos anuales: {total_annual_revenue_gtq:,.0f} GTQ")
-    print(f"- Ingresos anuales: ${total_annual_revenue_usd:,.2f} USD")
+    if verbose:
+        print(f"\nCálculo de Ingresos - {scenario_name}:")
+        print(f"- Productos por robot por hora: {products_per_robot_per_hour:.1f}")
+        print(f"- Productos procesados por día: {products_per_day:.0f}")
+        print(f"- Productos procesados por año: {products_per_year:.0f}")
+        print(f"- Ganancia promedio por producto: {avg_profit_per_product:.0f} GTQ")
+        print(f"- Ingresos anuales: {total_annual_revenue_gtq:,.0f} GTQ")
+        print(f"- Tipo de cambio: {gtq_to_usd_rate:.4f} GTQ/USD")
+        print(f"- Ingresos anuales: ${total_annual_revenue_usd:,.2f} USD")
     
     return total_annual_revenue_usd, products_per_year
 
-def profitability_analysis(df_list: List[pd.DataFrame]):
+def profitability_analysis(df_list: List[pd.DataFrame], verbose=True, intensidad=None, gtq_to_usd_rate=7.8):
     """
     Análisis completo de rentabilidad comparando escenarios
+
+    Con verbose=False solo calcula; resultados.profitability_result arma el
+    objeto para mostrarlo en consola, Markdown, JSON o CSV.
+
+    intensidad (tCO2/MWh, (días, 24) de carbono.align_intensity_to_grid)
+    agrega las emisiones de cada escenario a la comparación.
+
+    gtq_to_usd_rate convierte los ingresos; con una serie de tipo de cambio
+    usar tipo_cambio.effective_rate de la grilla de tasas.
     """
-    print("="*80)
-    print("ANÁLISIS DE RENTABILIDAD - COMPARACIÓN DE ESCENARIOS")
-    print("="*80)
+    if verbose:
+        print("="*80)
+        print("ANÁLISIS DE RENTABILIDAD - COMPARACIÓN DE ESCENARIOS")
+        print("="*80)
     
-    # ESCENARIO ACTUAL
-    print("\n" + "="*60)
-    print("ESCENARIO ACTUAL")
-    print("="*60)
+        # ESCENARIO ACTUAL
+        print("\n" + "="*60)
+        print("ESCENARIO ACTUAL")
+        print("="*60)
     
-    current_energy_cost, _ = calculate_energy_cost_scenario(
+    current_energy_cost, _, current_monthly_emissions = calculate_energy_cost_scenario(
         df_list, 
         num_robots=25,
         consumption_per_robot=0.2,
         working_hours_start=8,
         working_hours_end=20,
-        scenario_name="Actual"
+        scenario_name="Actual",
+        verbose=verbose,
+        intensidad=intensidad
     )
     
     current_revenue, current_products = calculate_revenue_scenario(
         working_hours_per_day=12, 
-        scenario_name="Actual"
+        scenario_name="Actual",
+        gtq_to_usd_rate=gtq_to_usd_rate,
+        verbose=verbose
     )
     
     current_profit = current_revenue - current_energy_cost
+    current_emissions = sum(current_monthly_emissions) if intensidad is not None else None
     
     # ESCENARIO MODIFICADO
-    print("\n" + "="*60)
-    print("ESCENARIO MODIFICADO")
-    print("="*60)
+    if verbose:
+        print("\n" + "="*60)
+        print("ESCENARIO MODIFICADO")
+        print("="*60)
     
     # Trabajar la mitad del tiempo: 6 horas centrales (10:00-16:00)
-    modified_energy_cost, _ = calculate_energy_cost_scenario(
+    modified_energy_cost, _, modified_monthly_emissions = calculate_energy_cost_scenario(
         df_list,
         num_robots=25,
         consumption_per_robot=0.15,  # Menor consumo
         working_hours_start=10,      # 6 horas centrales
         working_hours_end=16,
-        scenario_name="Modificado"
+        scenario_name="Modificado",
+        verbose=verbose,
+        intensidad=intensidad
     )
     
     modified_revenue, modified_products = calculate_revenue_scenario(
         working_hours_per_day=6,
-        scenario_name="Modificado"
+        scenario_name="Modificado",
+        gtq_to_usd_rate=gtq_to_usd_rate,
+        verbose=verbose
     )
     
     modified_profit = modified_revenue - modified_energy_cost
+    modified_emissions = sum(modified_monthly_emissions) if intensidad is not None else None
     
     # COMPARACIÓN Y ANÁLISIS
-    print("\n" + "="*80)
-    print("COMPARACIÓN DE ESCENARIOS")
-    print("="*80)
-    
-    print(f"\n{'Métrica':<30} {'Actual':<20} {'Modificado':<20} {'Diferencia':<15}")
-    print("-" * 85)
-    print(f"{'Costo Energético (USD)':<30} ${current_energy_cost:>15,.2f} ${modified_energy_cost:>15,.2f} ${modified_energy_cost - current_energy_cost:>12,.2f}")
-    print(f"{'Ingresos (USD)':<30} ${current_revenue:>15,.2f} ${modified_revenue:>15,.2f} ${modified_revenue - current_revenue:>12,.2f}")
-    print(f"{'Utilidad (USD)':<30} ${current_profit:>15,.2f} ${modified_profit:>15,.2f} ${modified_profit - current_profit:>12,.2f}")
-    print(f"{'Productos/año':<30} {current_products:>15,.0f} {modified_products:>15,.0f} {modified_products - current_products:>12,.0f}")
+    if verbose:
+        print("\n" + "="*80)
+        print("COMPARACIÓN DE ESCENARIOS")
+        print("="*80)
+    
+        print(f"\n{'Métrica':<30} {'Actual':<20} {'Modificado':<20} {'Diferencia':<15}")
+        print("-" * 85)
+        print(f"{'Costo Energético (USD)':<30} ${current_energy_cost:>15,.2f} ${modified_energy_cost:>15,.2f} ${modified_energy_cost - current_energy_cost:>12,.2f}")
+        print(f"{'Ingresos (USD)':<30} ${current_revenue:>15,.2f} ${modified_revenue:>15,.2f} ${modified_revenue - current_revenue:>12,.2f}")
+        print(f"{'Utilidad (USD)':<30} ${current_profit:>15,.2f} ${modified_profit:>15,.2f} ${modified_profit - current_profit:>12,.2f}")
+        print(f"{'Productos/año':<30} {current_products:>15,.0f} {modified_products:>15,.0f} {modified_products - current_products:>12,.0f}")
+        if intensidad is not None:
+            print(f"{'Emisiones (tCO2)':<30} {current_emissions:>16,.1f} {modified_emissions:>16,.1f} {modified_emissions - current_emissions:>13,.1f}")
     
     # Cálculo de porcentajes
     energy_savings_pct = ((current_energy_cost - modified_energy_cost) / current_energy_cost) * 100
     revenue_reduction_pct = ((current_revenue - modified_revenue) / current_revenue) * 100
     profit_change_pct = ((modified_profit - current_profit) / abs(current_profit)) * 100 if current_profit != 0 else 0
     
-    print(f"\n{'Cambios Porcentuales:'}")
-    print(f"- Ahorro en energía: {energy_savings_pct:.1f}%")
-    print(f"- Reducción en ingresos: {revenue_reduction_pct:.1f}%")
-    print(f"- Cambio en utilidad: {profit_change_pct:+.1f}%")
+    if verbose:
+        print(f"\n{'Cambios Porcentuales:'}")
+        print(f"- Ahorro en energía: {energy_savings_pct:.1f}%")
+        print(f"- Reducción en ingresos: {revenue_reduction_pct:.1f}%")
+        print(f"- Cambio en utilidad: {profit_change_pct:+.1f}%")
     
     # CONCLUSIÓN
-    print("\n" + "="*80)
-    print("CONCLUSIÓN")
-    print("="*80)
+    if verbose:
+        print("\n" + "="*80)
+        print("CONCLUSIÓN")
+        print("="*80)
     
     if modified_profit > current_profit:
         conclusion = "✅ SÍ ES RENTABLE - El escenario modificado genera mayor utilidad"
@@ -206,40 +267,75 @@ def profitability_analysis(df_list: List[pd.DataFrame]):
         conclusion = "❌ NO ES RENTABLE - El escenario modificado genera pérdidas"
         recommendation = "No se recomienda el cambio"
     
-    print(f"\n{conclusion}")
-    print(f"\nRecomendación: {recommendation}")
+    if verbose:
+        print(f"\n{conclusion}")
+        print(f"\nRecomendación: {recommendation}")
     
     # ROI Analysis
-    print(f"\nAnálisis de ROI:")
+    if verbose:
+        print(f"\nAnálisis de ROI:")
     current_roi = (current_profit / current_energy_cost) * 100 if current_energy_cost > 0 else 0
     modified_roi = (modified_profit / modified_energy_cost) * 100 if modified_energy_cost > 0 else 0
     
-    print(f"- ROI Actual: {current_roi:.1f}%")
-    print(f"- ROI Modificado: {modified_roi:.1f}%")
-    print(f"- Diferencia ROI: {modified_roi - current_roi:+.1f} puntos porcentuales")
+    if verbose:
+        print(f"- ROI Actual: {current_roi:.1f}%")
+        print(f"- ROI Modificado: {modified_roi:.1f}%")
+        print(f"- Diferencia ROI: {modified_roi - current_roi:+.1f} puntos porcentuales")
+    
+    escenario_actual = {
+        'costo_energia': current_energy_cost,
+        'ingresos': current_revenue,
+        'utilidad': current_profit,
+        'productos': current_products,
+        'roi': current_roi
+    }
+    escenario_modificado = {
+        'costo_energia': modified_energy_cost,
+        'ingresos': modified_revenue,
+        'utilidad': modified_profit,
+        'productos': modified_products,
+        'roi': modified_roi
+    }
+    if intensidad is not None:
+        escenario_actual['emisiones_tco2'] = current_emissions
+        escenario_modificado['emisiones_tco2'] = modified_emissions
     
     return {
-        'escenario_actual': {
-            'costo_energia': current_energy_cost,
-            'ingresos': current_revenue,
-            'utilidad': current_profit,
-            'productos': current_products,
-            'roi': current_roi
-        },
-        'escenario_modificado': {
-            'costo_energia': modified_energy_cost,
-            'ingresos': modified_revenue,
-            'utilidad': modified_profit,
-            'productos': modified_products,
-            'roi': modified_roi
-        },
+        'escenario_actual': escenario_actual,
+        'escenario_modificado': escenario_modificado,
         'es_rentable': modified_profit > current_profit,
-        'conclusion': conclusion
+        'conclusion': conclusion,
+        'recomendacion': recommendation,
+        'cambios_porcentuales': {
+            'ahorro_energia': energy_savings_pct,
+            'reduccion_ingresos': revenue_reduction_pct,
+            'cambio_utilidad': profit_change_pct
+        }
     }
 
-# Ejecutar análisis
-file_path = r"Modela1Fixeddata.xlsx"
-df_list: List[pd.DataFrame] = read_excel_sheets_to_dataframes(file_path)
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rentabilidad del escenario actual vs modificado (pregunta 2)")
+    parser.add_argument('--intensidad', help="CSV o Excel con fecha, [hora], intensidad (tCO2/MWh) para reportar emisiones")
+    parser.add_argument('--tipo-cambio', help="CSV o Excel con fecha, [hora], tasa (GTQ por USD) para convertir ingresos")
+    args = parser.parse_args()
+
+    # Ejecutar análisis
+    file_path = r"Modela1Fixeddata.xlsx"
+    # Validación única al cargar (huecos cortos interpolados, máscara de calidad aplicada)
+    df_list, price_grid = load_price_data(file_path, fill_gaps=True)
+    warn_incomplete_months(price_grid, 8, 20)
+
+    # Serie opcional de intensidad de carbono alineada a la grilla de precios
+    intensidad = None
+    if args.intensidad:
+        intensidad = align_intensity_to_grid(price_grid, load_carbon_intensity(args.intensidad))
+
+    # Tipo de cambio del período (por defecto la tasa fija de 7.8 GTQ/USD)
+    tasa = 7.8
+    if args.tipo_cambio:
+        tasa = effective_rate(align_fx_to_grid(price_grid, load_fx_rates(args.tipo_cambio)))
 
-# Realizar análisis de rentabilidad
-resultado_analisis = profitability_analysis(df_list)
\ No newline at end of file
+    # Realizar análisis de rentabilidad
+    resultado_analisis = profitability_analysis(df_list, intensidad=intensidad, gtq_to_usd_rate=tasa)
@@ -4,33 +4,27 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime
+from validacion import load_price_data, warn_incomplete_months
+from cache_resultados import cached_result
+from carbono import sheet_cost_and_emissions, load_carbon_intensity, align_intensity_to_grid
+from tipo_cambio import load_fx_rates, align_fx_to_grid, monthly_average_rate
 
-def read_excel_sheets_to_dataframes(file_path):
-    """
-    Read Excel file with sheets named 1-12 and return list of DataFrames
-    """
-    dataframes = []
-    
-    for sheet_num in range(1, 13):
-        try:
-            df = pd.read_excel(file_path, sheet_name=str(sheet_num))
-            dataframes.append(df)
-        except Exception as e:
-            print(f"Error reading sheet '{sheet_num}': {e}")
-            dataframes.append(pd.DataFrame())
-    
-    return dataframes
+# Días por mes (aproximado, año no bisiesto)
+DAYS_PER_MONTH = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
 
-def calculate_monthly_energy_costs(df_list: List[pd.DataFrame]):
+@cached_result()
+def calculate_monthly_energy_costs(df_list: List[pd.DataFrame], num_robots=25, consumption_per_robot=0.2,
+                                   working_hours_start=8, working_hours_end=20, intensidad=None):
     """
-    Calcula los costos energéticos mensuales
+    Calcula los costos energéticos mensuales (por defecto, el sistema actual)
+
+    Con intensidad (tCO2/MWh, (días, 24)) cada detalle mensual lleva también
+    'emisiones_tco2', calculadas en la misma pasada que el costo.
     """
-    # Parámetros del sistema actual
-    num_robots = 25
-    consumption_per_robot = 0.2
-    total_consumption_per_hour = num_robots * consumption_per_robot
-    working_hours_start = 8
-    working_hours_end = 20
+    # Costo (y emisiones) del horario por mes, ajustados a cobertura completa: un
+    # mes con huecos sin rellenar no parece más barato
+    schedule_mask = (np.arange(24) >= working_hours_start) & (np.arange(24) < working_hours_end)
+    totals = sheet_cost_and_emissions(df_list, schedule_mask, intensidad, num_robots, consumption_per_robot)
     
     monthly_costs = []
     monthly_details = []
@@ -44,6 +38,7 @@ def calculate_monthly_energy_costs(df_list: List[pd.DataFrame]):
             monthly_details.append({
                 'mes': months[month_idx],
                 'costo_energia': 0,
+                'cobertura': 0,
                 'precio_promedio': 0,
                 'precio_minimo': 0,
                 'precio_maximo': 0
@@ -52,42 +47,42 @@ def calculate_monthly_energy_costs(df_list: List[pd.DataFrame]):
         
         # Extraer precios del horario laboral (filas 8-19)
         working_hours_prices = df.iloc[working_hours_start:working_hours_end]
-        
-        # Calcular costo mensual
-        daily_costs = []
         all_prices = []
-        
         for day in working_hours_prices.columns:
-            day_prices = working_hours_prices[day].dropna()
-            if len(day_prices) > 0:
-                daily_cost = sum(price * total_consumption_per_hour for price in day_prices)
-                daily_costs.append(daily_cost)
-                all_prices.extend(day_prices)
+            all_prices.extend(working_hours_prices[day].dropna())
         
-        month_cost = sum(daily_costs)
+        coverage = float(totals['cobertura'][month_idx])
+        month_cost = float(totals['costos'][month_idx])
         monthly_costs.append(month_cost)
         
         # Detalles del mes
         monthly_details.append({
             'mes': months[month_idx],
             'costo_energia': month_cost,
+            'cobertura': coverage,
             'precio_promedio': np.mean(all_prices) if all_prices else 0,
             'precio_minimo': np.min(all_prices) if all_prices else 0,
             'precio_maximo': np.max(all_prices) if all_prices else 0
         })
     
+    if intensidad is not None:
+        for detail, emissions in zip(monthly_details, totals['emisiones']):
+            detail['emisiones_tco2'] = float(emissions)
+    
     return monthly_costs, monthly_details
 
-def calculate_monthly_revenues():
+def calculate_monthly_revenues(gtq_to_usd_rate=7.8, num_robots=25, working_hours_per_day=12,
+                               minutes_per_product=15):
     """
     Calcula los ingresos mensuales (constantes para cada mes)
+
+    Args:
+        gtq_to_usd_rate: Tasa GTQ por USD, un valor fijo o 12 tasas mensuales
+                         (ver tipo_cambio.monthly_average_rate)
+        num_robots, working_hours_per_day, minutes_per_product: Parámetros de
+                         producción; por defecto, el sistema actual
     """
-    # Parámetros de producción
-    num_robots = 25
-    working_hours_per_day = 12
-    
     # Productos por hora por robot
-    minutes_per_product = 15
     products_per_robot_per_hour = 60 / minutes_per_product  # 4 productos/hora
     
     # Productos por día
@@ -95,30 +90,33 @@ def calculate_monthly_revenues():
     
     # Ganancia promedio por producto (Grupo Impar) - 405 GTQ
     avg_profit_per_product_gtq = 405
-    gtq_to_usd_rate = 7.8
-    avg_profit_per_product_usd = avg_profit_per_product_gtq / gtq_to_usd_rate
-    
-    # Días por mes (aproximado)
-    days_per_month = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+    monthly_rates = np.broadcast_to(np.asarray(gtq_to_usd_rate, dtype=float), (12,))
     
     monthly_revenues = []
-    for days in days_per_month:
-        monthly_revenue = products_per_day * days * avg_profit_per_product_usd
+    for days, rate in zip(DAYS_PER_MONTH, monthly_rates):
+        monthly_revenue = products_per_day * days * avg_profit_per_product_gtq / rate
         monthly_revenues.append(monthly_revenue)
     
     return monthly_revenues
 
-def create_monthly_profitability_analysis(df_list: List[pd.DataFrame]):
+@cached_result()
+def compute_monthly_profitability(df_list: List[pd.DataFrame], num_robots=25, consumption_per_robot=0.2,
+                                  working_hours_start=8, working_hours_end=20, minutes_per_product=15,
+                                  gtq_to_usd_rate=7.8, intensidad=None):
     """
-    Análisis completo de rentabilidad mensual con tabla y gráficas
+    Calcula la tabla de rentabilidad mensual (df_analysis) sin imprimir ni graficar
+
+    Los parámetros por defecto son los del sistema actual; servicio.py los
+    cambia para responder consultas de otros escenarios. intensidad (tCO2/MWh,
+    (días, 24)) agrega la columna Emisiones_tCO2 del mismo escenario.
     """
-    print("="*80)
-    print("ANÁLISIS DE RENTABILIDAD MENSUAL - 2023")
-    print("="*80)
-    
     # Calcular costos e ingresos mensuales
-    monthly_costs, cost_details = calculate_monthly_energy_costs(df_list)
-    monthly_revenues = calculate_monthly_revenues()
+    monthly_costs, cost_details = calculate_monthly_energy_costs(
+        df_list, num_robots, consumption_per_robot, working_hours_start, working_hours_end, intensidad)
+    working_hours_per_day = working_hours_end - working_hours_start
+    monthly_revenues = calculate_monthly_revenues(gtq_to_usd_rate, num_robots, working_hours_per_day,
+                                                  minutes_per_product)
+    products_per_day = num_robots * working_hours_per_day * 60 / minutes_per_product
     
     # Calcular utilidades mensuales
     monthly_profits = [revenue - cost for revenue, cost in zip(monthly_revenues, monthly_costs)]
@@ -130,73 +128,105 @@ def create_monthly_profitability_analysis(df_list: List[pd.DataFrame]):
     df_analysis = pd.DataFrame({
         'Mes': months,
         'Mes_Num': range(1, 13),
+        'Productos': [products_per_day * days for days in DAYS_PER_MONTH],
         'Ingresos_USD': monthly_revenues,
         'Costos_Energia_USD': monthly_costs,
         'Utilidad_USD': monthly_profits,
         'Precio_Promedio_MWh': [detail['precio_promedio'] for detail in cost_details],
         'Precio_Min_MWh': [detail['precio_minimo'] for detail in cost_details],
-        'Precio_Max_MWh': [detail['precio_maximo'] for detail in cost_details]
+        'Precio_Max_MWh': [detail['precio_maximo'] for detail in cost_details],
+        'Cobertura_Pct': [detail['cobertura'] * 100 for detail in cost_details],
+        'Tasa_GTQ_USD': np.broadcast_to(np.asarray(gtq_to_usd_rate, dtype=float), (12,))
     })
     
     # Calcular métricas adicionales
     df_analysis['Margen_Utilidad_Pct'] = (df_analysis['Utilidad_USD'] / df_analysis['Ingresos_USD']) * 100
     df_analysis['ROI_Pct'] = (df_analysis['Utilidad_USD'] / df_analysis['Costos_Energia_USD']) * 100
+    if intensidad is not None:
+        df_analysis['Emisiones_tCO2'] = [detail['emisiones_tco2'] for detail in cost_details]
+    
+    return df_analysis
+
+def create_monthly_profitability_analysis(df_list: List[pd.DataFrame], verbose=True, intensidad=None,
+                                          gtq_to_usd_rate=7.8):
+    """
+    Análisis completo de rentabilidad mensual con tabla y gráficas
+
+    Con verbose=False no imprime ni genera gráficas (ver resultados.py).
+    intensidad (tCO2/MWh, (días, 24) de carbono.align_intensity_to_grid)
+    agrega la columna Emisiones_tCO2 del horario actual. gtq_to_usd_rate
+    acepta 12 tasas mensuales (tipo_cambio.monthly_average_rate).
+    """
+    if verbose:
+        print("="*80)
+        print("ANÁLISIS DE RENTABILIDAD MENSUAL - 2023")
+        print("="*80)
+    
+    df_analysis = compute_monthly_profitability(df_list, gtq_to_usd_rate=gtq_to_usd_rate, intensidad=intensidad)
     
     # Identificar mes más y menos rentable
     mes_mas_rentable = df_analysis.loc[df_analysis['Utilidad_USD'].idxmax()]
     mes_menos_rentable = df_analysis.loc[df_analysis['Utilidad_USD'].idxmin()]
     
-    # TABLA COMPARATIVA MENSUAL
-    print("\\nTABLA COMPARATIVA MENSUAL DE RENTABILIDAD")
-    print("="*120)
-    
-    # Formatear tabla para mejor visualización
-    table_df = df_analysis.copy()
-    table_df['Ingresos_USD'] = table_df['Ingresos_USD'].apply(lambda x: f"${x:,.0f}")
-    table_df['Costos_Energia_USD'] = table_df['Costos_Energia_USD'].apply(lambda x: f"${x:,.0f}")
-    table_df['Utilidad_USD'] = table_df['Utilidad_USD'].apply(lambda x: f"${x:,.0f}")
-    table_df['Precio_Promedio_MWh'] = table_df['Precio_Promedio_MWh'].apply(lambda x: f"${x:.2f}")
-    table_df['Margen_Utilidad_Pct'] = table_df['Margen_Utilidad_Pct'].apply(lambda x: f"{x:.1f}%")
-    table_df['ROI_Pct'] = table_df['ROI_Pct'].apply(lambda x: f"{x:.0f}%")
-    
-    # Mostrar tabla
-    print(f"{'Mes':<12} {'Ingresos':<15} {'Costos Energía':<15} {'Utilidad':<15} {'Precio Prom':<12} {'Margen':<8} {'ROI':<6}")
-    print("-" * 120)
-    
-    for _, row in table_df.iterrows():
-        print(f"{row['Mes']:<12} {row['Ingresos_USD']:<15} {row['Costos_Energia_USD']:<15} "
-              f"{row['Utilidad_USD']:<15} {row['Precio_Promedio_MWh']:<12} {row['Margen_Utilidad_Pct']:<8} {row['ROI_Pct']:<6}")
-    
-    # ESTADÍSTICAS CLAVE
-    print("\\n" + "="*80)
-    print("ESTADÍSTICAS CLAVE")
-    print("="*80)
-    
-    total_ingresos = df_analysis['Ingresos_USD'].sum()
-    total_costos = df_analysis['Costos_Energia_USD'].sum()
-    total_utilidad = df_analysis['Utilidad_USD'].sum()
-    
-    print(f"\\nResumen Anual:")
-    print(f"- Ingresos totales: ${total_ingresos:,.2f} USD")
-    print(f"- Costos energéticos totales: ${total_costos:,.2f} USD")
-    print(f"- Utilidad total: ${total_utilidad:,.2f} USD")
-    print(f"- Margen de utilidad promedio: {(total_utilidad/total_ingresos)*100:.1f}%")
-    
-    print(f"\\nMes MÁS rentable:")
-    print(f"- {mes_mas_rentable['Mes']}: ${mes_mas_rentable['Utilidad_USD']:,.2f} USD")
-    print(f"- Precio promedio energía: ${mes_mas_rentable['Precio_Promedio_MWh']:.2f} USD/MWh")
-    print(f"- Margen de utilidad: {mes_mas_rentable['Margen_Utilidad_Pct']:.1f}%")
-    
-    print(f"\\nMes MENOS rentable:")
-    print(f"- {mes_menos_rentable['Mes']}: ${mes_menos_rentable['Utilidad_USD']:,.2f} USD")
-    print(f"- Precio promedio energía: ${mes_menos_rentable['Precio_Promedio_MWh']:.2f} USD/MWh")
-    print(f"- Margen de utilidad: {mes_menos_rentable['Margen_Utilidad_Pct']:.1f}%")
-    
-    diferencia_rentabilidad = mes_mas_rentable['Utilidad_USD'] - mes_menos_rentable['Utilidad_USD']
-    print(f"\\nDiferencia de rentabilidad: ${diferencia_rentabilidad:,.2f} USD ({(diferencia_rentabilidad/mes_menos_rentable['Utilidad_USD'])*100:.1f}% más)")
-    
-    # CREAR GRÁFICAS
-    create_profitability_charts(df_analysis)
+    if verbose:
+        # TABLA COMPARATIVA MENSUAL
+        print("\\nTABLA COMPARATIVA MENSUAL DE RENTABILIDAD")
+        print("="*120)
+    
+        # Formatear tabla para mejor visualización
+        table_df = df_analysis.copy()
+        table_df['Ingresos_USD'] = table_df['Ingresos_USD'].apply(lambda x: f"${x:,.0f}")
+        table_df['Costos_Energia_USD'] = table_df['Costos_Energia_USD'].apply(lambda x: f"${x:,.0f}")
+        table_df['Utilidad_USD'] = table_df['Utilidad_USD'].apply(lambda x: f"${x:,.0f}")
+        table_df['Precio_Promedio_MWh'] = table_df['Precio_Promedio_MWh'].apply(lambda x: f"${x:.2f}")
+        table_df['Margen_Utilidad_Pct'] = table_df['Margen_Utilidad_Pct'].apply(lambda x: f"{x:.1f}%")
+        table_df['ROI_Pct'] = table_df['ROI_Pct'].apply(lambda x: f"{x:.0f}%")
+    
+        # Mostrar tabla
+        print(f"{'Mes':<12} {'Ingresos':<15} {'Costos Energía':<15} {'Utilidad':<15} {'Precio Prom':<12} {'Margen':<8} {'ROI':<6}")
+        print("-" * 120)
+    
+        for _, row in table_df.iterrows():
+            print(f"{row['Mes']:<12} {row['Ingresos_USD']:<15} {row['Costos_Energia_USD']:<15} "
+                  f"{row['Utilidad_USD']:<15} {row['Precio_Promedio_MWh']:<12} {row['Margen_Utilidad_Pct']:<8} {row['ROI_Pct']:<6}")
+    
+        # ESTADÍSTICAS CLAVE
+        print("\\n" + "="*80)
+        print("ESTADÍSTICAS CLAVE")
+        print("="*80)
+    
+        total_ingresos = df_analysis['Ingresos_USD'].sum()
+        total_costos = df_analysis['Costos_Energia_USD'].sum()
+        total_utilidad = df_analysis['Utilidad_USD'].sum()
+    
+        print(f"\\nResumen Anual:")
+        print(f"- Ingresos totales: ${total_ingresos:,.2f} USD")
+        print(f"- Costos energéticos totales: ${total_costos:,.2f} USD")
+        print(f"- Utilidad total: ${total_utilidad:,.2f} USD")
+        print(f"- Margen de utilidad promedio: {(total_utilidad/total_ingresos)*100:.1f}%")
+        tasa_min, tasa_max = df_analysis['Tasa_GTQ_USD'].min(), df_analysis['Tasa_GTQ_USD'].max()
+        rango_tasa = f"{tasa_min:.4f}" if tasa_min == tasa_max else f"{tasa_min:.4f} - {tasa_max:.4f}"
+        print(f"- Tipo de cambio: {rango_tasa} GTQ/USD")
+        if intensidad is not None:
+            print(f"- Emisiones totales: {df_analysis['Emisiones_tCO2'].sum():,.1f} tCO2")
+            for _, row in df_analysis.iterrows():
+                print(f"  {row['Mes']:<12} {row['Emisiones_tCO2']:>10,.1f} tCO2")
+    
+        print(f"\\nMes MÁS rentable:")
+        print(f"- {mes_mas_rentable['Mes']}: ${mes_mas_rentable['Utilidad_USD']:,.2f} USD")
+        print(f"- Precio promedio energía: ${mes_mas_rentable['Precio_Promedio_MWh']:.2f} USD/MWh")
+        print(f"- Margen de utilidad: {mes_mas_rentable['Margen_Utilidad_Pct']:.1f}%")
+    
+        print(f"\\nMes MENOS rentable:")
+        print(f"- {mes_menos_rentable['Mes']}: ${mes_menos_rentable['Utilidad_USD']:,.2f} USD")
+        print(f"- Precio promedio energía: ${mes_menos_rentable['Precio_Promedio_MWh']:.2f} USD/MWh")
+        print(f"- Margen de utilidad: {mes_menos_rentable['Margen_Utilidad_Pct']:.1f}%")
+    
+        diferencia_rentabilidad = mes_mas_rentable['Utilidad_USD'] - mes_menos_rentable['Utilidad_USD']
+        print(f"\\nDiferencia de rentabilidad: ${diferencia_rentabilidad:,.2f} USD ({(diferencia_rentabilidad/mes_menos_rentable['Utilidad_USD'])*100:.1f}% más)")
+    
+        # CREAR GRÁFICAS
+        create_profitability_charts(df_analysis)
     
     return df_analysis, mes_mas_rentable, mes_menos_rentable
 
@@ -307,18 +337,40 @@ def create_profitability_charts(df_analysis):
     
     print("\\n📊 Gráficas guardadas como 'rentabilidad_mensual_2023.png'")
 
-# Ejecutar análisis
-file_path = r"Modela1Fixeddata.xlsx"
-df_list: List[pd.DataFrame] = read_excel_sheets_to_dataframes(file_path)
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rentabilidad mensual (pregunta 3)")
+    parser.add_argument('--intensidad', help="CSV o Excel con fecha, [hora], intensidad (tCO2/MWh) para reportar emisiones")
+    parser.add_argument('--tipo-cambio', help="CSV o Excel con fecha, [hora], tasa (GTQ por USD) para convertir ingresos")
+    args = parser.parse_args()
+
+    # Ejecutar análisis
+    file_path = r"Modela1Fixeddata.xlsx"
+    # Validación única al cargar: huecos cortos se interpolan para que un mes
+    # incompleto no parezca más barato
+    df_list, price_grid = load_price_data(file_path, fill_gaps=True)
+    warn_incomplete_months(price_grid, 8, 20)
 
-# Realizar análisis de rentabilidad mensual
-print("Iniciando análisis de rentabilidad mensual...")
-resultado_mensual, mejor_mes, peor_mes = create_monthly_profitability_analysis(df_list)
+    # Serie opcional de intensidad de carbono alineada a la grilla de precios
+    intensidad = None
+    if args.intensidad:
+        intensidad = align_intensity_to_grid(price_grid, load_carbon_intensity(args.intensidad))
 
-print("\\n" + "="*80)
-print("RESUMEN EJECUTIVO")
-print("="*80)
-print(f"✅ MES MÁS RENTABLE: {mejor_mes['Mes']} con ${mejor_mes['Utilidad_USD']:,.2f} USD")
-print(f"❌ MES MENOS RENTABLE: {peor_mes['Mes']} con ${peor_mes['Utilidad_USD']:,.2f} USD")
-print(f"📈 VARIACIÓN: {((mejor_mes['Utilidad_USD'] - peor_mes['Utilidad_USD'])/peor_mes['Utilidad_USD']*100):.1f}% de diferencia")
-print("="*80)
\ No newline at end of file
+    # Tasas mensuales del período (por defecto la tasa fija de 7.8 GTQ/USD)
+    tasas = 7.8
+    if args.tipo_cambio:
+        tasas = monthly_average_rate(price_grid, align_fx_to_grid(price_grid, load_fx_rates(args.tipo_cambio)))
+
+    # Realizar análisis de rentabilidad mensual
+    print("Iniciando análisis de rentabilidad mensual...")
+    resultado_mensual, mejor_mes, peor_mes = create_monthly_profitability_analysis(df_list, intensidad=intensidad,
+                                                                                gtq_to_usd_rate=tasas)
+
+    print("\\n" + "="*80)
+    print("RESUMEN EJECUTIVO")
+    print("="*80)
+    print(f"✅ MES MÁS RENTABLE: {mejor_mes['Mes']} con ${mejor_mes['Utilidad_USD']:,.2f} USD")
+    print(f"❌ MES MENOS RENTABLE: {peor_mes['Mes']} con ${peor_mes['Utilidad_USD']:,.2f} USD")
+    print(f"📈 VARIACIÓN: {((mejor_mes['Utilidad_USD'] - peor_mes['Utilidad_USD'])/peor_mes['Utilidad_USD']*100):.1f}% de diferencia")
+    print("="*80)
@@ -3,6 +3,14 @@ from typing import List, Dict, Tuple
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
+from ingresos import schedule_to_hour_mask
+from cache_resultados import cached_result
+from validacion import load_price_data, coverage_adjusted, warn_incomplete_months
+from robustez import CRITERIOS_RIESGO, robust_schedule_ranking, print_risk_ranking
+from datos import build_price_grid
+from flota import optimize_fleet_levels, print_activation_report
+from desplazamiento import optimize_load_shifting, print_load_shifting_report
+from carbono import load_carbon_intensity, align_intensity_to_grid
 
 def read_excel_sheets_to_dataframes(file_path):
     """
@@ -53,47 +61,81 @@ def define_work_schedules():
     
     return schedules
 
-def calculate_energy_cost_by_schedule(df_enero, schedule_info, num_robots=25, consumption_per_robot=0.2):
+@cached_result()
+def calculate_energy_cost_by_schedule(df_enero, schedule_info, num_robots=25, consumption_per_robot=0.2,
+                                      robots_por_hora=None, intensidad=None):
     """
     Calcula el costo energético para un horario específico usando datos de enero
+
+    Si se indica robots_por_hora (24,) o (días, 24), p. ej. la matriz de
+    flota.optimize_fleet_levels para enero, cada hora consume según los robots
+    activos en ella en lugar de los num_robots completos.
+
+    Con intensidad (tCO2/MWh, (días, 24) de enero) agrega 'emisiones_tco2',
+    calculadas sobre la misma matriz de consumo que el costo.
     """
     total_consumption_per_hour = num_robots * consumption_per_robot
+    prices = df_enero.to_numpy(dtype=float)  # hora × día
+    n_days = prices.shape[1]
+    if robots_por_hora is not None:
+        # Matriz hora × día alineada con la hoja de enero
+        robots_por_hora = np.broadcast_to(np.asarray(robots_por_hora, dtype=float), (n_days, 24)).T
+        consumption = robots_por_hora * consumption_per_robot
+    else:
+        consumption = np.full((24, n_days), total_consumption_per_hour)
+    if intensidad is not None:
+        intensidad = np.asarray(intensidad, dtype=float)[:n_days].T
     
     # Obtener horas de trabajo del horario
     work_periods = schedule_info['horas_trabajo']
     
     total_cost = 0
+    total_emissions = 0
     total_hours_worked = 0
     price_details = []
     
     for start_hour, end_hour in work_periods:
-        # Extraer precios para este período
-        period_prices = df_enero.iloc[start_hour:end_hour]
+        # Precios del período con dato (las horas sin precio no consumen)
+        period_prices = prices[start_hour:end_hour]
+        valid = ~np.isnan(period_prices)
+        load = np.where(valid, consumption[start_hour:end_hour], 0.0)
         
-        for day_col in period_prices.columns:
-            day_prices = period_prices[day_col].dropna()
-            for price in day_prices:
-                cost = price * total_consumption_per_hour
-                total_cost += cost
-                total_hours_worked += 1
-                price_details.append(price)
+        total_cost += np.sum(np.nan_to_num(period_prices) * load)
+        if intensidad is not None:
+            total_emissions += np.sum(np.nan_to_num(intensidad[start_hour:end_hour]) * load)
+        total_hours_worked += int(valid.sum())
+        # Orden día por día, igual que recorrer las columnas de la hoja
+        price_details.extend(period_prices.T[valid.T].tolist())
     
     avg_price = np.mean(price_details) if price_details else 0
     min_price = np.min(price_details) if price_details else 0
     max_price = np.max(price_details) if price_details else 0
     
-    return {
+    # Huecos sin rellenar: costo y emisiones se llevan a cobertura completa del horario
+    expected_hours = sum(end_hour - start_hour for start_hour, end_hour in work_periods) * n_days
+    coverage = total_hours_worked / expected_hours if expected_hours else 0.0
+    total_cost = coverage_adjusted(float(total_cost), coverage)
+    
+    result = {
         'costo_total': total_cost,
         'horas_trabajadas': total_hours_worked,
+        'cobertura': coverage,
         'precio_promedio': avg_price,
         'precio_minimo': min_price,
         'precio_maximo': max_price,
-        'precios_detalle': price_details
+        'precios_detalle': price_details,
+        'matriz_activacion': robots_por_hora
     }
+    if intensidad is not None:
+        result['emisiones_tco2'] = coverage_adjusted(float(total_emissions), coverage)
+    return result
 
-def calculate_revenue_by_schedule(schedule_info, days_in_month=31):
+def calculate_revenue_by_schedule(schedule_info, days_in_month=31, productividad_horaria=None):
     """
     Calcula los ingresos basados en las horas de trabajo del horario
+
+    Si se indica productividad_horaria (24 factores), cada hora trabajada aporta
+    productos según su factor en lugar de contar solo total_horas.
     """
     # Parámetros de producción
     num_robots = 25
@@ -107,7 +149,12 @@ def calculate_revenue_by_schedule(schedule_info, days_in_month=31):
     
     # Calcular producción
     hours_per_day = schedule_info['total_horas']
-    products_per_day = num_robots * hours_per_day * products_per_robot_per_hour
+    if productividad_horaria is None:
+        effective_hours = hours_per_day
+    else:
+        # Horas efectivas = suma de factores de productividad en las horas trabajadas
+        effective_hours = float(np.sum(np.asarray(productividad_horaria)[schedule_to_hour_mask(schedule_info)]))
+    products_per_day = num_robots * effective_hours * products_per_robot_per_hour
     products_per_month = products_per_day * days_in_month
     
     monthly_revenue = products_per_month * avg_profit_per_product_usd
@@ -119,38 +166,18 @@ def calculate_revenue_by_schedule(schedule_info, days_in_month=31):
         'horas_por_dia': hours_per_day
     }
 
-def analyze_work_schedule_optimization(df_list):
+@cached_result()
+def compute_schedule_results(df_enero, schedules, intensidad=None):
     """
-    Análisis completo de optimización de horarios de trabajo
+    Costos, ingresos y utilidad de cada horario (sin salida en consola)
+
+    Con intensidad agrega las emisiones de enero, del mismo cálculo que el costo.
     """
-    print("="*100)
-    print("ANÁLISIS DE OPTIMIZACIÓN DE HORARIOS DE TRABAJO")
-    print("Mes de análisis: ENERO (mes más rentable)")
-    print("="*100)
-    
-    # Usar datos de enero (mes más rentable - índice 0)
-    df_enero = df_list[0]
-    
-    if df_enero.empty:
-        print("Error: No hay datos para enero")
-        return
-    
-    # Definir horarios
-    schedules = define_work_schedules()
-    
-    # Análisis para cada horario
     results = {}
     
-    print("\\nDETALLE DE HORARIOS PROPUESTOS:")
-    print("="*100)
-    
     for schedule_key, schedule_info in schedules.items():
-        print(f"\\n{schedule_info['nombre']}:")
-        print(f"  • {schedule_info['descripcion']}")
-        print(f"  • Total horas diarias: {schedule_info['total_horas']} horas")
-        
         # Calcular costos energéticos
-        energy_analysis = calculate_energy_cost_by_schedule(df_enero, schedule_info)
+        energy_analysis = calculate_energy_cost_by_schedule(df_enero, schedule_info, intensidad=intensidad)
         
         # Calcular ingresos
         revenue_analysis = calculate_revenue_by_schedule(schedule_info)
@@ -172,45 +199,143 @@ def analyze_work_schedule_optimization(df_list):
             'roi': (profit / energy_analysis['costo_total']) * 100 if energy_analysis['costo_total'] > 0 else 0,
             'margen': (profit / revenue_analysis['ingresos_mensuales']) * 100
         }
-        
-        print(f"  • Costo energético: ${energy_analysis['costo_total']:,.2f} USD")
-        print(f"  • Ingresos: ${revenue_analysis['ingresos_mensuales']:,.2f} USD")
-        print(f"  • Utilidad: ${profit:,.2f} USD")
-        print(f"  • Productos/mes: {revenue_analysis['productos_por_mes']:,.0f}")
+        if intensidad is not None:
+            results[schedule_key]['emisiones_tco2'] = energy_analysis['emisiones_tco2']
+    
+    return results
+
+def analyze_work_schedule_optimization(df_list, verbose=True, criterio='media', n_replicas=5000, flota=None,
+                                       intensidad=None):
+    """
+    Análisis completo de optimización de horarios de trabajo
+
+    Con verbose=False no imprime ni genera gráficas; solo devuelve los resultados.
+
+    flota (dict de argumentos de flota.optimize_fleet_levels, p. ej.
+    {'meta_diaria': 1200, 'rampa': 5}) agrega al análisis el modo de flota
+    parcial: robots activos por hora en enero, con su matriz de activación.
+
+    intensidad (tCO2/MWh, (días, 24) de carbono.align_intensity_to_grid)
+    agrega las emisiones de enero de cada horario.
+
+    criterio elige la mejor alternativa: 'media' (utilidad de enero), o en modo
+    robusto sobre días remuestreados 'cvar' (peores meses) o 'peor_k' (días pico).
+    """
+    if criterio not in CRITERIOS_RIESGO:
+        raise ValueError(f"Criterio no soportado: {criterio}. Opciones: {list(CRITERIOS_RIESGO)}")
+
+    if verbose:
+        print("="*100)
+        print("ANÁLISIS DE OPTIMIZACIÓN DE HORARIOS DE TRABAJO")
+        print("Mes de análisis: ENERO (mes más rentable)")
+        print("="*100)
     
-    # TABLA COMPARATIVA
-    print("\\n" + "="*120)
-    print("TABLA COMPARATIVA DE HORARIOS")
-    print("="*120)
+    # Usar datos de enero (mes más rentable - índice 0)
+    df_enero = df_list[0]
     
-    # Crear DataFrame para mejor visualización
-    df_comparison = pd.DataFrame(results).T
+    if df_enero.empty:
+        if verbose:
+            print("Error: No hay datos para enero")
+        return
     
-    print(f"{'Horario':<25} {'Horas/día':<10} {'Costos ($)':<15} {'Ingresos ($)':<15} {'Utilidad ($)':<15} {'ROI (%)':<10} {'Margen (%)':<12}")
-    print("-" * 120)
+    # Definir horarios
+    schedules = define_work_schedules()
     
-    for schedule_key, data in results.items():
-        print(f"{data['nombre']:<25} {data['total_horas']:<10} ${data['costo_energia']:<14,.0f} "
-              f"${data['ingresos']:<14,.0f} ${data['utilidad']:<14,.0f} {data['roi']:<9.0f}% {data['margen']:<11.1f}%")
+    # Análisis para cada horario (en caché por datos de enero + horarios)
+    results = dict(compute_schedule_results(df_enero, schedules, intensidad))
+
+    if flota is not None:
+        # Flota parcial: el optimizador elige los robots de cada hora; el horario cubre el día completo
+        price_grid = build_price_grid(df_list)
+        fleet_result = optimize_fleet_levels(price_grid, **flota)
+        robots_enero = fleet_result['robots_por_hora'][price_grid['mes'] == 1]
+        # Horas equivalentes de la flota completa (horas-robot diarias / 25 robots)
+        horas_equivalentes = robots_enero.sum() / (25 * len(robots_enero))
+        fleet_schedule = {'nombre': 'Flota Parcial', 'horas_trabajo': [(0, 24)], 'total_horas': horas_equivalentes}
+        fleet_energy = calculate_energy_cost_by_schedule(df_enero, fleet_schedule, robots_por_hora=robots_enero,
+                                                         intensidad=intensidad)
+        fleet_revenue = calculate_revenue_by_schedule(fleet_schedule)
+        fleet_profit = fleet_revenue['ingresos_mensuales'] - fleet_energy['costo_total']
+        results['Flota_Parcial'] = {
+            'nombre': fleet_schedule['nombre'],
+            'descripcion': 'Robots activos por hora según precio (matriz de activación)',
+            'total_horas': round(horas_equivalentes, 1),
+            'costo_energia': fleet_energy['costo_total'],
+            'ingresos': fleet_revenue['ingresos_mensuales'],
+            'utilidad': fleet_profit,
+            'productos_mes': fleet_revenue['productos_por_mes'],
+            'precio_promedio': fleet_energy['precio_promedio'],
+            'horas_trabajadas': fleet_energy['horas_trabajadas'],
+            'roi': (fleet_profit / fleet_energy['costo_total']) * 100 if fleet_energy['costo_total'] > 0 else 0,
+            'margen': (fleet_profit / fleet_revenue['ingresos_mensuales']) * 100
+        }
+        if intensidad is not None:
+            results['Flota_Parcial']['emisiones_tco2'] = fleet_energy['emisiones_tco2']
+
+    if verbose:
+        print("\\nDETALLE DE HORARIOS PROPUESTOS:")
+        print("="*100)
+        
+        for schedule_key, data in results.items():
+            print(f"\\n{data['nombre']}:")
+            print(f"  • {data['descripcion']}")
+            print(f"  • Total horas diarias: {data['total_horas']} horas")
+            print(f"  • Costo energético: ${data['costo_energia']:,.2f} USD")
+            print(f"  • Ingresos: ${data['ingresos']:,.2f} USD")
+            print(f"  • Utilidad: ${data['utilidad']:,.2f} USD")
+            print(f"  • Productos/mes: {data['productos_mes']:,.0f}")
+            if 'emisiones_tco2' in data:
+                print(f"  • Emisiones: {data['emisiones_tco2']:,.1f} tCO2")
+    
+        # TABLA COMPARATIVA
+        print("\\n" + "="*120)
+        print("TABLA COMPARATIVA DE HORARIOS")
+        print("="*120)
+    
+        # Crear DataFrame para mejor visualización
+        df_comparison = pd.DataFrame(results).T
+    
+        print(f"{'Horario':<25} {'Horas/día':<10} {'Costos ($)':<15} {'Ingresos ($)':<15} {'Utilidad ($)':<15} {'ROI (%)':<10} {'Margen (%)':<12}")
+        print("-" * 120)
+    
+        for schedule_key, data in results.items():
+            print(f"{data['nombre']:<25} {data['total_horas']:<10} ${data['costo_energia']:<14,.0f} "
+                  f"${data['ingresos']:<14,.0f} ${data['utilidad']:<14,.0f} {data['roi']:<9.0f}% {data['margen']:<11.1f}%")
+    
+        if flota is not None:
+            # Matriz de activación por hora del modo de flota parcial
+            print_activation_report(fleet_result, price_grid, 1)
     
     # IDENTIFICAR MEJOR ALTERNATIVA
     mejor_alternativa = max(results.items(), key=lambda x: x[1]['utilidad'])
     peor_alternativa = min(results.items(), key=lambda x: x[1]['utilidad'])
     
-    print("\\n" + "="*120)
-    print("ANÁLISIS DE RESULTADOS")
-    print("="*120)
-    
-    print(f"\\n🏆 MEJOR ALTERNATIVA: {mejor_alternativa[1]['nombre']}")
-    print(f"   • Utilidad: ${mejor_alternativa[1]['utilidad']:,.2f} USD")
-    print(f"   • ROI: {mejor_alternativa[1]['roi']:.0f}%")
-    print(f"   • Productos/mes: {mejor_alternativa[1]['productos_mes']:,.0f}")
-    print(f"   • {mejor_alternativa[1]['descripcion']}")
-    
-    print(f"\\n❌ PEOR ALTERNATIVA: {peor_alternativa[1]['nombre']}")
-    print(f"   • Utilidad: ${peor_alternativa[1]['utilidad']:,.2f} USD")
-    print(f"   • ROI: {peor_alternativa[1]['roi']:.0f}%")
-    print(f"   • {peor_alternativa[1]['descripcion']}")
+    if criterio != 'media':
+        # Modo robusto: bootstrap de los días de enero con los mismos días para todos los horarios
+        precios_enero = df_enero.iloc[:24, :31].to_numpy(dtype=float).T
+        ingresos_diarios = [calculate_revenue_by_schedule(info, days_in_month=1)['ingresos_mensuales']
+                            for info in schedules.values()]
+        tabla_riesgo, mejores = robust_schedule_ranking(precios_enero, schedules, ingresos_diarios,
+                                                        n_replicas=n_replicas)
+        mejor_alternativa = (mejores[criterio], results[mejores[criterio]])
+        if verbose:
+            print_risk_ranking(tabla_riesgo, mejores, {key: data['nombre'] for key, data in results.items()})
+    
+    if verbose:
+        print("\\n" + "="*120)
+        print("ANÁLISIS DE RESULTADOS")
+        print("="*120)
+    
+        print(f"\\n🏆 MEJOR ALTERNATIVA: {mejor_alternativa[1]['nombre']}")
+        print(f"   • Utilidad: ${mejor_alternativa[1]['utilidad']:,.2f} USD")
+        print(f"   • ROI: {mejor_alternativa[1]['roi']:.0f}%")
+        print(f"   • Productos/mes: {mejor_alternativa[1]['productos_mes']:,.0f}")
+        print(f"   • {mejor_alternativa[1]['descripcion']}")
+    
+        print(f"\\n❌ PEOR ALTERNATIVA: {peor_alternativa[1]['nombre']}")
+        print(f"   • Utilidad: ${peor_alternativa[1]['utilidad']:,.2f} USD")
+        print(f"   • ROI: {peor_alternativa[1]['roi']:.0f}%")
+        print(f"   • {peor_alternativa[1]['descripcion']}")
     
     # Comparar con horario actual
     actual_data = results['Actual']
@@ -219,15 +344,16 @@ def analyze_work_schedule_optimization(df_list):
     mejora_utilidad = mejor_data['utilidad'] - actual_data['utilidad']
     mejora_porcentual = (mejora_utilidad / actual_data['utilidad']) * 100
     
-    print(f"\\n💰 MEJORA vs HORARIO ACTUAL:")
-    print(f"   • Aumento en utilidad: ${mejora_utilidad:,.2f} USD")
-    print(f"   • Mejora porcentual: {mejora_porcentual:+.1f}%")
-    print(f"   • Aumento en productos: {mejor_data['productos_mes'] - actual_data['productos_mes']:,.0f} productos/mes")
+    if verbose:
+        print(f"\\n💰 MEJORA vs HORARIO ACTUAL:")
+        print(f"   • Aumento en utilidad: ${mejora_utilidad:,.2f} USD")
+        print(f"   • Mejora porcentual: {mejora_porcentual:+.1f}%")
+        print(f"   • Aumento en productos: {mejor_data['productos_mes'] - actual_data['productos_mes']:,.0f} productos/mes")
     
-    # ANÁLISIS POR HORAS DEL DÍA
-    print("\\n" + "="*120)
-    print("ANÁLISIS DE PRECIOS POR HORAS DEL DÍA (ENERO)")
-    print("="*120)
+        # ANÁLISIS POR HORAS DEL DÍA
+        print("\\n" + "="*120)
+        print("ANÁLISIS DE PRECIOS POR HORAS DEL DÍA (ENERO)")
+        print("="*120)
     
     # Calcular precio promedio por hora del día
     hourly_prices = []
@@ -239,45 +365,48 @@ def analyze_work_schedule_optimization(df_list):
         else:
             hourly_prices.append(0)
     
-    print("\\nPrecio promedio por hora (USD/MWh):")
-    for i in range(0, 24, 6):
-        hours_slice = hourly_prices[i:i+6]
-        hour_labels = [f"{h:02d}:00" for h in range(i, min(i+6, 24))]
-        print(f"{' | '.join(f'{label}: ${price:.2f}' for label, price in zip(hour_labels, hours_slice))}")
+    if verbose:
+        print("\\nPrecio promedio por hora (USD/MWh):")
+        for i in range(0, 24, 6):
+            hours_slice = hourly_prices[i:i+6]
+            hour_labels = [f"{h:02d}:00" for h in range(i, min(i+6, 24))]
+            print(f"{' | '.join(f'{label}: ${price:.2f}' for label, price in zip(hour_labels, hours_slice))}")
     
     # Identificar horas más baratas y caras
-    cheapest_hours = sorted(enumerate(hourly_prices), key=lambda x: x[1])[:5]
-    expensive_hours = sorted(enumerate(hourly_prices), key=lambda x: x[1], reverse=True)[:5]
+    hour_order = np.argsort(hourly_prices, kind='stable')
+    cheapest_hours = [(int(h), hourly_prices[h]) for h in hour_order[:5]]
+    expensive_hours = [(int(h), hourly_prices[h]) for h in hour_order[::-1][:5]]
     
-    print(f"\\n⬇️  HORAS MÁS BARATAS:")
-    for hour, price in cheapest_hours:
-        print(f"   • {hour:02d}:00 - ${price:.2f}/MWh")
+    if verbose:
+        print(f"\\n⬇️  HORAS MÁS BARATAS:")
+        for hour, price in cheapest_hours:
+            print(f"   • {hour:02d}:00 - ${price:.2f}/MWh")
     
-    print(f"\\n⬆️  HORAS MÁS CARAS:")
-    for hour, price in expensive_hours:
-        print(f"   • {hour:02d}:00 - ${price:.2f}/MWh")
+        print(f"\\n⬆️  HORAS MÁS CARAS:")
+        for hour, price in expensive_hours:
+            print(f"   • {hour:02d}:00 - ${price:.2f}/MWh")
     
-    # CREAR GRÁFICAS
-    create_schedule_comparison_charts(results, hourly_prices, schedules)
+        # CREAR GRÁFICAS
+        create_schedule_comparison_charts(results, hourly_prices, schedules)
     
-    # RECOMENDACIONES
-    print("\\n" + "="*120)
-    print("RECOMENDACIONES")
-    print("="*120)
+        # RECOMENDACIONES
+        print("\\n" + "="*120)
+        print("RECOMENDACIONES")
+        print("="*120)
     
-    print(f"\\n1. 🎯 HORARIO ÓPTIMO: {mejor_alternativa[1]['nombre']}")
-    print(f"   • Genera ${mejora_utilidad:,.2f} USD adicionales mensuales")
-    print(f"   • Incremento del {mejora_porcentual:.1f}% en rentabilidad")
+        print(f"\\n1. 🎯 HORARIO ÓPTIMO: {mejor_alternativa[1]['nombre']}")
+        print(f"   • Genera ${mejora_utilidad:,.2f} USD adicionales mensuales")
+        print(f"   • Incremento del {mejora_porcentual:.1f}% en rentabilidad")
     
-    print(f"\\n2. 📊 BENEFICIOS CLAVE:")
-    print(f"   • Mayor tiempo de operación (16 vs 12 horas/día)")
-    print(f"   • Mejor aprovechamiento de horas con precios favorables")
-    print(f"   • Descansos estratégicos para mantenimiento")
+        print(f"\\n2. 📊 BENEFICIOS CLAVE:")
+        print(f"   • Mayor tiempo de operación (16 vs 12 horas/día)")
+        print(f"   • Mejor aprovechamiento de horas con precios favorables")
+        print(f"   • Descansos estratégicos para mantenimiento")
     
-    print(f"\\n3. ⚡ OPTIMIZACIÓN ENERGÉTICA:")
-    print(f"   • Evitar horas pico de precios energéticos")
-    print(f"   • Aprovechar horas valle con precios más bajos")
-    print(f"   • Balance entre productividad y costos")
+        print(f"\\n3. ⚡ OPTIMIZACIÓN ENERGÉTICA:")
+        print(f"   • Evitar horas pico de precios energéticos")
+        print(f"   • Aprovechar horas valle con precios más bajos")
+        print(f"   • Balance entre productividad y costos")
     
     return results, mejor_alternativa, hourly_prices
 
@@ -387,9 +516,42 @@ def create_schedule_comparison_charts(results, hourly_prices, schedules):
     
     print("\\n📊 Gráficas guardadas como 'optimizacion_horarios_enero.png'")
 
-# Ejecutar análisis
-file_path = r"Modela1Fixeddata.xlsx"
-df_list: List[pd.DataFrame] = read_excel_sheets_to_dataframes(file_path)
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Optimización de horarios de trabajo en enero (pregunta 4)")
+    parser.add_argument('--intensidad', help="CSV o Excel con fecha, [hora], intensidad (tCO2/MWh) para reportar emisiones")
+    parser.add_argument('--precio-carbono', type=float, default=0.0, metavar='USD',
+                        help="Precio del carbono (USD/tCO2) con el que la flota parcial pondera las emisiones (con --intensidad)")
+    parser.add_argument('--latencia', type=int, metavar='HORAS',
+                        help="Diferir la demanda del horario actual hasta HORAS horas (desplazamiento.py)")
+    parser.add_argument('--backlog', type=float, metavar='PRODUCTOS',
+                        help="Productos pendientes máximos al diferir la demanda (con --latencia)")
+    args = parser.parse_args()
+
+    # Ejecutar análisis
+    file_path = r"Modela1Fixeddata.xlsx"
+    # Validación única al cargar (huecos cortos interpolados, máscara de calidad aplicada)
+    df_list, price_grid = load_price_data(file_path, fill_gaps=True)
+    warn_incomplete_months(price_grid)
+
+    # Serie opcional de intensidad de carbono alineada a la grilla de precios
+    intensidad = None
+    if args.intensidad:
+        intensidad = align_intensity_to_grid(price_grid, load_carbon_intensity(args.intensidad))
+
+    print("Iniciando análisis de optimización de horarios...")
+    # Incluye el modo de flota parcial (misma producción que el horario actual, rampa de 5 robots)
+    flota = {'meta_diaria': 1200, 'rampa': 5}
+    if intensidad is not None:
+        flota.update(intensidad_carbono=intensidad, precio_carbono=args.precio_carbono)
+    resultados_horarios, mejor_horario, precios_hora = analyze_work_schedule_optimization(
+        df_list, flota=flota, intensidad=intensidad)
 
-print("Iniciando análisis de optimización de horarios...")
-resultados_horarios, mejor_horario, precios_hora = analyze_work_schedule_optimization(df_list)
\ No newline at end of file
+    if args.latencia is not None:
+        # Demanda diferible: llega al ritmo del horario actual (25 robots × 4 productos/h, 8:00-20:00)
+        llegadas = np.zeros(24)
+        llegadas[8:20] = 25 * 60 / 15
+        desplazamiento = optimize_load_shifting(price_grid, llegadas, latencia_max=args.latencia,
+                                                backlog_max=args.backlog)
+        print_load_shifting_report(desplazamiento, args.latencia, args.backlog)
@@ -7,6 +7,15 @@ import calendar
 from typing import List, Dict
 import warnings
 warnings.filterwarnings('ignore')
+from datos import build_price_grid, price_grid_from_records
+from validacion import load_price_data, warn_incomplete_months
+from ahorros import evaluate_savings_policies, valley_hours_by_month
+from calendario import DIAS_SEMANA, ESTACIONES, build_calendar_context
+from indice_precios import build_price_rank_index, cheapest_hours, hours_below_quantile, hours_above_quantile
+from perfiles import build_profile_table, best_worst_hours_by_classification
+from agregados_graficas import aggregate_context_table
+from resultados import context_result
+from anomalias import detect_spikes, add_spike_flags, spike_cost_breakdown
 
 def read_excel_sheets_to_dataframes(file_path):
     """
@@ -169,42 +178,116 @@ def map_energy_data_with_context(df_list, calendar_df):
     
     return pd.DataFrame(energy_context_data)
 
-def comprehensive_energy_analysis(df_list):
+def compute_context_analysis(df_list, perfil=None):
     """
-    Análisis integral de datos energéticos con variables contextuales
+    Calcula todos los agregados del análisis integral (sin impresión ni gráficas)
+
+    Args:
+        df_list: Hojas mensuales de precios
+        perfil: Tabla de perfiles.py ya construida; None = se construye desde los datos
+
+    La tabla hora-día lleva la columna 'es_pico' (anomalias.detect_spikes) y
+    los análisis por día de semana y estación agregan el precio promedio sin
+    horas pico, para separar el nivel de precios de los picos aislados.
+
+    Returns:
+        dict: Tabla hora-día, calendario, análisis por factor, mejores horas por
+              tipo de día, picos de precio y oportunidades de ahorro
+    """
+    # Calendario contextual y tabla hora-día con las horas pico marcadas
+    calendar_df = create_guatemala_calendar_2023()
+    price_grid = build_price_grid(df_list)
+    spikes = detect_spikes(price_grid)
+    energy_context_df = add_spike_flags(map_energy_data_with_context(df_list, calendar_df), price_grid, spikes)
+    sin_picos = energy_context_df[~energy_context_df['es_pico']]
+    
+    # ANÁLISIS POR DÍA DE LA SEMANA
+    weekday_analysis = energy_context_df.groupby('dia_semana_nombre').agg({
+        'precio_mwh': ['mean', 'std', 'min', 'max', 'count']
+    }).round(2)
+    weekday_analysis.columns = ['Precio_Promedio', 'Desviacion_Std', 'Precio_Min', 'Precio_Max', 'Registros']
+    weekday_analysis['Precio_Sin_Picos'] = sin_picos.groupby('dia_semana_nombre')['precio_mwh'].mean().round(2)
+    weekday_analysis['Horas_Pico'] = energy_context_df.groupby('dia_semana_nombre')['es_pico'].sum()
+    weekday_analysis = weekday_analysis.sort_values('Precio_Promedio')
+    
+    # ANÁLISIS POR CLASIFICACIÓN
+    classification_analysis = energy_context_df.groupby('clasificacion').agg({
+        'precio_mwh': ['mean', 'std', 'count']
+    }).round(2)
+    classification_analysis.columns = ['Precio_Promedio', 'Desviacion_Std', 'Registros']
+    classification_analysis = classification_analysis.sort_values('Precio_Promedio')
+    
+    # ANÁLISIS POR ESTACIÓN
+    season_analysis = energy_context_df.groupby('estacion').agg({
+        'precio_mwh': ['mean', 'std', 'min', 'max', 'count']
+    }).round(2)
+    season_analysis.columns = ['Precio_Promedio', 'Desviacion_Std', 'Precio_Min', 'Precio_Max', 'Registros']
+    season_analysis['Precio_Sin_Picos'] = sin_picos.groupby('estacion')['precio_mwh'].mean().round(2)
+    season_analysis['Horas_Pico'] = energy_context_df.groupby('estacion')['es_pico'].sum()
+    season_analysis = season_analysis.sort_values('Precio_Promedio')
+    
+    # ANÁLISIS CICLO ESCOLAR
+    school_analysis = energy_context_df.groupby('ciclo_escolar_activo').agg({
+        'precio_mwh': ['mean', 'std', 'count']
+    }).round(2)
+    school_analysis.columns = ['Precio_Promedio', 'Desviacion_Std', 'Registros']
+    school_analysis.index = ['Vacaciones Escolares', 'Ciclo Escolar Activo']
+    
+    # ANÁLISIS DE FERIADOS
+    holiday_analysis = energy_context_df.groupby('es_feriado').agg({
+        'precio_mwh': ['mean', 'std', 'count']
+    }).round(2)
+    holiday_analysis.columns = ['Precio_Promedio', 'Desviacion_Std', 'Registros']
+    holiday_analysis.index = ['Días Regulares', 'Días Feriados']
+    
+    # Mejores y peores horarios por tipo de día desde el perfil por contexto
+    # (tabla precalculada de perfiles.py, sin recorrer la tabla horaria)
+    if perfil is None:
+        perfil = build_profile_table(price_grid)
+    best_hours_by_type = best_worst_hours_by_classification(perfil)
+    
+    # ANÁLISIS DE OPORTUNIDADES
+    oportunidades = compute_optimization_opportunities(energy_context_df, price_grid=price_grid, perfil=perfil)
+    
+    return {
+        'tabla_contexto': energy_context_df,
+        'calendario': calendar_df,
+        'por_dia_semana': weekday_analysis,
+        'por_clasificacion': classification_analysis,
+        'por_estacion': season_analysis,
+        'por_ciclo_escolar': school_analysis,
+        'por_feriado': holiday_analysis,
+        'mejores_horas_por_tipo': best_hours_by_type,
+        'picos': spike_cost_breakdown(price_grid, spikes),
+        'oportunidades': oportunidades
+    }
+
+def print_context_analysis(analisis, graficas=True):
+    """
+    Muestra en consola el análisis integral ya calculado (compute_context_analysis)
+
+    Con graficas=True también genera las gráficas y las recomendaciones.
     """
+    energy_context_df = analisis['tabla_contexto']
+    weekday_analysis = analisis['por_dia_semana']
+    season_analysis = analisis['por_estacion']
+    best_hours_by_type = analisis['mejores_horas_por_tipo']
+    
     print("="*100)
     print("ANÁLISIS INTEGRAL DE DATOS ENERGÉTICOS CON VARIABLES CONTEXTUALES")
     print("Guatemala 2023")
     print("="*100)
-    
-    # Crear calendario contextual
-    print("\\n📅 Creando calendario contextual de Guatemala 2023...")
-    calendar_df = create_guatemala_calendar_2023()
-    
-    # Mapear datos energéticos con contexto
-    print("🔗 Mapeando datos energéticos con variables contextuales...")
-    energy_context_df = map_energy_data_with_context(df_list, calendar_df)
-    
     print(f"✅ Datos procesados: {len(energy_context_df):,} registros hora-día")
     
     # ANÁLISIS POR DÍA DE LA SEMANA
     print("\\n" + "="*80)
     print("ANÁLISIS POR DÍA DE LA SEMANA")
     print("="*80)
-    
-    weekday_analysis = energy_context_df.groupby('dia_semana_nombre').agg({
-        'precio_mwh': ['mean', 'std', 'min', 'max', 'count']
-    }).round(2)
-    weekday_analysis.columns = ['Precio_Promedio', 'Desviacion_Std', 'Precio_Min', 'Precio_Max', 'Registros']
-    weekday_analysis = weekday_analysis.sort_values('Precio_Promedio')
-    
     print("\\nPrecios promedio por día de la semana (USD/MWh):")
     print(weekday_analysis)
     
     dia_mas_barato = weekday_analysis.index[0]
     dia_mas_caro = weekday_analysis.index[-1]
-    
     print(f"\\n🟢 Día MÁS BARATO: {dia_mas_barato} (${weekday_analysis.loc[dia_mas_barato, 'Precio_Promedio']:.2f}/MWh)")
     print(f"🔴 Día MÁS CARO: {dia_mas_caro} (${weekday_analysis.loc[dia_mas_caro, 'Precio_Promedio']:.2f}/MWh)")
     
@@ -212,33 +295,18 @@ def comprehensive_energy_analysis(df_list):
     print("\\n" + "="*80)
     print("ANÁLISIS POR CLASIFICACIÓN DE DÍAS")
     print("="*80)
-    
-    classification_analysis = energy_context_df.groupby('clasificacion').agg({
-        'precio_mwh': ['mean', 'std', 'count']
-    }).round(2)
-    classification_analysis.columns = ['Precio_Promedio', 'Desviacion_Std', 'Registros']
-    classification_analysis = classification_analysis.sort_values('Precio_Promedio')
-    
     print("\\nPrecios promedio por clasificación:")
-    print(classification_analysis)
+    print(analisis['por_clasificacion'])
     
     # ANÁLISIS POR ESTACIÓN
     print("\\n" + "="*80)
     print("ANÁLISIS POR ESTACIÓN DEL AÑO")
     print("="*80)
-    
-    season_analysis = energy_context_df.groupby('estacion').agg({
-        'precio_mwh': ['mean', 'std', 'min', 'max', 'count']
-    }).round(2)
-    season_analysis.columns = ['Precio_Promedio', 'Desviacion_Std', 'Precio_Min', 'Precio_Max', 'Registros']
-    season_analysis = season_analysis.sort_values('Precio_Promedio')
-    
     print("\\nPrecios promedio por estación:")
     print(season_analysis)
     
     estacion_mas_barata = season_analysis.index[0]
     estacion_mas_cara = season_analysis.index[-1]
-    
     print(f"\\n🌿 Estación MÁS BARATA: {estacion_mas_barata} (${season_analysis.loc[estacion_mas_barata, 'Precio_Promedio']:.2f}/MWh)")
     print(f"🌡️  Estación MÁS CARA: {estacion_mas_cara} (${season_analysis.loc[estacion_mas_cara, 'Precio_Promedio']:.2f}/MWh)")
     
@@ -246,70 +314,76 @@ def comprehensive_energy_analysis(df_list):
     print("\\n" + "="*80)
     print("ANÁLISIS CICLO ESCOLAR")
     print("="*80)
-    
-    school_analysis = energy_context_df.groupby('ciclo_escolar_activo').agg({
-        'precio_mwh': ['mean', 'std', 'count']
-    }).round(2)
-    school_analysis.columns = ['Precio_Promedio', 'Desviacion_Std', 'Registros']
-    school_analysis.index = ['Vacaciones Escolares', 'Ciclo Escolar Activo']
-    
     print("\\nPrecios promedio según ciclo escolar:")
-    print(school_analysis)
+    print(analisis['por_ciclo_escolar'])
     
     # ANÁLISIS DE FERIADOS
     print("\\n" + "="*80)
     print("ANÁLISIS DE DÍAS FERIADOS")
     print("="*80)
-    
-    holiday_analysis = energy_context_df.groupby('es_feriado').agg({
-        'precio_mwh': ['mean', 'std', 'count']
-    }).round(2)
-    holiday_analysis.columns = ['Precio_Promedio', 'Desviacion_Std', 'Registros']
-    holiday_analysis.index = ['Días Regulares', 'Días Feriados']
-    
     print("\\nPrecios promedio en días feriados vs regulares:")
-    print(holiday_analysis)
+    print(analisis['por_feriado'])
     
     # ANÁLISIS POR HORA Y CONTEXTO
     print("\\n" + "="*80)
     print("ANÁLISIS COMBINADO: HORA + CONTEXTO")
     print("="*80)
-    
-    # Mejores y peores horarios por tipo de día
-    best_hours_by_type = {}
-    
-    for tipo in energy_context_df['clasificacion'].unique():
-        tipo_data = energy_context_df[energy_context_df['clasificacion'] == tipo]
-        hourly_avg = tipo_data.groupby('hora')['precio_mwh'].mean().sort_values()
-        
-        best_hours_by_type[tipo] = {
-            'mejor_hora': hourly_avg.index[0],
-            'mejor_precio': hourly_avg.iloc[0],
-            'peor_hora': hourly_avg.index[-1],
-            'peor_precio': hourly_avg.iloc[-1]
-        }
-    
     print("\\nMejores y peores horas por tipo de día:")
     for tipo, data in best_hours_by_type.items():
         print(f"\\n{tipo}:")
         print(f"  🟢 Mejor hora: {data['mejor_hora']:02d}:00 (${data['mejor_precio']:.2f}/MWh)")
         print(f"  🔴 Peor hora: {data['peor_hora']:02d}:00 (${data['peor_precio']:.2f}/MWh)")
     
-    # CREAR GRÁFICAS AVANZADAS
-    create_comprehensive_charts(energy_context_df)
+    # PICOS DE PRECIO EN EL HORARIO ACTUAL
+    picos = analisis['picos']
+    print("\\n" + "="*80)
+    print("PICOS DE PRECIO (HORARIO ACTUAL 08:00-20:00)")
+    print("="*80)
+    print(f"\\nHoras pico en el año: {int(energy_context_df['es_pico'].sum()):,}")
+    print(f"Costo en horas pico: ${picos['Costo_Picos'].sum():,.2f} USD "
+          f"({picos['Costo_Picos'].sum() / picos['Costo_Total'].sum() * 100:.1f}% del costo anual)")
+    print(f"Sobrecosto sobre el precio de referencia: ${picos['Sobrecosto_Picos'].sum():,.2f} USD")
+    print(f"Costo anual excluyendo picos: ${picos['Costo_Excluyendo_Picos'].sum():,.2f} USD")
     
-    # RECOMENDACIONES ESTRATÉGICAS
-    generate_strategic_recommendations(energy_context_df, weekday_analysis, season_analysis, best_hours_by_type)
+    if graficas:
+        # CREAR GRÁFICAS AVANZADAS
+        create_comprehensive_charts(energy_context_df)
     
-    # ANÁLISIS DE OPORTUNIDADES
-    identify_optimization_opportunities(energy_context_df)
+        # RECOMENDACIONES ESTRATÉGICAS
+        generate_strategic_recommendations(energy_context_df, weekday_analysis, season_analysis, best_hours_by_type)
     
-    return energy_context_df, calendar_df
+    # ANÁLISIS DE OPORTUNIDADES
+    print_optimization_opportunities(analisis['oportunidades'])
 
-def create_comprehensive_charts(energy_context_df):
+def comprehensive_energy_analysis(df_list, verbose=True):
+    """
+    Análisis integral de datos energéticos con variables contextuales
+
+    El cálculo (compute_context_analysis) y la presentación
+    (print_context_analysis) van por separado; con verbose=False solo calcula.
+
+    Returns:
+        ResultadoAnalisis: Agregados por factor, mejores horas y ahorros; la
+        tabla hora-día, el calendario y las oportunidades van en 'datos'
+    """
+    analisis = compute_context_analysis(df_list)
+    if verbose:
+        print_context_analysis(analisis)
+    return context_result(analisis)
+
+def create_comprehensive_charts(energy_context_df, agregados=None):
     """
     Crear gráficas comprehensivas del análisis
+
+    Las 12 gráficas salen de agregados_graficas.ChartAggregates (promedios por
+    grupo, histogramas por estación y co-momentos), no de la tabla completa:
+    el costo no crece con los años de historia. Se puede pasar un estado ya
+    acumulado (ej. varios años con aggregate_price_grids) en agregados.
     """
+    if agregados is None:
+        agregados = aggregate_context_table(energy_context_df)
+    data = agregados.chart_data()
+    
     plt.style.use('seaborn-v0_8')
     fig = plt.figure(figsize=(24, 16))
     
@@ -318,7 +392,7 @@ def create_comprehensive_charts(energy_context_df):
     
     # Gráfica 1: Precios por día de la semana
     ax1 = plt.subplot(3, 4, 1)
-    weekday_avg = energy_context_df.groupby('dia_semana_nombre')['precio_mwh'].mean().sort_values()
+    weekday_avg = data['por_dia_semana']
     bars1 = plt.bar(range(len(weekday_avg)), weekday_avg.values, color=colors[0], alpha=0.8)
     plt.title('Precio Promedio por Día\\nde la Semana', fontsize=12, fontweight='bold')
     plt.xlabel('Día de la Semana')
@@ -328,7 +402,7 @@ def create_comprehensive_charts(energy_context_df):
     
     # Gráfica 2: Precios por estación
     ax2 = plt.subplot(3, 4, 2)
-    season_avg = energy_context_df.groupby('estacion')['precio_mwh'].mean().sort_values()
+    season_avg = data['por_estacion']
     bars2 = plt.bar(range(len(season_avg)), season_avg.values, color=colors[1], alpha=0.8)
     plt.title('Precio Promedio por\\nEstación del Año', fontsize=12, fontweight='bold')
     plt.xlabel('Estación')
@@ -336,16 +410,10 @@ def create_comprehensive_charts(energy_context_df):
     plt.xticks(range(len(season_avg)), season_avg.index, rotation=45)
     plt.grid(True, alpha=0.3, axis='y')
     
-    # Gráfica 3: Heatmap hora vs día de semana
+    # Gráfica 3: Heatmap hora vs día de semana (columnas de lunes a domingo)
     ax3 = plt.subplot(3, 4, 3)
-    pivot_data = energy_context_df.pivot_table(values='precio_mwh', 
-                                              index='hora', 
-                                              columns='dia_semana_nombre', 
-                                              aggfunc='mean')
-    
-    # Reordenar columnas para que empiecen en lunes
-    day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    pivot_data = pivot_data.reindex(columns=day_order)
+    pivot_data = data['hora_dia_semana']
+    day_order = list(pivot_data.columns)
     
     sns.heatmap(pivot_data, cmap='RdYlBu_r', cbar_kws={'label': 'Precio (USD/MWh)'}, 
                 fmt='.1f', linewidths=0.1)
@@ -356,7 +424,7 @@ def create_comprehensive_charts(energy_context_df):
     
     # Gráfica 4: Clasificación de días
     ax4 = plt.subplot(3, 4, 4)
-    classification_avg = energy_context_df.groupby('clasificacion')['precio_mwh'].mean().sort_values()
+    classification_avg = data['por_clasificacion']
     bars4 = plt.bar(range(len(classification_avg)), classification_avg.values, color=colors[2], alpha=0.8)
     plt.title('Precio por Clasificación\\nde Días', fontsize=12, fontweight='bold')
     plt.xlabel('Clasificación')
@@ -366,8 +434,8 @@ def create_comprehensive_charts(energy_context_df):
     
     # Gráfica 5: Evolución mensual con contexto
     ax5 = plt.subplot(3, 4, 5)
-    monthly_avg = energy_context_df.groupby('mes')['precio_mwh'].mean()
-    monthly_escolar = energy_context_df.groupby(['mes', 'ciclo_escolar_activo'])['precio_mwh'].mean().unstack()
+    monthly_avg = data['por_mes']
+    monthly_escolar = data['mes_ciclo']
     
     if True in monthly_escolar.columns and False in monthly_escolar.columns:
         plt.plot(monthly_avg.index, monthly_escolar[True], 'o-', label='Ciclo Escolar', color=colors[3], linewidth=2)
@@ -382,13 +450,9 @@ def create_comprehensive_charts(energy_context_df):
     plt.xticks(range(1, 13))
     plt.grid(True, alpha=0.3)
     
-    # Gráfica 6: Boxplot por estación
+    # Gráfica 6: Boxplot por estación (cuartiles desde histogramas, dibujado con bxp)
     ax6 = plt.subplot(3, 4, 6)
-    seasons_order = ['Invierno', 'Primavera', 'Verano', 'Otoño']
-    season_data = [energy_context_df[energy_context_df['estacion'] == season]['precio_mwh'].values 
-                   for season in seasons_order]
-    
-    box_plot = plt.boxplot(season_data, labels=[s[:3] for s in seasons_order], patch_artist=True)
+    box_plot = ax6.bxp(data['boxplot_estacion'], patch_artist=True)
     for patch, color in zip(box_plot['boxes'], colors):
         patch.set_facecolor(color)
         patch.set_alpha(0.7)
@@ -400,7 +464,7 @@ def create_comprehensive_charts(energy_context_df):
     
     # Gráfica 7: Feriados vs días regulares
     ax7 = plt.subplot(3, 4, 7)
-    holiday_comparison = energy_context_df.groupby(['hora', 'es_feriado'])['precio_mwh'].mean().unstack()
+    holiday_comparison = data['hora_feriado']
     
     if True in holiday_comparison.columns and False in holiday_comparison.columns:
         plt.plot(holiday_comparison.index, holiday_comparison[False], 'o-', 
@@ -416,7 +480,7 @@ def create_comprehensive_charts(energy_context_df):
     
     # Gráfica 8: Fin de semana vs semana laboral
     ax8 = plt.subplot(3, 4, 8)
-    weekend_comparison = energy_context_df.groupby(['hora', 'es_fin_de_semana'])['precio_mwh'].mean().unstack()
+    weekend_comparison = data['hora_fin_de_semana']
     
     if True in weekend_comparison.columns and False in weekend_comparison.columns:
         plt.plot(weekend_comparison.index, weekend_comparison[False], 'o-', 
@@ -432,10 +496,7 @@ def create_comprehensive_charts(energy_context_df):
     
     # Gráfica 9: Heatmap estación vs hora
     ax9 = plt.subplot(3, 4, 9)
-    season_hour_pivot = energy_context_df.pivot_table(values='precio_mwh', 
-                                                     index='hora', 
-                                                     columns='estacion', 
-                                                     aggfunc='mean')
+    season_hour_pivot = data['hora_estacion']
     
     sns.heatmap(season_hour_pivot, cmap='RdYlBu_r', cbar_kws={'label': 'Precio (USD/MWh)'}, 
                 fmt='.1f', linewidths=0.1)
@@ -445,7 +506,7 @@ def create_comprehensive_charts(energy_context_df):
     
     # Gráfica 10: Variabilidad por mes
     ax10 = plt.subplot(3, 4, 10)
-    monthly_std = energy_context_df.groupby('mes')['precio_mwh'].std()
+    monthly_std = data['std_mes']
     plt.bar(monthly_std.index, monthly_std.values, color=colors[4], alpha=0.8)
     plt.title('Variabilidad de Precios\\npor Mes', fontsize=12, fontweight='bold')
     plt.xlabel('Mes')
@@ -453,16 +514,9 @@ def create_comprehensive_charts(energy_context_df):
     plt.xticks(range(1, 13))
     plt.grid(True, alpha=0.3, axis='y')
     
-    # Gráfica 11: Correlación entre variables
+    # Gráfica 11: Correlación entre variables (co-momentos acumulados)
     ax11 = plt.subplot(3, 4, 11)
-    
-    # Crear variables numéricas para correlación
-    corr_data = energy_context_df[['precio_mwh', 'hora', 'mes', 'dia_semana_num']].copy()
-    corr_data['es_fin_de_semana_num'] = energy_context_df['es_fin_de_semana'].astype(int)
-    corr_data['es_feriado_num'] = energy_context_df['es_feriado'].astype(int)
-    corr_data['ciclo_escolar_num'] = energy_context_df['ciclo_escolar_activo'].astype(int)
-    
-    correlation_matrix = corr_data.corr()
+    correlation_matrix = data['correlacion']
     sns.heatmap(correlation_matrix, annot=True, cmap='RdBu_r', center=0, 
                 fmt='.2f', linewidths=0.5)
     plt.title('Matriz de Correlación', fontsize=12, fontweight='bold')
@@ -474,9 +528,10 @@ def create_comprehensive_charts(energy_context_df):
     ax12.axis('off')
     
     # Calcular insights clave
-    cheapest_day = energy_context_df.groupby('dia_semana_nombre')['precio_mwh'].mean().idxmin()
-    cheapest_season = energy_context_df.groupby('estacion')['precio_mwh'].mean().idxmin()
-    cheapest_hour = energy_context_df.groupby('hora')['precio_mwh'].mean().idxmin()
+    cheapest_day = data['dia_mas_barato']
+    cheapest_season = data['estacion_mas_barata']
+    cheapest_hour = data['hora_mas_barata']
+    total_records = data['registros']
     
     insights_text = f'''INSIGHTS CLAVE
     
@@ -490,7 +545,7 @@ def create_comprehensive_charts(energy_context_df):
 {cheapest_hour:02d}:00
 
 📊 REGISTROS TOTALES:
-{len(energy_context_df):,}
+{total_records:,}
 
 🎯 OPORTUNIDAD:
 Optimizar horarios según
@@ -547,110 +602,198 @@ def generate_strategic_recommendations(energy_context_df, weekday_analysis, seas
         print(f"   • Peor horario: {data['peor_hora']:02d}:00 (${data['peor_precio']:.2f}/MWh)")
         print(f"   • Ahorro horario: ${ahorro_horario:.2f}/MWh ({(ahorro_horario/precio_promedio_general)*100:.1f}%)")
 
-def identify_optimization_opportunities(energy_context_df):
+def _day_characteristics(context, day_pos, n=3):
     """
-    Identificar oportunidades específicas de optimización
+    Combinaciones (día de semana, feriado, estación) más frecuentes entre las celdas dadas
+
+    Se cuentan con bincount sobre un código por día (7 × 2 × 4 combinaciones).
+    """
+    codes = (context['dia_semana'] * 2 + context['es_feriado'].astype(int)) * len(ESTACIONES) + context['estacion']
+    counts = np.bincount(codes[day_pos], minlength=len(DIAS_SEMANA) * 2 * len(ESTACIONES))
+    top = np.argsort(-counts, kind='stable')[:n]
+    top = top[counts[top] > 0]
+    dia, resto = np.divmod(top, 2 * len(ESTACIONES))
+    feriado, estacion = np.divmod(resto, len(ESTACIONES))
+    index = pd.MultiIndex.from_arrays([[DIAS_SEMANA[d] for d in dia], feriado.astype(bool),
+                                       [ESTACIONES[e] for e in estacion]],
+                                      names=['dia_semana_nombre', 'es_feriado', 'estacion'])
+    return pd.Series(counts[top], index=index)
+
+def compute_optimization_opportunities(energy_context_df, price_grid=None, perfil=None, indice=None):
+    """
+    Calcula las oportunidades específicas de optimización (sin salida en consola)
+
+    Los ahorros salen de re-preciar el año completo con cada política sobre la
+    grilla horaria (ahorros.evaluate_savings_policies), no de diferencias de
+    promedios por factores fijos. El total es el de la política combinada, sin
+    contar dos veces las horas que mueven dos políticas a la vez ni aplicar las
+    que encarecen la operación a precios observados. Con perfil
+    (perfiles.py) las políticas se deciden con precios esperados por contexto.
+
+    Las horas pico y los días del primer y último cuartil salen del índice de
+    rangos (indice_precios), sin ordenar ni calcular cuantiles sobre la tabla
+    completa; se puede pasar un índice ya construido.
+
+    Returns:
+        dict: Ahorros estimados y contexto de cada oportunidad
     """
-    print("\\n" + "="*100)
-    print("OPORTUNIDADES DE OPTIMIZACIÓN IDENTIFICADAS")
-    print("="*100)
-    
     # Calcular consumo actual del sistema
     num_robots = 25
     consumption_per_robot = 0.2
-    total_consumption_per_hour = num_robots * consumption_per_robot
     
-    # Análisis de oportunidades
-    precio_promedio = energy_context_df['precio_mwh'].mean()
+    if price_grid is None:
+        price_grid = price_grid_from_records(energy_context_df['fecha'], energy_context_df['hora'],
+                                             energy_context_df['precio_mwh'])
+    context = build_calendar_context(price_grid)
+    if indice is None:
+        indice = build_price_rank_index(price_grid, context)
+    politicas = evaluate_savings_policies(price_grid, context=context, num_robots=num_robots,
+                                          consumption_per_robot=consumption_per_robot, perfil=perfil)
+    tabla_politicas = politicas['tabla'].set_index('Politica')
+    ahorros = tabla_politicas['Ahorro_Anual']
     
     # Oportunidad 1: Optimización por día de semana
-    print("\\n💡 OPORTUNIDAD 1: OPTIMIZACIÓN POR DÍA DE SEMANA")
     weekday_savings = energy_context_df.groupby('dia_semana_nombre')['precio_mwh'].mean()
-    mejor_dia_week = weekday_savings.idxmin()
-    peor_dia_week = weekday_savings.idxmax()
-    ahorro_semanal = (weekday_savings[peor_dia_week] - weekday_savings[mejor_dia_week]) * total_consumption_per_hour * 12  # 12 horas/día
     
-    print(f"• Concentrar operaciones en {mejor_dia_week}")
-    print(f"• Reducir operaciones en {peor_dia_week}")
-    print(f"• Ahorro potencial: ${ahorro_semanal:.2f} USD por día de cambio")
-    print(f"• Ahorro mensual estimado: ${ahorro_semanal * 4:.2f} USD")
+    # Oportunidad 2: Horarios valle (las horas que re-precia la política, por mes)
+    valle_por_mes = valley_hours_by_month(price_grid, politicas['mascaras']['Horas valle'],
+                                          politicas['mascaras']['Actual'])
+    top_5_expensive = pd.Series(dict(cheapest_hours(indice, 5, mas_caras=True)))
+    
+    # Oportunidad 3: Estrategia estacional
+    seasonal_avg = energy_context_df.groupby('estacion')['precio_mwh'].mean()
+    
+    # Oportunidad 4: Calendario inteligente (celdas del primer y último cuartil de precio)
+    best_day_chars = _day_characteristics(context, hours_below_quantile(indice, 0.25)[0])
+    worst_day_chars = _day_characteristics(context, hours_above_quantile(indice, 0.75)[0])
+    
+    return {
+        'mejor_dia': weekday_savings.idxmin(),
+        'peor_dia': weekday_savings.idxmax(),
+        'ahorro_semanal_mensual': ahorros['Traslado semanal'] / 12,
+        'horas_valle': valle_por_mes,
+        'horas_pico': list(top_5_expensive.index),
+        'precio_horas_pico': top_5_expensive,
+        'ahorro_horario_mensual': ahorros['Horas valle'] / 12,
+        'ahorro_mantenimiento_anual': ahorros['Mantenimiento estacional'],
+        'mejor_estacion': seasonal_avg.idxmin(),
+        'peor_estacion': seasonal_avg.idxmax(),
+        'precio_por_estacion': seasonal_avg,
+        'estacion_mantenimiento': politicas['peor_estacion'],
+        'caracteristicas_mejores': best_day_chars,
+        'caracteristicas_peores': worst_day_chars,
+        'ahorro_total_mensual': ahorros['Combinada'] / 12,
+        'ahorro_total_anual': ahorros['Combinada'],
+        'porcentaje_ahorro': tabla_politicas.loc['Combinada', 'Ahorro_Pct'],
+        'politicas_combinada': politicas['politicas_combinada'],
+        'traslape': politicas['traslape'],
+        'perdida': politicas['perdida'],
+        'politicas': politicas['tabla']
+    }
+
+def print_optimization_opportunities(oportunidades):
+    """
+    Muestra las oportunidades calculadas por compute_optimization_opportunities
+    """
+    print("\\n" + "="*100)
+    print("OPORTUNIDADES DE OPTIMIZACIÓN IDENTIFICADAS")
+    print("="*100)
+    
+    # Oportunidad 1: Optimización por día de semana
+    ahorro_semanal_anual = oportunidades['ahorro_semanal_mensual'] * 12
+    print("\\n💡 OPORTUNIDAD 1: OPTIMIZACIÓN POR DÍA DE SEMANA")
+    print(f"• Concentrar operaciones en {oportunidades['mejor_dia']}")
+    print(f"• Reducir operaciones en {oportunidades['peor_dia']}")
+    print(f"• Ahorro anual re-preciando cada semana: ${ahorro_semanal_anual:,.2f} USD")
+    print(f"• Ahorro mensual promedio: ${ahorro_semanal_anual / 12:,.2f} USD")
     
     # Oportunidad 2: Horarios valle
     print("\\n💡 OPORTUNIDAD 2: APROVECHAMIENTO DE HORARIOS VALLE")
-    hourly_avg = energy_context_df.groupby('hora')['precio_mwh'].mean().sort_values()
-    top_5_cheapest = hourly_avg.head(5)
-    top_5_expensive = hourly_avg.tail(5)
-    
-    print("\\nHorarios MÁS BARATOS (Valle):")
-    for hora, precio in top_5_cheapest.items():
-        print(f"  • {hora:02d}:00 - ${precio:.2f}/MWh")
+    print("\\nHorarios valle de cada mes (las horas más baratas que usa la política):")
+    for _, fila in oportunidades['horas_valle'].iterrows():
+        print(f"  • {fila['Mes']:<11} {fila['Horario']:<40} ${fila['Precio_Valle']:.2f}/MWh "
+              f"(actual ${fila['Precio_Actual']:.2f}/MWh)")
     
     print("\\nHorarios MÁS CAROS (Pico):")
-    for hora, precio in top_5_expensive.items():
+    for hora, precio in oportunidades['precio_horas_pico'].items():
         print(f"  • {hora:02d}:00 - ${precio:.2f}/MWh")
     
-    ahorro_horario_max = top_5_expensive.mean() - top_5_cheapest.mean()
-    ahorro_por_cambio_horario = ahorro_horario_max * total_consumption_per_hour
-    
-    print(f"\\n• Ahorro por cambiar de horario pico a valle: ${ahorro_por_cambio_horario:.2f} USD/hora")
-    print(f"• Ahorro diario (12 horas): ${ahorro_por_cambio_horario * 12:.2f} USD")
-    print(f"• Ahorro mensual: ${ahorro_por_cambio_horario * 12 * 30:.2f} USD")
+    ahorro_horario_anual = oportunidades['ahorro_horario_mensual'] * 12
+    print(f"\\n• Ahorro anual trabajando las {oportunidades['horas_valle']['Horas'].iloc[0]} horas más baratas de cada mes: ${ahorro_horario_anual:,.2f} USD")
+    print(f"• Ahorro mensual promedio: ${ahorro_horario_anual / 12:,.2f} USD")
     
     # Oportunidad 3: Estrategia estacional
+    seasonal_avg = oportunidades['precio_por_estacion']
+    mejor_estacion = oportunidades['mejor_estacion']
+    peor_estacion = oportunidades['peor_estacion']
     print("\\n💡 OPORTUNIDAD 3: ESTRATEGIA ESTACIONAL")
-    seasonal_avg = energy_context_df.groupby('estacion')['precio_mwh'].mean()
-    mejor_estacion = seasonal_avg.idxmin()
-    peor_estacion = seasonal_avg.idxmax()
-    
     print(f"• Incrementar producción en {mejor_estacion}: ${seasonal_avg[mejor_estacion]:.2f}/MWh")
     print(f"• Mantenimiento programado en {peor_estacion}: ${seasonal_avg[peor_estacion]:.2f}/MWh")
+    print(f"• Ahorro anual con 14 días de mantenimiento en {oportunidades['estacion_mantenimiento']}: "
+          f"${oportunidades['ahorro_mantenimiento_anual']:,.2f} USD")
     
     # Oportunidad 4: Calendario inteligente
     print("\\n💡 OPORTUNIDAD 4: CALENDARIO OPERATIVO INTELIGENTE")
-    
-    # Días con mejores precios
-    best_days_data = energy_context_df[energy_context_df['precio_mwh'] <= energy_context_df['precio_mwh'].quantile(0.25)]
-    worst_days_data = energy_context_df[energy_context_df['precio_mwh'] >= energy_context_df['precio_mwh'].quantile(0.75)]
-    
     print("\\nCaracterísticas de días con MEJORES precios:")
-    best_day_chars = best_days_data.groupby(['dia_semana_nombre', 'es_feriado', 'estacion']).size().sort_values(ascending=False).head(3)
-    for (dia, feriado, estacion), count in best_day_chars.items():
+    for (dia, feriado, estacion), count in oportunidades['caracteristicas_mejores'].items():
         feriado_text = "Feriado" if feriado else "Regular"
         print(f"  • {dia}, {feriado_text}, {estacion}: {count} registros")
     
     print("\\nCaracterísticas de días con PEORES precios:")
-    worst_day_chars = worst_days_data.groupby(['dia_semana_nombre', 'es_feriado', 'estacion']).size().sort_values(ascending=False).head(3)
-    for (dia, feriado, estacion), count in worst_day_chars.items():
+    for (dia, feriado, estacion), count in oportunidades['caracteristicas_peores'].items():
         feriado_text = "Feriado" if feriado else "Regular"
         print(f"  • {dia}, {feriado_text}, {estacion}: {count} registros")
     
     # RESUMEN DE AHORROS
+    tabla_politicas = oportunidades['politicas'].set_index('Politica')
     print("\\n" + "="*100)
     print("RESUMEN DE AHORROS POTENCIALES")
     print("="*100)
     
-    ahorro_total_mensual = (ahorro_semanal * 4) + (ahorro_por_cambio_horario * 12 * 30)
-    ahorro_total_anual = ahorro_total_mensual * 12
-    
     print(f"\\n💰 AHORROS ESTIMADOS:")
-    print(f"• Optimización semanal: ${ahorro_semanal * 4:,.2f} USD/mes")
-    print(f"• Optimización horaria: ${ahorro_por_cambio_horario * 12 * 30:,.2f} USD/mes")
-    print(f"• TOTAL MENSUAL: ${ahorro_total_mensual:,.2f} USD")
-    print(f"• TOTAL ANUAL: ${ahorro_total_anual:,.2f} USD")
-    print(f"• Porcentaje de ahorro: {(ahorro_total_anual / (precio_promedio * total_consumption_per_hour * 12 * 365)) * 100:.1f}%")
-
-# Ejecutar análisis integral
-file_path = r"Modela1Fixeddata.xlsx"
-df_list: List[pd.DataFrame] = read_excel_sheets_to_dataframes(file_path)
-
-print("Iniciando análisis integral con variables contextuales...")
-energy_context_data, calendar_data = comprehensive_energy_analysis(df_list)
-
-print("\\n" + "="*100)
-print("ANÁLISIS COMPLETADO EXITOSAMENTE")
-print("="*100)
-print("✅ Datos enriquecidos con variables contextuales")
-print("📊 Gráficas avanzadas generadas") 
-print("🎯 Recomendaciones estratégicas identificadas")
-print("💡 Oportunidades de optimización cuantificadas")
-print("="*100)
\ No newline at end of file
+    for politica, fila in tabla_politicas.iloc[1:-1].iterrows():
+        print(f"• {politica}: ${fila['Ahorro_Anual'] / 12:,.2f} USD/mes")
+    print(f"• Traslape entre políticas (no se suma dos veces): ${oportunidades['traslape']:,.2f} USD/año")
+    if oportunidades['perdida'] > 0:
+        print(f"• Pérdida a precios observados de políticas que encarecen (no se aplican): "
+              f"${oportunidades['perdida']:,.2f} USD/año")
+    print(f"• Política combinada: {' + '.join(oportunidades['politicas_combinada'])}")
+    print(f"• TOTAL MENSUAL (política combinada): ${oportunidades['ahorro_total_mensual']:,.2f} USD")
+    print(f"• TOTAL ANUAL: ${oportunidades['ahorro_total_anual']:,.2f} USD")
+    print(f"• Porcentaje de ahorro: {oportunidades['porcentaje_ahorro']:.1f}%")
+
+def identify_optimization_opportunities(energy_context_df, verbose=True, price_grid=None, perfil=None, indice=None):
+    """
+    Identificar oportunidades específicas de optimización
+
+    Calcula con compute_optimization_opportunities y, con verbose=True, las
+    muestra con print_optimization_opportunities.
+
+    Returns:
+        dict: Ahorros estimados y contexto de cada oportunidad
+    """
+    oportunidades = compute_optimization_opportunities(energy_context_df, price_grid=price_grid, perfil=perfil,
+                                                       indice=indice)
+    if verbose:
+        print_optimization_opportunities(oportunidades)
+    return oportunidades
+
+if __name__ == "__main__":
+    # Ejecutar análisis integral
+    file_path = r"Modela1Fixeddata.xlsx"
+    # Validación única al cargar (huecos cortos interpolados, máscara de calidad aplicada)
+    df_list, price_grid = load_price_data(file_path, fill_gaps=True)
+    warn_incomplete_months(price_grid)
+
+    print("Iniciando análisis integral con variables contextuales...")
+    resultado = comprehensive_energy_analysis(df_list)
+    energy_context_data = resultado.datos['tabla_contexto']
+
+    print("\\n" + "="*100)
+    print("ANÁLISIS COMPLETADO EXITOSAMENTE")
+    print("="*100)
+    print("✅ Datos enriquecidos con variables contextuales")
+    print("📊 Gráficas avanzadas generadas") 
+    print("🎯 Recomendaciones estratégicas identificadas")
+    print("💡 Oportunidades de optimización cuantificadas")
+    print("="*100)
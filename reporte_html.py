@@ -0,0 +1,449 @@
+import html
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+from datos import MONTHS
+from calendario import DIAS_SEMANA
+from cache_resultados import cached_result
+from ingresos import calculate_hourly_profit_grid, summarize_by_month
+from agregados_graficas import aggregate_price_grids
+from horarios_semanales import optimize_weekly_schedules
+from ahorros import evaluate_savings_policies
+from anomalias import detect_spikes, spike_cost_breakdown
+import ahorros
+import agregados_graficas
+import anomalias
+import horarios_semanales
+import ingresos
+
+# Paleta de las gráficas originales de pregunta5
+COLORES = ['#2E86AB', '#A23B72', '#F18F01', '#C73E1D', '#4CAF50', '#9C27B0']
+
+# Parámetros de operación del reporte (escenario actual)
+PARAMETROS_REPORTE = {
+    'num_robots': 25,
+    'consumption_per_robot': 0.2,
+    'hora_inicio': 8,
+    'hora_fin': 20,
+    'intensidad': None  # tCO2/MWh (días, 24) de carbono.align_intensity_to_grid; agrega emisiones
+}
+
+# =============================================================================
+# Gráficas SVG (sin dependencias; el tooltip de cada elemento muestra su valor)
+# =============================================================================
+
+def _nice_max(value):
+    if not np.isfinite(value) or value <= 0:
+        return 1.0
+    magnitude = 10 ** np.floor(np.log10(value))
+    return float(np.ceil(value / magnitude * 2) / 2 * magnitude)
+
+def _axes(width, height, margin, y_max, formato):
+    parts = []
+    plot_h = height - margin[0] - margin[2]
+    for i in range(5):
+        y = margin[0] + plot_h * (1 - i / 4)
+        parts.append(f'<line x1="{margin[3]}" y1="{y:.1f}" x2="{width - margin[1]}" y2="{y:.1f}" class="grid"/>')
+        parts.append(f'<text x="{margin[3] - 4}" y="{y + 3:.1f}" class="ytick">{formato.format(y_max * i / 4)}</text>')
+    return parts
+
+def _legend(names, x, y):
+    parts = []
+    for i, name in enumerate(names):
+        parts.append(f'<rect x="{x + i * 120}" y="{y}" width="10" height="10" fill="{COLORES[i % len(COLORES)]}"/>'
+                     f'<text x="{x + i * 120 + 14}" y="{y + 9}" class="legend">{html.escape(str(name))}</text>')
+    return parts
+
+def svg_bar_chart(labels, series, titulo, width=560, height=280, formato='{:,.0f}'):
+    """
+    Barras agrupadas: series = {nombre: valores alineados con labels}
+    """
+    margin = (30, 10, 40, 70)  # arriba, derecha, abajo, izquierda
+    values = np.array([np.asarray(v, dtype=float) for v in series.values()])
+    y_max = _nice_max(np.nanmax(values))
+    plot_w, plot_h = width - margin[1] - margin[3], height - margin[0] - margin[2]
+    slot = plot_w / len(labels)
+    bar_w = slot * 0.8 / len(series)
+
+    parts = _axes(width, height, margin, y_max, formato)
+    for s, (name, vals) in enumerate(series.items()):
+        for i, (label, value) in enumerate(zip(labels, vals)):
+            if not np.isfinite(value):
+                continue
+            h = plot_h * max(value, 0) / y_max
+            x = margin[3] + i * slot + slot * 0.1 + s * bar_w
+            parts.append(f'<rect x="{x:.1f}" y="{margin[0] + plot_h - h:.1f}" width="{bar_w:.1f}" height="{h:.1f}" '
+                         f'fill="{COLORES[s % len(COLORES)]}"><title>{html.escape(str(label))} · '
+                         f'{html.escape(str(name))}: {formato.format(value)}</title></rect>')
+    for i, label in enumerate(labels):
+        x = margin[3] + (i + 0.5) * slot
+        parts.append(f'<text x="{x:.1f}" y="{height - margin[2] + 14}" class="xtick">{html.escape(str(label)[:3])}</text>')
+    if len(series) > 1:
+        parts.extend(_legend(series, margin[3], 8))
+    return _svg(titulo, width, height, parts)
+
+def svg_line_chart(labels, series, titulo, width=560, height=280, formato='{:,.1f}'):
+    """
+    Líneas con un punto por etiqueta; cada punto tiene su tooltip
+    """
+    margin = (30, 10, 40, 60)
+    values = np.array([np.asarray(v, dtype=float) for v in series.values()])
+    y_max = _nice_max(np.nanmax(values))
+    plot_w, plot_h = width - margin[1] - margin[3], height - margin[0] - margin[2]
+    step = plot_w / max(len(labels) - 1, 1)
+
+    parts = _axes(width, height, margin, y_max, formato)
+    for s, (name, vals) in enumerate(series.items()):
+        color = COLORES[s % len(COLORES)]
+        points = [(margin[3] + i * step, margin[0] + plot_h * (1 - v / y_max))
+                  for i, v in enumerate(vals) if np.isfinite(v)]
+        parts.append(f'<polyline fill="none" stroke="{color}" stroke-width="2" '
+                     f'points="{" ".join(f"{x:.1f},{y:.1f}" for x, y in points)}"/>')
+        for (x, y), label, value in zip(points, [l for l, v in zip(labels, vals) if np.isfinite(v)],
+                                        [v for v in vals if np.isfinite(v)]):
+            parts.append(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="3" fill="{color}"><title>{html.escape(str(label))} · '
+                         f'{html.escape(str(name))}: {formato.format(value)}</title></circle>')
+    tick_every = max(1, len(labels) // 12)
+    for i, label in enumerate(labels):
+        if i % tick_every == 0:
+            parts.append(f'<text x="{margin[3] + i * step:.1f}" y="{height - margin[2] + 14}" class="xtick">'
+                         f'{html.escape(str(label))}</text>')
+    if len(series) > 1:
+        parts.extend(_legend(series, margin[3], 8))
+    return _svg(titulo, width, height, parts)
+
+def _heat_color(t):
+    # Escala azul -> amarillo -> rojo (similar a RdYlBu_r)
+    stops = np.array([[49, 54, 149], [116, 173, 209], [255, 255, 191], [244, 109, 67], [165, 0, 38]], dtype=float)
+    position = np.clip(t, 0, 1) * (len(stops) - 1)
+    i = min(int(position), len(stops) - 2)
+    rgb = stops[i] + (stops[i + 1] - stops[i]) * (position - i)
+    return '#%02x%02x%02x' % tuple(rgb.round().astype(int))
+
+def svg_heatmap(matrix, row_labels, col_labels, titulo, width=560, height=420, formato='{:,.1f}'):
+    """
+    Mapa de calor (filas × columnas) con el valor de cada celda en su tooltip
+    """
+    matrix = np.asarray(matrix, dtype=float)
+    margin = (30, 10, 30, 50)
+    cell_w = (width - margin[1] - margin[3]) / matrix.shape[1]
+    cell_h = (height - margin[0] - margin[2]) / matrix.shape[0]
+    lo, hi = np.nanmin(matrix), np.nanmax(matrix)
+    span = hi - lo if hi > lo else 1.0
+
+    parts = []
+    for r, row_label in enumerate(row_labels):
+        for c, col_label in enumerate(col_labels):
+            value = matrix[r, c]
+            fill = _heat_color((value - lo) / span) if np.isfinite(value) else '#eeeeee'
+            parts.append(f'<rect x="{margin[3] + c * cell_w:.1f}" y="{margin[0] + r * cell_h:.1f}" '
+                         f'width="{cell_w + 0.5:.1f}" height="{cell_h + 0.5:.1f}" fill="{fill}">'
+                         f'<title>{html.escape(str(row_label))} · {html.escape(str(col_label))}: '
+                         f'{formato.format(value)}</title></rect>')
+        parts.append(f'<text x="{margin[3] - 4}" y="{margin[0] + (r + 0.7) * cell_h:.1f}" class="ytick">'
+                     f'{html.escape(str(row_label))}</text>')
+    for c, col_label in enumerate(col_labels):
+        parts.append(f'<text x="{margin[3] + (c + 0.5) * cell_w:.1f}" y="{height - margin[2] + 14}" class="xtick">'
+                     f'{html.escape(str(col_label)[:3])}</text>')
+    parts.append(f'<text x="{width - margin[1]}" y="{margin[0] - 8}" class="ytick">'
+                 f'{formato.format(lo)} – {formato.format(hi)}</text>')
+    return _svg(titulo, width, height, parts)
+
+def _svg(titulo, width, height, parts):
+    return (f'<figure><figcaption>{html.escape(titulo)}</figcaption>'
+            f'<svg viewBox="0 0 {width} {height}" width="{width}" height="{height}" role="img">'
+            f'{"".join(parts)}</svg></figure>')
+
+def _table(df, formato='{:,.2f}'):
+    def cell(value):
+        if isinstance(value, (float, np.floating)):
+            return formato.format(value) if np.isfinite(value) else '-'
+        return html.escape(str(value))
+
+    head = ''.join(f'<th>{html.escape(str(c))}</th>' for c in df.columns)
+    body = ''.join('<tr>' + ''.join(f'<td>{cell(v)}</td>' for v in row) + '</tr>'
+                   for row in df.itertuples(index=False))
+    return f'<table class="ordenable"><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>'
+
+def _metrics(metricas):
+    items = ''.join(f'<div class="metrica"><span>{html.escape(k)}</span><strong>{html.escape(v)}</strong></div>'
+                    for k, v in metricas.items())
+    return f'<div class="metricas">{items}</div>'
+
+def _json_value(value):
+    # JSON estricto para JSON.parse: NaN/inf como null y tipos numpy como nativos
+    if isinstance(value, dict):
+        return {str(k): _json_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_json_value(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    return value
+
+def _section(section_id, titulo, contenido, datos):
+    """
+    Fragmento HTML de una sección con sus agregados en un bloque JSON para tableros
+    """
+    payload = json.dumps(_json_value(datos), ensure_ascii=False, separators=(',', ':'), allow_nan=False)
+    payload = payload.replace('</', '<\\/')  # no cerrar el <script> desde los datos
+    return (f'<section id="{section_id}"><h2>{html.escape(titulo)}</h2>{contenido}'
+            f'<script type="application/json" id="datos-{section_id}">{payload}</script>'
+            f'</section>')
+
+def _schedule_mask(hora_inicio, hora_fin):
+    mask = np.zeros(24, dtype=bool)
+    mask[hora_inicio:hora_fin] = True
+    return mask
+
+# =============================================================================
+# Secciones (cada una en caché por datos + parámetros: solo se rehacen las que cambian)
+# =============================================================================
+
+# La clave de cada sección incluye su código, el de las funciones que llama
+# (gráficas SVG, tablas) y el contenido completo de los módulos de cálculo
+_cached_section = cached_result(modulos=(ingresos, agregados_graficas, horarios_semanales, ahorros, anomalias))
+
+@_cached_section
+def section_energy_cost(price_grid, num_robots=25, consumption_per_robot=0.2, hora_inicio=8, hora_fin=20,
+                        intensidad=None):
+    """
+    Pregunta 1: costo energético mensual del horario actual (y sus emisiones si hay intensidad)
+    """
+    grid = calculate_hourly_profit_grid(price_grid, _schedule_mask(hora_inicio, hora_fin), num_robots=num_robots,
+                                        consumption_per_robot=consumption_per_robot, intensidad_carbono=intensidad)
+    monthly = summarize_by_month(price_grid, grid['costos_usd'])
+    tabla = pd.DataFrame({'Mes': MONTHS, 'Costo_USD': monthly})
+    metricas = {
+        'Costo anual': f"${monthly.sum():,.2f}",
+        'Horario': f"{hora_inicio:02d}:00-{hora_fin:02d}:00",
+        'Consumo por hora': f"{num_robots * consumption_per_robot:.2f} MWh"
+    }
+    datos = {'mes': MONTHS, 'costo_usd': monthly.tolist()}
+
+    graficas = svg_bar_chart(MONTHS, {'Costo': monthly}, 'Costo energético por mes (USD)')
+    if intensidad is not None:
+        emisiones = summarize_by_month(price_grid, grid['emisiones_tco2'])
+        tabla['Emisiones_tCO2'] = emisiones
+        metricas['Emisiones anuales'] = f"{emisiones.sum():,.1f} tCO2"
+        datos['emisiones_tco2'] = emisiones.tolist()
+        graficas += svg_bar_chart(MONTHS, {'Emisiones': emisiones}, 'Emisiones por mes (tCO2)', formato='{:,.1f}')
+
+    contenido = _metrics(metricas) + graficas + _table(tabla)
+    return _section('costo', 'Costo energético', contenido, datos)
+
+@_cached_section
+def section_profitability(price_grid, num_robots=25, consumption_per_robot=0.2, hora_inicio=8, hora_fin=20):
+    """
+    Pregunta 3: ingresos, costos y utilidad por mes
+    """
+    grid = calculate_hourly_profit_grid(price_grid, _schedule_mask(hora_inicio, hora_fin), num_robots=num_robots,
+                                        consumption_per_robot=consumption_per_robot)
+    ingresos = summarize_by_month(price_grid, grid['ingresos_usd'])
+    costos = summarize_by_month(price_grid, grid['costos_usd'])
+    utilidad = ingresos - costos
+    tabla = pd.DataFrame({'Mes': MONTHS, 'Ingresos': ingresos, 'Costos': costos, 'Utilidad': utilidad,
+                          'Margen_Pct': utilidad / ingresos * 100})
+
+    contenido = _metrics({
+        'Utilidad anual': f"${utilidad.sum():,.2f}",
+        'Mes más rentable': MONTHS[int(np.argmax(utilidad))],
+        'Mes menos rentable': MONTHS[int(np.argmin(utilidad))]
+    })
+    contenido += svg_bar_chart(MONTHS, {'Ingresos': ingresos, 'Costos': costos, 'Utilidad': utilidad},
+                               'Rentabilidad mensual (USD)')
+    contenido += _table(tabla)
+    return _section('rentabilidad', 'Rentabilidad mensual', contenido,
+                    {'mes': MONTHS, 'ingresos': ingresos.tolist(), 'costos': costos.tolist(),
+                     'utilidad': utilidad.tolist()})
+
+@_cached_section
+def section_price_context(price_grid):
+    """
+    Pregunta 5: patrones de precio por hora, día de la semana, estación y tipo de día
+    """
+    data = aggregate_price_grids([price_grid]).chart_data()
+    hora_dia = data['hora_dia_semana']
+    feriado = data['hora_feriado']
+
+    contenido = _metrics({
+        'Día más barato': data['dia_mas_barato'],
+        'Estación más barata': data['estacion_mas_barata'],
+        'Hora más barata': f"{data['hora_mas_barata']:02d}:00",
+        'Registros': f"{data['registros']:,}"
+    })
+    contenido += svg_heatmap(hora_dia.to_numpy(), [f"{h:02d}" for h in range(24)], DIAS_SEMANA,
+                             'Precio promedio: hora vs día de la semana (USD/MWh)')
+    contenido += svg_line_chart(list(range(24)), {'Días regulares': feriado.get(False, pd.Series(np.nan, range(24))),
+                                                  'Feriados': feriado.get(True, pd.Series(np.nan, range(24)))},
+                                'Precio por hora: feriados vs días regulares (USD/MWh)')
+    contenido += svg_bar_chart(list(data['por_estacion'].index), {'Precio': data['por_estacion'].values},
+                               'Precio promedio por estación (USD/MWh)', formato='{:,.1f}')
+    contenido += svg_bar_chart(list(data['por_clasificacion'].index), {'Precio': data['por_clasificacion'].values},
+                               'Precio promedio por clasificación de día (USD/MWh)', formato='{:,.1f}')
+    return _section('contexto', 'Precios y contexto', contenido, {
+        'hora_dia_semana': hora_dia.round(3).to_numpy().tolist(),
+        'por_estacion': data['por_estacion'].round(3).to_dict(),
+        'por_clasificacion': data['por_clasificacion'].round(3).to_dict(),
+        'por_dia_semana': data['por_dia_semana'].round(3).to_dict()
+    })
+
+@_cached_section
+def section_weekly_schedules(price_grid, n_horas=12):
+    """
+    Pregunta 4 extendida: horario óptimo por mes y tipo de día
+    """
+    result = optimize_weekly_schedules(price_grid, n_horas=n_horas)
+    resumen = result['resumen']
+    tabla = result['horarios'].pivot(index='Mes', columns='Clasificacion', values='Horario').reindex(MONTHS)
+    tabla = tabla.fillna('-').reset_index()
+
+    contenido = _metrics({'Ganancia anual vs horario único': f"${result['ganancia_anual']:,.2f}"})
+    contenido += svg_bar_chart(MONTHS, {'Ganancia': resumen['Ganancia'].to_numpy()},
+                               'Ganancia mensual de un horario por tipo de día (USD)')
+    contenido += _table(tabla)
+    return _section('horarios', f'Horarios de {n_horas} horas por tipo de día', contenido, {
+        'horarios': result['horarios'][['Mes', 'Clasificacion', 'Horario']].to_dict(orient='records'),
+        'ganancia': resumen['Ganancia'].round(2).tolist()
+    })
+
+@_cached_section
+def section_savings(price_grid, hora_inicio=8, hora_fin=20, num_robots=25, consumption_per_robot=0.2):
+    """
+    Políticas de ahorro re-preciadas sobre el año completo
+    """
+    result = evaluate_savings_policies(price_grid, hora_inicio=hora_inicio, hora_fin=hora_fin,
+                                       num_robots=num_robots, consumption_per_robot=consumption_per_robot)
+    tabla = result['tabla']
+    contenido = _metrics({
+        'Mejor día': result['mejor_dia'],
+        'Peor día': result['peor_dia'],
+        'Estación más cara': result['peor_estacion']
+    })
+    contenido += svg_bar_chart(list(tabla['Politica'][1:]), {'Ahorro': tabla['Ahorro_Anual'].to_numpy()[1:]},
+                               'Ahorro anual por política (USD)')
+    contenido += _table(tabla)
+    return _section('ahorros', 'Políticas de ahorro', contenido,
+                    {'politicas': tabla.round(2).to_dict(orient='records')})
+
+@_cached_section
+def section_price_spikes(price_grid):
+    """
+    Picos de precio y su peso en el costo mensual
+    """
+    spikes = detect_spikes(price_grid)
+    tabla = spike_cost_breakdown(price_grid, spikes)
+    contenido = _metrics({
+        'Horas pico': f"{int(spikes['picos'].sum()):,}",
+        'Días con pico': f"{int(spikes['dias_con_pico'].sum()):,}",
+        'Sobrecosto anual': f"${tabla['Sobrecosto_Picos'].sum():,.2f}"
+    })
+    contenido += svg_bar_chart(MONTHS, {'Costo sin picos': tabla['Costo_Excluyendo_Picos'].to_numpy(),
+                                        'Costo en picos': tabla['Costo_Picos'].to_numpy()},
+                               'Costo mensual en horas pico (USD)')
+    contenido += _table(tabla)
+    return _section('picos', 'Picos de precio', contenido,
+                    {'mensual': tabla.round(2).to_dict(orient='records')})
+
+# =============================================================================
+# Ensamblado
+# =============================================================================
+
+_ESTILO = """
+body{font-family:system-ui,sans-serif;margin:0 auto;max-width:1200px;padding:16px;color:#222}
+nav a{margin-right:12px}section{border-top:2px solid #2E86AB;margin-top:24px}
+figure{display:inline-block;margin:8px}figcaption{font-weight:bold;font-size:13px}
+svg text{font-size:10px}.xtick{text-anchor:middle}.ytick{text-anchor:end}.legend{font-size:11px}
+.grid{stroke:#ddd}rect:hover,circle:hover{opacity:.75}
+.metricas{display:flex;gap:12px;flex-wrap:wrap}.metrica{background:#eef5fa;padding:8px 12px;border-radius:6px}
+.metrica span{display:block;font-size:12px;color:#555}
+table{border-collapse:collapse;font-size:12px;margin:8px}td,th{border:1px solid #ddd;padding:3px 6px;text-align:right}
+th{background:#f3f3f3;cursor:pointer}
+"""
+
+# Ordenar tablas al hacer clic en el encabezado
+_SCRIPT = """
+document.querySelectorAll('table.ordenable th').forEach((th,i)=>th.addEventListener('click',()=>{
+const body=th.closest('table').tBodies[0],rows=[...body.rows],asc=th.dataset.asc!=='1';th.dataset.asc=asc?'1':'0';
+const val=r=>{const t=r.cells[i].textContent.replace(/[$,%]/g,'');return isNaN(parseFloat(t))?t:parseFloat(t)};
+rows.sort((a,b)=>(val(a)>val(b)?1:val(a)<val(b)?-1:0)*(asc?1:-1));rows.forEach(r=>body.appendChild(r));}));
+"""
+
+SECCIONES = {
+    'costo': (section_energy_cost, ['num_robots', 'consumption_per_robot', 'hora_inicio', 'hora_fin', 'intensidad']),
+    'rentabilidad': (section_profitability, ['num_robots', 'consumption_per_robot', 'hora_inicio', 'hora_fin']),
+    'contexto': (section_price_context, []),
+    'horarios': (section_weekly_schedules, []),
+    'ahorros': (section_savings, ['num_robots', 'consumption_per_robot', 'hora_inicio', 'hora_fin']),
+    'picos': (section_price_spikes, [])
+}
+
+def build_html_report(price_grid, output_path='reporte_energia.html', secciones=None, verbose=True, **parametros):
+    """
+    Genera un reporte HTML autocontenido (SVG en línea, sin archivos externos)
+
+    Cada sección se calcula desde la grilla de precios y queda en caché según
+    sus datos y parámetros (cache_resultados): al regenerar el reporte solo se
+    recalculan las secciones cuyas entradas cambiaron. Las gráficas y los
+    bloques JSON solo llevan agregados (mes, hora, día de la semana), no las
+    8,760 filas horarias.
+
+    Args:
+        price_grid: Diccionario de datos.build_price_grid
+        output_path: Archivo HTML de salida
+        secciones: Nombres de SECCIONES a incluir (por defecto todas)
+        **parametros: Sobrescriben PARAMETROS_REPORTE
+
+    Returns:
+        str: Ruta del reporte
+    """
+    params = {**PARAMETROS_REPORTE, **parametros}
+    secciones = list(SECCIONES) if secciones is None else secciones
+
+    fragments = []
+    for name in secciones:
+        builder, keys = SECCIONES[name]
+        start = time.perf_counter()
+        fragments.append(builder(price_grid, **{key: params[key] for key in keys}))
+        if verbose:
+            print(f"  {name:<14} {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+    nav = ''.join(f'<a href="#{name}">{name.capitalize()}</a>' for name in secciones)
+    document = (f'<!DOCTYPE html><html lang="es"><head><meta charset="utf-8">'
+                f'<title>Reporte energético {price_grid["año"]}</title><style>{_ESTILO}</style></head><body>'
+                f'<h1>Smart Packaging: reporte energético {price_grid["año"]}</h1><nav>{nav}</nav>'
+                f'{"".join(fragments)}<script>{_SCRIPT}</script></body></html>')
+
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(document)
+    os.replace(tmp_path, output_path)
+
+    if verbose:
+        print(f"Reporte guardado en {output_path} ({len(document) / 1024:,.0f} KB)")
+    return output_path
+
+if __name__ == "__main__":
+    import argparse
+    from validacion import load_price_data
+    from carbono import load_carbon_intensity, align_intensity_to_grid
+
+    parser = argparse.ArgumentParser(description="Genera el reporte HTML del análisis energético")
+    parser.add_argument('archivo', nargs='?', default=r"Modela1Fixeddata.xlsx")
+    parser.add_argument('--salida', default='reporte_energia.html')
+    parser.add_argument('--hora-inicio', type=int, default=8)
+    parser.add_argument('--hora-fin', type=int, default=20)
+    parser.add_argument('--intensidad', help="CSV o Excel con fecha, [hora], intensidad (tCO2/MWh) para reportar emisiones")
+    parser.add_argument('--kg', action='store_true', help="La intensidad viene en kgCO2/MWh")
+    args = parser.parse_args()
+
+    _, price_grid = load_price_data(args.archivo, verbose=False)
+    intensidad = None
+    if args.intensidad:
+        serie = load_carbon_intensity(args.intensidad, 0.001 if args.kg else 1.0)
+        intensidad = align_intensity_to_grid(price_grid, serie)
+    build_html_report(price_grid, args.salida, hora_inicio=args.hora_inicio, hora_fin=args.hora_fin,
+                      intensidad=intensidad)
@@ -0,0 +1,242 @@
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+import numpy as np
+import pandas as pd
+
+FORMATOS = ['consola', 'markdown', 'json', 'csv']
+
+@dataclass
+class ResultadoAnalisis:
+    """
+    Resultado estructurado de un análisis, independiente de su presentación
+
+    Las funciones de cálculo (verbose=False) solo producen números; los
+    convertidores de este módulo los empaquetan aquí y render() los muestra
+    en una pasada aparte. 'datos' guarda insumos de apoyo que no se
+    presentan (ej. la tabla hora-día completa).
+    """
+    nombre: str
+    metricas: Dict[str, float] = field(default_factory=dict)
+    tablas: Dict[str, pd.DataFrame] = field(default_factory=dict)
+    conclusiones: List[str] = field(default_factory=list)
+    datos: Dict[str, Any] = field(default_factory=dict)
+
+# =============================================================================
+# Convertidores desde los diccionarios de cada pregunta
+# =============================================================================
+
+def energy_cost_result(resultado):
+    """
+    pregunta1.calculate_energy_cost -> ResultadoAnalisis
+    """
+    costos = pd.DataFrame(resultado['detalles_mensuales'])
+    metricas = {'costo_total_anual': resultado['costo_total_anual']}
+    metricas.update(resultado['parametros'])
+    return ResultadoAnalisis(
+        nombre='Costo energético anual 2023',
+        metricas=metricas,
+        tablas={'costos_mensuales': costos}
+    )
+
+def profitability_result(resultado):
+    """
+    pregunta2.profitability_analysis -> ResultadoAnalisis
+    """
+    escenarios = pd.DataFrame({
+        'Actual': resultado['escenario_actual'],
+        'Modificado': resultado['escenario_modificado']
+    }).T
+    metricas = {f'{k}_pct': v for k, v in resultado['cambios_porcentuales'].items()}
+    metricas['es_rentable'] = bool(resultado['es_rentable'])
+    return ResultadoAnalisis(
+        nombre='Rentabilidad: escenario actual vs modificado',
+        metricas=metricas,
+        tablas={'escenarios': escenarios},
+        conclusiones=[resultado['conclusion'], resultado['recomendacion']]
+    )
+
+def monthly_profitability_result(df_analysis):
+    """
+    pregunta3.compute_monthly_profitability -> ResultadoAnalisis
+    """
+    mejor = df_analysis.loc[df_analysis['Utilidad_USD'].idxmax()]
+    peor = df_analysis.loc[df_analysis['Utilidad_USD'].idxmin()]
+    return ResultadoAnalisis(
+        nombre='Rentabilidad mensual 2023',
+        metricas={
+            'ingresos_anuales': df_analysis['Ingresos_USD'].sum(),
+            'costos_anuales': df_analysis['Costos_Energia_USD'].sum(),
+            'utilidad_anual': df_analysis['Utilidad_USD'].sum()
+        },
+        tablas={'rentabilidad_mensual': df_analysis},
+        conclusiones=[
+            f"Mes más rentable: {mejor['Mes']} (${mejor['Utilidad_USD']:,.2f} USD)",
+            f"Mes menos rentable: {peor['Mes']} (${peor['Utilidad_USD']:,.2f} USD)"
+        ]
+    )
+
+def schedule_result(results, hourly_prices=None):
+    """
+    pregunta4.compute_schedule_results -> ResultadoAnalisis
+    """
+    tabla = pd.DataFrame(results).T
+    mejor = tabla['utilidad'].astype(float).idxmax()
+    actual = tabla.loc['Actual', 'utilidad'] if 'Actual' in tabla.index else np.nan
+    tablas = {'horarios': tabla}
+    if hourly_prices is not None:
+        tablas['precio_por_hora'] = pd.DataFrame({'hora': range(24), 'precio_promedio': hourly_prices})
+    return ResultadoAnalisis(
+        nombre='Optimización de horarios (enero)',
+        metricas={
+            'utilidad_mejor': tabla.loc[mejor, 'utilidad'],
+            'mejora_vs_actual': tabla.loc[mejor, 'utilidad'] - actual
+        },
+        tablas=tablas,
+        conclusiones=[f"Horario óptimo: {tabla.loc[mejor, 'nombre']}"]
+    )
+
+def context_result(analisis):
+    """
+    pregunta5.compute_context_analysis -> ResultadoAnalisis (sin recalcular agregados)
+    """
+    energy_context_df = analisis['tabla_contexto']
+    oportunidades = analisis['oportunidades']
+    mejores_horas = pd.DataFrame(analisis['mejores_horas_por_tipo']).T
+    mejores_horas.index.name = 'clasificacion'
+
+    return ResultadoAnalisis(
+        nombre='Precios con variables contextuales',
+        metricas={
+            'registros': len(energy_context_df),
+            'precio_promedio': energy_context_df['precio_mwh'].mean(),
+            'horas_pico': int(energy_context_df['es_pico'].sum()),
+            'ahorro_total_anual': oportunidades['ahorro_total_anual'],
+            'porcentaje_ahorro': oportunidades['porcentaje_ahorro']
+        },
+        tablas={
+            'por_dia_semana': analisis['por_dia_semana'],
+            'por_clasificacion': analisis['por_clasificacion'],
+            'por_estacion': analisis['por_estacion'],
+            'por_ciclo_escolar': analisis['por_ciclo_escolar'],
+            'por_feriado': analisis['por_feriado'],
+            'mejores_horas_por_tipo': mejores_horas,
+            'picos': analisis['picos'],
+            'politicas': oportunidades['politicas']
+        },
+        conclusiones=[
+            f"Día más barato: {analisis['por_dia_semana'].index[0]}",
+            f"Estación más barata: {analisis['por_estacion'].index[0]}"
+        ],
+        datos={
+            'tabla_contexto': energy_context_df,
+            'calendario': analisis['calendario'],
+            'oportunidades': oportunidades
+        }
+    )
+
+def opportunities_result(oportunidades):
+    """
+    pregunta5.identify_optimization_opportunities -> ResultadoAnalisis
+    """
+    metricas = {k: v for k, v in oportunidades.items() if isinstance(v, (int, float, np.number))}
+    return ResultadoAnalisis(
+        nombre='Oportunidades de optimización',
+        metricas=metricas,
+        tablas={
+            'caracteristicas_mejores': oportunidades['caracteristicas_mejores'].rename('registros').reset_index(),
+            'caracteristicas_peores': oportunidades['caracteristicas_peores'].rename('registros').reset_index(),
+            'politicas': oportunidades['politicas'],
+            'horas_valle': oportunidades['horas_valle']
+        },
+        conclusiones=[
+            f"Concentrar operaciones en {oportunidades['mejor_dia']}",
+            f"Horas valle (enero): {oportunidades['horas_valle']['Horario'].iloc[0]}",
+            f"Política combinada: {' + '.join(oportunidades['politicas_combinada'])}",
+            f"Mantenimiento programado en {oportunidades['peor_estacion']}"
+        ]
+    )
+
+# =============================================================================
+# Presentación
+# =============================================================================
+
+def _format_value(value):
+    if isinstance(value, (bool, np.bool_)):
+        return 'Sí' if value else 'No'
+    if isinstance(value, (int, float, np.number)):
+        return f"{value:,.2f}"
+    return str(value)
+
+def render_console(res):
+    lines = ["=" * 80, res.nombre.upper(), "=" * 80]
+    for key, value in res.metricas.items():
+        lines.append(f"{key:<35} {_format_value(value)}")
+    for name, table in res.tablas.items():
+        lines.extend(["", f"{name}:", table.to_string()])
+    if res.conclusiones:
+        lines.append("")
+        lines.extend(f"• {c}" for c in res.conclusiones)
+    return '\n'.join(lines)
+
+def render_markdown(res):
+    lines = [f"## {res.nombre}", ""]
+    if res.metricas:
+        lines.extend(["| Métrica | Valor |", "|---|---|"])
+        lines.extend(f"| {k} | {_format_value(v)} |" for k, v in res.metricas.items())
+    for name, table in res.tablas.items():
+        lines.extend(["", f"### {name}", ""])
+        header = [str(table.index.name or '')] + [str(c) for c in table.columns]
+        lines.append('| ' + ' | '.join(header) + ' |')
+        lines.append('|' + '---|' * len(header))
+        for idx, row in table.iterrows():
+            lines.append('| ' + ' | '.join([str(idx)] + [_format_value(v) for v in row]) + ' |')
+    if res.conclusiones:
+        lines.append("")
+        lines.extend(f"- {c}" for c in res.conclusiones)
+    return '\n'.join(lines)
+
+def _to_builtin(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+def render_json(res):
+    data = {
+        'nombre': res.nombre,
+        'metricas': {k: _to_builtin(v) for k, v in res.metricas.items()},
+        'tablas': {name: json.loads(table.to_json(orient='split', force_ascii=False))
+                   for name, table in res.tablas.items()},
+        'conclusiones': res.conclusiones
+    }
+    return json.dumps(data, ensure_ascii=False, indent=2)
+
+def render_csv(res, directorio='.'):
+    """
+    Escribe una tabla por archivo (<nombre>.csv) más metricas.csv
+
+    Returns:
+        list: Rutas escritas
+    """
+    os.makedirs(directorio, exist_ok=True)
+    paths = []
+    for name, table in dict(res.tablas, metricas=pd.Series(res.metricas, name='valor').to_frame()).items():
+        path = os.path.join(directorio, f"{name}.csv")
+        table.to_csv(path)
+        paths.append(path)
+    return paths
+
+def render(res, formato='consola', **kwargs):
+    """
+    Presenta un ResultadoAnalisis en el formato pedido (ver FORMATOS)
+    """
+    renderers = {
+        'consola': render_console,
+        'markdown': render_markdown,
+        'json': render_json,
+        'csv': render_csv
+    }
+    if formato not in renderers:
+        raise ValueError(f"Formato no soportado: {formato}. Opciones: {FORMATOS}")
+    return renderers[formato](res, **kwargs)
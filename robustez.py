@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+
+# Preferencias de riesgo: columna de la tabla que se maximiza
+CRITERIOS_RIESGO = {
+    'media': 'Utilidad_Media',
+    'cvar': 'Utilidad_CVaR',
+    'peor_k': 'Utilidad_Peores_k'
+}
+
+def daily_schedule_costs(precios, masks, num_robots=25, consumption_per_robot=0.2):
+    """
+    Costo energético de cada horario en cada día
+
+    Args:
+        precios: Matriz (días, 24); las horas sin precio no cuestan (igual que dropna)
+        masks: Horas trabajadas por horario (K, 24)
+
+    Returns:
+        np.ndarray: Costos (K, días)
+    """
+    precios = np.nan_to_num(np.asarray(precios, dtype=float))
+    return np.asarray(masks, dtype=float) @ precios.T * num_robots * consumption_per_robot
+
+def bootstrap_schedule_risk(costos_diarios, ingresos_diarios=0.0, n_replicas=5000, n_dias=None, alpha=0.95,
+                            peores_k=3, batch_size=1000, seed=0):
+    """
+    Distribución bootstrap de la utilidad mensual de cada horario
+
+    Cada réplica es un mes de n_dias remuestreados con reemplazo de los días
+    observados. Los índices se generan en bloques (batch_size, n_dias) y se usan
+    para indexar todos los horarios a la vez; todos los horarios ven los mismos
+    días remuestreados, así que las diferencias entre ellos no agregan ruido.
+
+    Args:
+        costos_diarios: Costos (K, días) de daily_schedule_costs
+        ingresos_diarios: Ingreso por día de cada horario, escalar o (K,)
+        n_dias: Días por réplica; por defecto los días observados
+        alpha: Nivel del CVaR (0.95 = promedio del 5% de réplicas con menor utilidad)
+        peores_k: Días más caros de cada réplica que se promedian
+
+    Returns:
+        dict: Arreglos (K,) con media, desviación, VaR/CVaR y costo de los peores k días
+    """
+    costos_diarios = np.asarray(costos_diarios, dtype=float)
+    n_schedules, n_observed = costos_diarios.shape
+    n_dias = n_observed if n_dias is None else n_dias
+    ingresos_diarios = np.broadcast_to(np.asarray(ingresos_diarios, dtype=float), (n_schedules,))
+    rng = np.random.default_rng(seed)
+
+    costo_mes = np.empty((n_schedules, n_replicas))
+    peores = np.empty((n_schedules, n_replicas))
+    for start in range(0, n_replicas, batch_size):
+        stop = min(start + batch_size, n_replicas)
+        idx = rng.integers(0, n_observed, size=(stop - start, n_dias))
+        sample = costos_diarios[:, idx]  # (K, lote, n_dias)
+        costo_mes[:, start:stop] = sample.sum(axis=2)
+        # Los k días más caros de cada réplica
+        peores[:, start:stop] = np.partition(sample, n_dias - peores_k, axis=2)[..., n_dias - peores_k:].sum(axis=2)
+
+    utilidad = ingresos_diarios[:, None] * n_dias - costo_mes
+    n_tail = max(1, int(np.ceil((1 - alpha) * n_replicas)))
+    tail = np.sort(utilidad, axis=1)[:, :n_tail]
+
+    return {
+        'utilidad_media': utilidad.mean(axis=1),
+        'utilidad_std': utilidad.std(axis=1),
+        'utilidad_var': tail[:, -1],
+        'utilidad_cvar': tail.mean(axis=1),
+        'costo_medio': costo_mes.mean(axis=1),
+        'costo_peores_k': peores.mean(axis=1),
+        'utilidad_peores_k': ingresos_diarios * peores_k - peores.mean(axis=1)
+    }
+
+def rank_schedules_by_risk(nombres, riesgo, peores_k=3):
+    """
+    Tabla de métricas por horario y el mejor horario bajo cada preferencia de riesgo
+
+    Returns:
+        tuple: (DataFrame indexado por horario, dict criterio -> horario)
+    """
+    tabla = pd.DataFrame({
+        'Utilidad_Media': riesgo['utilidad_media'],
+        'Utilidad_Std': riesgo['utilidad_std'],
+        'Utilidad_VaR': riesgo['utilidad_var'],
+        'Utilidad_CVaR': riesgo['utilidad_cvar'],
+        'Costo_Peores_k': riesgo['costo_peores_k'],
+        'Utilidad_Peores_k': riesgo['utilidad_peores_k']
+    }, index=pd.Index(list(nombres), name='Horario'))
+    tabla.attrs['peores_k'] = peores_k
+
+    mejores = {criterio: tabla[columna].idxmax() for criterio, columna in CRITERIOS_RIESGO.items()}
+    return tabla, mejores
+
+def robust_schedule_ranking(precios, schedules, ingresos_diarios, num_robots=25, consumption_per_robot=0.2,
+                            **bootstrap_kwargs):
+    """
+    Atajo: costos diarios, bootstrap y ranking para horarios con formato define_work_schedules
+
+    Args:
+        precios: Matriz (días, 24) del período analizado (ej. enero)
+        schedules: Diccionario de horarios con 'horas_trabajo'
+        ingresos_diarios: Ingreso por día de cada horario, mismo orden que schedules
+    """
+    masks = np.zeros((len(schedules), 24), dtype=bool)
+    for i, info in enumerate(schedules.values()):
+        for start_hour, end_hour in info['horas_trabajo']:
+            masks[i, start_hour:end_hour] = True
+
+    costos = daily_schedule_costs(precios, masks, num_robots, consumption_per_robot)
+    riesgo = bootstrap_schedule_risk(costos, ingresos_diarios, **bootstrap_kwargs)
+    return rank_schedules_by_risk(list(schedules), riesgo, bootstrap_kwargs.get('peores_k', 3))
+
+def print_risk_ranking(tabla, mejores, nombres=None):
+    """
+    Muestra las métricas de riesgo y el horario elegido por cada preferencia
+    """
+    nombres = nombres or {}
+    k = tabla.attrs.get('peores_k', 3)
+    print("\nSELECCIÓN ROBUSTA DE HORARIOS (BOOTSTRAP DE DÍAS)")
+    print("=" * 120)
+    print(f"{'Horario':<25} {'Media ($)':<16} {'Desv. ($)':<14} {'CVaR ($)':<16} {f'Peores {k} días ($)':<20}")
+    print("-" * 120)
+    for key, row in tabla.iterrows():
+        print(f"{nombres.get(key, key):<25} {row['Utilidad_Media']:<16,.0f} {row['Utilidad_Std']:<14,.0f} "
+              f"{row['Utilidad_CVaR']:<16,.0f} {row['Utilidad_Peores_k']:<20,.0f}")
+
+    etiquetas = {'media': 'Neutral al riesgo (media)', 'cvar': 'Aversión a meses malos (CVaR)',
+                 'peor_k': f'Aversión a días pico (peores {k} días)'}
+    print()
+    for criterio, key in mejores.items():
+        print(f"   • {etiquetas[criterio]:<40} -> {nombres.get(key, key)}")
@@ -0,0 +1,203 @@
+import numpy as np
+import pandas as pd
+from ingresos import PRODUCT_PROFITS_GTQ, PRODUCT_PROBABILITIES
+
+# Parámetros del escenario actual (pregunta2)
+BASE_PARAMETERS = {
+    'num_robots': 25,
+    'consumo_por_robot': 0.2,
+    'minutos_por_producto': 15,
+    'tasa_cambio': 7.8,
+    'hora_inicio': 8,
+    'hora_fin': 20
+}
+
+def _hourly_price_prefix(price_grid):
+    """
+    Suma anual de precios por hora del día y su suma acumulada (25 valores)
+    """
+    hourly_totals = np.nansum(price_grid['precios'], axis=0)
+    return np.concatenate([[0.0], np.cumsum(hourly_totals)])
+
+def evaluate_profit_model(price_grid, params, probabilities=None, product_profits=None, prefix=None):
+    """
+    Modelo anual vectorizado de ingresos, costo energético y utilidad
+
+    Cada parámetro puede ser escalar o arreglo; todo se evalúa con broadcasting,
+    así que una matriz de escenarios se resuelve en una sola llamada. El costo de
+    la ventana [hora_inicio, hora_fin) sale de sumas prefijo de precios por hora.
+
+    Args:
+        price_grid: Diccionario de datos.build_price_grid
+        params: Diccionario con las llaves de BASE_PARAMETERS
+        probabilities: Mezcla de productos (..., 5); por defecto la del Grupo Impar
+        product_profits: Ganancia por producto en GTQ (5,)
+
+    Returns:
+        dict: Arreglos de ingresos, costo y utilidad en USD
+    """
+    if prefix is None:
+        prefix = _hourly_price_prefix(price_grid)
+    profits = np.array(list((product_profits or PRODUCT_PROFITS_GTQ).values()), dtype=float)
+    if probabilities is None:
+        probabilities = np.array(list(PRODUCT_PROBABILITIES.values()))
+
+    avg_profit_gtq = np.asarray(probabilities) @ profits
+
+    start = np.asarray(params['hora_inicio'], dtype=int)
+    end = np.asarray(params['hora_fin'], dtype=int)
+    hours = end - start
+    price_sum = prefix[end] - prefix[start]
+
+    n_days = len(price_grid['fechas'])
+    products = params['num_robots'] * hours * (60 / np.asarray(params['minutos_por_producto'], dtype=float)) * n_days
+    revenue = products * avg_profit_gtq / params['tasa_cambio']
+    cost = params['num_robots'] * params['consumo_por_robot'] * price_sum
+
+    return {
+        'ingresos': revenue,
+        'costo_energia': cost,
+        'utilidad': revenue - cost,
+        'productos': products
+    }
+
+def analytic_gradient(price_grid, params=None, probabilities=None):
+    """
+    Derivadas parciales de la utilidad respecto a cada parámetro continuo
+
+    La ventana horaria es discreta: para hora_inicio/hora_fin se reporta el cambio
+    de utilidad por correr la hora de inicio o de fin una hora más tarde. La mezcla
+    se deriva respecto a la probabilidad de cada producto, con las demás
+    reescaladas en proporción como en _scenario_matrix.
+    """
+    params = dict(BASE_PARAMETERS, **(params or {}))
+    prefix = _hourly_price_prefix(price_grid)
+    profits = np.array(list(PRODUCT_PROFITS_GTQ.values()), dtype=float)
+    if probabilities is None:
+        probabilities = np.array(list(PRODUCT_PROBABILITIES.values()))
+
+    R = params['num_robots']
+    c = params['consumo_por_robot']
+    m = params['minutos_por_producto']
+    fx = params['tasa_cambio']
+    D = len(price_grid['fechas'])
+    start, end = params['hora_inicio'], params['hora_fin']
+    H = end - start
+    P = probabilities @ profits
+    S = prefix[end] - prefix[start]
+
+    # Ingreso por unidad de ganancia promedio (GTQ) por producto
+    k = R * H * (60 / m) * D / fx
+
+    gradient = {
+        'num_robots': H * (60 / m) * D * P / fx - c * S,
+        'consumo_por_robot': -R * S,
+        'minutos_por_producto': -R * H * 60 * D * P / (fx * m ** 2),
+        'tasa_cambio': -k * P / fx
+    }
+
+    # Ventana: diferencias finitas exactas con las sumas prefijo
+    hourly_revenue = R * (60 / m) * D * P / fx
+    if end < 24:
+        gradient['hora_fin'] = hourly_revenue - R * c * (prefix[end + 1] - prefix[end])
+    if start < end - 1:
+        gradient['hora_inicio'] = -hourly_revenue + R * c * (prefix[start + 1] - prefix[start])
+
+    # Mezcla: subir la probabilidad del producto i y reescalar las demás en proporción
+    # (igual que el tornado), de modo que la suma sigue en 1
+    for name, profit, p_i in zip(PRODUCT_PROFITS_GTQ, profits, probabilities):
+        gradient[f'mezcla: {name}'] = k * (profit - P) / (1 - p_i)
+
+    return gradient
+
+def _scenario_matrix(params, probabilities, variacion):
+    """
+    Escenarios bajo/alto por parámetro como arreglos para una sola evaluación
+    """
+    names = []
+    rows = []
+    prob_rows = []
+
+    for name, value in params.items():
+        if name in ('hora_inicio', 'hora_fin'):
+            low, high = value - 1, value + 1
+            if name == 'hora_fin':
+                high = min(high, 24)
+            if name == 'hora_inicio':
+                low = max(low, 0)
+        else:
+            low, high = value * (1 - variacion), value * (1 + variacion)
+
+        for scenario_value in (low, high):
+            rows.append(dict(params, **{name: scenario_value}))
+            prob_rows.append(probabilities)
+        names.append(name)
+
+    for i, name in enumerate(PRODUCT_PROFITS_GTQ):
+        for factor in (1 - variacion, 1 + variacion):
+            shifted = probabilities.copy()
+            shifted[i] = min(probabilities[i] * factor, 1.0)
+            others = np.arange(len(probabilities)) != i
+            shifted[others] *= (1 - shifted[i]) / probabilities[others].sum()
+            rows.append(dict(params))
+            prob_rows.append(shifted)
+        names.append(f'mezcla: {name}')
+
+    stacked = {key: np.array([row[key] for row in rows]) for key in params}
+    return names, stacked, np.array(prob_rows)
+
+def sensitivity_report(price_grid, params=None, variacion=0.10):
+    """
+    Tabla tipo tornado con derivadas, elasticidades y rangos de utilidad
+
+    Todos los escenarios bajo/alto se evalúan en una sola llamada vectorizada
+    del modelo en lugar de re-ejecutar el análisis por parámetro.
+
+    Args:
+        price_grid: Diccionario de datos.build_price_grid
+        params: Parámetros a sobrescribir sobre BASE_PARAMETERS
+        variacion: Variación relativa para el tornado (ventana horaria: ±1 hora)
+
+    Returns:
+        pd.DataFrame: Una fila por parámetro ordenada por rango de utilidad
+    """
+    params = dict(BASE_PARAMETERS, **(params or {}))
+    probabilities = np.array(list(PRODUCT_PROBABILITIES.values()), dtype=float)
+    prefix = _hourly_price_prefix(price_grid)
+
+    base_profit = float(evaluate_profit_model(price_grid, params, probabilities, prefix=prefix)['utilidad'])
+    gradient = analytic_gradient(price_grid, params, probabilities)
+
+    names, stacked, prob_matrix = _scenario_matrix(params, probabilities, variacion)
+    profits = evaluate_profit_model(price_grid, stacked, prob_matrix, prefix=prefix)['utilidad'].reshape(-1, 2)
+
+    # Valor base de la mezcla = probabilidad del producto (define su elasticidad)
+    base_values = dict(params, **{f'mezcla: {name}': p for name, p in zip(PRODUCT_PROFITS_GTQ, probabilities)})
+
+    rows = []
+    for name, (low, high) in zip(names, profits):
+        value = base_values.get(name)
+        derivative = gradient.get(name, np.nan)
+        elasticity = derivative * value / base_profit if value is not None else np.nan
+        rows.append({
+            'Parametro': name,
+            'Valor_Base': value,
+            'Derivada': derivative,
+            'Elasticidad': elasticity,
+            'Utilidad_Baja': low,
+            'Utilidad_Alta': high,
+            'Rango': abs(high - low)
+        })
+
+    return pd.DataFrame(rows).sort_values('Rango', ascending=False).reset_index(drop=True)
+
+def print_tornado(report, width=40):
+    """
+    Muestra el tornado en consola (barras proporcionales al rango)
+    """
+    print("\nANÁLISIS DE SENSIBILIDAD DE LA UTILIDAD ANUAL")
+    print("=" * 100)
+    max_range = report['Rango'].max()
+    for _, row in report.iterrows():
+        bar = '█' * max(1, int(round(row['Rango'] / max_range * width)))
+        print(f"{row['Parametro']:<40} {bar:<{width}} ${row['Utilidad_Baja']:>14,.0f} → ${row['Utilidad_Alta']:>14,.0f}")
@@ -0,0 +1,342 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+import numpy as np
+from datos import MONTHS
+from validacion import load_price_data
+from pregunta2 import compute_energy_cost_scenario
+from pregunta3 import compute_monthly_profitability
+from calendario import CLASIFICACIONES, build_calendar_context
+from indice_precios import build_price_rank_index, cheapest_hours
+from ingresos import optimize_hours_by_profit
+from pareto import mask_to_periods
+from cache_resultados import hash_inputs
+
+# Parámetros aceptados por consulta y su valor por defecto (escenario actual)
+PARAMETROS_OPERACION = {
+    'num_robots': 25,
+    'consumo_por_robot': 0.2,
+    'minutos_por_producto': 15,
+    'tasa_cambio': 7.8,
+    'hora_inicio': 8,
+    'hora_fin': 20,
+    'mes': None
+}
+
+def _parse_month(value):
+    if value is None or value == '':
+        return None
+    if isinstance(value, str) and not value.isdigit():
+        return MONTHS.index(value.capitalize()) + 1
+    month = int(value)
+    if not 1 <= month <= 12:
+        raise ValueError(f"Mes fuera de rango: {month}")
+    return month
+
+def _parse_list(value):
+    if value is None or value == '':
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    return [v.strip() if isinstance(v, str) else v for v in value]
+
+def _operation_params(raw):
+    """
+    Normaliza los parámetros de operación (query string o JSON) con sus tipos
+    """
+    params = dict(PARAMETROS_OPERACION)
+    for key, default in PARAMETROS_OPERACION.items():
+        if key in raw and key != 'mes':
+            params[key] = type(default)(raw[key])
+    params['mes'] = _parse_month(raw.get('mes'))
+
+    if not 0 <= params['hora_inicio'] < params['hora_fin'] <= 24:
+        raise ValueError("Se requiere 0 <= hora_inicio < hora_fin <= 24")
+    if params['num_robots'] < 0 or params['consumo_por_robot'] < 0:
+        raise ValueError("num_robots y consumo_por_robot no pueden ser negativos")
+    if params['minutos_por_producto'] <= 0 or params['tasa_cambio'] <= 0:
+        raise ValueError("minutos_por_producto y tasa_cambio deben ser positivos")
+    return params
+
+def _parse_hours(value, nombre='n_horas', default=None):
+    if value is None or value == '':
+        return default
+    n_horas = int(value)
+    if not 1 <= n_horas <= 24:
+        raise ValueError(f"{nombre} fuera de rango (1-24): {n_horas}")
+    return n_horas
+
+def _schedule_params(raw):
+    return dict(_operation_params(raw), n_horas=_parse_hours(raw.get('n_horas')))
+
+def _context_params(raw):
+    """
+    Normaliza la consulta de contexto: meses como números y n entre 1 y 24
+    """
+    meses = _parse_list(raw.get('meses'))
+    clasificaciones = _parse_list(raw.get('clasificaciones'))
+    for clasificacion in clasificaciones or []:
+        if clasificacion not in CLASIFICACIONES:
+            raise ValueError(f"Clasificación desconocida: {clasificacion}. Opciones: {CLASIFICACIONES}")
+    return {
+        'meses': None if meses is None else [_parse_month(m) for m in meses],
+        'clasificaciones': clasificaciones,
+        'n': _parse_hours(raw.get('n'), 'n', default=5),
+        'mas_caras': str(raw.get('mas_caras', '')).lower() in ('1', 'true', 'si', 'sí')
+    }
+
+def _to_json(value):
+    if isinstance(value, dict):
+        return {str(k): _to_json(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return _to_json(value.tolist())
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    return value
+
+class ServicioConsultas:
+    """
+    Servicio HTTP/JSON de consultas de costo, rentabilidad, horarios y contexto
+
+    La grilla de precios, el contexto de calendario y el índice de rangos se
+    cargan una sola vez al iniciar. Cada consulta se calcula en un hilo del
+    ejecutor con las mismas funciones de los análisis (pregunta2, pregunta3,
+    ingresos e indice_precios), y el resultado queda en un caché LRU en memoria
+    con clave en los parámetros ya normalizados (mes=5 y mes=Mayo, o un valor
+    omitido y su valor por defecto, son la misma consulta). Consultas idénticas
+    que llegan al mismo tiempo comparten el mismo cálculo en curso.
+
+    Rutas:
+        GET/POST /costo         Costo energético por mes (num_robots, consumo_por_robot, hora_inicio, hora_fin, mes)
+        GET/POST /rentabilidad  Ingresos, costos y utilidad (además minutos_por_producto, tasa_cambio)
+        GET/POST /horarios      Mejores n_horas por mes según utilidad
+        GET/POST /contexto      Horas más baratas por mes y clasificación de día
+        GET      /metricas      Latencias p50/p99 y aciertos de caché por ruta
+    """
+
+    def __init__(self, price_grid, df_list, max_cache=512, max_workers=4, ventana_latencias=2000):
+        self.price_grid = price_grid
+        self.df_list = df_list
+        self.context = build_calendar_context(price_grid)
+        self.index = build_price_rank_index(price_grid, self.context)
+        self.max_cache = max_cache
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.cache = OrderedDict()
+        self.latencias = defaultdict(lambda: deque(maxlen=ventana_latencias))
+        self.contadores = defaultdict(lambda: {'consultas': 0, 'aciertos_cache': 0, 'errores': 0})
+        # Ruta -> (normalizador de parámetros, consulta)
+        self.routes = {
+            '/costo': (_operation_params, self.query_cost),
+            '/rentabilidad': (_operation_params, self.query_profitability),
+            '/horarios': (_schedule_params, self.query_schedule),
+            '/contexto': (_context_params, self.query_context)
+        }
+
+    @classmethod
+    def from_file(cls, file_path, **kwargs):
+        df_list, price_grid = load_price_data(file_path, fill_gaps=True, verbose=False)
+        return cls(price_grid, df_list, **kwargs)
+
+    # -------------------------------------------------------------------------
+    # Consultas (se ejecutan en el pool de hilos)
+    # -------------------------------------------------------------------------
+
+    def _monthly(self, params, monthly):
+        monthly = np.asarray(monthly, dtype=float)
+        if params['mes'] is not None:
+            return {'mes': MONTHS[params['mes'] - 1], 'total': monthly[params['mes'] - 1]}
+        return {'mensual': dict(zip(MONTHS, monthly)), 'total': monthly.sum()}
+
+    def query_cost(self, params):
+        _, monthly_costs, _ = compute_energy_cost_scenario(
+            self.df_list,
+            num_robots=params['num_robots'],
+            consumption_per_robot=params['consumo_por_robot'],
+            working_hours_start=params['hora_inicio'],
+            working_hours_end=params['hora_fin']
+        )
+        return dict(parametros=params, costo_usd=self._monthly(params, monthly_costs))
+
+    def query_profitability(self, params):
+        df_analysis = compute_monthly_profitability(
+            self.df_list,
+            num_robots=params['num_robots'],
+            consumption_per_robot=params['consumo_por_robot'],
+            working_hours_start=params['hora_inicio'],
+            working_hours_end=params['hora_fin'],
+            minutes_per_product=params['minutos_por_producto'],
+            gtq_to_usd_rate=params['tasa_cambio']
+        )
+        result = {'parametros': params}
+        columns = {'productos': 'Productos', 'ingresos_usd': 'Ingresos_USD',
+                   'costos_usd': 'Costos_Energia_USD', 'utilidad_usd': 'Utilidad_USD'}
+        for key, column in columns.items():
+            result[key] = self._monthly(params, df_analysis[column])
+        return result
+
+    def query_schedule(self, params):
+        optimum = optimize_hours_by_profit(
+            self.price_grid, n_horas=params['n_horas'],
+            num_robots=params['num_robots'],
+            consumption_per_robot=params['consumo_por_robot'],
+            minutes_per_product=params['minutos_por_producto'],
+            gtq_to_usd_rate=params['tasa_cambio']
+        )
+        months = range(1, 13) if params['mes'] is None else [params['mes']]
+        horarios = {}
+        for month in months:
+            mask = optimum['mascara_horas'][month - 1]
+            bits = int(np.sum(1 << np.flatnonzero(mask)))
+            horarios[MONTHS[month - 1]] = {
+                'horas': np.flatnonzero(mask),
+                'periodos': mask_to_periods(bits),
+                'utilidad_mensual': optimum['utilidad_mensual'][month - 1]
+            }
+        return {'parametros': params, 'horarios': horarios}
+
+    def query_context(self, params):
+        horas = cheapest_hours(self.index, params['n'], meses=params['meses'],
+                               clasificaciones=params['clasificaciones'], mas_caras=params['mas_caras'])
+        return {
+            'meses': params['meses'],
+            'clasificaciones': params['clasificaciones'],
+            'horas': [{'hora': hour, 'precio_promedio': price} for hour, price in horas]
+        }
+
+    # -------------------------------------------------------------------------
+    # Caché, métricas y despacho
+    # -------------------------------------------------------------------------
+
+    async def dispatch(self, path, raw):
+        """
+        Resuelve una consulta usando el caché LRU; devuelve (status, cuerpo)
+        """
+        if path == '/metricas':
+            return 200, self.metrics()
+        if path not in self.routes:
+            return 404, {'error': f"Ruta desconocida: {path}", 'rutas': sorted(self.routes) + ['/metricas']}
+
+        start = time.perf_counter()
+        counters = self.contadores[path]
+        counters['consultas'] += 1
+        normalize, query = self.routes[path]
+
+        try:
+            params = normalize(raw)
+        except (ValueError, KeyError, TypeError) as e:
+            counters['errores'] += 1
+            self.latencias[path].append((time.perf_counter() - start) * 1000)
+            return 400, {'error': str(e)}
+        key = hash_inputs(path, params)
+
+        future = self.cache.get(key)
+        if future is not None:
+            self.cache.move_to_end(key)
+            counters['aciertos_cache'] += 1
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.executor, query, params)
+            self.cache[key] = future
+            if len(self.cache) > self.max_cache:
+                self.cache.popitem(last=False)
+
+        try:
+            body = await asyncio.shield(future)
+            status = 200
+        except (ValueError, KeyError, TypeError) as e:
+            self.cache.pop(key, None)  # los errores no se guardan
+            counters['errores'] += 1
+            body, status = {'error': str(e)}, 400
+        except Exception as e:
+            self.cache.pop(key, None)
+            counters['errores'] += 1
+            body, status = {'error': f"Error interno: {type(e).__name__}: {e}"}, 500
+
+        self.latencias[path].append((time.perf_counter() - start) * 1000)
+        return status, body
+
+    def metrics(self):
+        """
+        Latencia p50/p99 (ms) sobre la ventana reciente y contadores por ruta
+        """
+        report = {}
+        for path, counters in self.contadores.items():
+            samples = np.array(self.latencias[path])
+            report[path] = dict(counters)
+            if len(samples):
+                report[path].update({
+                    'p50_ms': float(np.percentile(samples, 50)),
+                    'p99_ms': float(np.percentile(samples, 99)),
+                    'max_ms': float(samples.max())
+                })
+        return {'rutas': report, 'entradas_cache': len(self.cache)}
+
+    async def handle_connection(self, reader, writer):
+        """
+        HTTP/1.1 mínimo: una consulta por conexión, parámetros por query string o JSON
+        """
+        try:
+            try:
+                request_line = await reader.readline()
+                if not request_line:
+                    return
+                method, target, _ = request_line.decode('latin-1').split(' ', 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                url = urlsplit(target)
+                raw = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                length = int(headers.get('content-length', 0))
+                if method == 'POST' and length:
+                    raw.update(json.loads(await reader.readexactly(length)))
+
+                status, body = await self.dispatch(url.path.rstrip('/') or '/', raw)
+            except (ValueError, json.JSONDecodeError) as e:
+                status, body = 400, {'error': f"Solicitud inválida: {e}"}
+            except Exception as e:
+                status, body = 500, {'error': f"Error interno: {type(e).__name__}: {e}"}
+
+            payload = json.dumps(_to_json(body), ensure_ascii=False).encode('utf-8')
+            reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 500: 'Internal Server Error'}[status]
+            writer.write(
+                f"HTTP/1.1 {status} {reason}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: close\r\n\r\n".encode('latin-1') + payload
+            )
+            await writer.drain()
+        except ConnectionError:
+            pass  # el cliente cerró la conexión antes de recibir la respuesta
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8080):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"Servicio de consultas en http://{host}:{port} (rutas: {', '.join(sorted(self.routes))}, /metricas)")
+        async with server:
+            await server.serve_forever()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Servicio HTTP de consultas de costo y horarios")
+    parser.add_argument('archivo', nargs='?', default=r"Modela1Fixeddata.xlsx")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=8080)
+    args = parser.parse_args()
+
+    servicio = ServicioConsultas.from_file(args.archivo)
+    asyncio.run(servicio.serve(args.host, args.puerto))
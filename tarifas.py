@@ -0,0 +1,153 @@
+import numpy as np
+import pandas as pd
+
+def define_tariffs():
+    """
+    Define estructuras tarifarias de ejemplo aplicadas sobre el precio spot
+
+    Cada banda suma un recargo (USD/MWh) en sus horas; 'solo_laborales' limita
+    la banda a lunes-viernes. El cargo de demanda se cobra sobre el pico mensual en kW.
+    """
+    tariffs = {
+        'Spot': {
+            'nombre': 'Precio spot (sin cargos)',
+            'cargo_fijo_mensual': 0.0,
+            'cargo_demanda_kw': 0.0,
+            'bandas': []
+        },
+        'Horaria_Industrial': {
+            'nombre': 'Horaria industrial',
+            'cargo_fijo_mensual': 1500.0,
+            'cargo_demanda_kw': 8.5,
+            'bandas': [
+                {'nombre': 'Punta', 'horas': [(18, 22)], 'recargo_mwh': 25.0, 'solo_laborales': True},
+                {'nombre': 'Intermedia', 'horas': [(8, 18)], 'recargo_mwh': 8.0, 'solo_laborales': True},
+                {'nombre': 'Valle', 'horas': [(0, 6)], 'recargo_mwh': -4.0, 'solo_laborales': False}
+            ]
+        },
+        'Demanda_Alta': {
+            'nombre': 'Cargo por demanda alto',
+            'cargo_fijo_mensual': 800.0,
+            'cargo_demanda_kw': 15.0,
+            'bandas': [
+                {'nombre': 'Punta', 'horas': [(18, 21)], 'recargo_mwh': 12.0, 'solo_laborales': False}
+            ]
+        }
+    }
+
+    return tariffs
+
+def scenario_consumption_profile(num_robots=25, consumption_per_robot=0.2,
+                                 working_hours_start=8, working_hours_end=20):
+    """
+    Perfil diario de consumo (MWh por hora, 24 valores) equivalente a calculate_energy_cost_scenario
+    """
+    profile = np.zeros(24)
+    profile[working_hours_start:working_hours_end] = num_robots * consumption_per_robot
+    return profile
+
+def _weekday(price_grid):
+    # 1970-01-01 fue jueves: (días + 3) % 7 da 0=lunes
+    return (price_grid['fechas'].astype('datetime64[D]').astype(np.int64) + 3) % 7
+
+def build_band_adders(price_grid, tariffs):
+    """
+    Recargos por banda horaria como tensor (tarifas, días, 24) en USD/MWh
+    """
+    n_days = len(price_grid['fechas'])
+    hours = np.arange(24)
+    is_workday = _weekday(price_grid) < 5
+
+    adders = np.zeros((len(tariffs), n_days, 24))
+    for t_idx, tariff in enumerate(tariffs):
+        for band in tariff['bandas']:
+            hour_mask = np.zeros(24, dtype=bool)
+            for start_hour, end_hour in band['horas']:
+                hour_mask |= (hours >= start_hour) & (hours < end_hour)
+            day_mask = is_workday if band.get('solo_laborales', False) else np.ones(n_days, dtype=bool)
+            adders[t_idx] += band['recargo_mwh'] * (day_mask[:, None] & hour_mask[None, :])
+
+    return adders
+
+def evaluate_tariffs(price_grid, consumption_profiles, tariffs):
+    """
+    Evalúa todas las combinaciones tarifa × perfil de consumo en una sola pasada
+
+    Args:
+        price_grid: Diccionario de datos.build_price_grid
+        consumption_profiles: MWh por hora; (24,) un perfil diario, (S, 24) S perfiles
+                              diarios repetidos cada día, o (S, días, 24) perfiles completos
+        tariffs: Lista de tarifas con el formato de define_tariffs()
+
+    Las horas sin precio no consumen (igual que el dropna() de pregunta1-4): no
+    pagan recargos de banda ni cuentan para el pico de demanda.
+
+    Returns:
+        dict: Tensores (tarifas, perfiles, 12) con cada componente del costo mensual
+    """
+    profiles = np.asarray(consumption_profiles, dtype=float)
+    if profiles.ndim == 1:
+        profiles = profiles[None, :]
+
+    valid = ~np.isnan(price_grid['precios'])
+    precios = np.nan_to_num(price_grid['precios'], nan=0.0)
+    month_idx = price_grid['mes'] - 1
+    n_days = len(month_idx)
+
+    # Matriz indicadora mes × día para sumar por mes con einsum
+    month_matrix = np.zeros((12, n_days))
+    month_matrix[month_idx, np.arange(n_days)] = 1.0
+    month_starts = np.searchsorted(month_idx, np.arange(12))
+
+    adders = build_band_adders(price_grid, tariffs)
+    fixed = np.array([tariff['cargo_fijo_mensual'] for tariff in tariffs])
+    demand_rate = np.array([tariff['cargo_demanda_kw'] for tariff in tariffs])
+
+    if profiles.ndim == 2:
+        # Perfiles diarios: primero se agregan precios/recargos por (mes, hora)
+        price_by_month_hour = month_matrix @ precios
+        adder_by_month_hour = np.einsum('md,tdh,dh->tmh', month_matrix, adders, valid)
+        energy = np.einsum('sh,mh->sm', profiles, price_by_month_hour)
+        band_cost = np.einsum('sh,tmh->tsm', profiles, adder_by_month_hour)
+        # Pico mensual: solo horas con al menos un precio válido en el mes
+        priced_month_hour = (month_matrix @ valid) > 0
+        peak_mw = (profiles[:, None, :] * priced_month_hour[None, :, :]).max(axis=2)
+    else:
+        profiles = profiles * valid
+        energy = np.einsum('md,sdh,dh->sm', month_matrix, profiles, precios)
+        band_cost = np.einsum('md,sdh,tdh->tsm', month_matrix, profiles, adders)
+        # Pico mensual: máximo diario y luego reduceat por bloques de meses contiguos
+        peak_mw = np.maximum.reduceat(profiles.max(axis=2), month_starts, axis=1)
+
+    n_tariffs, n_profiles = len(tariffs), profiles.shape[0]
+    energy = np.broadcast_to(energy, (n_tariffs, n_profiles, 12))
+    peak_kw = peak_mw * 1000
+    demand = demand_rate[:, None, None] * peak_kw[None, :, :]
+    fixed_cost = np.broadcast_to(fixed[:, None, None], (n_tariffs, n_profiles, 12))
+
+    return {
+        'energia': energy,
+        'recargos_banda': band_cost,
+        'cargo_demanda': demand,
+        'cargo_fijo': fixed_cost,
+        'pico_kw': peak_kw,
+        'total': energy + band_cost + demand + fixed_cost
+    }
+
+def tariff_summary_table(result, tariff_names, profile_names):
+    """
+    Tabla anual por tarifa y perfil con el desglose de componentes
+    """
+    rows = []
+    for t_idx, tariff_name in enumerate(tariff_names):
+        for s_idx, profile_name in enumerate(profile_names):
+            rows.append({
+                'Tarifa': tariff_name,
+                'Perfil': profile_name,
+                'Energia_USD': result['energia'][t_idx, s_idx].sum(),
+                'Recargos_USD': result['recargos_banda'][t_idx, s_idx].sum(),
+                'Demanda_USD': result['cargo_demanda'][t_idx, s_idx].sum(),
+                'Fijo_USD': result['cargo_fijo'][t_idx, s_idx].sum(),
+                'Total_USD': result['total'][t_idx, s_idx].sum()
+            })
+    return pd.DataFrame(rows)
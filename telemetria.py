@@ -0,0 +1,140 @@
+import os
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet es opcional; CSV funciona sin pyarrow
+    pq = None
+
+# Columnas esperadas en los registros de medidores por robot (resolución de minuto)
+COLUMNAS_TELEMETRIA = {'tiempo': 'timestamp', 'robot': 'robot_id', 'energia': 'kwh'}
+KWH_POR_MWH = 1000.0
+
+def iter_telemetry_chunks(file_path, columnas=None, chunksize=1_000_000):
+    """
+    Lee los registros de telemetría por bloques desde CSV o Parquet
+
+    Solo se cargan las tres columnas necesarias y nunca más de chunksize filas
+    a la vez, para archivos con millones de lecturas por mes.
+
+    Yields:
+        pd.DataFrame: Bloque con columnas tiempo, robot y energía
+    """
+    columnas = {**COLUMNAS_TELEMETRIA, **(columnas or {})}
+    usecols = [columnas['tiempo'], columnas['robot'], columnas['energia']]
+
+    if file_path.lower().endswith(('.parquet', '.pq')):
+        if pq is None:
+            raise ImportError("Leer Parquet requiere pyarrow (pip install pyarrow); use CSV como alternativa")
+        parquet_file = pq.ParquetFile(file_path)
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=usecols):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(file_path, usecols=usecols, chunksize=chunksize)
+
+class HourlyConsumptionAccumulator:
+    """
+    Acumula consumo por celda (día, hora) de la grilla de precios, bloque por bloque
+
+    Cada bloque se reduce con bincount sobre el índice plano día × 24 + hora, así
+    que la memoria depende de la grilla (365 × 24) y del número de robots, no del
+    tamaño del archivo.
+    """
+
+    def __init__(self, price_grid, columnas=None, kwh_por_unidad=1.0):
+        self.columnas = {**COLUMNAS_TELEMETRIA, **(columnas or {})}
+        self.kwh_por_unidad = kwh_por_unidad
+        self.start = price_grid['fechas'][0].astype('datetime64[h]')
+        self.shape = price_grid['precios'].shape
+        self.n_cells = self.shape[0] * self.shape[1]
+
+        self.energia_kwh = np.zeros(self.n_cells)
+        self.lecturas = np.zeros(self.n_cells, dtype=np.int64)
+        self.robots = {}  # robot -> fila en self.activos
+        self.activos = np.zeros((0, self.n_cells), dtype=bool)  # (robots, celdas) con consumo
+        self.filas = 0
+        self.fuera_de_rango = 0
+
+    def add_chunk(self, chunk):
+        times = pd.to_datetime(chunk[self.columnas['tiempo']]).to_numpy().astype('datetime64[h]')
+        cell = (times - self.start).astype(np.int64)
+        energy = pd.to_numeric(chunk[self.columnas['energia']], errors='coerce').to_numpy(dtype=float)
+
+        valid = (cell >= 0) & (cell < self.n_cells) & ~np.isnan(energy)
+        self.filas += len(chunk)
+        self.fuera_de_rango += int((~valid).sum())
+        cell, energy = cell[valid], energy[valid] * self.kwh_por_unidad
+
+        self.energia_kwh += np.bincount(cell, weights=energy, minlength=self.n_cells)
+        self.lecturas += np.bincount(cell, minlength=self.n_cells)
+
+        # Robots activos por hora: se marca cada (robot, celda) con consumo positivo en
+        # una sola asignación sobre el índice plano fila × celdas + celda
+        codes, robot_ids = pd.factorize(chunk[self.columnas['robot']].to_numpy()[valid])
+        rows = np.array([self.robots.setdefault(robot, len(self.robots)) for robot in robot_ids], dtype=np.int64)
+        if len(self.robots) > len(self.activos):
+            nuevos = np.zeros((len(self.robots) - len(self.activos), self.n_cells), dtype=bool)
+            self.activos = np.vstack([self.activos, nuevos])
+        active = energy > 0
+        self.activos.reshape(-1)[rows[codes[active]] * self.n_cells + cell[active]] = True
+
+    def result(self):
+        consumo = (self.energia_kwh / KWH_POR_MWH).reshape(self.shape)
+        robots_activos = self.activos.sum(axis=0).reshape(self.shape)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            por_robot = np.where(robots_activos > 0, consumo / robots_activos, np.nan)
+
+        return {
+            'consumo_mwh': consumo,
+            'robots_activos': robots_activos,
+            'consumo_por_robot': por_robot,
+            'lecturas': self.lecturas.reshape(self.shape),
+            'num_robots': len(self.robots),
+            'filas': self.filas,
+            'fuera_de_rango': self.fuera_de_rango
+        }
+
+def load_robot_telemetry(file_path, price_grid, columnas=None, kwh_por_unidad=1.0, chunksize=1_000_000,
+                         verbose=True):
+    """
+    Consumo horario medido de la flota, alineado a la grilla de precios
+
+    Args:
+        file_path: CSV o Parquet con una lectura por robot y minuto
+        price_grid: Diccionario de datos.build_price_grid (define días y año)
+        columnas: Nombres de columnas si difieren de COLUMNAS_TELEMETRIA
+        kwh_por_unidad: Factor de la columna de energía a kWh (ej. 0.001 si viene en Wh)
+        chunksize: Filas por bloque de lectura
+
+    Returns:
+        dict: Matrices (días, 24) de consumo MWh, robots activos y consumo por robot
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"No se encontró el archivo de telemetría: {file_path}")
+
+    accumulator = HourlyConsumptionAccumulator(price_grid, columnas, kwh_por_unidad)
+    for chunk in iter_telemetry_chunks(file_path, columnas, chunksize):
+        accumulator.add_chunk(chunk)
+    result = accumulator.result()
+
+    if verbose:
+        print(f"\nTELEMETRÍA: {os.path.basename(file_path)}")
+        print(f"- Lecturas procesadas: {result['filas']:,} ({result['fuera_de_rango']:,} fuera del año o inválidas)")
+        print(f"- Robots: {result['num_robots']}")
+        print(f"- Consumo total: {result['consumo_mwh'].sum():,.2f} MWh")
+        print(f"- Consumo medio por robot-hora: {np.nanmean(result['consumo_por_robot']):.3f} MWh")
+
+    return result
+
+def consumption_sheets(consumo, price_grid):
+    """
+    Divide la matriz (días, 24) en hojas mensuales (24 horas × días) como df_list
+
+    Es el formato que recibe pregunta2.calculate_energy_cost_scenario(consumo_horario=...).
+    """
+    sheets = []
+    for month in range(1, 13):
+        rows = price_grid['mes'] == month
+        sheets.append(pd.DataFrame(consumo[rows].T, columns=price_grid['dia'][rows]))
+    return sheets
@@ -0,0 +1,46 @@
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+# La caché de resultados de las pruebas no se mezcla con la del proyecto
+_cache_dir = tempfile.mkdtemp(prefix='cache_resultados_')
+atexit.register(shutil.rmtree, _cache_dir, ignore_errors=True)
+os.environ['CACHE_RESULTADOS_DIR'] = _cache_dir
+
+# Los módulos del proyecto están en la raíz del repositorio (sin paquete instalable)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+ARCHIVO_PRECIOS = os.path.join(ROOT, 'Modela1Fixeddata.xlsx')
+
+@pytest.fixture(autouse=True, scope='session')
+def _directorio_temporal(tmp_path_factory):
+    # Los archivos que generan los análisis (gráficas, reportes) quedan fuera del repositorio
+    previous = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp('ejecucion'))
+    yield
+    os.chdir(previous)
+
+@pytest.fixture(scope='session')
+def datos_precios():
+    """
+    (df_list, price_grid) del libro 2023, validado como en los scripts de cada pregunta
+    """
+    if not os.path.exists(ARCHIVO_PRECIOS):
+        pytest.skip("Falta Modela1Fixeddata.xlsx")
+    from validacion import load_price_data
+    return load_price_data(ARCHIVO_PRECIOS, fill_gaps=True, verbose=False)
+
+@pytest.fixture(scope='session')
+def df_list(datos_precios):
+    return datos_precios[0]
+
+@pytest.fixture(scope='session')
+def price_grid(datos_precios):
+    return datos_precios[1]
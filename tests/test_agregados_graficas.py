@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+import pregunta5
+from agregados_graficas import VARIABLES_CORRELACION, aggregate_context_table
+from calendario import ESTACIONES
+
+@pytest.fixture(scope='module')
+def tabla_contexto(df_list):
+    tabla = pregunta5.map_energy_data_with_context(df_list, pregunta5.create_guatemala_calendar_2023())
+    return tabla.assign(es_fin_de_semana_num=tabla['es_fin_de_semana'].astype(int),
+                        es_feriado_num=tabla['es_feriado'].astype(int),
+                        ciclo_escolar_num=tabla['ciclo_escolar_activo'].astype(int))
+
+def test_medias_y_correlacion_igual_a_pandas(tabla_contexto):
+    agregados = aggregate_context_table(tabla_contexto, chunksize=1000)
+    datos = agregados.chart_data()
+
+    esperado = tabla_contexto.groupby('estacion')['precio_mwh'].mean()
+    np.testing.assert_allclose(datos['por_estacion'][esperado.index], esperado, rtol=1e-12)
+    esperado = tabla_contexto.groupby('mes')['precio_mwh'].std()
+    np.testing.assert_allclose(datos['std_mes'][esperado.index], esperado, rtol=1e-10)
+
+    correlacion = tabla_contexto[VARIABLES_CORRELACION].corr()
+    np.testing.assert_allclose(datos['correlacion'].to_numpy(), correlacion.to_numpy(), atol=1e-10)
+
+def test_cuartiles_por_estacion_dentro_de_un_bin(tabla_contexto):
+    ancho_bin = 0.5
+    agregados = aggregate_context_table(tabla_contexto, ancho_bin=ancho_bin)
+    stats = {s['label']: s for s in agregados.boxplot_stats()}
+
+    for estacion, precios in tabla_contexto.groupby('estacion')['precio_mwh']:
+        caja = stats[estacion[:3]]
+        q1, med, q3 = precios.quantile([0.25, 0.5, 0.75])
+        assert abs(caja['q1'] - q1) <= ancho_bin
+        assert abs(caja['med'] - med) <= ancho_bin
+        assert abs(caja['q3'] - q3) <= ancho_bin
+
+def test_bloques_combinados_igual_a_un_solo_bloque(tabla_contexto):
+    completo = aggregate_context_table(tabla_contexto, chunksize=len(tabla_contexto))
+    mitad = len(tabla_contexto) // 2
+    combinado = aggregate_context_table(tabla_contexto.iloc[:mitad]).merge(
+        aggregate_context_table(tabla_contexto.iloc[mitad:]))
+
+    np.testing.assert_allclose(combinado.mean('hora_estacion'), completo.mean('hora_estacion'), rtol=1e-12)
+    np.testing.assert_allclose(combinado.correlation(), completo.correlation(), atol=1e-12)
+    np.testing.assert_array_equal(combinado.histogramas, completo.histogramas)
+    assert set(ESTACIONES) >= set(tabla_contexto['estacion'].unique())
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+import ahorros
+from perfiles import build_profile_table
+
+COMPONENTES = ['Horas valle', 'Traslado semanal', 'Mantenimiento estacional']
+
+@pytest.fixture(scope='module', params=['observados', 'perfil'])
+def politicas(request, price_grid):
+    perfil = build_profile_table(price_grid) if request.param == 'perfil' else None
+    return ahorros.evaluate_savings_policies(price_grid, perfil=perfil)
+
+def test_combinada_ahorra_al_menos_la_mejor_politica(politicas):
+    ahorro = politicas['tabla'].set_index('Politica')['Ahorro_Anual']
+    assert ahorro['Combinada'] >= ahorro[COMPONENTES].max() - 1e-6
+    assert set(politicas['politicas_combinada']) <= set(COMPONENTES)
+
+def test_traslape_y_perdida_explican_la_diferencia(politicas):
+    ahorro = politicas['tabla'].set_index('Politica')['Ahorro_Anual']
+    assert politicas['perdida'] >= 0
+    diferencia = ahorro[COMPONENTES].sum() - ahorro['Combinada']
+    assert diferencia == pytest.approx(politicas['traslape'] - politicas['perdida'])
+
+def test_costos_igual_a_re_preciar_cada_mascara(politicas, price_grid):
+    precios = np.nan_to_num(price_grid['precios'])
+    tabla = politicas['tabla'].set_index('Politica')
+    for nombre, mascara in politicas['mascaras'].items():
+        assert tabla.loc[nombre, 'Costo_Anual'] == pytest.approx((mascara * precios).sum() * 5.0, rel=1e-12)
+
+def test_horas_valle_mantienen_las_horas_diarias(price_grid):
+    base = ahorros.baseline_mask(price_grid)
+    valle = ahorros.valley_hours_mask(price_grid, base)
+    np.testing.assert_array_equal(valle.sum(axis=1), base.sum(axis=1))
+
+    tabla = ahorros.valley_hours_by_month(price_grid, valle, base)
+    assert (tabla['Horas'] == 12).all()
+    assert (tabla['Precio_Valle'] <= tabla['Precio_Actual']).all()
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import anomalias
+import pregunta5
+
+def test_ewma_vectorizado_igual_al_detector_en_linea(price_grid):
+    serie = price_grid['precios'].ravel()
+    serie = serie[~np.isnan(serie)]
+
+    vectorizado = anomalias.ewma_zscore(serie)
+    detector = anomalias.OnlineSpikeDetector()
+    en_linea = np.array([detector.update(precio)[1] for precio in serie])
+
+    ambos = np.isfinite(vectorizado) & np.isfinite(en_linea)
+    assert ambos.sum() >= len(serie) - 3
+    np.testing.assert_allclose(vectorizado[ambos], en_linea[ambos], rtol=1e-10, atol=1e-11)
+
+def test_detector_en_linea_marca_un_pico_tras_el_calentamiento():
+    detector = anomalias.OnlineSpikeDetector(warmup=24)
+    for precio in 100 + np.sin(np.arange(48)):
+        es_pico, _ = detector.update(precio)
+        assert not es_pico
+    es_pico, z = detector.update(400.0)
+    assert es_pico and z > detector.threshold
+
+def test_marcas_de_pico_alineadas_con_la_grilla(df_list, price_grid):
+    spikes = anomalias.detect_spikes(price_grid)
+    tabla = pregunta5.map_energy_data_with_context(df_list, pregunta5.create_guatemala_calendar_2023())
+    marcada = anomalias.add_spike_flags(tabla, price_grid, spikes)
+
+    assert marcada['es_pico'].sum() == spikes['picos'].sum()
+    picos = marcada[marcada['es_pico']]
+    dias = (pd.to_datetime(picos['fecha']).to_numpy().astype('datetime64[D]') - price_grid['fechas'][0]).astype(int)
+    np.testing.assert_array_equal(price_grid['precios'][dias, picos['hora']], picos['precio_mwh'])
+
+def test_desglose_de_picos_suma_el_costo_total(price_grid):
+    spikes = anomalias.detect_spikes(price_grid)
+    tabla = anomalias.spike_cost_breakdown(price_grid, spikes)
+    np.testing.assert_allclose(tabla['Costo_Excluyendo_Picos'] + tabla['Costo_Picos'], tabla['Costo_Total'])
+    assert tabla['Costo_Total'].sum() == pytest.approx(2_614_458.60, abs=0.005)
+    assert (tabla['Sobrecosto_Picos'] >= 0).all()
+    assert tabla['Horas_Pico'].sum() <= spikes['picos'].sum()
@@ -0,0 +1,91 @@
+import importlib.util
+import os
+import textwrap
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import cache_resultados
+from cache_resultados import cached_result, hash_inputs
+
+MODULO = '''
+from cache_resultados import cached_result
+
+LLAMADAS = []
+
+def factor(valor, escala={escala}):
+    return valor * escala
+
+@cached_result(cache_dir={cache_dir!r})
+def calcular(valor, extra=1):
+    LLAMADAS.append(valor)
+    return factor(valor) + extra
+'''
+
+def _cargar(directorio, nombre, escala):
+    path = os.path.join(directorio, f"{nombre}.py")
+    with open(path, 'w') as f:
+        f.write(textwrap.dedent(MODULO.format(escala=escala, cache_dir=os.path.join(directorio, 'cache'))))
+    spec = importlib.util.spec_from_file_location(nombre, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def test_resultado_se_sirve_desde_disco(tmp_path):
+    modulo = _cargar(str(tmp_path), 'modulo_a', 2)
+    assert modulo.calcular(3) == 7
+    assert modulo.calcular(3) == 7
+    assert modulo.LLAMADAS == [3]
+
+def test_argumentos_por_posicion_o_nombre_dan_la_misma_clave(tmp_path):
+    modulo = _cargar(str(tmp_path), 'modulo_b', 2)
+    clave = modulo.calcular.cache_key(3)
+    assert modulo.calcular.cache_key(valor=3) == clave
+    assert modulo.calcular.cache_key(3, extra=1) == clave
+    assert modulo.calcular.cache_key(3, extra=2) != clave
+
+def test_cambiar_una_funcion_auxiliar_invalida_la_clave(tmp_path):
+    original = _cargar(str(tmp_path), 'modulo_c', 2).calcular.cache_key(3)
+    assert _cargar(str(tmp_path), 'modulo_c', 2).calcular.cache_key(3) == original
+    # Solo cambia el valor por defecto de factor(), que calcular() llama
+    assert _cargar(str(tmp_path), 'modulo_c', 5).calcular.cache_key(3) != original
+
+def test_hash_de_datos_por_contenido():
+    df = pd.DataFrame({'a': [1.0, 2.0]})
+    assert hash_inputs(df) == hash_inputs(df.copy())
+    assert hash_inputs(df) != hash_inputs(df.assign(a=[1.0, 2.5]))
+
+def test_modulos_agregan_su_contenido_a_la_clave(tmp_path):
+    dependencia = _cargar(str(tmp_path), 'dependencia', 2)
+
+    @cached_result(cache_dir=str(tmp_path / 'cache'), modulos=(dependencia,))
+    def envolver(valor):
+        return valor
+
+    clave = envolver.cache_key(1)
+    with open(dependencia.__file__, 'a') as f:
+        f.write('\nOTRA = 1\n')
+    os.utime(dependencia.__file__, ns=(0, 0))
+
+    @cached_result(cache_dir=str(tmp_path / 'cache'), modulos=(dependencia,))
+    def envolver(valor):
+        return valor
+
+    assert envolver.cache_key(1) != clave
+
+def test_escritores_concurrentes_de_la_misma_clave(tmp_path):
+    @cached_result(cache_dir=str(tmp_path))
+    def grande(valor):
+        return np.full(200_000, valor)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        resultados = list(pool.map(grande, [3] * 32))
+
+    assert all((r == 3).all() for r in resultados)
+    assert [p.suffix for p in tmp_path.iterdir()] == ['.pkl']
+    assert (grande(3) == 3).all()
+
+def test_carpeta_por_defecto_no_depende_del_directorio_de_trabajo():
+    assert os.path.isabs(cache_resultados.CACHE_DIR)
+    assert cache_resultados.CACHE_DIR == os.environ['CACHE_RESULTADOS_DIR']
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+import capacidad
+
+def test_capacidad_reproduce_utilidad_del_readme_con_25_robots(price_grid):
+    modelo = capacidad.capacity_model(price_grid, 25)
+    assert float(modelo['utilidad']) == pytest.approx(20_127_849.09, abs=0.005)
+    assert float(modelo['costo_energia']) == pytest.approx(2_614_458.60, abs=0.005)
+
+def test_flota_optima_igual_a_busqueda_exhaustiva(price_grid):
+    consumos = np.array([0.2, 1.0, 5.0])
+    optimo = capacidad.optimal_fleet(price_grid, consumo_por_robot=consumos)
+
+    robots = np.arange(0, 501)
+    for i, consumo in enumerate(consumos):
+        utilidad = capacidad.capacity_model(price_grid, robots, consumo)['utilidad']
+        assert optimo['num_robots'][i] == robots[np.argmax(utilidad)]
+        assert optimo['utilidad'][i] == pytest.approx(utilidad.max(), rel=1e-12)
+
+def test_puntos_de_equilibrio_dan_utilidad_cero(price_grid):
+    robots = np.array([10.0, 25.0, 40.0])
+    escala = capacidad.break_even_price_scale(price_grid, num_robots=robots)
+    utilidad = capacidad.capacity_model(price_grid, robots, escala_precio=escala)['utilidad']
+    np.testing.assert_allclose(utilidad, 0, atol=1e-3)
+
+    flota = capacidad.break_even_fleet(price_grid, escala_precio=np.array([1.0, 3.0]))
+    utilidad = capacidad.capacity_model(price_grid, flota, escala_precio=np.array([1.0, 3.0]))['utilidad']
+    np.testing.assert_allclose(utilidad, 0, atol=1e-3)
+    # Más allá del equilibrio la flota pierde dinero
+    assert (capacidad.capacity_model(price_grid, flota + 1, escala_precio=np.array([1.0, 3.0]))['utilidad'] < 0).all()
+
+def test_biseccion_sin_cambio_de_signo_es_nan():
+    raiz = capacidad.bisect_vectorized(lambda x: x ** 2 + 1, np.array([-1.0, -1.0]), np.array([1.0, 1.0]))
+    assert np.isnan(raiz).all()
+    raiz = capacidad.bisect_vectorized(lambda x: x - 0.3, 0.0, 1.0)
+    assert raiz == pytest.approx(0.3)
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import carbono
+import flota
+import pareto
+from datos import build_price_grid
+from ingresos import optimize_hours_by_profit
+from horarios_semanales import optimize_weekly_schedules
+
+HORARIO_ACTUAL = (np.arange(24) >= 8) & (np.arange(24) < 20)
+
+def _intensidad(price_grid, semilla=0):
+    # Intensidad sintética con un patrón horario (más limpia de madrugada)
+    rng = np.random.default_rng(semilla)
+    perfil = 0.3 + 0.4 * np.sin(np.arange(24) / 24 * np.pi)
+    return perfil * rng.uniform(0.8, 1.2, size=price_grid['precios'].shape)
+
+@pytest.fixture(scope='module')
+def hojas_con_huecos(df_list):
+    hojas = [df.copy() for df in df_list]
+    hojas[0].iloc[9:12, 3:6] = np.nan
+    hojas[4].iloc[15:18, 10] = np.nan
+    return hojas
+
+def test_costo_y_emisiones_por_hoja_igual_a_recorrido_por_celdas(hojas_con_huecos):
+    price_grid = build_price_grid(hojas_con_huecos)
+    intensidad = _intensidad(price_grid)
+    totales = carbono.sheet_cost_and_emissions(hojas_con_huecos, HORARIO_ACTUAL, intensidad)
+
+    fila = 0
+    for mes, df in enumerate(hojas_con_huecos):
+        costo = emisiones = 0.0
+        horas = 0
+        for dia in range(df.shape[1]):
+            for hora in range(8, 20):
+                precio = df.iloc[hora, dia]
+                if np.isnan(precio):
+                    continue
+                costo += precio * 5
+                emisiones += intensidad[fila + dia, hora] * 5
+                horas += 1
+        cobertura = horas / (12 * df.shape[1])
+        fila += df.shape[1]
+        assert totales['cobertura'][mes] == pytest.approx(cobertura)
+        assert totales['costos'][mes] == pytest.approx(costo / cobertura, rel=1e-12)
+        assert totales['emisiones'][mes] == pytest.approx(emisiones / cobertura, rel=1e-12)
+
+def test_pregunta1_reporta_emisiones_ajustadas_a_cobertura(hojas_con_huecos):
+    from pregunta1 import calculate_energy_cost
+    intensidad = _intensidad(build_price_grid(hojas_con_huecos))
+    resultado = calculate_energy_cost(hojas_con_huecos, verbose=False, intensidad=intensidad)
+    totales = carbono.sheet_cost_and_emissions(hojas_con_huecos, HORARIO_ACTUAL, intensidad)
+    np.testing.assert_allclose(resultado['emisiones_mensuales'], totales['emisiones'], rtol=1e-12)
+    assert resultado['emisiones_total_anual'] == pytest.approx(totales['emisiones'].sum())
+    assert resultado['costo_total_anual'] == pytest.approx(totales['costos'].sum())
+
+def test_pregunta3_emisiones_con_sus_robots_y_consumo(df_list, price_grid):
+    from pregunta3 import compute_monthly_profitability
+    intensidad = _intensidad(price_grid)
+    base = compute_monthly_profitability(df_list, intensidad=intensidad)
+    escenario = compute_monthly_profitability(df_list, num_robots=10, consumption_per_robot=0.3,
+                                              intensidad=intensidad)
+    # 10 × 0.3 = 3 MWh por hora frente a 25 × 0.2 = 5 MWh
+    np.testing.assert_allclose(escenario['Emisiones_tCO2'], base['Emisiones_tCO2'] * 3 / 5, rtol=1e-12)
+
+def test_promedio_mensual_ignora_las_horas_sin_precio():
+    precios = np.full((24, 31), 10.0)
+    precios[3, :30] = np.nan
+    precios[3, 30] = 50.0  # la hora 3 tiene un solo precio, alto
+    precios[5, :] = np.nan  # la hora 5 no tiene precios
+    price_grid = build_price_grid([pd.DataFrame(precios)])
+    intensidad = np.zeros(price_grid['precios'].shape)
+
+    mascara = carbono.select_hours_weighted(price_grid, intensidad, n_horas=22, precios_carbono=[0.0])[0, 0]
+    # Con nan_to_num las horas 3 (50/31) y 5 (0) parecerían las más baratas
+    assert not mascara[3] and not mascara[5]
+    assert mascara.sum() == 22
+
+def test_precio_del_carbono_en_la_flota_reduce_emisiones(price_grid):
+    intensidad = _intensidad(price_grid)
+    sin_precio = flota.optimize_fleet_levels(price_grid, intensidad_carbono=intensidad)
+    con_precio = flota.optimize_fleet_levels(price_grid, intensidad_carbono=intensidad, precio_carbono=500)
+    np.testing.assert_array_equal(sin_precio['robots_por_hora'],
+                                  flota.optimize_fleet_levels(price_grid)['robots_por_hora'])
+    assert con_precio['emisiones_diarias'].sum() < sin_precio['emisiones_diarias'].sum()
+    assert con_precio['costo_diario'].sum() >= sin_precio['costo_diario'].sum()
+    np.testing.assert_array_equal(con_precio['productos_diarios'], sin_precio['productos_diarios'])
+    assert con_precio['resumen']['Emisiones_tCO2'].sum() == pytest.approx(con_precio['emisiones_diarias'].sum())
+
+def test_precio_del_carbono_en_la_frontera_de_pareto(price_grid):
+    intensidad = _intensidad(price_grid)
+    kwargs = dict(month=1, min_horas=12, max_horas=12, max_bloques=2)
+    sin_precio = pareto.pareto_schedule_frontier(price_grid, intensidad_carbono=intensidad, **kwargs)
+    con_precio = pareto.pareto_schedule_frontier(price_grid, intensidad_carbono=intensidad, precio_carbono=5000,
+                                                 **kwargs)
+    referencia = pareto.pareto_schedule_frontier(price_grid, **kwargs)
+
+    assert sin_precio['costo_energia'][0] == pytest.approx(referencia['costo_energia'][0], rel=1e-12)
+    fila = con_precio.iloc[0]
+    assert fila['emisiones_tco2'] < sin_precio['emisiones_tco2'][0]
+    assert fila['costo_ponderado'] == pytest.approx(fila['costo_energia'] + 5000 * fila['emisiones_tco2'])
+
+def test_precio_del_carbono_en_optimizadores_por_utilidad(price_grid):
+    intensidad = _intensidad(price_grid)
+    sin_precio = optimize_hours_by_profit(price_grid, n_horas=12, intensidad_carbono=intensidad)
+    con_precio = optimize_hours_by_profit(price_grid, n_horas=12, intensidad_carbono=intensidad,
+                                          precio_carbono=5000)
+    assert con_precio['emisiones_mensuales'].sum() < sin_precio['emisiones_mensuales'].sum()
+
+    semanal = optimize_weekly_schedules(price_grid, intensidad_carbono=intensidad)
+    semanal_con_precio = optimize_weekly_schedules(price_grid, intensidad_carbono=intensidad, precio_carbono=5000)
+    assert semanal_con_precio['resumen']['Emisiones_Por_Tipo'].sum() < semanal['resumen']['Emisiones_Por_Tipo'].sum()
+    assert semanal['horarios']['Emisiones_tCO2'].sum() == pytest.approx(semanal['resumen']['Emisiones_Por_Tipo'].sum())
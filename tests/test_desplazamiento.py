@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from datos import build_price_grid
+from desplazamiento import _cumulative_bounds, optimize_load_shifting
+
+CAPACIDAD = 4  # 2 robots × 60 / 30 minutos
+
+def _malla(semilla):
+    """
+    Enero con precios enteros aleatorios (el resto del año sin datos)
+    """
+    rng = np.random.default_rng(semilla)
+    df = pd.DataFrame(rng.integers(5, 60, size=(24, 31)).astype(float))
+    price_grid = build_price_grid([df])
+    llegadas = rng.integers(0, 6, size=price_grid['precios'].shape).astype(float)
+    llegadas[np.isnan(price_grid['precios'])] = 0.0
+    return price_grid, llegadas
+
+def _dp_exacto(precios, lower, upper):
+    """
+    Costo mínimo de un día por programación dinámica sobre la producción acumulada
+    """
+    total = int(upper[-1])
+    costo = np.full(total + 1, np.inf)
+    costo[0] = 0.0
+    for hora in range(24):
+        nuevo = np.full(total + 1, np.inf)
+        for x in range(CAPACIDAD + 1):
+            nuevo[x:] = np.minimum(nuevo[x:], costo[:total + 1 - x] + x * precios[hora])
+        estados = np.arange(total + 1)
+        nuevo[(estados < lower[hora] - 1e-9) | (estados > upper[hora] + 1e-9)] = np.inf
+        costo = nuevo
+    return costo[total]
+
+def _verificar(latencia, backlog, semilla):
+    price_grid, llegadas = _malla(semilla)
+    resultado = optimize_load_shifting(price_grid, llegadas, latencia_max=latencia, backlog_max=backlog,
+                                       num_robots=2, minutes_per_product=30)
+    lower, upper = _cumulative_bounds(llegadas, latencia, backlog)
+    precios = price_grid['precios']
+    produccion = resultado['produccion']
+
+    for dia in range(31):
+        optimo = _dp_exacto(precios[dia], lower[dia], upper[dia])
+        if resultado['dias_infactibles'][dia]:
+            assert np.isinf(optimo)
+            continue
+        assert produccion[dia] @ precios[dia] == pytest.approx(optimo)
+
+    factibles = ~resultado['dias_infactibles']
+    acumulada = np.cumsum(produccion, axis=1)
+    assert np.all(produccion <= CAPACIDAD + 1e-9)
+    assert np.all(resultado['backlog'] >= -1e-9)  # nunca se produce antes de la llegada
+    assert np.all(acumulada[factibles] >= lower[factibles] - 1e-9)
+    if backlog is not None:
+        assert np.all(resultado['backlog'][factibles] <= backlog + 1e-9)
+    return resultado
+
+@pytest.mark.parametrize('latencia', [2, 3, 4, 6])
+def test_voraz_igual_a_dp_con_plazo(latencia):
+    resultado = _verificar(latencia, None, semilla=latencia)
+    assert (~resultado['dias_infactibles']).any()
+
+@pytest.mark.parametrize('backlog', [3, 6, 10])
+def test_voraz_igual_a_dp_con_backlog(backlog):
+    resultado = _verificar(24, backlog, semilla=100 + backlog)
+    assert (~resultado['dias_infactibles']).any()
+
+def test_plazo_y_backlog_combinados():
+    _verificar(4, 5, semilla=7)
+
+def test_latencia_cero_es_produccion_inmediata():
+    price_grid, llegadas = _malla(3)
+    llegadas = np.minimum(llegadas, CAPACIDAD)
+    resultado = optimize_load_shifting(price_grid, llegadas, latencia_max=0, num_robots=2, minutes_per_product=30)
+    assert np.allclose(resultado['produccion'], llegadas)
+    assert np.allclose(resultado['costo_diario'], resultado['costo_inmediato_diario'])
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+import experimentos
+import ingresos
+import pregunta4
+from conftest import ROOT
+
+def test_escenarios_toml_reproduce_horarios_de_pregunta4(df_list, price_grid):
+    definicion = experimentos.load_scenario_file(f"{ROOT}/escenarios.toml")
+    escenarios = {e['nombre']: e for e in experimentos.expand_scenarios(definicion) if 'nombre' in e}
+    horarios = pregunta4.define_work_schedules()
+
+    for clave, info in horarios.items():
+        nombre = 'Actual' if clave == 'Actual' else info['nombre']
+        mascara = experimentos._scenario_mask(escenarios[nombre])
+        np.testing.assert_array_equal(mascara, ingresos.schedule_to_hour_mask(info))
+
+        # Costo de enero del escenario = costo del horario en pregunta4
+        grid = ingresos.calculate_hourly_profit_grid(price_grid, mascara)
+        enero = ingresos.summarize_by_month(price_grid, grid['costos_usd'])[0]
+        esperado = pregunta4.calculate_energy_cost_by_schedule(df_list[0], info)['costo_total']
+        assert enero == pytest.approx(esperado, rel=1e-12)
+
+def test_grilla_descarta_ventanas_vacias_y_duplicados():
+    definicion = {'grid': {'hora_inicio': [8, 12], 'hora_fin': [12, 20]},
+                  'escenarios': [{'nombre': 'Actual'}]}
+    escenarios = experimentos.expand_scenarios(definicion)
+
+    ventanas = sorted((e['hora_inicio'], e['hora_fin']) for e in escenarios)
+    assert ventanas == [(8, 12), (8, 20), (12, 20)]
+    # (8, 20) de la grilla es el escenario base: se conserva el explícito con nombre
+    assert [e.get('nombre') for e in escenarios if (e['hora_inicio'], e['hora_fin']) == (8, 20)] == ['Actual']
+
+def test_almacen_reanuda_sin_recalcular(price_grid, tmp_path, capsys):
+    escenarios = experimentos.expand_scenarios({'grid': {'num_robots': [20, 25]}})
+    almacen = str(tmp_path / 'resultados.csv')
+
+    primera = experimentos.run_experiments(price_grid, escenarios, store=almacen, max_workers=1)
+    capsys.readouterr()
+    segunda = experimentos.run_experiments(price_grid, escenarios, store=almacen, max_workers=1)
+    assert 'por calcular: 0' in capsys.readouterr().out
+
+    assert len(segunda) == 2
+    np.testing.assert_allclose(segunda['utilidad'], primera['utilidad'])
+    actual = segunda.loc[segunda['num_robots'] == 25, 'utilidad'].iloc[0]
+    assert actual == pytest.approx(20_127_849.09, abs=0.005)
@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+import flota
+
+def test_rampa_sin_efecto_igual_a_mochila_sin_rampa(price_grid):
+    sin_rampa = flota.optimize_fleet_levels(price_grid, meta_diaria=1200)
+    rampa_amplia = flota.optimize_fleet_levels(price_grid, meta_diaria=1200, rampa=25)
+    np.testing.assert_allclose(rampa_amplia['costo_diario'], sin_rampa['costo_diario'], rtol=1e-12)
+    np.testing.assert_array_equal(rampa_amplia['productos_diarios'], sin_rampa['productos_diarios'])
+
+def test_rampa_se_respeta_y_cumple_la_meta(price_grid):
+    resultado = flota.optimize_fleet_levels(price_grid, meta_diaria=1200, rampa=3)
+    robots = resultado['robots_por_hora']
+    assert np.abs(np.diff(robots, axis=1)).max() <= 3
+    assert (resultado['productos_diarios'] >= 1200).all()
+    assert not resultado['deficit_diario'].any()
+
+def test_meta_sobre_la_capacidad_se_reporta_como_deficit(price_grid):
+    # 25 robots × 24 h × 4 productos = 2,400 productos/día como máximo
+    resultado = flota.optimize_fleet_levels(price_grid, meta_diaria=3000)
+    dias_completos = ~np.isnan(price_grid['precios']).any(axis=1)
+    np.testing.assert_allclose(resultado['deficit_diario'][dias_completos], 600)
+    assert resultado['resumen']['Deficit'].sum() == pytest.approx(resultado['deficit_diario'].sum())
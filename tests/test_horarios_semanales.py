@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+import horarios_semanales
+import pregunta4
+from calendario import build_calendar_context
+from ingresos import calculate_hourly_profit_grid, schedule_to_hour_mask
+
+@pytest.fixture(scope='module')
+def contexto(price_grid):
+    return build_calendar_context(price_grid)
+
+@pytest.fixture(scope='module')
+def semanal(price_grid, contexto):
+    return horarios_semanales.optimize_weekly_schedules(price_grid, contexto)
+
+def test_jornadas_continuas_cruzan_la_medianoche():
+    mascaras, nombres = horarios_semanales.contiguous_schedules(12)
+    assert (mascaras.sum(axis=1) == 12).all()
+    assert nombres[20] == '20:00-08:00'
+    assert mascaras[20, [20, 23, 0, 7]].all() and not mascaras[20, 8:20].any()
+
+def test_mejor_horario_por_tipo_igual_a_busqueda_exhaustiva(price_grid, contexto, semanal):
+    utilidad = calculate_hourly_profit_grid(price_grid, None)['utilidad_usd']
+    candidatos, _ = horarios_semanales.contiguous_schedules(12)
+
+    for mes, tipo in [(1, 0), (6, 2), (12, 3)]:
+        dias = (price_grid['mes'] == mes) & (contexto['clasificacion'] == tipo)
+        valores = [utilidad[dias][:, mascara].sum() for mascara in candidatos]
+        fila = semanal['mascaras'][mes - 1, tipo]
+        assert utilidad[dias][:, fila].sum() == pytest.approx(max(valores), rel=1e-12)
+
+def test_mascara_semanal_reproduce_la_utilidad_por_tipo(price_grid, contexto, semanal):
+    mascara = horarios_semanales.weekly_schedule_mask(price_grid, semanal, contexto)
+    utilidad = calculate_hourly_profit_grid(price_grid, mascara)['utilidad_usd'].sum()
+
+    assert utilidad == pytest.approx(semanal['resumen']['Utilidad_Por_Tipo'].sum(), rel=1e-12)
+    assert (semanal['resumen']['Ganancia'] >= -1e-6).all()
+    assert semanal['ganancia_anual'] == pytest.approx(semanal['resumen']['Ganancia'].sum())
+
+def test_candidatos_de_pregunta4(price_grid, contexto):
+    horarios = pregunta4.define_work_schedules()
+    resultado = horarios_semanales.optimize_weekly_schedules(price_grid, contexto, horarios=horarios)
+    nombres = {info['nombre'] for info in horarios.values()}
+    assert set(resultado['horarios']['Horario']) <= nombres
+
+    # El horario uniforme es el mejor de los candidatos aplicado a todo el mes
+    enero = resultado['resumen'].iloc[0]
+    utilidad = calculate_hourly_profit_grid(price_grid, None)['utilidad_usd'][price_grid['mes'] == 1]
+    mejor = max(utilidad[:, schedule_to_hour_mask(info)].sum() for info in horarios.values())
+    assert enero['Utilidad_Uniforme'] == pytest.approx(mejor, rel=1e-12)
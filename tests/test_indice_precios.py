@@ -0,0 +1,25 @@
+import numpy as np
+
+import indice_precios
+
+def test_horas_mas_baratas_del_mes_igual_a_ordenar_promedios(price_grid):
+    indice = indice_precios.build_price_rank_index(price_grid)
+    for mes in (1, 6, 12):
+        promedios = np.nanmean(price_grid['precios'][price_grid['mes'] == mes], axis=0)
+        horas = [hora for hora, _ in indice_precios.cheapest_hours(indice, 6, meses=[mes])]
+        assert horas == list(np.argsort(promedios, kind='stable')[:6])
+
+def test_horas_bajo_y_sobre_el_cuantil_igual_a_filtrar_la_matriz(price_grid):
+    indice = indice_precios.build_price_rank_index(price_grid)
+
+    dias, horas, precios = indice_precios.hours_above_quantile(indice, 0.9)
+    umbral = indice_precios.quantile_threshold(indice, 0.9)
+    assert np.all(np.diff(precios) <= 0)
+    assert len(precios) == np.sum(price_grid['precios'] >= umbral)
+    np.testing.assert_array_equal(price_grid['precios'][dias, horas], precios)
+
+    dias, horas, precios = indice_precios.hours_below_quantile(indice, 0.25)
+    umbral = indice_precios.quantile_threshold(indice, 0.25)
+    assert np.all(np.diff(precios) >= 0)
+    assert len(precios) == np.sum(price_grid['precios'] <= umbral)
+    np.testing.assert_array_equal(price_grid['precios'][dias, horas], precios)
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+import ingresos
+import pregunta1
+import pregunta3
+
+HORARIO_ACTUAL = (np.arange(24) >= 8) & (np.arange(24) < 20)
+
+def test_costo_anual_pregunta1(df_list):
+    resultado = pregunta1.calculate_energy_cost(df_list, verbose=False)
+    assert resultado['costo_total_anual'] == pytest.approx(2_614_458.60, abs=0.005)
+
+def test_grilla_horaria_reproduce_costos_e_ingresos_mensuales(df_list, price_grid):
+    grid = ingresos.calculate_hourly_profit_grid(price_grid, HORARIO_ACTUAL)
+
+    costos = ingresos.summarize_by_month(price_grid, grid['costos_usd'])
+    esperado = pregunta1.calculate_energy_cost(df_list, verbose=False)['costos_mensuales']
+    np.testing.assert_allclose(costos, esperado, rtol=1e-12)
+
+    ingresos_mes = ingresos.summarize_by_month(price_grid, grid['ingresos_usd'])
+    np.testing.assert_allclose(ingresos_mes, pregunta3.calculate_monthly_revenues(), rtol=1e-12)
+
+def test_rentabilidad_mensual_del_readme(df_list):
+    tabla = pregunta3.compute_monthly_profitability(df_list)
+    mejor = tabla.loc[tabla['Utilidad_USD'].idxmax()]
+    peor = tabla.loc[tabla['Utilidad_USD'].idxmin()]
+    assert (mejor['Mes'], peor['Mes']) == ('Enero', 'Junio')
+    assert mejor['Utilidad_USD'] == pytest.approx(1_781_368.89, abs=0.005)
+    assert peor['Utilidad_USD'] == pytest.approx(1_536_303.38, abs=0.005)
+
+def test_horas_optimas_superan_el_horario_actual_cada_mes(price_grid):
+    optimo = ingresos.optimize_hours_by_profit(price_grid, n_horas=12)
+    assert (optimo['mascara_horas'].sum(axis=1) == 12).all()
+
+    grid = ingresos.calculate_hourly_profit_grid(price_grid, HORARIO_ACTUAL)
+    actual = ingresos.summarize_by_month(price_grid, grid['utilidad_usd'])
+    assert np.all(optimo['utilidad_mensual'] >= actual - 1e-6)
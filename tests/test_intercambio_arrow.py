@@ -0,0 +1,61 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+
+import intercambio_arrow
+from calendario import build_calendar_context
+from pregunta5 import create_guatemala_calendar_2023, map_energy_data_with_context
+
+def _mtimes(rutas):
+    return {nombre: os.stat(ruta).st_mtime_ns for nombre, ruta in rutas.items()}
+
+def test_tabla_igual_a_la_de_pregunta5(df_list, price_grid):
+    tabla = intercambio_arrow.build_context_table(price_grid)
+    referencia = map_energy_data_with_context(df_list, create_guatemala_calendar_2023())
+
+    assert len(tabla) == len(referencia)
+    np.testing.assert_allclose(tabla['precio_mwh'], referencia['precio_mwh'].astype(float))
+    for columna in ['mes_nombre', 'dia_semana_nombre', 'estacion', 'clasificacion']:
+        assert list(tabla[columna].astype(str)) == list(referencia[columna])
+    for columna in ['es_feriado', 'es_fin_de_semana', 'ciclo_escolar_activo']:
+        np.testing.assert_array_equal(tabla[columna], referencia[columna].astype(bool))
+
+def test_exportacion_ida_y_vuelta_conserva_tipos(price_grid, tmp_path):
+    rutas = intercambio_arrow.export_context_arrow(price_grid, str(tmp_path), verbose=False)
+    assert set(rutas) == {intercambio_arrow.TABLA_CONTEXTO, *intercambio_arrow.AGREGADOS}
+
+    tabla = intercambio_arrow.build_context_table(price_grid)
+    leida = intercambio_arrow.load_context_dataframe(str(tmp_path))
+    pd.testing.assert_frame_equal(leida, tabla, check_dtype=False)
+    assert leida['clasificacion'].dtype == tabla['clasificacion'].dtype
+
+    arrow = intercambio_arrow.open_context_arrow(str(tmp_path))
+    assert pa.types.is_dictionary(arrow.schema.field('clasificacion').type)
+
+def test_reexportar_sin_cambios_no_reescribe(price_grid, tmp_path):
+    rutas = intercambio_arrow.export_context_arrow(price_grid, str(tmp_path), verbose=False)
+    antes = _mtimes(rutas)
+    assert _mtimes(intercambio_arrow.export_context_arrow(price_grid, str(tmp_path), verbose=False)) == antes
+
+def test_cambio_de_calendario_reescribe(price_grid, tmp_path):
+    intercambio_arrow.export_context_arrow(price_grid, str(tmp_path), verbose=False)
+    contexto = build_calendar_context(price_grid, feriados=[(1, 1), (3, 15)])
+    intercambio_arrow.export_context_arrow(price_grid, str(tmp_path), context=contexto, verbose=False)
+
+    leida = intercambio_arrow.load_context_dataframe(str(tmp_path))
+    assert leida.loc[leida['fecha'] == '2023-03-15', 'es_feriado'].all()
+
+def test_agregados_faltantes_se_vuelven_a_escribir(price_grid, tmp_path):
+    intercambio_arrow.export_context_arrow(price_grid, str(tmp_path), incluir_agregados=False, verbose=False)
+    assert not os.path.exists(tmp_path / 'por_mes.arrow')
+
+    rutas = intercambio_arrow.export_context_arrow(price_grid, str(tmp_path), verbose=False)
+    assert all(os.path.exists(ruta) for ruta in rutas.values())
+
+    os.remove(rutas['por_estacion'])
+    intercambio_arrow.export_context_arrow(price_grid, str(tmp_path), verbose=False)
+    assert os.path.exists(rutas['por_estacion'])
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+import pareto
+
+def _costo_por_hora(price_grid, mes=1):
+    return np.nansum(price_grid['precios'][price_grid['mes'] == mes], axis=0) * 25 * 0.2
+
+def test_mascara_a_periodos():
+    mascara = sum(1 << h for h in (0, 1, 8, 9, 10, 23))
+    assert pareto.mask_to_periods(mascara) == [(0, 2), (8, 11), (23, 24)]
+    assert pareto.mask_to_periods(0) == []
+
+def test_sin_limite_de_bloques_el_costo_minimo_son_las_horas_mas_baratas(price_grid):
+    frontera = pareto.pareto_schedule_frontier(price_grid, month=1, max_bloques=None)
+    costos = np.sort(_costo_por_hora(price_grid))
+
+    # Con productividad uniforme queda un horario por cantidad de horas
+    assert sorted(frontera['horas_dia']) == list(range(1, 25))
+    for _, fila in frontera.iterrows():
+        assert fila['costo_energia'] == pytest.approx(costos[:fila['horas_dia']].sum(), rel=1e-12)
+
+def test_un_bloque_igual_a_la_mejor_ventana_continua(price_grid):
+    frontera = pareto.pareto_schedule_frontier(price_grid, month=6, max_bloques=1).set_index('horas_dia')
+    costo = _costo_por_hora(price_grid, 6)
+
+    for horas in range(1, 25):
+        ventanas = [costo[inicio:inicio + horas].sum() for inicio in range(25 - horas)]
+        fila = frontera.loc[horas]
+        assert fila['costo_energia'] == pytest.approx(min(ventanas), rel=1e-12)
+        assert len(fila['periodos']) == 1
+
+def test_catalogo_compatible_con_define_work_schedules(price_grid):
+    frontera = pareto.pareto_schedule_frontier(price_grid, month=1, min_horas=6, max_horas=12, max_bloques=2)
+    catalogo = pareto.generate_schedule_catalog(frontera)
+    for info in catalogo.values():
+        assert sum(fin - inicio for inicio, fin in info['horas_trabajo']) == info['total_horas']
+        assert 6 <= info['total_horas'] <= 12
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+import flota
+import portafolio
+
+def test_portafolio_de_un_sitio_igual_a_flota(price_grid):
+    resultado = portafolio.optimize_portfolio([{'price_grid': price_grid}], 1200)
+    referencia = flota.optimize_fleet_levels(price_grid, meta_diaria=1200)
+
+    np.testing.assert_allclose(resultado['robots_activos'][0], referencia['robots_por_hora'])
+    assert resultado['costo_diario'].sum() == pytest.approx(referencia['costo_diario'].sum(), rel=1e-12)
+    assert resultado['ahorro_anual'] == pytest.approx(0.0, abs=1e-6)
+
+def test_minimo_sobre_la_capacidad_del_sitio_es_deficit(price_grid):
+    sitios = [{'nombre': 'A', 'price_grid': price_grid, 'produccion_minima': 5000},
+              {'nombre': 'B', 'price_grid': price_grid}]
+    resultado = portafolio.optimize_portfolio(sitios, 2400)
+    dias_completos = ~np.isnan(price_grid['precios']).any(axis=1)
+
+    np.testing.assert_allclose(resultado['deficit_minimos'][0][dias_completos], 2600)
+    assert (resultado['deficit_diario'][dias_completos] >= 2600).all()
+    assert resultado['resumen_sitios'].loc[0, 'Deficit_Minimo'] > 0
+
+def test_referencia_independiente_produce_la_meta(price_grid):
+    sitios = [{'nombre': 'A', 'price_grid': price_grid, 'produccion_minima': 1500},
+              {'nombre': 'B', 'price_grid': price_grid, 'factor_precio': 1.2}]
+    resultado = portafolio.optimize_portfolio(sitios, 2400)
+
+    # Portafolio y referencia producen lo mismo, así el ahorro solo refleja el reparto
+    productos = resultado['produccion'].sum(axis=(0, 2))
+    dias_completos = ~np.isnan(price_grid['precios']).any(axis=1)
+    np.testing.assert_allclose(productos[dias_completos], 2400)
+    assert resultado['ahorro_anual'] >= 0
+    assert resultado['resumen_sitios']['Costo_Independiente'].sum() >= resultado['resumen_sitios']['Costo_Energia'].sum()
+
+def test_sitios_con_fechas_distintas_es_error(price_grid):
+    desplazada = dict(price_grid, fechas=price_grid['fechas'] + np.timedelta64(365, 'D'))
+    sitios = [{'nombre': 'A', 'price_grid': price_grid}, {'nombre': 'B', 'price_grid': desplazada}]
+    with pytest.raises(ValueError, match='mismas fechas'):
+        portafolio.optimize_portfolio(sitios, 2400)
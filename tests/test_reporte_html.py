@@ -0,0 +1,61 @@
+import json
+import os
+import re
+
+import numpy as np
+import pytest
+
+import reporte_html
+from cache_resultados import CACHE_DIR
+
+def _datos(documento):
+    bloques = re.findall(r'<script type="application/json" id="datos-(\w+)">(.*?)</script>', documento)
+    return {nombre: json.loads(payload.replace('<\\/', '</')) for nombre, payload in bloques}
+
+@pytest.fixture(scope='module')
+def reporte(price_grid, tmp_path_factory):
+    ruta = str(tmp_path_factory.mktemp('reporte') / 'reporte.html')
+    reporte_html.build_html_report(price_grid, ruta, verbose=False)
+    with open(ruta, encoding='utf-8') as f:
+        return f.read()
+
+def test_datos_del_reporte_reproducen_las_cifras_del_readme(reporte):
+    datos = _datos(reporte)
+    assert set(datos) == set(reporte_html.SECCIONES)
+    assert sum(datos['costo']['costo_usd']) == pytest.approx(2_614_458.60, abs=0.005)
+    assert sum(datos['rentabilidad']['utilidad']) == pytest.approx(20_127_849.09, abs=0.005)
+
+def test_reporte_autocontenido_y_liviano(reporte):
+    # Solo agregados: sin recursos externos ni las 8,760 filas horarias
+    assert 'src=' not in reporte and 'href="http' not in reporte
+    assert len(reporte.encode('utf-8')) < 400 * 1024
+    assert 'NaN' not in ''.join(re.findall(r'<script type="application/json".*?</script>', reporte))
+
+def test_solo_cambian_las_secciones_con_parametros_distintos(price_grid):
+    base = dict(reporte_html.PARAMETROS_REPORTE)
+    cambiado = dict(base, hora_fin=18)
+
+    cambian = set()
+    for nombre, (builder, claves) in reporte_html.SECCIONES.items():
+        antes = builder.cache_key(price_grid, **{k: base[k] for k in claves})
+        despues = builder.cache_key(price_grid, **{k: cambiado[k] for k in claves})
+        if antes != despues:
+            cambian.add(nombre)
+    assert cambian == {'costo', 'rentabilidad', 'ahorros'}
+
+def test_secciones_se_sirven_desde_la_cache(price_grid, reporte, tmp_path):
+    builder, claves = reporte_html.SECCIONES['rentabilidad']
+    clave = builder.cache_key(price_grid, **{k: reporte_html.PARAMETROS_REPORTE[k] for k in claves})
+    assert os.path.exists(os.path.join(CACHE_DIR, f"{clave}.pkl"))
+
+    ruta = str(tmp_path / 'parcial.html')
+    reporte_html.build_html_report(price_grid, ruta, secciones=['rentabilidad'], verbose=False)
+    with open(ruta, encoding='utf-8') as f:
+        assert _datos(f.read())['rentabilidad'] == _datos(reporte)['rentabilidad']
+
+def test_emisiones_con_intensidad(price_grid):
+    intensidad = np.full(price_grid['precios'].shape, 0.5)
+    fragmento = reporte_html.section_energy_cost(price_grid, intensidad=intensidad)
+    emisiones = _datos(fragmento)['costo']['emisiones_tco2']
+    # 25 robots × 0.2 MWh × 12 h × 365 días × 0.5 tCO2/MWh
+    assert sum(emisiones) == pytest.approx(25 * 0.2 * 12 * 365 * 0.5)
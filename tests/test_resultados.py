@@ -0,0 +1,26 @@
+import json
+
+import pytest
+
+import pregunta1
+import resultados
+
+def test_resultado_json_conserva_metricas_y_tablas(df_list):
+    res = resultados.energy_cost_result(pregunta1.calculate_energy_cost(df_list, verbose=False))
+    datos = json.loads(resultados.render(res, 'json'))
+
+    assert datos['metricas']['costo_total_anual'] == pytest.approx(2_614_458.60, abs=0.005)
+    tabla = datos['tablas']['costos_mensuales']
+    assert len(tabla['data']) == 12
+    assert 'costo_total' in tabla['columns']
+
+def test_calculo_silencioso_y_formatos(df_list, capsys, tmp_path):
+    res = resultados.energy_cost_result(pregunta1.calculate_energy_cost(df_list, verbose=False))
+    assert capsys.readouterr().out == ''
+
+    assert res.nombre.upper() in resultados.render(res, 'consola')
+    assert resultados.render(res, 'markdown').startswith(f"## {res.nombre}")
+    rutas = resultados.render(res, 'csv', directorio=str(tmp_path))
+    assert sorted(p.rsplit('/', 1)[-1] for p in rutas) == ['costos_mensuales.csv', 'metricas.csv']
+    with pytest.raises(ValueError):
+        resultados.render(res, 'xml')
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+import pregunta4
+import robustez
+
+def _costos(semilla=0, horarios=3, dias=31):
+    rng = np.random.default_rng(semilla)
+    return rng.gamma(2.0, 500.0, size=(horarios, dias))
+
+def test_costos_diarios_igual_a_pregunta4(df_list, price_grid):
+    horarios = pregunta4.define_work_schedules()
+    enero = price_grid['precios'][price_grid['mes'] == 1]
+    masks = np.zeros((len(horarios), 24), dtype=bool)
+    for i, info in enumerate(horarios.values()):
+        for inicio, fin in info['horas_trabajo']:
+            masks[i, inicio:fin] = True
+
+    costos = robustez.daily_schedule_costs(enero, masks)
+    for i, info in enumerate(horarios.values()):
+        esperado = pregunta4.calculate_energy_cost_by_schedule(df_list[0], info)['costo_total']
+        assert costos[i].sum() == pytest.approx(esperado, rel=1e-12)
+
+def test_bootstrap_por_lotes_igual_a_replicas_una_por_una():
+    costos = _costos()
+    riesgo = robustez.bootstrap_schedule_risk(costos, 3000.0, n_replicas=500, alpha=0.9, peores_k=3,
+                                              batch_size=128, seed=4)
+
+    # Mismos índices, generados réplica por réplica
+    rng = np.random.default_rng(4)
+    indices = np.vstack([rng.integers(0, 31, size=(min(128, 500 - s), 31)) for s in range(0, 500, 128)])
+    utilidad = np.array([[3000.0 * 31 - fila[idx].sum() for idx in indices] for fila in costos])
+    peores = np.array([[np.sort(fila[idx])[-3:].sum() for idx in indices] for fila in costos])
+    cola = np.sort(utilidad, axis=1)[:, :50]
+
+    np.testing.assert_allclose(riesgo['utilidad_media'], utilidad.mean(axis=1))
+    np.testing.assert_allclose(riesgo['utilidad_cvar'], cola.mean(axis=1))
+    np.testing.assert_allclose(riesgo['utilidad_var'], cola[:, -1])
+    np.testing.assert_allclose(riesgo['costo_peores_k'], peores.mean(axis=1))
+    assert (riesgo['utilidad_cvar'] <= riesgo['utilidad_media']).all()
+
+def test_costos_constantes_no_tienen_riesgo():
+    costos = np.full((2, 31), 100.0)
+    riesgo = robustez.bootstrap_schedule_risk(costos, 500.0, n_replicas=200)
+    np.testing.assert_allclose(riesgo['utilidad_std'], 0.0, atol=1e-9)
+    np.testing.assert_allclose(riesgo['utilidad_cvar'], 400.0 * 31)
+    np.testing.assert_allclose(riesgo['costo_peores_k'], 300.0)
+
+def test_horario_dominante_gana_bajo_todos_los_criterios():
+    costos = _costos(semilla=1)
+    costos[1] = costos.min(axis=0) * 0.9
+    riesgo = robustez.bootstrap_schedule_risk(costos, 3000.0, n_replicas=1000)
+    tabla, mejores = robustez.rank_schedules_by_risk(['A', 'B', 'C'], riesgo)
+    assert set(mejores) == set(robustez.CRITERIOS_RIESGO)
+    assert set(mejores.values()) == {'B'}
+    assert list(tabla.index) == ['A', 'B', 'C']
+
+def test_media_ignora_los_dias_pico_y_peores_k_los_penaliza():
+    # A: siempre 1,000; B: más barato en promedio pero con días pico
+    costos = np.vstack([np.full(30, 1000.0), np.r_[np.full(27, 600.0), np.full(3, 4500.0)]])
+    riesgo = robustez.bootstrap_schedule_risk(costos, 2000.0, n_replicas=4000, alpha=0.95, seed=2)
+    _, mejores = robustez.rank_schedules_by_risk(['A', 'B'], riesgo)
+    assert mejores['media'] == 'B'
+    assert mejores['peor_k'] == 'A'
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+import sensibilidad
+from ingresos import PRODUCT_PROFITS_GTQ, PRODUCT_PROBABILITIES
+
+PROBABILIDADES = np.array(list(PRODUCT_PROBABILITIES.values()), dtype=float)
+CONTINUOS = ('num_robots', 'consumo_por_robot', 'minutos_por_producto', 'tasa_cambio')
+
+def _utilidad(price_grid, params=None, probabilidades=PROBABILIDADES):
+    params = dict(sensibilidad.BASE_PARAMETERS, **(params or {}))
+    return float(sensibilidad.evaluate_profit_model(price_grid, params, probabilidades)['utilidad'])
+
+def _mezcla(i, delta):
+    # Misma trayectoria que el tornado: sube p_i y reescala las demás en proporción
+    mezcla = PROBABILIDADES.copy()
+    mezcla[i] += delta
+    otros = np.arange(len(mezcla)) != i
+    mezcla[otros] *= (1 - mezcla[i]) / PROBABILIDADES[otros].sum()
+    return mezcla
+
+def test_gradiente_analitico_igual_a_diferencia_central(price_grid):
+    gradiente = sensibilidad.analytic_gradient(price_grid)
+
+    for nombre in CONTINUOS:
+        h = sensibilidad.BASE_PARAMETERS[nombre] * 1e-4
+        base = sensibilidad.BASE_PARAMETERS[nombre]
+        central = (_utilidad(price_grid, {nombre: base + h}) - _utilidad(price_grid, {nombre: base - h})) / (2 * h)
+        assert gradiente[nombre] == pytest.approx(central, rel=1e-6)
+
+    for i, nombre in enumerate(PRODUCT_PROFITS_GTQ):
+        h = 1e-4
+        central = (_utilidad(price_grid, probabilidades=_mezcla(i, h)) -
+                   _utilidad(price_grid, probabilidades=_mezcla(i, -h))) / (2 * h)
+        assert gradiente[f'mezcla: {nombre}'] == pytest.approx(central, rel=1e-6)
+
+def test_ventana_horaria_igual_a_correr_una_hora(price_grid):
+    gradiente = sensibilidad.analytic_gradient(price_grid)
+    base = _utilidad(price_grid)
+    assert gradiente['hora_fin'] == pytest.approx(_utilidad(price_grid, {'hora_fin': 21}) - base)
+    assert gradiente['hora_inicio'] == pytest.approx(_utilidad(price_grid, {'hora_inicio': 9}) - base)
+
+def test_tornado_coherente_con_derivadas_y_elasticidades(price_grid):
+    variacion = 0.10
+    reporte = sensibilidad.sensitivity_report(price_grid, variacion=variacion).set_index('Parametro')
+    base = _utilidad(price_grid)
+
+    assert reporte['Elasticidad'].notna().all()
+    for i, nombre in enumerate(PRODUCT_PROFITS_GTQ):
+        fila = reporte.loc[f'mezcla: {nombre}']
+        assert fila['Valor_Base'] == PROBABILIDADES[i]
+        # La utilidad es lineal en p_i sobre esta trayectoria: el rango es exacto
+        pendiente = (fila['Utilidad_Alta'] - fila['Utilidad_Baja']) / (2 * variacion * PROBABILIDADES[i])
+        assert fila['Derivada'] == pytest.approx(pendiente, rel=1e-9)
+        assert fila['Elasticidad'] == pytest.approx(fila['Derivada'] * PROBABILIDADES[i] / base)
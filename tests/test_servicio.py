@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+import pregunta1
+from servicio import ServicioConsultas
+
+@pytest.fixture(scope='module')
+def servicio(df_list, price_grid):
+    servicio = ServicioConsultas(price_grid, df_list, max_workers=2)
+    yield servicio
+    servicio.executor.shutdown()
+
+def _consultar(servicio, *consultas):
+    async def ejecutar():
+        return await asyncio.gather(*(servicio.dispatch(path, raw) for path, raw in consultas))
+    return asyncio.run(ejecutar())
+
+def test_costo_igual_a_pregunta1(servicio, df_list):
+    (status, cuerpo), = _consultar(servicio, ('/costo', {}))
+    assert status == 200
+    esperado = pregunta1.calculate_energy_cost(df_list, verbose=False)['costo_total_anual']
+    assert cuerpo['costo_usd']['total'] == pytest.approx(esperado, rel=1e-12)
+
+def test_consultas_equivalentes_comparten_la_entrada_de_cache(servicio):
+    antes = len(servicio.cache)
+    respuestas = _consultar(servicio, ('/costo', {'mes': '5'}), ('/costo', {'mes': 'Mayo'}),
+                            ('/costo', {'mes': 5, 'num_robots': '25'}))
+    assert len(servicio.cache) == antes + 1
+    assert {cuerpo['costo_usd']['mes'] for _, cuerpo in respuestas} == {'Mayo'}
+
+    (_, omitido), (_, explicito) = _consultar(servicio, ('/contexto', {}), ('/contexto', {'n': '5'}))
+    assert omitido == explicito
+    assert len(omitido['horas']) == 5
+
+@pytest.mark.parametrize('raw', [{'n': '-3'}, {'n': '0'}, {'n': '25'}, {'meses': 'Foo'},
+                                 {'clasificaciones': 'Lunes'}])
+def test_contexto_rechaza_parametros_invalidos(servicio, raw):
+    (status, cuerpo), = _consultar(servicio, ('/contexto', raw))
+    assert status == 400 and 'error' in cuerpo
+
+def test_horarios_y_rutas_desconocidas(servicio):
+    (status, cuerpo), (status_malo, _), (status_ruta, _) = _consultar(
+        servicio, ('/horarios', {'n_horas': '6', 'mes': '1'}), ('/horarios', {'n_horas': '30'}), ('/nada', {}))
+    assert status == 200
+    assert len(cuerpo['horarios']['Enero']['horas']) == 6
+    assert (status_malo, status_ruta) == (400, 404)
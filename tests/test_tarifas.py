@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import pregunta1
+import tarifas
+from datos import build_price_grid
+
+@pytest.fixture
+def grilla_constante():
+    # Precio plano de 50 USD/MWh; el 3 de enero (martes) y todo febrero sin precio
+    hojas = [pd.DataFrame(np.full((24, 31), 50.0)) for _ in range(12)]
+    grid = build_price_grid(hojas)
+    grid['precios'][2] = np.nan
+    grid['precios'][grid['mes'] == 2] = np.nan
+    return grid
+
+def test_factura_horaria_industrial_calculada_a_mano(grilla_constante):
+    tarifa = tarifas.define_tariffs()['Horaria_Industrial']
+    perfil = tarifas.scenario_consumption_profile()  # 5 MWh de 8:00 a 20:00
+    resultado = tarifas.evaluate_tariffs(grilla_constante, perfil, [tarifa])
+
+    # Enero: 30 días con precio, 21 laborables (22 menos el 3 de enero)
+    energia = 30 * 12 * 5 * 50
+    recargos = 21 * (10 * 5 * 8.0 + 2 * 5 * 25.0)
+    demanda = 5 * 1000 * 8.5
+    assert resultado['energia'][0, 0, 0] == pytest.approx(energia)
+    assert resultado['recargos_banda'][0, 0, 0] == pytest.approx(recargos)
+    assert resultado['cargo_demanda'][0, 0, 0] == pytest.approx(demanda)
+    assert resultado['total'][0, 0, 0] == pytest.approx(energia + recargos + demanda + 1500.0)
+
+    # Febrero sin precios: solo el cargo fijo
+    assert resultado['recargos_banda'][0, 0, 1] == 0
+    assert resultado['cargo_demanda'][0, 0, 1] == 0
+    assert resultado['total'][0, 0, 1] == pytest.approx(1500.0)
+
+def test_perfiles_diarios_y_completos_dan_la_misma_factura(grilla_constante):
+    tarifas_lista = list(tarifas.define_tariffs().values())
+    perfil = tarifas.scenario_consumption_profile()
+    completo = np.broadcast_to(perfil, grilla_constante['precios'].shape)[None]
+
+    diario = tarifas.evaluate_tariffs(grilla_constante, perfil, tarifas_lista)
+    anual = tarifas.evaluate_tariffs(grilla_constante, completo, tarifas_lista)
+    for componente in ('energia', 'recargos_banda', 'cargo_demanda', 'total'):
+        np.testing.assert_allclose(diario[componente], anual[componente])
+
+def test_tarifa_spot_igual_al_costo_de_pregunta1(df_list, price_grid):
+    tabla = pregunta1.calculate_tariff_costs(price_grid, verbose=False)
+    spot = tabla.set_index('Tarifa').loc['Spot', 'Total_USD']
+    esperado = pregunta1.calculate_energy_cost(df_list, verbose=False)['costo_total_anual']
+    assert spot == pytest.approx(esperado, rel=1e-12)
+    assert (tabla['Total_USD'] >= spot).all()
+
+def test_tarifa_desconocida_es_error(price_grid):
+    with pytest.raises(ValueError):
+        pregunta1.calculate_tariff_costs(price_grid, ['Inexistente'], verbose=False)
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from telemetria import HourlyConsumptionAccumulator, load_robot_telemetry
+
+def _lecturas(price_grid, n=20_000, semilla=0):
+    rng = np.random.default_rng(semilla)
+    inicio = pd.Timestamp(price_grid['fechas'][0])
+    return pd.DataFrame({
+        'timestamp': inicio + pd.to_timedelta(rng.integers(0, 365 * 24 * 60, n), unit='min'),
+        'robot_id': rng.choice([f"R{i:02d}" for i in range(25)], n),
+        'kwh': rng.choice([0.0, 0.5, 1.2], n),
+    })
+
+def test_acumulador_por_bloques_igual_a_groupby(price_grid):
+    lecturas = _lecturas(price_grid)
+    acumulador = HourlyConsumptionAccumulator(price_grid)
+    for inicio in range(0, len(lecturas), 3_000):
+        acumulador.add_chunk(lecturas.iloc[inicio:inicio + 3_000])
+    resultado = acumulador.result()
+
+    celda = ((lecturas['timestamp'] - pd.Timestamp(price_grid['fechas'][0])) // pd.Timedelta(hours=1)).to_numpy()
+    energia = lecturas.groupby(celda)['kwh'].sum()
+    activos = lecturas[lecturas['kwh'] > 0].groupby(celda[lecturas['kwh'] > 0])['robot_id'].nunique()
+
+    esperado = np.zeros(price_grid['precios'].size)
+    esperado[energia.index] = energia.to_numpy() / 1000
+    np.testing.assert_allclose(resultado['consumo_mwh'].ravel(), esperado, atol=1e-12)
+
+    esperado = np.zeros(price_grid['precios'].size, dtype=int)
+    esperado[activos.index] = activos.to_numpy()
+    np.testing.assert_array_equal(resultado['robots_activos'].ravel(), esperado)
+
+def test_lectura_desde_csv_descarta_lecturas_fuera_del_año(price_grid, tmp_path):
+    lecturas = _lecturas(price_grid, n=5_000, semilla=1)
+    fuera = lecturas.iloc[:10].assign(timestamp=pd.Timestamp('2030-01-01'))
+    archivo = tmp_path / 'telemetria.csv'
+    pd.concat([lecturas, fuera]).to_csv(archivo, index=False)
+
+    resultado = load_robot_telemetry(str(archivo), price_grid, chunksize=700, verbose=False)
+    assert resultado['filas'] == len(lecturas) + 10
+    assert resultado['fuera_de_rango'] == 10
+    assert resultado['consumo_mwh'].sum() == pytest.approx(lecturas['kwh'].sum() / 1000)
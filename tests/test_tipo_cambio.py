@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+import pregunta3
+import tipo_cambio
+
+def _serie_diaria(price_grid, semilla=0):
+    rng = np.random.default_rng(semilla)
+    fechas = price_grid['fechas'].astype('datetime64[h]')
+    return fechas, 7.6 + 0.4 * rng.random(len(fechas))
+
+def test_serie_de_tipo_de_cambio_vacia_es_error(price_grid):
+    vacia = (np.array([], dtype='datetime64[h]'), np.array([], dtype=float))
+    with pytest.raises(ValueError):
+        tipo_cambio.align_fx_to_grid(price_grid, vacia)
+
+def test_tasa_efectiva_de_una_serie_constante(price_grid):
+    tasas = tipo_cambio.align_fx_to_grid(price_grid)
+    assert tipo_cambio.effective_rate(tasas) == pytest.approx(tipo_cambio.DEFAULT_GTQ_PER_USD)
+    np.testing.assert_allclose(tipo_cambio.monthly_average_rate(price_grid, tasas), 7.8)
+
+def test_alineacion_toma_la_ultima_tasa_publicada(price_grid):
+    fechas, tasas = _serie_diaria(price_grid)
+    grid = tipo_cambio.align_fx_to_grid(price_grid, (fechas[::7], tasas[::7]))
+    np.testing.assert_array_equal(grid[:, 0], np.repeat(tasas[::7], 7)[:len(fechas)])
+
+def test_conversion_mensual_igual_a_la_suma_de_conversiones_diarias(price_grid):
+    tasas = tipo_cambio.align_fx_to_grid(price_grid, _serie_diaria(price_grid))
+    ingreso_diario_gtq = 1_000_000.0
+
+    por_dia = np.bincount(price_grid['mes'] - 1, weights=ingreso_diario_gtq / tasas.mean(axis=1), minlength=12)
+    dias = np.bincount(price_grid['mes'] - 1, minlength=12)
+    por_mes = dias * ingreso_diario_gtq / tipo_cambio.monthly_average_rate(price_grid, tasas)
+    np.testing.assert_allclose(por_mes, por_dia, rtol=1e-12)
+
+    anual = dias.sum() * ingreso_diario_gtq / tipo_cambio.effective_rate(tasas)
+    assert anual == pytest.approx(por_dia.sum(), rel=1e-12)
+
+def test_ingresos_de_pregunta3_con_tasas_mensuales(price_grid):
+    tasas = tipo_cambio.align_fx_to_grid(price_grid, _serie_diaria(price_grid))
+    mensuales = tipo_cambio.monthly_average_rate(price_grid, tasas)
+    ingresos = pregunta3.calculate_monthly_revenues(gtq_to_usd_rate=mensuales)
+    np.testing.assert_allclose(ingresos * mensuales, pregunta3.calculate_monthly_revenues(gtq_to_usd_rate=1.0))
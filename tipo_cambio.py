@@ -0,0 +1,114 @@
+import os
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+# Tasa fija usada en los análisis originales (1 USD = 7.8 GTQ)
+DEFAULT_GTQ_PER_USD = 7.8
+
+@lru_cache(maxsize=8)
+def _read_rate_table(file_path, mtime, size):
+    """
+    Lee y ordena la tabla de tasas; la clave incluye mtime/tamaño para invalidar la caché
+    """
+    if file_path.lower().endswith(('.xlsx', '.xls')):
+        df = pd.read_excel(file_path)
+    else:
+        df = pd.read_csv(file_path)
+
+    df.columns = [str(col).strip().lower() for col in df.columns]
+    if 'fecha' not in df.columns or 'tasa' not in df.columns:
+        raise ValueError(f"El archivo {file_path} debe tener columnas 'fecha' y 'tasa' (GTQ por USD)")
+
+    # Se permite una columna opcional 'hora' para series horarias
+    times = pd.to_datetime(df['fecha'])
+    if 'hora' in df.columns:
+        times = times + pd.to_timedelta(df['hora'].astype(int), unit='h')
+
+    order = np.argsort(times.to_numpy(), kind='stable')
+    rate_times = times.to_numpy().astype('datetime64[h]')[order]
+    rates = df['tasa'].to_numpy(dtype=float)[order]
+
+    # Arreglos de solo lectura: se comparten entre llamadas
+    rate_times.setflags(write=False)
+    rates.setflags(write=False)
+    return rate_times, rates
+
+def load_fx_rates(file_path):
+    """
+    Carga una serie diaria u horaria de tipo de cambio GTQ/USD desde CSV o Excel
+
+    El archivo debe tener columnas 'fecha' y 'tasa' y opcionalmente 'hora'.
+    Las lecturas repetidas del mismo archivo sin modificar se sirven desde caché.
+
+    Returns:
+        tuple: (tiempos datetime64[h] ordenados, tasas GTQ por USD)
+    """
+    stat = os.stat(file_path)
+    return _read_rate_table(os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+
+def align_fx_to_grid(price_grid, fx_rates=None):
+    """
+    Alinea la serie de tasas a la grilla día × hora con un as-of join vectorizado
+
+    Cada celda toma la última tasa publicada en o antes de su hora; las celdas
+    anteriores a la primera tasa usan la primera disponible.
+
+    Args:
+        price_grid: Diccionario de datos.build_price_grid
+        fx_rates: Resultado de load_fx_rates; None = tasa fija DEFAULT_GTQ_PER_USD
+
+    Returns:
+        np.ndarray: Tasas GTQ por USD con forma (días, 24)
+
+    Raises:
+        ValueError: Si la serie no tiene tasas
+    """
+    shape = price_grid['precios'].shape
+    if fx_rates is None:
+        return np.full(shape, DEFAULT_GTQ_PER_USD)
+
+    rate_times, rates = fx_rates
+    if len(rates) == 0:
+        raise ValueError("La serie de tipo de cambio está vacía")
+
+    cell_times = price_grid['fechas'].astype('datetime64[h]')[:, None] + np.arange(24).astype('timedelta64[h]')
+
+    idx = np.searchsorted(rate_times, cell_times, side='right') - 1
+    return rates[np.clip(idx, 0, len(rates) - 1)]
+
+def convert_gtq_to_usd(values_gtq, rate_grid):
+    """
+    Convierte montos en GTQ a USD celda por celda
+    """
+    return np.asarray(values_gtq) / rate_grid
+
+def convert_usd_to_gtq(values_usd, rate_grid):
+    """
+    Convierte montos en USD (ej. costos energéticos) a GTQ celda por celda
+    """
+    return np.asarray(values_usd) * rate_grid
+
+def monthly_average_rate(price_grid, rate_grid):
+    """
+    Tasa equivalente por mes (12 valores) para los cálculos de ingresos mensuales
+
+    Igual que effective_rate, es la media armónica de las tasas diarias de cada
+    mes: dividir el ingreso mensual entre ella da lo mismo que convertir el
+    ingreso de cada día con su propia tasa.
+    """
+    month_idx = price_grid['mes'] - 1
+    daily = np.asarray(rate_grid).mean(axis=1)
+    inverse_sums = np.bincount(month_idx, weights=1.0 / daily, minlength=12)
+    counts = np.bincount(month_idx, minlength=12)
+    return np.divide(counts, inverse_sums, out=np.full(12, DEFAULT_GTQ_PER_USD), where=counts > 0)
+
+def effective_rate(rate_grid):
+    """
+    Tasa única equivalente para ingresos anuales repartidos por igual entre días
+
+    Es la media armónica de las tasas diarias: convertir el total con ella da
+    lo mismo que convertir el ingreso de cada día con su propia tasa.
+    """
+    daily = np.asarray(rate_grid).mean(axis=1)
+    return len(daily) / np.sum(1.0 / daily)
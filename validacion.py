@@ -0,0 +1,199 @@
+import calendar
+import warnings
+from typing import List
+import numpy as np
+import pandas as pd
+from datos import MONTHS, read_excel_sheets_to_dataframes, build_price_grid
+
+# Banderas de la máscara de calidad (uint8 por celda día × hora)
+FLAG_FALTANTE = 1
+FLAG_NEGATIVO = 2
+FLAG_ATIPICO = 4
+FLAG_RELLENADO = 8
+
+def _nan_run_lengths(missing):
+    """
+    Largo de la racha de NaN a la que pertenece cada posición (0 si no falta)
+    """
+    run_id = np.cumsum(~missing)
+    run_sizes = np.bincount(run_id, weights=missing)
+    return np.where(missing, run_sizes[run_id], 0)
+
+def validate_price_sheets(df_list: List[pd.DataFrame], year=2023, outlier_threshold=6.0,
+                          mad_floor=0.1, fill_gaps=False, max_gap_hours=6):
+    """
+    Valida las hojas mensuales una sola vez al cargar los datos
+
+    Revisa la forma de cada hoja contra los días reales del mes, marca precios
+    faltantes, negativos y atípicos (z robusto con mediana/MAD por mes) y,
+    opcionalmente, rellena huecos cortos con interpolación lineal en orden
+    cronológico.
+
+    Args:
+        df_list: Lista de DataFrames con precios de energía por mes
+        year: Año de los datos
+        outlier_threshold: Umbral del z robusto para marcar precios atípicos
+        mad_floor: Dispersión mínima como fracción de la mediana mensual
+        fill_gaps: Si True, interpola huecos de hasta max_gap_hours horas
+        max_gap_hours: Largo máximo de hueco que se rellena
+
+    Returns:
+        tuple: (hojas reparadas, grilla de precios con máscara 'calidad' y 'reporte_calidad')
+    """
+    price_grid = build_price_grid(df_list, year=year)
+    precios = price_grid['precios']
+    calidad = np.zeros(precios.shape, dtype=np.uint8)
+
+    missing = np.isnan(precios)
+    calidad[missing] |= FLAG_FALTANTE
+    calidad[precios < 0] |= FLAG_NEGATIVO
+
+    # Z robusto por mes: tensor (12, 31*24) rellenado con NaN
+    month_idx = price_grid['mes'] - 1
+    day_idx = price_grid['dia'] - 1
+    month_tensor = np.full((12, 31, 24), np.nan)
+    month_tensor[month_idx, day_idx] = precios
+    flat = month_tensor.reshape(12, -1)
+    with np.errstate(all='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        median = np.nanmedian(flat, axis=1)
+        mad = np.nanmedian(np.abs(flat - median[:, None]), axis=1) * 1.4826
+        # Meses con precios casi planos tienen MAD ~0: se usa un piso relativo a la mediana
+        mad = np.maximum(mad, mad_floor * np.abs(median))
+        robust_z = np.abs(precios - median[month_idx, None]) / mad[month_idx, None]
+    calidad[np.nan_to_num(robust_z, nan=0.0) > outlier_threshold] |= FLAG_ATIPICO
+
+    if fill_gaps and missing.any():
+        series = precios.ravel()
+        fillable = (_nan_run_lengths(np.isnan(series)) <= max_gap_hours) & np.isnan(series)
+        interpolated = pd.Series(series).interpolate(limit_area='inside').to_numpy()
+        series = np.where(fillable, interpolated, series)
+        filled = fillable.reshape(precios.shape) & ~np.isnan(series.reshape(precios.shape))
+        precios = series.reshape(precios.shape)
+        calidad[filled] |= FLAG_RELLENADO
+        price_grid['precios'] = precios
+
+    # Reporte por mes y reconstrucción de las hojas (24 horas × días)
+    report = []
+    repaired = []
+    for month_num in range(1, 13):
+        days_in_month = calendar.monthrange(year, month_num)[1]
+        rows = month_idx == month_num - 1
+        month_flags = calidad[rows]
+        df = df_list[month_num - 1] if month_num - 1 < len(df_list) else pd.DataFrame()
+
+        report.append({
+            'mes': MONTHS[month_num - 1],
+            'hoja_vacia': df.empty,
+            'forma': df.shape,
+            'dias_esperados': days_in_month,
+            'forma_correcta': df.shape == (24, days_in_month),
+            'faltantes': int(np.count_nonzero(month_flags & FLAG_FALTANTE)),
+            'negativos': int(np.count_nonzero(month_flags & FLAG_NEGATIVO)),
+            'atipicos': int(np.count_nonzero(month_flags & FLAG_ATIPICO)),
+            'rellenados': int(np.count_nonzero(month_flags & FLAG_RELLENADO))
+        })
+
+        repaired.append(pd.DataFrame(precios[rows].T, columns=range(1, days_in_month + 1)))
+
+    price_grid['calidad'] = calidad
+    price_grid['reporte_calidad'] = pd.DataFrame(report)
+
+    return repaired, price_grid
+
+def usable_hours_mask(price_grid, exclude_flags=FLAG_FALTANTE | FLAG_NEGATIVO):
+    """
+    Máscara booleana de celdas utilizables según la máscara de calidad ya calculada
+    """
+    return (price_grid['calidad'] & exclude_flags) == 0
+
+def monthly_coverage(price_grid, hora_inicio=0, hora_fin=24, exclude_flags=FLAG_FALTANTE | FLAG_NEGATIVO):
+    """
+    Fracción de horas utilizables de cada mes (12 valores) dentro del horario
+    """
+    usable = usable_hours_mask(price_grid, exclude_flags)[:, hora_inicio:hora_fin]
+    month_idx = price_grid['mes'] - 1
+    observed = np.bincount(month_idx, weights=usable.sum(axis=1), minlength=12)
+    expected = np.bincount(month_idx, minlength=12) * (hora_fin - hora_inicio)
+    return np.divide(observed, expected, out=np.zeros(12), where=expected > 0)
+
+def sheet_coverage(prices):
+    """
+    Fracción de celdas con precio en un bloque de una hoja (ej. las horas laborales del mes)
+    """
+    values = np.asarray(prices, dtype=float)
+    return np.count_nonzero(~np.isnan(values)) / values.size if values.size else 0.0
+
+def coverage_adjusted(total, coverage):
+    """
+    Lleva un total calculado sobre las horas con precio a cobertura completa
+
+    Las horas sin precio se valoran al promedio de las observadas del mismo
+    bloque, de modo que un mes con huecos sin rellenar no parece más barato.
+    """
+    return total / coverage if 0 < coverage < 1 else total
+
+def warn_incomplete_months(price_grid, hora_inicio=0, hora_fin=24):
+    """
+    Advierte los meses con huecos sin rellenar dentro del horario analizado
+
+    Returns:
+        np.ndarray: Cobertura por mes (ver monthly_coverage)
+    """
+    coverage = monthly_coverage(price_grid, hora_inicio, hora_fin)
+    for month_idx in np.flatnonzero(coverage < 1):
+        print(f"⚠️  {MONTHS[month_idx]}: {coverage[month_idx] * 100:.1f}% de las horas "
+              f"{hora_inicio}:00-{hora_fin}:00 con precio válido; sus totales se ajustan a cobertura completa")
+    return coverage
+
+def print_quality_report(price_grid):
+    """
+    Muestra el resumen de calidad de datos por mes
+    """
+    report = price_grid['reporte_calidad']
+    print("\nVALIDACIÓN DE DATOS DE PRECIOS")
+    print(f"{'Mes':<12} {'Forma':<10} {'Esperado':<9} {'Faltantes':<10} {'Negativos':<10} {'Atípicos':<9} {'Rellenados':<10}")
+    print("-" * 75)
+    for _, row in report.iterrows():
+        forma = f"{row['forma'][0]}x{row['forma'][1]}"
+        marca = "" if row['forma_correcta'] else "  ⚠️"
+        print(f"{row['mes']:<12} {forma:<10} {'24x' + str(row['dias_esperados']):<9} {row['faltantes']:<10} "
+              f"{row['negativos']:<10} {row['atipicos']:<9} {row['rellenados']:<10}{marca}")
+
+def apply_quality_mask(df_list, price_grid, exclude_flags=FLAG_FALTANTE | FLAG_NEGATIVO):
+    """
+    Deja como NaN (en hojas y grilla) las celdas que la máscara de calidad excluye
+
+    Así todos los análisis omiten las mismas celdas y los ajustes por
+    cobertura (coverage_adjusted) las consideran faltantes.
+    """
+    excluded = ~usable_hours_mask(price_grid, exclude_flags)
+    if not excluded.any():
+        return df_list, price_grid
+
+    precios = np.where(excluded, np.nan, price_grid['precios'])
+    month_idx = price_grid['mes'] - 1
+    sheets = []
+    for month_num, df in enumerate(df_list, start=1):
+        rows = month_idx == month_num - 1
+        sheets.append(pd.DataFrame(precios[rows].T, columns=df.columns))
+    return sheets, dict(price_grid, precios=precios)
+
+def load_price_data(file_path, year=2023, fill_gaps=False, verbose=True,
+                    exclude_flags=FLAG_FALTANTE | FLAG_NEGATIVO, **validation_kwargs):
+    """
+    Carga el libro de precios y ejecuta la validación una sola vez
+
+    Las celdas marcadas con exclude_flags (faltantes y negativas por defecto)
+    quedan como NaN; exclude_flags=0 conserva todos los precios leídos.
+
+    Returns:
+        tuple: (hojas validadas/reparadas, grilla de precios con máscara de calidad)
+    """
+    df_list = read_excel_sheets_to_dataframes(file_path)
+    df_list, price_grid = validate_price_sheets(df_list, year=year, fill_gaps=fill_gaps,
+                                                **validation_kwargs)
+    df_list, price_grid = apply_quality_mask(df_list, price_grid, exclude_flags)
+    if verbose:
+        print_quality_report(price_grid)
+    return df_list, price_grid